@@ -5,16 +5,21 @@ from datetime import datetime
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, send_file
 from flask import make_response
 from flask_login import LoginManager, login_required, login_user, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import JWTManager
 from flask_wtf.csrf import CSRFProtect
 from flask_wtf import FlaskForm
 from wtforms import HiddenField
-from services.ats_analyzer import EnhancedATSAnalyzer
-from services.ai_suggestions import AISuggestions
-from services.file_parser import FileParser
-from services.resume_customizer import ResumeCustomizer
 from extensions import db
+from db_config import configure_database
+from db_bootstrap import bootstrap_database
+from services.session_store import configure_sessions
+from services.metrics import init_metrics
+from services.tracing import init_tracing
+from services.profiler import init_profiler
+from services.memory import init_memory_tracking
+from services.health import init_health
+from services.rate_limit import init_rate_limits
+from services.lazy_imports import apply_cold_start_mode
 from models import JobDescription, CustomizedResume, User, ABTest, OptimizationSuggestion
 from io import BytesIO
 from sqlalchemy import func
@@ -22,13 +27,12 @@ from functools import wraps
 
 # Import blueprints
 from routes.auth import auth_bp
-from routes.jobs import jobs_bp
+from routes.jobs import jobs_bp, SERVICES
 from routes.dashboard import dashboard_bp
 from routes.admin import admin_bp
 from routes.resume import resume_bp
-
-# Import the feedback loop service
-from services.feedback_loop import FeedbackLoop
+from routes.metrics import metrics_bp
+from routes.health import health_bp
 
 logging.basicConfig(level=logging.DEBUG, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -36,21 +40,61 @@ logger = logging.getLogger("app")
 
 # Create Flask app
 app = Flask(__name__)
-# Set the absolute path for the database
-db_path = os.path.join(os.getcwd(), 'resumerocket.db')
-print(f"Using database at: {db_path}")
 
 app.config.from_mapping(
     SECRET_KEY=os.environ.get('SECRET_KEY', 'dev_key'),
-    SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}",
     SQLALCHEMY_TRACK_MODIFICATIONS=False,
     JWT_SECRET_KEY=os.environ.get('JWT_SECRET_KEY', 'jwt_dev_key'),
     UPLOAD_FOLDER=os.path.join(os.getcwd(), 'uploads'),
+    BLOB_STORE_DIR=os.environ.get('BLOB_STORE_DIR'),  # defaults to <instance_path>/blobs
+    SESSION_BACKEND=os.environ.get('SESSION_BACKEND', 'database'),  # 'database', 'filesystem' or 'cookie'
+    SESSION_FILE_DIR=os.environ.get('SESSION_FILE_DIR'),  # defaults to <instance_path>/sessions
+    SESSION_IDLE_LIFETIME=int(os.environ.get('SESSION_IDLE_LIFETIME', 24 * 3600)),  # seconds a non-permanent session is kept unused
+    RESCORE_ON_READ=os.environ.get('RESCORE_ON_READ', 'false').lower() == 'true',  # rescore stale ATS scores when viewed
+    METRICS_DIR=os.environ.get('METRICS_DIR'),  # per-worker metrics snapshots; defaults to a temp directory
+    METRICS_PORT=os.environ.get('METRICS_PORT'),  # serve /metrics only on this (internal) port when set
+    METRICS_TOKEN=os.environ.get('METRICS_TOKEN'),  # bearer token required by /metrics when set
+    TRACE_EXPORTER=os.environ.get('TRACE_EXPORTER', 'memory'),  # memory, jsonl or off
+    TRACE_FILE=os.environ.get('TRACE_FILE'),  # jsonl exporter path; defaults to instance/traces.jsonl
+    TRACE_FILE_MAX_BYTES=int(os.environ.get('TRACE_FILE_MAX_BYTES', 5 * 1024 * 1024)),  # rotate the trace file to .1 past this size
+    TRACE_BUFFER_SIZE=int(os.environ.get('TRACE_BUFFER_SIZE', 200)),  # recent traces kept for /admin/traces
+    PROFILE_DIR=os.environ.get('PROFILE_DIR'),  # profiler arming state and saved profiles; defaults to instance/profiles
+    MEMORY_TRACKING=os.environ.get('MEMORY_TRACKING', 'false').lower() == 'true',  # per-request peaks with tracemalloc
+    MEMORY_TRACE_FRAMES=int(os.environ.get('MEMORY_TRACE_FRAMES', 1)),  # stack frames kept per allocation
+    MEMORY_REPORT_THRESHOLD_MB=int(os.environ.get('MEMORY_REPORT_THRESHOLD_MB', 50)),  # log allocation sites above this peak
+    MEMORY_LOG=os.environ.get('MEMORY_LOG'),  # heavy-request log; defaults to instance/memory/heavy_requests.jsonl
+    WORKER_RSS_CEILING_MB=int(os.environ.get('WORKER_RSS_CEILING_MB', 0)),  # recycle a worker above this RSS (gunicorn.conf.py); 0 disables
+    READINESS_CACHE_SECONDS=float(os.environ.get('READINESS_CACHE_SECONDS', 5)),  # how long /readyz reuses its result
+    RATE_LIMIT_ENABLED=os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true',  # per-user and global limits on LLM-backed endpoints
+    RATE_LIMIT_USER_CAPACITY=float(os.environ.get('RATE_LIMIT_USER_CAPACITY', 5)),  # LLM requests a user can make in a burst
+    RATE_LIMIT_USER_PER_MINUTE=float(os.environ.get('RATE_LIMIT_USER_PER_MINUTE', 2)),  # refill rate of each user's bucket
+    RATE_LIMIT_GLOBAL_CAPACITY=float(os.environ.get('RATE_LIMIT_GLOBAL_CAPACITY', 20)),  # LLM requests all users can make in a burst
+    RATE_LIMIT_GLOBAL_PER_MINUTE=float(os.environ.get('RATE_LIMIT_GLOBAL_PER_MINUTE', 30)),  # refill rate of the shared bucket
+    LLM_DAILY_TOKEN_BUDGET=int(os.environ.get('LLM_DAILY_TOKEN_BUDGET', 200000)),  # LLM tokens per user per UTC day; 0 disables
+    COLD_START_MODE=os.environ.get('COLD_START_MODE', 'lazy'),  # when to import PyMuPDF, python-docx and the Anthropic SDK: lazy, background or eager
+    DB_BOOTSTRAP=os.environ.get('DB_BOOTSTRAP', 'true').lower() == 'true',  # create tables and the admin account at import
     MAX_CONTENT_LENGTH=16 * 1024 * 1024  # 16MB max file size
 )
 
+# Database engine from DATABASE_URL (Postgres pool settings or tuned SQLite)
+configure_database(app)
+
 # Initialize Flask extensions
 db.init_app(app)
+# Keep session data server-side; the cookie only carries a signed session id
+configure_sessions(app)
+# Request latency and per-request query metrics, served at /metrics
+init_metrics(app)
+# Span trees of recent requests, shown at /admin/traces
+init_tracing(app)
+# Profiles of the next matching requests, armed from /admin/profiler
+init_profiler(app)
+# Per-request memory peaks and the heavy-request log, shown at /admin/memory
+init_memory_tracking(app)
+# Cached readiness checks behind /readyz
+init_health(app, SERVICES)
+# Token buckets and daily token budgets for the LLM-backed endpoints
+init_rate_limits(app)
 csrf = CSRFProtect(app)
 jwt = JWTManager(app)
 
@@ -64,19 +108,14 @@ login_manager.login_view = 'auth.login'
 def load_user(user_id):
     return User.query.get(int(user_id))
 
-# Initialize services
-file_parser = FileParser()
-ats_analyzer = EnhancedATSAnalyzer()
-ai_suggestions = AISuggestions()
-resume_customizer = ResumeCustomizer()
-feedback_loop = FeedbackLoop()
-
 # Register blueprints
 app.register_blueprint(auth_bp, url_prefix='/auth')
 app.register_blueprint(jobs_bp, url_prefix='/api')
 app.register_blueprint(dashboard_bp)
 app.register_blueprint(admin_bp)
 app.register_blueprint(resume_bp)
+app.register_blueprint(metrics_bp)
+app.register_blueprint(health_bp)
 
 # Admin required decorator
 def admin_required(f):
@@ -113,76 +152,16 @@ def toggle_job_input_partial():
     return render_template('partials/toggle_job_input.html', type=input_type)
 
 # Create uploads directory if it doesn't exist
-with app.app_context():
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-    
-    # Check if database exists and create tables if not
-    try:
-        if not os.path.exists(db_path):
-            logger.info("Database does not exist. Creating tables...")
-            db.create_all()
-            logger.info("Tables created successfully.")
-        
-        # Get admin credentials from environment variables
-        admin_username = os.environ.get('ADMIN_USERNAME', 'admin')
-        admin_password = os.environ.get('ADMIN_PASSWORD', 'admin')
-        admin_email = os.environ.get('ADMIN_EMAIL', 'admin@example.com')
-        
-        # First check if a user with the admin email already exists
-        user_with_email = User.query.filter_by(email=admin_email).first()
-        
-        if user_with_email:
-            # If the user exists but username doesn't match the admin username,
-            # we'll just update this user to have admin privileges
-            if user_with_email.username != admin_username:
-                logger.info(f"User with email {admin_email} already exists with username {user_with_email.username}")
-                logger.info(f"Granting admin privileges to existing user {user_with_email.username}")
-                user_with_email.is_admin = True
-                
-                # Optionally update the password if specified and not default
-                if admin_password != 'admin':
-                    user_with_email.password_hash = generate_password_hash(admin_password)
-                    logger.info(f"Updated password for user {user_with_email.username}")
-                
-                db.session.commit()
-            else:
-                # Email exists with matching username - this is the admin user
-                # Update password if needed
-                if admin_password != 'admin':
-                    user_with_email.password_hash = generate_password_hash(admin_password)
-                    db.session.commit()
-                    logger.info(f"Updated password for admin user {admin_username}")
-        else:
-            # No user with this email exists, check by username
-            admin_exists = User.query.filter_by(username=admin_username).first()
-        
-            # Create or update the admin user
-            if not admin_exists:
-                # Create new admin user
-                admin_user = User(
-                    username=admin_username,
-                    email=admin_email,
-                    password_hash=generate_password_hash(admin_password),
-                    is_admin=True
-                )
-                db.session.add(admin_user)
-                db.session.commit()
-                logger.info(f"Admin user '{admin_username}' created successfully.")
-            else:
-                # Admin with this username exists but different email
-                # Update email and password if needed
-                if admin_exists.email != admin_email:
-                    admin_exists.email = admin_email
-                    logger.info(f"Updated email for admin user {admin_username}")
-                
-                # Update password if needed
-                if admin_password != 'admin':
-                    admin_exists.password_hash = generate_password_hash(admin_password)
-                    logger.info(f"Updated password for admin user {admin_username}")
-                
-                db.session.commit()
-    except Exception as ex:
-        logger.error(f"Error setting up admin user: {str(ex)}")
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+# Create missing tables and the admin account. In the Docker image migrate.py
+# has already done this once per boot, so workers skip it (DB_BOOTSTRAP=false).
+if app.config['DB_BOOTSTRAP']:
+    with app.app_context():
+        bootstrap_database()
+
+# PyMuPDF, python-docx and the Anthropic SDK load on first use unless COLD_START_MODE says otherwise
+apply_cold_start_mode(app.config['COLD_START_MODE'])
 
 # Uncomment below to run directly from this file (not recommended)
 # if __name__ == "__main__":
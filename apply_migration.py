@@ -3,32 +3,41 @@ Script to apply database migrations
 """
 import os
 import logging
+import argparse
 from app import app, db
-from migrations.versions.add_original_ats_score import upgrade as upgrade_original_score
+from chunked_migration import DEFAULT_BATCH_SIZE
+from scripts.db_migration import apply_migration, DEFAULT_CHECKPOINT
 from migrations.versions.add_comparison_data import upgrade as upgrade_comparison_data
 from migrations.versions.add_feedback_loop_tables import upgrade as upgrade_feedback_loop
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def apply_migrations():
+def apply_migrations(batch_size=DEFAULT_BATCH_SIZE, checkpoint_path=DEFAULT_CHECKPOINT, dry_run=False):
     logger.info("Applying migrations...")
     
     with app.app_context():
-        # Apply the original_ats_score migration
+        # Apply the original_ats_score migration; its scores are copied in batches
         try:
-            upgrade_original_score()
-            logger.info("Successfully added original_ats_score column")
+            if apply_migration('add_original_ats_score', batch_size=batch_size,
+                               checkpoint_path=checkpoint_path, dry_run=dry_run):
+                logger.info("Successfully added original_ats_score column")
+            else:
+                logger.error("Error applying original_ats_score migration")
         except Exception as e:
             logger.error(f"Error applying original_ats_score migration: {str(e)}")
         
+        if dry_run:
+            logger.info("Dry run: skipping comparison_data and feedback_loop migrations")
+            return True
+        
         # Apply the comparison_data migration
         try:
             upgrade_comparison_data()
             logger.info("Successfully added comparison data columns")
         except Exception as e:
             logger.error(f"Error applying comparison_data migration: {str(e)}")
-            
+        
         # Apply the feedback loop migration
         try:
             upgrade_feedback_loop()
@@ -42,10 +51,17 @@ if __name__ == "__main__":
     # Set environment variables if needed
     os.environ["JINA_API_KEY"] = "dummy"
     
+    parser = argparse.ArgumentParser(description='Apply ResumeRocket database migrations')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per batch for data changes')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT,
+                        help='Progress file used to resume interrupted data changes')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+    args = parser.parse_args()
+    
     # Apply the migrations
-    success = apply_migrations()
+    success = apply_migrations(batch_size=args.batch_size, checkpoint_path=args.checkpoint, dry_run=args.dry_run)
     
     if success:
         logger.info("Migrations completed!")
     else:
-        logger.error("Migrations failed!")
\ No newline at end of file
+        logger.error("Migrations failed!")
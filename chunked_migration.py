@@ -0,0 +1,236 @@
+"""
+Chunked data migrations
+
+Data migrations that touch every row (compressing columns, moving uploads
+to the blob store, deduplicating resume text, copying tables between
+databases) walk the table by primary key, a batch at a time, instead of
+loading or updating it in one statement. ChunkedMigration provides the loop:
+
+    migration = ChunkedMigration('compress original_content', 'customized_resume',
+                                 ['original_content'], where='original_content IS NOT NULL',
+                                 commit_each_batch=True, checkpoint_path='instance/migrate.json')
+    stats = migration.run(connection, compress_batch)
+
+process_batch(rows) receives the selected rows (primary key first) and
+returns the batch's writes as (statement, params) pairs. ChunkedMigration
+executes them, commits if asked to, records the last primary key in the
+checkpoint file so an interrupted run resumes after it, and logs
+throughput and an ETA. With dry_run=True the writes are counted but not
+executed and no checkpoint is kept; process_batch should skip any side
+effects of its own when migration.dry_run is set.
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+from datetime import datetime
+from sqlalchemy import text
+
+DEFAULT_BATCH_SIZE = 200
+
+# Minimum seconds between progress log lines
+REPORT_INTERVAL = 5.0
+
+class Checkpoint:
+    """
+    Last processed primary key per migration, kept in a JSON file
+
+    One file can hold several migrations' progress, keyed by name.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def _write(self, state):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename so a crash never leaves a truncated checkpoint
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def load(self, name):
+        """Return (last_id, rows) recorded for a migration, or (None, 0)"""
+        entry = self._read().get(name)
+        if not entry:
+            return None, 0
+        return entry['last_id'], entry['rows']
+
+    def save(self, name, last_id, rows):
+        state = self._read()
+        state[name] = {'last_id': last_id, 'rows': rows, 'updated_at': datetime.utcnow().isoformat()}
+        self._write(state)
+
+    def clear(self, name):
+        state = self._read()
+        if state.pop(name, None) is not None:
+            if state:
+                self._write(state)
+            else:
+                os.unlink(self.path)
+
+
+class Progress:
+    """Throughput and ETA reporting for a running migration"""
+
+    def __init__(self, name, total=None, logger=None, interval=REPORT_INTERVAL):
+        self.name = name
+        self.total = total
+        self.logger = logger or logging.getLogger(__name__)
+        self.interval = interval
+        self.rows = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        """Rows per second so far"""
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Estimated seconds remaining, or None if unknown"""
+        if self.total is None or not self.rate:
+            return None
+        return max(self.total - self.rows, 0) / self.rate
+
+    def advance(self, rows, last_id, force=False):
+        """Count processed rows and log progress at most every interval seconds"""
+        self.rows += rows
+        now = time.monotonic()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+
+        done = f"{self.rows}/{self.total} rows ({self.rows * 100 / self.total:.1f}%)" if self.total else f"{self.rows} rows"
+        eta = f", ETA {self.eta:.0f}s" if self.eta is not None else ""
+        self.logger.info(f"{self.name}: {done} up to id {last_id}, {self.rate:.0f} rows/s{eta}")
+
+
+class ChunkedMigration:
+    """Walks a table by primary key and applies a batch function to each chunk"""
+
+    def __init__(self, name, table, columns, where=None, key='id', batch_size=DEFAULT_BATCH_SIZE,
+                 checkpoint_path=None, dry_run=False, commit_each_batch=False, logger=None):
+        """
+        Initialize the migration
+
+        Args:
+            name: Label used in logs and as the checkpoint key
+            table: Table to walk
+            columns: Columns selected after the primary key
+            where: Optional SQL condition restricting the rows
+            key: Integer primary key column (default: id)
+            batch_size: Rows per batch
+            checkpoint_path: JSON file recording progress (optional; only used
+                with commit_each_batch, since uncommitted batches can roll back)
+            dry_run: Count writes without executing them
+            commit_each_batch: Commit after every batch; leave off inside Alembic,
+                which owns the transaction
+            logger: Logger for progress lines (default: this module's)
+        """
+        self.name = name
+        self.table = table
+        self.columns = list(columns)
+        self.where = where
+        self.key = key
+        self.batch_size = batch_size
+        self.checkpoint = Checkpoint(checkpoint_path) if checkpoint_path and commit_each_batch and not dry_run else None
+        self.dry_run = dry_run
+        self.commit_each_batch = commit_each_batch
+        self.logger = logger or logging.getLogger(__name__)
+
+    def _condition(self):
+        condition = f"{self.key} > :last_id"
+        if self.where:
+            condition += f" AND ({self.where})"
+        return condition
+
+    def count_remaining(self, connection, after=0):
+        """Rows still to process after the given primary key"""
+        return connection.execute(
+            text(f"SELECT count(*) FROM {self.table} WHERE {self._condition()}"), {'last_id': after}
+        ).scalar()
+
+    def batches(self, connection, after=0):
+        """Yield lists of rows (primary key first) in primary key order"""
+        select_batch = text(
+            f"SELECT {', '.join([self.key] + self.columns)} FROM {self.table} "
+            f"WHERE {self._condition()} ORDER BY {self.key} LIMIT :batch_size"
+        )
+        last_id = after
+        while True:
+            rows = connection.execute(select_batch, {'last_id': last_id, 'batch_size': self.batch_size}).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
+
+    def run(self, connection, process_batch, target=None):
+        """
+        Process every remaining row
+
+        Args:
+            connection: SQLAlchemy Connection the rows are read from
+            process_batch: Callable taking a list of rows and returning an
+                iterable of (statement, params) writes; params may be a dict
+                or a list of dicts (executemany)
+            target: Connection the writes go to, e.g. another database
+                (default: connection)
+
+        Returns:
+            Dict with rows, writes, batches, last_id and elapsed seconds
+        """
+        target = target if target is not None else connection
+        after, done = (0, 0)
+        if self.checkpoint:
+            last_id, rows = self.checkpoint.load(self.name)
+            if last_id is not None:
+                after, done = last_id, rows
+                self.logger.info(f"{self.name}: resuming after id {after} ({done} rows already done)")
+
+        progress = Progress(self.name, total=self.count_remaining(connection, after), logger=self.logger)
+        stats = {'rows': 0, 'writes': 0, 'batches': 0, 'last_id': after}
+        if self.dry_run:
+            self.logger.info(f"{self.name}: dry run over {progress.total} rows, nothing will be written")
+
+        for rows in self.batches(connection, after):
+            for statement, params in process_batch(rows) or ():
+                if isinstance(statement, str):
+                    statement = text(statement)
+                stats['writes'] += len(params) if isinstance(params, list) else 1
+                if not self.dry_run and params != []:
+                    target.execute(statement, params)
+            if self.commit_each_batch and not self.dry_run:
+                target.commit()
+
+            stats['rows'] += len(rows)
+            stats['batches'] += 1
+            stats['last_id'] = rows[-1][0]
+            if self.checkpoint:
+                self.checkpoint.save(self.name, stats['last_id'], done + stats['rows'])
+            progress.advance(len(rows), stats['last_id'])
+
+        if stats['batches']:
+            progress.advance(0, stats['last_id'], force=True)
+        if self.checkpoint:
+            self.checkpoint.clear(self.name)
+
+        stats['elapsed'] = progress.elapsed
+        verb = 'would write' if self.dry_run else 'wrote'
+        self.logger.info(f"{self.name}: {stats['rows']} rows in {stats['batches']} batches, "
+                         f"{verb} {stats['writes']} rows, {stats['elapsed']:.1f}s")
+        return stats
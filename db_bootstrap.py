@@ -0,0 +1,157 @@
+"""
+Schema creation and admin account setup
+
+bootstrap_database() creates missing tables and makes sure the admin account
+from ADMIN_USERNAME / ADMIN_EMAIL / ADMIN_PASSWORD exists. migrate.py runs it
+once per boot; app.py runs it at import unless DB_BOOTSTRAP=false.
+
+db.create_all() reflects every table, which is a noticeable part of a cold
+start, so it is skipped when the schema is current: the tables, columns,
+indexes and constraints of the models are hashed into a fingerprint that is
+stored in the schema_state table after a successful run. Any model change
+alters the fingerprint and the next boot runs create_all() again. Like
+create_all(), this only adds missing tables; column changes still need a
+migration (see docs/MIGRATION_GUIDE.md).
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+from sqlalchemy import text
+from werkzeug.security import generate_password_hash
+from extensions import db
+from models import User
+import services.search_index  # noqa: F401  (registers the full-text index DDL run by create_all)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_STATE_TABLE = 'schema_state'
+
+
+def schema_fingerprint(metadata):
+    """Hash of every table's columns, indexes and constraints"""
+    tables = []
+    for table in metadata.sorted_tables:
+        tables.append({
+            'name': table.name,
+            'columns': [[column.name, repr(column.type), column.nullable, column.primary_key]
+                        for column in table.columns],
+            'indexes': sorted([index.name, [column.name for column in index.columns], bool(index.unique)]
+                              for index in table.indexes),
+            'constraints': sorted(type(constraint).__name__ + ':' + ','.join(column.name for column in constraint.columns)
+                                  for constraint in table.constraints),
+        })
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def stored_fingerprint(connection):
+    """The fingerprint recorded by the last bootstrap, or None"""
+    try:
+        return connection.execute(text(f"SELECT fingerprint FROM {SCHEMA_STATE_TABLE} WHERE id = 1")).scalar()
+    except Exception:
+        connection.rollback()
+        return None
+
+
+def record_fingerprint(connection, fingerprint):
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {SCHEMA_STATE_TABLE} "
+        "(id INTEGER PRIMARY KEY, fingerprint VARCHAR(64) NOT NULL, updated_at TIMESTAMP NOT NULL)"
+    ))
+    connection.execute(text(f"DELETE FROM {SCHEMA_STATE_TABLE}"))
+    connection.execute(text(f"INSERT INTO {SCHEMA_STATE_TABLE} (id, fingerprint, updated_at) VALUES (1, :fingerprint, :now)"),
+                       {'fingerprint': fingerprint, 'now': datetime.utcnow()})
+
+
+def ensure_schema(force=False):
+    """
+    Create missing tables unless the stored fingerprint shows the schema is current
+
+    Returns:
+        True if create_all() ran, False if it was skipped
+    """
+    fingerprint = schema_fingerprint(db.metadata)
+    with db.engine.connect() as connection:
+        current = stored_fingerprint(connection) == fingerprint
+    if current and not force:
+        logger.info("Database schema is current; skipping table creation")
+        return False
+
+    db.create_all()
+    with db.engine.begin() as connection:
+        record_fingerprint(connection, fingerprint)
+    logger.info("Database tables created/verified")
+    return True
+
+
+def ensure_admin_user():
+    """Create the admin account, or grant admin to the user holding ADMIN_EMAIL"""
+    # Get admin credentials from environment variables
+    admin_username = os.environ.get('ADMIN_USERNAME', 'admin')
+    admin_password = os.environ.get('ADMIN_PASSWORD', 'admin')
+    admin_email = os.environ.get('ADMIN_EMAIL', 'admin@example.com')
+    
+    # First check if a user with the admin email already exists
+    user_with_email = User.query.filter_by(email=admin_email).first()
+    
+    if user_with_email:
+        # If the user exists but username doesn't match the admin username,
+        # we'll just update this user to have admin privileges
+        if user_with_email.username != admin_username:
+            logger.info(f"User with email {admin_email} already exists with username {user_with_email.username}")
+            logger.info(f"Granting admin privileges to existing user {user_with_email.username}")
+            user_with_email.is_admin = True
+            
+            # Optionally update the password if specified and not default
+            if admin_password != 'admin':
+                user_with_email.password_hash = generate_password_hash(admin_password)
+                logger.info(f"Updated password for user {user_with_email.username}")
+            
+            db.session.commit()
+        else:
+            # Email exists with matching username - this is the admin user
+            # Update password if needed
+            if admin_password != 'admin':
+                user_with_email.password_hash = generate_password_hash(admin_password)
+                db.session.commit()
+                logger.info(f"Updated password for admin user {admin_username}")
+    else:
+        # No user with this email exists, check by username
+        admin_exists = User.query.filter_by(username=admin_username).first()
+    
+        # Create or update the admin user
+        if not admin_exists:
+            # Create new admin user
+            admin_user = User(
+                username=admin_username,
+                email=admin_email,
+                password_hash=generate_password_hash(admin_password),
+                is_admin=True
+            )
+            db.session.add(admin_user)
+            db.session.commit()
+            logger.info(f"Admin user '{admin_username}' created successfully.")
+        else:
+            # Admin with this username exists but different email
+            # Update email and password if needed
+            if admin_exists.email != admin_email:
+                admin_exists.email = admin_email
+                logger.info(f"Updated email for admin user {admin_username}")
+            
+            # Update password if needed
+            if admin_password != 'admin':
+                admin_exists.password_hash = generate_password_hash(admin_password)
+                logger.info(f"Updated password for admin user {admin_username}")
+            
+            db.session.commit()
+
+
+def bootstrap_database(force=False):
+    """Create missing tables and the admin account; errors are logged, not raised"""
+    try:
+        ensure_schema(force=force)
+        ensure_admin_user()
+    except Exception as ex:
+        logger.error(f"Error setting up the database or admin user: {str(ex)}")
@@ -0,0 +1,111 @@
+"""
+Database engine configuration
+
+The database is chosen by the DATABASE_URL environment variable (falling
+back to resumerocket.db in the working directory). Postgres gets a sized
+connection pool with pre-ping and recycling; SQLite connections get WAL
+journaling, a busy timeout, synchronous=NORMAL and memory-mapped I/O via
+pragmas issued on every new connection.
+
+Tuning knobs (environment variables):
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_TIMEOUT   (Postgres)
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_MMAP_SIZE                          (SQLite)
+"""
+
+import os
+import sqlite3
+import logging
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_FILE = 'resumerocket.db'
+
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+# Recycle connections before server-side idle timeouts (and Fly proxy restarts) drop them
+POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
+
+def resolve_database_uri(database_url=None):
+    """
+    Normalise a database URL for SQLAlchemy
+
+    - Unset: SQLite file resumerocket.db in the working directory
+    - postgres:// (as issued by Fly/Heroku) becomes postgresql://
+    - Relative SQLite paths are made absolute against the working directory,
+      so sqlite:///instance/resumerocket.db means ./instance/resumerocket.db
+      (Flask-SQLAlchemy would otherwise resolve it against the instance folder)
+    """
+    database_url = database_url or os.environ.get('DATABASE_URL')
+    if not database_url:
+        return f"sqlite:///{os.path.join(os.getcwd(), DEFAULT_DATABASE_FILE)}"
+
+    if database_url.startswith('postgres://'):
+        database_url = 'postgresql://' + database_url[len('postgres://'):]
+
+    url = make_url(database_url)
+    if url.get_backend_name() == 'sqlite' and url.database and url.database != ':memory:' \
+            and not url.database.startswith('file:') and not os.path.isabs(url.database):
+        database_url = url.set(database=os.path.join(os.getcwd(), url.database)).render_as_string(hide_password=False)
+
+    return database_url
+
+
+def engine_options(database_uri):
+    """SQLAlchemy create_engine keyword arguments for the given database"""
+    backend = make_url(database_uri).get_backend_name()
+    if backend == 'postgresql':
+        return {
+            'pool_size': POOL_SIZE,
+            'max_overflow': MAX_OVERFLOW,
+            'pool_pre_ping': True,
+            'pool_recycle': POOL_RECYCLE,
+            'pool_timeout': POOL_TIMEOUT,
+        }
+    return {}
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection; other drivers are left alone."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers run alongside the single writer (in-memory databases ignore it)
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        # Durable at checkpoints under WAL, without an fsync on every commit
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    finally:
+        cursor.close()
+
+
+def configure_database(app, database_uri=None):
+    """
+    Point a Flask app at the configured database
+
+    Args:
+        app: Flask application (before db.init_app)
+        database_uri: Explicit URI; defaults to DATABASE_URL
+
+    Returns:
+        The resolved database URI
+    """
+    database_uri = resolve_database_uri(database_uri)
+    url = make_url(database_uri)
+    if url.get_backend_name() == 'sqlite' and url.database and os.path.isabs(url.database):
+        os.makedirs(os.path.dirname(url.database), exist_ok=True)
+    
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_uri)
+    app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+    logger.info(f"Using database: {url.render_as_string(hide_password=True)}")
+    return database_uri
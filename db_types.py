@@ -0,0 +1,131 @@
+"""
+Custom SQLAlchemy column types
+
+CompressedText and CompressedBinary store values zlib-compressed behind a
+one-byte header so large resume content, uploaded files and cached PDF text
+take less room in the database. Compression is transparent: models read and
+write plain str/bytes.
+
+Stored layout: <header byte><payload>
+    0x00  payload stored as-is (small values, or compression didn't help)
+    0x01  payload is zlib-compressed (format version 1)
+
+Rows written before compression was introduced carry no header. Text columns
+read those back as str; binary columns return any value that doesn't start
+with a known header unchanged. Uploaded PDF/DOCX/Markdown files never start
+with 0x00 or 0x01, so the two cases can't be confused.
+"""
+
+import zlib
+from sqlalchemy import LargeBinary, text
+from sqlalchemy.types import TypeDecorator
+
+HEADER_RAW = 0x00
+HEADER_ZLIB_V1 = 0x01
+KNOWN_HEADERS = (HEADER_RAW, HEADER_ZLIB_V1)
+
+# Values shorter than this aren't worth compressing
+MIN_COMPRESS_SIZE = 256
+# zlib level: 6 is zlib's own default and a good ratio/CPU trade-off for text
+COMPRESSION_LEVEL = 6
+
+
+def compress_payload(data, level=COMPRESSION_LEVEL):
+    """Compress bytes and prefix the header byte. Falls back to raw storage if it doesn't shrink."""
+    if len(data) >= MIN_COMPRESS_SIZE:
+        compressed = zlib.compress(data, level)
+        if len(compressed) < len(data):
+            return bytes([HEADER_ZLIB_V1]) + compressed
+    return bytes([HEADER_RAW]) + data
+
+
+def decompress_payload(data):
+    """Reverse compress_payload. Values without a known header are returned unchanged."""
+    data = bytes(data)
+    if not data or data[0] not in KNOWN_HEADERS:
+        return data
+    if data[0] == HEADER_ZLIB_V1:
+        return zlib.decompress(data[1:])
+    return data[1:]
+
+
+def is_compressed_payload(value):
+    """Whether a stored value already carries a compression header."""
+    if isinstance(value, str):
+        return False
+    value = bytes(value)
+    return len(value) > 0 and value[0] in KNOWN_HEADERS
+
+
+class CompressedBinary(TypeDecorator):
+    """LargeBinary column stored zlib-compressed behind a header byte."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_payload(bytes(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress_payload(value)
+
+
+class CompressedText(CompressedBinary):
+    """Text column stored as UTF-8, zlib-compressed behind a header byte."""
+
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_payload(value.encode('utf-8'))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # Legacy rows stored as TEXT before compression was introduced
+        if isinstance(value, str):
+            return value
+        return decompress_payload(value).decode('utf-8')
+
+
+def compress_existing_rows(connection, table_name, column_name, batch_size=200, commit_each_batch=False, logger=None,
+                           checkpoint_path=None, dry_run=False):
+    """
+    Compress a column's legacy (header-less) values in place, one batch at a time.
+
+    Walks the table by primary key with ChunkedMigration, so only batch_size
+    rows are held in memory, and skips values that already carry a header, so
+    it is safe to re-run. Pass commit_each_batch=True outside of Alembic to
+    keep transactions short (and to make checkpoint_path take effect).
+
+    Returns a dict with rows_compressed, bytes_before and bytes_after.
+    """
+    from chunked_migration import ChunkedMigration
+
+    stats = {'rows_compressed': 0, 'bytes_before': 0, 'bytes_after': 0}
+    update_row = text(f"UPDATE {table_name} SET {column_name} = :value WHERE id = :id")
+
+    def compress_batch(rows):
+        updates = []
+        for row_id, value in rows:
+            if is_compressed_payload(value):
+                continue
+            raw = value.encode('utf-8') if isinstance(value, str) else bytes(value)
+            stored = compress_payload(raw)
+            stats['bytes_before'] += len(raw)
+            stats['bytes_after'] += len(stored)
+            updates.append({'id': row_id, 'value': stored})
+        stats['rows_compressed'] += len(updates)
+        return [(update_row, updates)]
+
+    ChunkedMigration(
+        f"{table_name}.{column_name} compression", table_name, [column_name],
+        where=f"{column_name} IS NOT NULL", batch_size=batch_size, checkpoint_path=checkpoint_path,
+        dry_run=dry_run, commit_each_batch=commit_each_batch, logger=logger
+    ).run(connection, compress_batch)
+    return stats
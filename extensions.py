@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
+import db_config  # noqa: F401 - registers the SQLite connection pragmas
 
 class Base(DeclarativeBase):
     pass
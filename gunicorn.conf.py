@@ -0,0 +1,31 @@
+"""
+gunicorn settings shared by the container and the load tests
+
+Bind address, worker count and timeout are passed on the command line in
+start.sh; this file holds the hooks.
+"""
+
+import os
+
+# Recycle a worker once its RSS is over this many MB (0 disables)
+worker_rss_ceiling_mb = int(os.environ.get('WORKER_RSS_CEILING_MB', 0))
+
+
+def post_request(worker, req, environ, resp):
+    """
+    Retire the worker after this response if its RSS is over the ceiling
+
+    The response has already been sent. Clearing worker.alive lets the worker
+    finish what it is doing and exit, and the arbiter starts a replacement, so
+    a worker that has grown too large is replaced between requests rather than
+    OOM-killed in the middle of one.
+    """
+    if not worker_rss_ceiling_mb or not worker.alive:
+        return
+    # Imported here: the app has already loaded it in the worker, the arbiter never needs it
+    from services.memory import MB, rss_over_ceiling
+    rss = rss_over_ceiling(worker_rss_ceiling_mb)
+    if rss is not None:
+        worker.log.warning(f"Worker {worker.pid} RSS {rss / MB:.0f} MB is over the {worker_rss_ceiling_mb} MB "
+                           f"ceiling after {req.method} {req.path}; recycling it")
+        worker.alive = False
@@ -4,64 +4,63 @@ Database migration script for ResumeRocket
 
 This script ensures all database tables are created and up to date.
 Run this script whenever the database schema changes.
+
+It runs on every container start, so it binds a minimal Flask app to the
+database instead of importing the full application, and skips table
+creation when the stored schema fingerprint shows nothing has changed
+(see db_bootstrap.py). Use --force to run db.create_all() regardless.
 """
 
-import os
 import logging
-from app import app, db
-
-# Print the database path for verification
-print(f"Using database at: {app.config['SQLALCHEMY_DATABASE_URI']}")
+import argparse
+from flask import Flask
+from extensions import db
+from db_config import configure_database
+from db_bootstrap import ensure_schema, ensure_admin_user
 from models import User, JobDescription, CustomizedResume, PDFCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def init_db():
+def create_app():
+    """Create a minimal Flask app bound to the application database"""
+    app = Flask(__name__)
+    configure_database(app)
+    db.init_app(app)
+    return app
+
+def init_db(force=False):
     """Initialize the database with required tables."""
+    app = create_app()
+    # Print the database path for verification
+    print(f"Using database at: {app.config['SQLALCHEMY_DATABASE_URI']}")
     try:
         with app.app_context():
-            logger.info("Creating database tables...")
-            db.create_all()
-            logger.info("Database tables created successfully!")
-            
-            # Check if tables exist by querying them
-            table_count = 0
-            try:
-                User.query.first()
-                table_count += 1
-                logger.info("User table exists")
-            except Exception as e:
-                logger.error(f"User table check failed: {e}")
-                
-            try:
-                JobDescription.query.first()
-                table_count += 1
-                logger.info("JobDescription table exists")
-            except Exception as e:
-                logger.error(f"JobDescription table check failed: {e}")
-                
-            try:
-                CustomizedResume.query.first()
-                table_count += 1
-                logger.info("CustomizedResume table exists")
-            except Exception as e:
-                logger.error(f"CustomizedResume table check failed: {e}")
-                
-            try:
-                PDFCache.query.first()
-                table_count += 1
-                logger.info("PDFCache table exists")
-            except Exception as e:
-                logger.error(f"PDFCache table check failed: {e}")
-                
-            logger.info(f"Verified {table_count} tables exist")
+            logger.info("Checking database schema...")
+            if ensure_schema(force=force):
+                # Check if tables exist by querying them
+                table_count = 0
+                for model in (User, JobDescription, CustomizedResume, PDFCache):
+                    try:
+                        model.query.first()
+                        table_count += 1
+                        logger.info(f"{model.__name__} table exists")
+                    except Exception as e:
+                        logger.error(f"{model.__name__} table check failed: {e}")
+
+                logger.info(f"Verified {table_count} tables exist")
+            ensure_admin_user()
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
         raise
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Create missing database tables and the admin account')
+    parser.add_argument('--force', action='store_true',
+                        help='Run table creation even if the schema fingerprint is current')
+    args = parser.parse_args()
+
     logger.info("Starting database migration...")
-    init_db()
-    logger.info("Database migration completed!")
\ No newline at end of file
+    init_db(force=args.force)
+    logger.info("Database migration completed!")
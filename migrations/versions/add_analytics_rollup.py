@@ -0,0 +1,86 @@
+"""Add incrementally maintained analytics rollups for the admin dashboard
+
+Revision ID: add_analytics_rollup
+Revises: add_hot_table_indexes
+Create Date: 2025-03-20 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'add_analytics_rollup'
+down_revision = 'add_hot_table_indexes'
+branch_labels = None
+depends_on = None
+
+# Per-day buckets, then the all-time row summed from them
+BACKFILL_STATEMENTS = [
+    """
+    INSERT INTO analytics_rollup (bucket, customization_count, improvement_sum, improvement_count,
+                                  rating_sum, feedback_count, updated_at)
+    SELECT date(created_at), count(id), coalesce(sum(ats_score - original_ats_score), 0.0),
+           count(ats_score - original_ats_score), coalesce(sum(user_rating), 0), count(user_rating),
+           CURRENT_TIMESTAMP
+    FROM customized_resume
+    GROUP BY date(created_at)
+    """,
+    """
+    INSERT INTO analytics_rollup (bucket, customization_count, improvement_sum, improvement_count,
+                                  rating_sum, feedback_count, updated_at)
+    SELECT 'all', coalesce(sum(customization_count), 0), coalesce(sum(improvement_sum), 0.0),
+           coalesce(sum(improvement_count), 0), coalesce(sum(rating_sum), 0),
+           coalesce(sum(feedback_count), 0), CURRENT_TIMESTAMP
+    FROM analytics_rollup
+    """,
+]
+
+# SQL statements to execute for this migration (SQLite)
+sql_statements = [
+    """
+    CREATE TABLE IF NOT EXISTS analytics_rollup (
+        bucket VARCHAR(10) NOT NULL PRIMARY KEY,
+        customization_count INTEGER NOT NULL DEFAULT 0,
+        improvement_sum FLOAT NOT NULL DEFAULT 0.0,
+        improvement_count INTEGER NOT NULL DEFAULT 0,
+        rating_sum INTEGER NOT NULL DEFAULT 0,
+        feedback_count INTEGER NOT NULL DEFAULT 0,
+        updated_at DATETIME
+    )
+    """,
+    "DELETE FROM analytics_rollup",
+] + BACKFILL_STATEMENTS
+
+
+def upgrade():
+    """Create the rollup table and backfill it from customized_resume."""
+    op.create_table(
+        'analytics_rollup',
+        sa.Column('bucket', sa.String(length=10), primary_key=True),
+        sa.Column('customization_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('improvement_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('improvement_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('feedback_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    # date() is SQLite's; Postgres spells the cast differently
+    if op.get_bind().dialect.name == 'postgresql':
+        for sql in BACKFILL_STATEMENTS:
+            op.execute(sql.replace('date(created_at)', 'CAST(created_at AS DATE)::text'))
+    else:
+        for sql in BACKFILL_STATEMENTS:
+            op.execute(sql)
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values):
+    """Custom upgrade function that works with our db_migration utility"""
+    for sql in sql_statements:
+        execute_sql(sql)
+
+
+def downgrade():
+    """Drop the rollup table."""
+    op.drop_table('analytics_rollup')
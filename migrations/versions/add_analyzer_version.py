@@ -0,0 +1,44 @@
+"""Record which ATS analyzer version produced each resume's scores
+
+Revision ID: add_analyzer_version
+Revises: add_server_session
+Create Date: 2025-03-26 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'add_analyzer_version'
+down_revision = 'add_server_session'
+branch_labels = None
+depends_on = None
+
+# SQL statements to execute for this migration (SQLite)
+# Existing scores have no recorded version, so scripts/rescore.py treats them as stale
+sql_statements = [
+    "ALTER TABLE customized_resume ADD COLUMN analyzer_version VARCHAR(32)",
+    "CREATE INDEX IF NOT EXISTS ix_customized_resume_analyzer_version ON customized_resume (analyzer_version)",
+]
+
+
+def upgrade():
+    """Add customized_resume.analyzer_version."""
+    with op.batch_alter_table('customized_resume') as batch_op:
+        batch_op.add_column(sa.Column('analyzer_version', sa.String(length=32), nullable=True))
+        batch_op.create_index('ix_customized_resume_analyzer_version', ['analyzer_version'])
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values):
+    """Custom upgrade function that works with our db_migration utility"""
+    for sql in sql_statements:
+        execute_sql(sql)
+
+
+def downgrade():
+    """Drop customized_resume.analyzer_version."""
+    with op.batch_alter_table('customized_resume') as batch_op:
+        batch_op.drop_index('ix_customized_resume_analyzer_version')
+        batch_op.drop_column('analyzer_version')
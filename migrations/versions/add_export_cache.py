@@ -0,0 +1,54 @@
+"""Add export_cache table for rendered PDF/DOCX downloads
+
+Revision ID: add_export_cache
+Revises: move_uploads_to_blob_store
+Create Date: 2025-03-16 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'add_export_cache'
+down_revision = 'move_uploads_to_blob_store'
+branch_labels = None
+depends_on = None
+
+# SQL statements to execute for this migration (SQLite)
+sql_statements = [
+    "CREATE TABLE IF NOT EXISTS export_cache ("
+    "id INTEGER PRIMARY KEY, content_hash VARCHAR(64) NOT NULL, export_format VARCHAR(10) NOT NULL, "
+    "template_version INTEGER NOT NULL, blob_hash VARCHAR(64) NOT NULL REFERENCES stored_blob(hash), "
+    "size INTEGER NOT NULL, created_at DATETIME, last_accessed DATETIME, hit_count INTEGER, "
+    "CONSTRAINT uq_export_cache_key UNIQUE (content_hash, export_format, template_version))"
+]
+
+
+def upgrade():
+    """Create the export_cache table."""
+    op.create_table(
+        'export_cache',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('export_format', sa.String(length=10), nullable=False),
+        sa.Column('template_version', sa.Integer(), nullable=False),
+        sa.Column('blob_hash', sa.String(length=64), sa.ForeignKey('stored_blob.hash'), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('last_accessed', sa.DateTime(), nullable=True),
+        sa.Column('hit_count', sa.Integer(), nullable=True),
+        sa.UniqueConstraint('content_hash', 'export_format', 'template_version', name='uq_export_cache_key')
+    )
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values):
+    """Custom upgrade function that works with our db_migration utility"""
+    for sql in sql_statements:
+        execute_sql(sql)
+
+
+def downgrade():
+    """Drop the export_cache table."""
+    op.drop_table('export_cache')
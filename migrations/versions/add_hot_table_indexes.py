@@ -0,0 +1,55 @@
+"""Add composite and foreign-key indexes for the dashboard, admin and feedback-loop queries
+
+Revision ID: add_hot_table_indexes
+Revises: add_job_description_search
+Create Date: 2025-03-18 09:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = 'add_hot_table_indexes'
+down_revision = 'add_job_description_search'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) - must match the indexes declared in models.py
+INDEXES = [
+    ('ix_customized_resume_user_created', 'customized_resume', ['user_id', 'created_at', 'id']),
+    ('ix_customized_resume_scores', 'customized_resume', ['original_ats_score', 'ats_score']),
+    ('ix_customized_resume_job_description_id', 'customized_resume', ['job_description_id']),
+    ('ix_customized_resume_original_id', 'customized_resume', ['original_id']),
+    ('ix_customized_resume_user_rating', 'customized_resume', ['user_rating']),
+    ('ix_job_description_user_created', 'job_description', ['user_id', 'created_at']),
+    ('ix_customization_evaluation_customized_resume_id', 'customization_evaluation', ['customized_resume_id']),
+    ('ix_customization_evaluation_created_at', 'customization_evaluation', ['created_at']),
+    ('ix_optimization_suggestion_created_at', 'optimization_suggestion', ['created_at']),
+    ('ix_ab_test_start_date', 'ab_test', ['start_date']),
+]
+
+# SQL statements to execute for this migration (SQLite)
+sql_statements = [
+    f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+    for name, table, columns in INDEXES
+] + ["ANALYZE"]
+
+
+def upgrade():
+    """Create the indexes and refresh planner statistics."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+    op.execute("ANALYZE")
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values):
+    """Custom upgrade function that works with our db_migration utility"""
+    for sql in sql_statements:
+        execute_sql(sql)
+
+
+def downgrade():
+    """Drop the indexes."""
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
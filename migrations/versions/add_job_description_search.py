@@ -0,0 +1,41 @@
+"""Add full-text search index over job descriptions
+
+Revision ID: add_job_description_search
+Revises: add_export_cache
+Create Date: 2025-03-17 09:00:00
+
+"""
+from alembic import op
+
+from services.search_index import rebuild_search_index, SQLITE_DDL, FTS_TABLE
+
+
+# revision identifiers, used by Alembic
+revision = 'add_job_description_search'
+down_revision = 'add_export_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create the FTS5 table and triggers (SQLite) or tsvector column and GIN index (Postgres), then backfill."""
+    rebuild_search_index(op.get_bind())
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values):
+    """Custom upgrade function that works with our db_migration utility"""
+    for sql in SQLITE_DDL:
+        execute_sql(sql)
+    execute_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def downgrade():
+    """Drop the search index objects."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_job_description_search_vector")
+        op.execute("ALTER TABLE job_description DROP COLUMN IF EXISTS search_vector")
+    else:
+        for trigger in ('job_description_fts_insert', 'job_description_fts_delete', 'job_description_fts_update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
@@ -0,0 +1,48 @@
+"""Add entry_size column to PDFCache for byte-budgeted eviction
+
+Revision ID: add_pdf_cache_entry_size
+Revises: add_pdf_cache_section_map
+Create Date: 2025-03-13 09:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'add_pdf_cache_entry_size'
+down_revision = 'add_pdf_cache_section_map'
+branch_labels = None
+depends_on = None
+
+# SQL statements to execute for this migration (SQLite)
+sql_statements = [
+    "ALTER TABLE pdf_cache ADD COLUMN entry_size INTEGER",
+    "UPDATE pdf_cache SET entry_size = length(CAST(extracted_text AS BLOB)) "
+    "+ COALESCE(length(CAST(section_map AS BLOB)), 0) WHERE entry_size IS NULL"
+]
+
+
+def upgrade():
+    """Add entry_size to pdf_cache and backfill it from the stored payload."""
+    op.add_column('pdf_cache', sa.Column('entry_size', sa.Integer(), nullable=True))
+    
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "UPDATE pdf_cache SET entry_size = octet_length(extracted_text) "
+            "+ COALESCE(octet_length(section_map::text), 0) WHERE entry_size IS NULL"
+        )
+    else:
+        op.execute(sql_statements[1])
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values):
+    """Custom upgrade function that works with our db_migration utility"""
+    add_column('pdf_cache', 'entry_size', 'INTEGER')
+    execute_sql(sql_statements[1])
+
+
+def downgrade():
+    """Remove entry_size from pdf_cache."""
+    op.drop_column('pdf_cache', 'entry_size')
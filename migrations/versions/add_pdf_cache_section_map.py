@@ -0,0 +1,35 @@
+"""Add extraction_mode and section_map columns to PDFCache
+
+Revision ID: add_pdf_cache_section_map
+Revises: add_admin_flag
+Create Date: 2025-03-12 10:15:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'add_pdf_cache_section_map'
+down_revision = 'add_admin_flag'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add layout-aware extraction columns to the pdf_cache table."""
+    op.add_column('pdf_cache', sa.Column('extraction_mode', sa.String(length=20), nullable=True, server_default='text'))
+    op.add_column('pdf_cache', sa.Column('section_map', sa.JSON(), nullable=True))
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values):
+    """Custom upgrade function that works with our db_migration utility"""
+    add_column('pdf_cache', 'extraction_mode', "VARCHAR(20) DEFAULT 'text'")
+    add_column('pdf_cache', 'section_map', 'JSON')
+
+
+def downgrade():
+    """Remove layout-aware extraction columns from the pdf_cache table."""
+    op.drop_column('pdf_cache', 'section_map')
+    op.drop_column('pdf_cache', 'extraction_mode')
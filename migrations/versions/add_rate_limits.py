@@ -0,0 +1,53 @@
+"""Add the rate_limit_bucket and llm_usage tables for LLM rate limiting
+
+Revision ID: add_rate_limits
+Revises: add_analyzer_version
+Create Date: 2025-03-28 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'add_rate_limits'
+down_revision = 'add_analyzer_version'
+branch_labels = None
+depends_on = None
+
+# SQL statements to execute for this migration (SQLite)
+sql_statements = [
+    "CREATE TABLE IF NOT EXISTS rate_limit_bucket (key VARCHAR(64) PRIMARY KEY, tokens FLOAT NOT NULL, "
+    "updated_at FLOAT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS llm_usage (user_id INTEGER NOT NULL REFERENCES user (id), "
+    "day VARCHAR(10) NOT NULL, tokens INTEGER NOT NULL, PRIMARY KEY (user_id, day))",
+]
+
+
+def upgrade():
+    """Create rate_limit_bucket and llm_usage."""
+    op.create_table(
+        'rate_limit_bucket',
+        sa.Column('key', sa.String(length=64), primary_key=True),
+        sa.Column('tokens', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.Float(), nullable=False)
+    )
+    op.create_table(
+        'llm_usage',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), primary_key=True),
+        sa.Column('day', sa.String(length=10), primary_key=True),
+        sa.Column('tokens', sa.Integer(), nullable=False)
+    )
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values):
+    """Custom upgrade function that works with our db_migration utility"""
+    for sql in sql_statements:
+        execute_sql(sql)
+
+
+def downgrade():
+    """Drop rate_limit_bucket and llm_usage."""
+    op.drop_table('llm_usage')
+    op.drop_table('rate_limit_bucket')
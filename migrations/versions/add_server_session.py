@@ -0,0 +1,47 @@
+"""Add the server_session table for server-side Flask sessions
+
+Revision ID: add_server_session
+Revises: dedup_resume_content
+Create Date: 2025-03-24 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'add_server_session'
+down_revision = 'dedup_resume_content'
+branch_labels = None
+depends_on = None
+
+# SQL statements to execute for this migration (SQLite)
+sql_statements = [
+    "CREATE TABLE IF NOT EXISTS server_session (id VARCHAR(64) PRIMARY KEY, data BLOB NOT NULL, "
+    "expires_at DATETIME NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_server_session_expires_at ON server_session (expires_at)",
+]
+
+
+def upgrade():
+    """Create server_session."""
+    op.create_table(
+        'server_session',
+        sa.Column('id', sa.String(length=64), primary_key=True),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False)
+    )
+    op.create_index('ix_server_session_expires_at', 'server_session', ['expires_at'])
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values):
+    """Custom upgrade function that works with our db_migration utility"""
+    for sql in sql_statements:
+        execute_sql(sql)
+
+
+def downgrade():
+    """Drop server_session."""
+    op.drop_index('ix_server_session_expires_at', table_name='server_session')
+    op.drop_table('server_session')
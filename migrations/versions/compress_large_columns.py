@@ -0,0 +1,67 @@
+"""Store large resume, upload and PDF cache columns zlib-compressed
+
+Revision ID: compress_large_columns
+Revises: add_pdf_cache_entry_size
+Create Date: 2025-03-14 11:00:00
+
+"""
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+from db_types import compress_existing_rows
+
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic
+revision = 'compress_large_columns'
+down_revision = 'add_pdf_cache_entry_size'
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs now using CompressedText/CompressedBinary
+COMPRESSED_COLUMNS = [
+    ('customized_resume', 'original_content'),
+    ('customized_resume', 'customized_content'),
+    ('customized_resume', 'original_bytes'),
+    ('pdf_cache', 'extracted_text'),
+]
+TEXT_COLUMNS = {'original_content', 'customized_content', 'extracted_text'}
+
+BATCH_SIZE = 200
+
+
+def upgrade():
+    """Switch text columns to binary storage and compress existing rows in batches."""
+    bind = op.get_bind()
+    
+    # SQLite stores whatever it is given, so only Postgres needs the type change
+    if bind.dialect.name == 'postgresql':
+        for table_name, column_name in COMPRESSED_COLUMNS:
+            if column_name in TEXT_COLUMNS:
+                op.alter_column(
+                    table_name, column_name,
+                    type_=sa.LargeBinary(),
+                    postgresql_using=f"convert_to({column_name}, 'UTF8')"
+                )
+    
+    for table_name, column_name in COMPRESSED_COLUMNS:
+        stats = compress_existing_rows(bind, table_name, column_name, batch_size=BATCH_SIZE, logger=logger)
+        logger.info(f"{table_name}.{column_name}: {stats['rows_compressed']} rows, "
+                    f"{stats['bytes_before']} -> {stats['bytes_after']} bytes")
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values, chunk_options=None):
+    """Custom upgrade function that works with our db_migration utility"""
+    from extensions import db
+    
+    with db.engine.connect() as connection:
+        for table_name, column_name in COMPRESSED_COLUMNS:
+            compress_existing_rows(connection, table_name, column_name, commit_each_batch=True, logger=logger,
+                                   **{'batch_size': BATCH_SIZE, **(chunk_options or {})})
+
+
+def downgrade():
+    """Not implemented - compressed rows would need decompressing back to text"""
+    pass
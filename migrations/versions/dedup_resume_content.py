@@ -0,0 +1,153 @@
+"""Move resume text into a deduplicated resume_content table keyed by SHA-256
+
+Revision ID: dedup_resume_content
+Revises: add_analytics_rollup
+Create Date: 2025-03-22 09:00:00
+
+"""
+import hashlib
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+from db_types import compress_payload, decompress_payload
+from chunked_migration import ChunkedMigration
+
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic
+revision = 'dedup_resume_content'
+down_revision = 'add_analytics_rollup'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 200
+
+# SQL statements to execute for this migration (SQLite)
+sql_statements = [
+    "CREATE TABLE IF NOT EXISTS resume_content (hash VARCHAR(64) PRIMARY KEY, body BLOB NOT NULL, "
+    "size INTEGER NOT NULL, created_at DATETIME, last_used_at DATETIME)",
+    "ALTER TABLE customized_resume ADD COLUMN original_content_hash VARCHAR(64) REFERENCES resume_content(hash)",
+    "ALTER TABLE customized_resume ADD COLUMN customized_content_hash VARCHAR(64) REFERENCES resume_content(hash)",
+]
+
+INDEX_STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS ix_customized_resume_original_content_hash ON customized_resume (original_content_hash)",
+    "CREATE INDEX IF NOT EXISTS ix_customized_resume_customized_content_hash ON customized_resume (customized_content_hash)",
+]
+
+
+def _as_text(stored):
+    # Rows predating compress_large_columns may still hold plain TEXT
+    if isinstance(stored, str):
+        return stored
+    return decompress_payload(stored).decode('utf-8')
+
+
+def dedup_content(connection, batch_size=BATCH_SIZE, commit_each_batch=False, checkpoint_path=None, dry_run=False):
+    """
+    Point each customized_resume row at resume_content, one batch at a time
+
+    Rows that already have content hashes are skipped, so an interrupted run
+    can be resumed. Pass commit_each_batch=True outside of Alembic to keep
+    transactions short.
+
+    Returns a dict with rows, contents, bytes_before and bytes_after.
+    """
+    stats = {'rows': 0, 'contents': 0, 'bytes_before': 0, 'bytes_after': 0}
+
+    insert_content = sa.text(
+        "INSERT INTO resume_content (hash, body, size, created_at, last_used_at) "
+        "VALUES (:hash, :body, :size, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP) ON CONFLICT (hash) DO NOTHING"
+    )
+    update_row = sa.text(
+        "UPDATE customized_resume SET original_content_hash = :original, customized_content_hash = :customized "
+        "WHERE id = :id"
+    )
+
+    def dedup_batch(rows):
+        contents = {}
+        updates = []
+        for row_id, original, customized in rows:
+            hashes = {}
+            for key, stored in (('original', original), ('customized', customized)):
+                stats['bytes_before'] += len(stored.encode('utf-8') if isinstance(stored, str) else stored)
+                data = _as_text(stored).encode('utf-8')
+                content_hash = hashlib.sha256(data).hexdigest()
+                if content_hash not in contents:
+                    contents[content_hash] = {'hash': content_hash, 'body': compress_payload(data), 'size': len(data)}
+                hashes[key] = content_hash
+            updates.append({'id': row_id, **hashes})
+        return [(insert_content, list(contents.values())), (update_row, updates)]
+
+    result = ChunkedMigration(
+        'deduplicate resume content', 'customized_resume', ['original_content', 'customized_content'],
+        where='original_content_hash IS NULL', batch_size=batch_size, checkpoint_path=checkpoint_path,
+        dry_run=dry_run, commit_each_batch=commit_each_batch, logger=logger
+    ).run(connection, dedup_batch)
+    stats['rows'] = result['rows']
+
+    if not stats['rows'] or dry_run:
+        return stats
+
+    stats['contents'], stats['bytes_after'] = connection.execute(sa.text(
+        "SELECT count(*), coalesce(sum(length(body)), 0) FROM resume_content"
+    )).one()
+    saved = stats['bytes_before'] - stats['bytes_after']
+    logger.info(
+        f"Resume text storage: {stats['bytes_before']} bytes in {stats['rows']} rows before, "
+        f"{stats['bytes_after']} bytes in {stats['contents']} distinct texts after ({saved} bytes saved)"
+    )
+    return stats
+
+
+def upgrade():
+    """Create resume_content, fill it from customized_resume and drop the inline text columns."""
+    op.create_table(
+        'resume_content',
+        sa.Column('hash', sa.String(length=64), primary_key=True),
+        sa.Column('body', sa.LargeBinary(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('last_used_at', sa.DateTime(), nullable=True)
+    )
+    with op.batch_alter_table('customized_resume') as batch_op:
+        batch_op.add_column(sa.Column('original_content_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('customized_content_hash', sa.String(length=64), nullable=True))
+
+    dedup_content(op.get_bind())
+
+    with op.batch_alter_table('customized_resume') as batch_op:
+        batch_op.alter_column('original_content_hash', nullable=False)
+        batch_op.alter_column('customized_content_hash', nullable=False)
+        batch_op.create_foreign_key('fk_customized_resume_original_content_hash', 'resume_content',
+                                    ['original_content_hash'], ['hash'])
+        batch_op.create_foreign_key('fk_customized_resume_customized_content_hash', 'resume_content',
+                                    ['customized_content_hash'], ['hash'])
+        batch_op.create_index('ix_customized_resume_original_content_hash', ['original_content_hash'])
+        batch_op.create_index('ix_customized_resume_customized_content_hash', ['customized_content_hash'])
+        batch_op.drop_column('original_content')
+        batch_op.drop_column('customized_content')
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values, chunk_options=None):
+    """Custom upgrade function that works with our db_migration utility"""
+    from extensions import db
+
+    for sql in sql_statements:
+        execute_sql(sql)
+
+    with db.engine.connect() as connection:
+        dedup_content(connection, commit_each_batch=True, **(chunk_options or {}))
+
+    for sql in INDEX_STATEMENTS:
+        execute_sql(sql)
+    # SQLite 3.35+ can drop the columns in place
+    execute_sql("ALTER TABLE customized_resume DROP COLUMN original_content")
+    execute_sql("ALTER TABLE customized_resume DROP COLUMN customized_content")
+
+
+def downgrade():
+    """Not implemented - the text would need copying back into every row"""
+    pass
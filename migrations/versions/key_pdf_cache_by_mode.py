@@ -0,0 +1,67 @@
+"""Key pdf_cache on (content_hash, extraction_mode)
+
+Revision ID: key_pdf_cache_by_mode
+Revises: add_rate_limits
+Create Date: 2025-03-29 09:00:00
+
+One row per content_hash made the text and layout extractions of the same PDF
+overwrite each other, so alternating callers missed the cache every time.
+SQLite can't drop the table's inline UNIQUE(content_hash), so there the table
+is rebuilt with its rows copied across.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'key_pdf_cache_by_mode'
+down_revision = 'add_rate_limits'
+branch_labels = None
+depends_on = None
+
+# SQL statements to execute for this migration (SQLite)
+sql_statements = [
+    "CREATE TABLE pdf_cache_new (id INTEGER PRIMARY KEY, content_hash VARCHAR(64) NOT NULL, "
+    "extracted_text BLOB NOT NULL, file_size INTEGER NOT NULL, page_count INTEGER NOT NULL, "
+    "created_at DATETIME, last_accessed DATETIME, hit_count INTEGER, "
+    "extraction_mode VARCHAR(20) NOT NULL DEFAULT 'text', section_map JSON, entry_size INTEGER)",
+    "INSERT INTO pdf_cache_new (id, content_hash, extracted_text, file_size, page_count, created_at, "
+    "last_accessed, hit_count, extraction_mode, section_map, entry_size) "
+    "SELECT id, content_hash, extracted_text, file_size, page_count, created_at, last_accessed, hit_count, "
+    "COALESCE(extraction_mode, 'text'), section_map, entry_size FROM pdf_cache",
+    "DROP TABLE pdf_cache",
+    "ALTER TABLE pdf_cache_new RENAME TO pdf_cache",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_pdf_cache_content_hash_mode ON pdf_cache (content_hash, extraction_mode)",
+]
+
+
+def upgrade():
+    """Replace the unique content_hash with a unique (content_hash, extraction_mode)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        for sql in sql_statements:
+            op.execute(sql)
+        return
+    op.execute("UPDATE pdf_cache SET extraction_mode = 'text' WHERE extraction_mode IS NULL")
+    # create_all builds the unique column as a unique index only; a table made
+    # from a unique constraint also has pdf_cache_content_hash_key
+    op.execute("DROP INDEX IF EXISTS ix_pdf_cache_content_hash")
+    op.execute("ALTER TABLE pdf_cache DROP CONSTRAINT IF EXISTS pdf_cache_content_hash_key")
+    op.alter_column('pdf_cache', 'extraction_mode', existing_type=sa.String(length=20), nullable=False)
+    op.execute(sql_statements[-1])
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values):
+    """Custom upgrade function that works with our db_migration utility"""
+    for sql in sql_statements:
+        execute_sql(sql)
+
+
+def downgrade():
+    """Go back to one row per content_hash, keeping the layout extraction where there are two."""
+    op.execute("DELETE FROM pdf_cache WHERE extraction_mode = 'text' AND content_hash IN "
+               "(SELECT content_hash FROM pdf_cache WHERE extraction_mode = 'layout')")
+    op.execute("DROP INDEX IF EXISTS uq_pdf_cache_content_hash_mode")
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_pdf_cache_content_hash ON pdf_cache (content_hash)")
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('pdf_cache', 'extraction_mode', existing_type=sa.String(length=20), nullable=True)
@@ -0,0 +1,109 @@
+"""Move original uploads out of customized_resume into the content-addressed blob store
+
+Revision ID: move_uploads_to_blob_store
+Revises: compress_large_columns
+Create Date: 2025-03-15 10:00:00
+
+"""
+import os
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+from db_types import decompress_payload
+from services.blob_store import BlobStore
+from chunked_migration import ChunkedMigration
+
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic
+revision = 'move_uploads_to_blob_store'
+down_revision = 'compress_large_columns'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 100
+
+# SQL statements to execute for this migration (SQLite)
+sql_statements = [
+    "CREATE TABLE IF NOT EXISTS stored_blob (hash VARCHAR(64) PRIMARY KEY, size INTEGER NOT NULL, "
+    "ref_count INTEGER NOT NULL DEFAULT 0, created_at DATETIME)",
+    "ALTER TABLE customized_resume ADD COLUMN blob_hash VARCHAR(64) REFERENCES stored_blob(hash)",
+    "CREATE INDEX IF NOT EXISTS ix_customized_resume_blob_hash ON customized_resume (blob_hash)",
+]
+
+
+def _blob_root():
+    # Migrations run from the app directory, whose instance/ folder is the persistent volume
+    return os.environ.get('BLOB_STORE_DIR') or os.path.join(os.getcwd(), 'instance', 'blobs')
+
+
+def move_uploads(connection, store, batch_size=BATCH_SIZE, commit_each_batch=False, checkpoint_path=None, dry_run=False):
+    """Write each inline upload to the blob store and point its row at it, one batch at a time."""
+    migration = ChunkedMigration(
+        'move uploads to blob store', 'customized_resume', ['original_bytes'],
+        where='original_bytes IS NOT NULL AND blob_hash IS NULL', batch_size=batch_size,
+        checkpoint_path=checkpoint_path, dry_run=dry_run, commit_each_batch=commit_each_batch, logger=logger
+    )
+    
+    def move_batch(rows):
+        updates = []
+        ref_counts = {}
+        for row_id, stored in rows:
+            data = decompress_payload(stored)
+            blob_hash = store.hash_bytes(data) if migration.dry_run else store.write(data)
+            size, count = ref_counts.get(blob_hash, (len(data), 0))
+            ref_counts[blob_hash] = (size, count + 1)
+            updates.append({'id': row_id, 'blob_hash': blob_hash})
+        # Counts are added per batch so a resumed run doesn't lose earlier batches' references
+        return [
+            ("INSERT INTO stored_blob (hash, size, ref_count, created_at) "
+             "VALUES (:hash, :size, :ref_count, CURRENT_TIMESTAMP) "
+             "ON CONFLICT (hash) DO UPDATE SET ref_count = stored_blob.ref_count + excluded.ref_count",
+             [{'hash': h, 'size': size, 'ref_count': count} for h, (size, count) in ref_counts.items()]),
+            ("UPDATE customized_resume SET blob_hash = :blob_hash WHERE id = :id", updates),
+        ]
+    
+    stats = migration.run(connection, move_batch)
+    logger.info(f"Moved {stats['rows']} uploads into the blob store")
+    return stats
+
+
+def upgrade():
+    """Create stored_blob, add customized_resume.blob_hash, move the bytes and drop original_bytes."""
+    op.create_table(
+        'stored_blob',
+        sa.Column('hash', sa.String(length=64), primary_key=True),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True)
+    )
+    with op.batch_alter_table('customized_resume') as batch_op:
+        batch_op.add_column(sa.Column('blob_hash', sa.String(length=64), nullable=True))
+        batch_op.create_foreign_key('fk_customized_resume_blob_hash', 'stored_blob', ['blob_hash'], ['hash'])
+        batch_op.create_index('ix_customized_resume_blob_hash', ['blob_hash'])
+    
+    move_uploads(op.get_bind(), BlobStore(root=_blob_root()))
+    
+    with op.batch_alter_table('customized_resume') as batch_op:
+        batch_op.drop_column('original_bytes')
+
+
+# This function is used by our custom db_migration.py script
+def custom_upgrade(execute_sql, add_column, copy_column_values, chunk_options=None):
+    """Custom upgrade function that works with our db_migration utility"""
+    from extensions import db
+    
+    for sql in sql_statements:
+        execute_sql(sql)
+    
+    with db.engine.connect() as connection:
+        move_uploads(connection, BlobStore(root=_blob_root()), commit_each_batch=True, **(chunk_options or {}))
+    
+    # SQLite 3.35+ can drop the column in place
+    execute_sql("ALTER TABLE customized_resume DROP COLUMN original_bytes")
+
+
+def downgrade():
+    """Not implemented - blobs would need copying back into the rows"""
+    pass
@@ -1,8 +1,14 @@
 from extensions import db
+from db_types import CompressedBinary, CompressedText
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
 import hashlib
+import json
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -36,6 +42,11 @@ class JobDescription(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
+    __table_args__ = (
+        # Job listings per user, newest first
+        db.Index('ix_job_description_user_created', 'user_id', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -46,32 +57,298 @@ class JobDescription(db.Model):
             'user_id': self.user_id
         }
 
+class StoredBlob(db.Model):
+    """
+    Reference-counted index of files in the content-addressed blob store.
+    
+    The bytes live on disk (see services/blob_store.py); this row tracks how
+    many resumes point at each file so shared uploads are stored once.
+    """
+    hash = db.Column(db.String(64), primary_key=True)  # SHA-256 of the file contents
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @classmethod
+    def retain(cls, blob_hash, size=None):
+        """
+        Add a reference to a blob, creating its row on first use
+        
+        Without a size only an existing row is updated. Returns whether the
+        reference was recorded.
+        """
+        updated = db.session.execute(
+            db.update(cls).where(cls.hash == blob_hash).values(ref_count=cls.ref_count + 1)
+        ).rowcount
+        if updated:
+            return True
+        if size is None:
+            return False
+        db.session.add(cls(hash=blob_hash, size=size, ref_count=1))
+        db.session.flush()
+        return True
+    
+    @classmethod
+    def release(cls, blob_hash):
+        """Drop a reference to a blob. Unreferenced files are removed by BlobStore.collect_garbage"""
+        db.session.execute(
+            db.update(cls).where(cls.hash == blob_hash, cls.ref_count > 0).values(ref_count=cls.ref_count - 1)
+        )
+
+class ExportCache(db.Model):
+    """
+    Rendered PDF/DOCX downloads, keyed by the Markdown they were rendered from.
+    
+    The rendered bytes live in the blob store; each row holds one reference to
+    its blob. Rows for an older template_version are purged by purge_stale,
+    rows for Markdown no resume has any more by purge_unreferenced, and
+    evict_to_budget keeps the rest within a byte budget.
+    """
+    __table_args__ = (
+        db.UniqueConstraint('content_hash', 'export_format', 'template_version', name='uq_export_cache_key'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # SHA-256 of the Markdown source
+    content_hash = db.Column(db.String(64), nullable=False)
+    # 'pdf' or 'docx'
+    export_format = db.Column(db.String(10), nullable=False)
+    # Renderer version the bytes were produced with
+    template_version = db.Column(db.Integer, nullable=False)
+    blob_hash = db.Column(db.String(64), db.ForeignKey('stored_blob.hash'), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_accessed = db.Column(db.DateTime, default=datetime.utcnow)
+    hit_count = db.Column(db.Integer, default=0)
+    
+    @classmethod
+    def lookup(cls, content_hash, export_format, template_version):
+        return cls.query.filter_by(
+            content_hash=content_hash, export_format=export_format, template_version=template_version
+        ).first()
+    
+    @classmethod
+    def purge_stale(cls, template_version):
+        """
+        Delete entries rendered with another template version and release their blobs
+        
+        Returns:
+            Number of entries deleted
+        """
+        stale = db.session.query(cls.id, cls.blob_hash).filter(cls.template_version != template_version).all()
+        for entry_id, blob_hash in stale:
+            StoredBlob.release(blob_hash)
+            db.session.execute(delete(cls).where(cls.id == entry_id))
+        db.session.commit()
+        return len(stale)
+    
+    @classmethod
+    def purge_unreferenced(cls, content_hash=None):
+        """
+        Delete entries for Markdown that no resume has as its customized content, and release their blobs
+        
+        Args:
+            content_hash: Only consider entries for this content (e.g. that of a resume just deleted)
+            
+        Returns:
+            Number of entries deleted
+        """
+        # The cache key is the SHA-256 of the Markdown, the same hash resume_content uses
+        referenced = select(CustomizedResume.id).where(CustomizedResume.customized_content_hash == cls.content_hash).exists()
+        query = db.session.query(cls.id, cls.blob_hash).filter(~referenced)
+        if content_hash is not None:
+            query = query.filter(cls.content_hash == content_hash)
+        orphans = query.all()
+        for entry_id, blob_hash in orphans:
+            StoredBlob.release(blob_hash)
+            db.session.execute(delete(cls).where(cls.id == entry_id))
+        db.session.commit()
+        return len(orphans)
+    
+    @classmethod
+    def evict_to_budget(cls, max_bytes, batch_size=500):
+        """
+        Evict the least recently downloaded entries until the rendered bytes fit in max_bytes
+        
+        Their blobs are released; BlobStore.collect_garbage deletes the files.
+        
+        Returns a dict with deleted_count, reclaimed_bytes and total_bytes
+        (the size remaining after eviction).
+        """
+        total_bytes = db.session.query(func.coalesce(func.sum(cls.size), 0)).scalar()
+        deleted_count = 0
+        reclaimed_bytes = 0
+        
+        while total_bytes - reclaimed_bytes > max_bytes:
+            victims = db.session.query(cls.id, cls.blob_hash, cls.size).order_by(
+                func.coalesce(cls.last_accessed, cls.created_at), cls.id
+            ).limit(batch_size).all()
+            if not victims:
+                break
+            for entry_id, blob_hash, size in victims:
+                if total_bytes - reclaimed_bytes <= max_bytes:
+                    break
+                StoredBlob.release(blob_hash)
+                db.session.execute(delete(cls).where(cls.id == entry_id))
+                deleted_count += 1
+                reclaimed_bytes += size
+            db.session.commit()
+        
+        return {
+            'deleted_count': deleted_count,
+            'reclaimed_bytes': reclaimed_bytes,
+            'total_bytes': total_bytes - reclaimed_bytes
+        }
+
+class ServerSession(db.Model):
+    """
+    Server-side Flask session data (see services/session_store.py).
+    
+    The cookie carries only a random session id; rows are keyed by its SHA-256
+    so the table can't be used to hijack sessions. Expired rows are ignored on
+    load and deleted by the store's periodic cleanup.
+    """
+    id = db.Column(db.String(64), primary_key=True)  # SHA-256 of the session id
+    data = db.Column(CompressedBinary, nullable=False)  # Serialized session dict
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class RateLimitBucket(db.Model):
+    """
+    Token bucket state for the LLM rate limits (see services/rate_limit.py).
+    
+    One row per bucket ('user:<id>' or 'global'). Tokens are refilled lazily:
+    each take computes the refill since updated_at in the same UPDATE that
+    spends the token, so every worker sees the same buckets.
+    """
+    key = db.Column(db.String(64), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)  # Unix time of the last refill
+
+class LLMUsage(db.Model):
+    """
+    LLM tokens (input plus output) used per user per UTC day ('YYYY-MM-DD'),
+    checked against LLM_DAILY_TOKEN_BUDGET before each LLM-backed request.
+    """
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.String(10), primary_key=True)
+    tokens = db.Column(db.Integer, nullable=False, default=0)
+
+class ResumeContent(db.Model):
+    """
+    Deduplicated resume text, keyed by the SHA-256 of its UTF-8 encoding.
+    
+    CustomizedResume rows reference their original and customized text here,
+    so a resume analysed against many jobs (whose original_content is also
+    the initial customized_content) is stored once. Rows nothing references
+    are removed by collect_orphans once they haven't been used for a while.
+    """
+    hash = db.Column(db.String(64), primary_key=True)
+    body = db.Column(CompressedText, nullable=False)
+    size = db.Column(db.Integer, nullable=False)  # UTF-8 length in bytes, before compression
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @staticmethod
+    def hash_text(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def intern(cls, text):
+        """Return the row holding this text, inserting it on first use"""
+        content_hash = cls.hash_text(text)
+        now = datetime.utcnow()
+        content = db.session.get(cls, content_hash)
+        if content is not None:
+            # Keeps collect_orphans off rows about to gain a reference
+            content.last_used_at = now
+            return content
+        
+        # ON CONFLICT DO NOTHING: a concurrent request may be inserting the same text
+        insert = postgresql_insert if db.session.get_bind().dialect.name == 'postgresql' else sqlite_insert
+        db.session.execute(insert(cls).values(
+            hash=content_hash,
+            body=text,
+            size=len(text.encode('utf-8')),
+            created_at=now,
+            last_used_at=now
+        ).on_conflict_do_nothing(index_elements=['hash']))
+        return db.session.get(cls, content_hash)
+    
+    @classmethod
+    def collect_orphans(cls, grace=timedelta(days=1)):
+        """
+        Delete content no resume references that hasn't been used within the grace period
+        
+        Returns:
+            Dict with deleted_count and reclaimed_bytes
+        """
+        referenced = select(CustomizedResume.id).where(
+            (CustomizedResume.original_content_hash == cls.hash) |
+            (CustomizedResume.customized_content_hash == cls.hash)
+        ).exists()
+        orphaned = (~referenced) & (cls.last_used_at < datetime.utcnow() - grace)
+        
+        deleted_count, reclaimed_bytes = db.session.query(
+            func.count(cls.hash), func.coalesce(func.sum(cls.size), 0)
+        ).filter(orphaned).one()
+        db.session.execute(delete(cls).where(orphaned))
+        db.session.commit()
+        return {'deleted_count': deleted_count, 'reclaimed_bytes': reclaimed_bytes}
+
 class CustomizedResume(db.Model):
+    __table_args__ = (
+        # Dashboard listing: per user, keyset-paged on (created_at, id)
+        db.Index('ix_customized_resume_user_created', 'user_id', 'created_at', 'id'),
+        # Covers the admin average-improvement aggregate without touching the content columns
+        db.Index('ix_customized_resume_scores', 'original_ats_score', 'ats_score'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
-    original_content = db.Column(db.Text, nullable=False)
-    customized_content = db.Column(db.Text, nullable=False)
-    job_description_id = db.Column(db.Integer, db.ForeignKey('job_description.id'), nullable=False)
+    # Text lives in resume_content; use the original_content/customized_content properties
+    original_content_hash = db.Column(db.String(64), db.ForeignKey('resume_content.hash'), nullable=False, index=True)
+    customized_content_hash = db.Column(db.String(64), db.ForeignKey('resume_content.hash'), nullable=False, index=True)
+    job_description_id = db.Column(db.Integer, db.ForeignKey('job_description.id'), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    original_id = db.Column(db.Integer, db.ForeignKey('customized_resume.id'), nullable=True)  # ID of the original resume this was customized from
+    original_id = db.Column(db.Integer, db.ForeignKey('customized_resume.id'), nullable=True, index=True)  # ID of the original resume this was customized from
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     original_ats_score = db.Column(db.Float)  # Original ATS score before customization
     ats_score = db.Column(db.Float)  # New ATS score after customization
+    analyzer_version = db.Column(db.String(32), nullable=True, index=True)  # ANALYZER_VERSION that produced the scores
     matching_keywords = db.Column(db.JSON)
     missing_keywords = db.Column(db.JSON)
     file_format = db.Column(db.String(10), default='md')  # 'md', 'docx', 'pdf'
-    original_bytes = db.Column(db.LargeBinary, nullable=True)  # Store original file bytes for non-markdown files
+    blob_hash = db.Column(db.String(64), db.ForeignKey('stored_blob.hash'), nullable=True, index=True)  # Original upload in the blob store
     comparison_data = db.Column(db.JSON, nullable=True)  # Detailed comparison between original and customized
     added_keywords_count = db.Column(db.Integer, default=0)  # Count of keywords added
     changes_count = db.Column(db.Integer, default=0)  # Total number of changes made
     
     # Feedback and outcome tracking fields
-    user_rating = db.Column(db.Integer, nullable=True)  # 1-5 star rating
+    user_rating = db.Column(db.Integer, nullable=True, index=True)  # 1-5 star rating
     user_feedback = db.Column(db.Text, nullable=True)   # Text feedback
     was_effective = db.Column(db.Boolean, nullable=True)  # Did they get an interview?
     interview_secured = db.Column(db.Boolean, nullable=True)  # Did they get an interview?
     job_secured = db.Column(db.Boolean, nullable=True)  # Did they get the job?
     feedback_date = db.Column(db.DateTime, nullable=True)  # When feedback was provided
     
+    original_content_ref = db.relationship('ResumeContent', foreign_keys=[original_content_hash])
+    customized_content_ref = db.relationship('ResumeContent', foreign_keys=[customized_content_hash])
+    
+    @property
+    def original_content(self):
+        return self.original_content_ref.body if self.original_content_ref else None
+    
+    @original_content.setter
+    def original_content(self, text):
+        self.original_content_ref = ResumeContent.intern(text)
+    
+    @property
+    def customized_content(self):
+        return self.customized_content_ref.body if self.customized_content_ref else None
+    
+    @customized_content.setter
+    def customized_content(self, text):
+        self.customized_content_ref = ResumeContent.intern(text)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -82,9 +359,11 @@ class CustomizedResume(db.Model):
             'created_at': self.created_at.isoformat(),
             'original_ats_score': self.original_ats_score,
             'ats_score': self.ats_score,
+            'analyzer_version': self.analyzer_version,
             'matching_keywords': self.matching_keywords,
             'missing_keywords': self.missing_keywords,
             'file_format': self.file_format,
+            'blob_hash': self.blob_hash,
             'comparison_data': self.comparison_data,
             'added_keywords_count': self.added_keywords_count,
             'changes_count': self.changes_count,
@@ -99,12 +378,19 @@ class CustomizedResume(db.Model):
 class PDFCache(db.Model):
     """
     Cache for extracted PDF content to improve performance for large files.
+    
+    Entries are keyed by the PDF's hash and the extraction mode, so the text
+    and layout extractions of the same file are cached side by side.
     """
+    __table_args__ = (
+        db.Index('uq_pdf_cache_content_hash_mode', 'content_hash', 'extraction_mode', unique=True),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
-    # SHA-256 hash of the PDF content (used as cache key)
-    content_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    # SHA-256 hash of the PDF content (with extraction_mode, the cache key)
+    content_hash = db.Column(db.String(64), nullable=False)
     # The extracted text content
-    extracted_text = db.Column(db.Text, nullable=False)
+    extracted_text = db.Column(CompressedText, nullable=False)
     # File size in bytes
     file_size = db.Column(db.Integer, nullable=False)
     # Pages in the PDF
@@ -115,6 +401,12 @@ class PDFCache(db.Model):
     last_accessed = db.Column(db.DateTime, default=datetime.utcnow)
     # Number of times this cache entry has been used
     hit_count = db.Column(db.Integer, default=1)
+    # How the text was extracted: 'text' (plain) or 'layout' (markdown headings)
+    extraction_mode = db.Column(db.String(20), nullable=False, default='text', server_default='text')
+    # Section name -> content map produced by layout-aware extraction
+    section_map = db.Column(db.JSON, nullable=True)
+    # Bytes taken by the cached payload (text plus section map), used for eviction
+    entry_size = db.Column(db.Integer, nullable=True)
     
     @staticmethod
     def generate_hash(pdf_bytes):
@@ -122,39 +414,65 @@ class PDFCache(db.Model):
         Generate a SHA-256 hash from PDF bytes to use as cache key.
         """
         return hashlib.sha256(pdf_bytes).hexdigest()
+    
+    @staticmethod
+    def calculate_entry_size(extracted_text, section_map=None):
+        """
+        Bytes a cache entry's payload occupies: the extracted text plus the
+        serialized section map, if any.
+        """
+        size = len(extracted_text.encode('utf-8')) if extracted_text else 0
+        if section_map:
+            size += len(json.dumps(section_map).encode('utf-8'))
+        return size
         
     @classmethod
-    def get_from_cache(cls, pdf_bytes):
+    def get_from_cache(cls, pdf_bytes, extraction_mode='text'):
         """
         Try to retrieve cached content using the PDF file's hash.
         Returns None if not found in cache.
         """
+        cached = cls.get_extraction_from_cache(pdf_bytes, extraction_mode)
+        return cached[0] if cached else None
+        
+    @classmethod
+    def get_extraction_from_cache(cls, pdf_bytes, extraction_mode='text'):
+        """
+        Retrieve cached (extracted_text, section_map) for the PDF file's hash
+        and extraction mode.
+        Returns None if not found in cache.
+        """
         content_hash = cls.generate_hash(pdf_bytes)
-        cache_entry = cls.query.filter_by(content_hash=content_hash).first()
+        cache_entry = cls.query.filter_by(content_hash=content_hash, extraction_mode=extraction_mode).first()
         
         if cache_entry:
+            # Read the payload before the commit expires the instance
+            result = (cache_entry.extracted_text, cache_entry.section_map)
+            
             # Update access statistics
             cache_entry.last_accessed = datetime.utcnow()
             cache_entry.hit_count += 1
             db.session.commit()
-            return cache_entry.extracted_text
+            return result
             
         return None
         
     @classmethod
-    def add_to_cache(cls, pdf_bytes, extracted_text, page_count):
+    def add_to_cache(cls, pdf_bytes, extracted_text, page_count, section_map=None, extraction_mode='text'):
         """
         Add extracted PDF content to cache.
         """
         content_hash = cls.generate_hash(pdf_bytes)
         file_size = len(pdf_bytes)
         
-        # Check if already exists (shouldn't happen normally, but just in case)
-        existing = cls.query.filter_by(content_hash=content_hash).first()
+        # Check if already exists (e.g. added by a concurrent request)
+        existing = cls.query.filter_by(content_hash=content_hash, extraction_mode=extraction_mode).first()
         if existing:
             existing.extracted_text = extracted_text
             existing.file_size = file_size
             existing.page_count = page_count
+            existing.section_map = section_map
+            existing.entry_size = cls.calculate_entry_size(extracted_text, section_map)
             existing.last_accessed = datetime.utcnow()
             existing.hit_count += 1
         else:
@@ -163,7 +481,10 @@ class PDFCache(db.Model):
                 content_hash=content_hash,
                 extracted_text=extracted_text,
                 file_size=file_size,
-                page_count=page_count
+                page_count=page_count,
+                extraction_mode=extraction_mode,
+                section_map=section_map,
+                entry_size=cls.calculate_entry_size(extracted_text, section_map)
             )
             db.session.add(cache_entry)
             
@@ -171,10 +492,87 @@ class PDFCache(db.Model):
         return extracted_text
         
     @classmethod
-    def clean_old_entries(cls, max_age_days=30, keep_min=100):
+    def _size_expression(cls):
+        """Entry size in SQL, falling back to text length for rows cached before entry_size existed."""
+        return func.coalesce(cls.entry_size, func.length(cls.extracted_text), 0)
+    
+    @classmethod
+    def _eviction_score(cls, now):
+        """
+        LFU/LRU hybrid score in SQL: hit count decayed by days since last access.
+        Entries with the lowest score are evicted first.
+        """
+        if db.engine.dialect.name == 'postgresql':
+            age_days = func.extract('epoch', now - cls.last_accessed) / 86400.0
+        else:
+            age_days = func.julianday(now) - func.julianday(cls.last_accessed)
+        
+        # Rows without an access time are treated as a year old
+        return func.coalesce(cls.hit_count, 1) / (1.0 + func.coalesce(age_days, 365))
+    
+    @classmethod
+    def total_bytes(cls):
+        """Total payload bytes currently held by the cache."""
+        return db.session.query(func.coalesce(func.sum(cls._size_expression()), 0)).scalar()
+    
+    @classmethod
+    def evict_to_budget(cls, max_bytes, batch_size=500):
+        """
+        Evict the lowest-scoring entries until the cache payload fits in max_bytes.
+        
+        Each chunk picks the shortest prefix of entries (by eviction score) whose
+        cumulative size covers the overage, and removes it with a set-based
+        DELETE ... WHERE id IN (subquery), so no ORM objects are loaded.
+        
+        Returns a dict with deleted_count, reclaimed_bytes and total_bytes
+        (the size remaining after eviction).
+        """
+        now = datetime.utcnow()
+        size = cls._size_expression()
+        
+        total_bytes = cls.total_bytes()
+        deleted_count = 0
+        reclaimed_bytes = 0
+        
+        while total_bytes - reclaimed_bytes > max_bytes:
+            excess = total_bytes - reclaimed_bytes - max_bytes
+            
+            # Running size in eviction order; an entry is a victim while the
+            # bytes ranked before it still don't cover the overage
+            ranked = select(
+                cls.id.label('id'),
+                size.label('size'),
+                func.sum(size).over(order_by=(cls._eviction_score(now), cls.id)).label('running_size')
+            ).subquery()
+            victim_ids = select(ranked.c.id).where(
+                ranked.c.running_size - ranked.c.size < excess
+            ).order_by(ranked.c.running_size).limit(batch_size)
+            
+            chunk_bytes = db.session.query(func.coalesce(func.sum(size), 0)).filter(
+                cls.id.in_(victim_ids)
+            ).scalar()
+            result = db.session.execute(
+                delete(cls).where(cls.id.in_(victim_ids)).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            
+            if not result.rowcount:
+                break
+            deleted_count += result.rowcount
+            reclaimed_bytes += chunk_bytes
+        
+        return {
+            'deleted_count': deleted_count,
+            'reclaimed_bytes': reclaimed_bytes,
+            'total_bytes': total_bytes - reclaimed_bytes
+        }
+        
+    @classmethod
+    def clean_old_entries(cls, max_age_days=30, keep_min=100, batch_size=500):
         """
         Remove old cache entries to prevent unlimited growth.
         Keeps at least keep_min most recently used entries.
+        Deletes in set-based chunks of batch_size rows.
         """
         # Calculate cutoff date using timedelta instead of day replacement
         cutoff_date = datetime.utcnow() - timedelta(days=max_age_days)
@@ -184,22 +582,28 @@ class PDFCache(db.Model):
         
         if total_entries <= keep_min:
             return 0
-            
-        # Find old entries to delete
-        old_entries = cls.query.filter(
-            cls.last_accessed < cutoff_date
-        ).order_by(
-            cls.hit_count,  # Delete least used first
-            cls.last_accessed  # Then oldest
-        ).limit(total_entries - keep_min).all()
-        
-        # Delete entries
+        
         deleted_count = 0
-        for entry in old_entries:
-            db.session.delete(entry)
-            deleted_count += 1
+        remaining = total_entries - keep_min
+        while remaining > 0:
+            # Old entries, least used first, then oldest
+            victim_ids = select(cls.id).where(
+                cls.last_accessed < cutoff_date
+            ).order_by(
+                cls.hit_count,
+                cls.last_accessed
+            ).limit(min(batch_size, remaining))
+            
+            result = db.session.execute(
+                delete(cls).where(cls.id.in_(victim_ids)).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            
+            if not result.rowcount:
+                break
+            deleted_count += result.rowcount
+            remaining -= result.rowcount
             
-        db.session.commit()
         return deleted_count
 
 class CustomizationEvaluation(db.Model):
@@ -207,11 +611,11 @@ class CustomizationEvaluation(db.Model):
     Stores evaluations of resume customizations based on metrics and feedback
     """
     id = db.Column(db.Integer, primary_key=True)
-    customized_resume_id = db.Column(db.Integer, db.ForeignKey('customized_resume.id'))
+    customized_resume_id = db.Column(db.Integer, db.ForeignKey('customized_resume.id'), index=True)
     customized_resume = db.relationship('CustomizedResume', backref=db.backref('evaluations', lazy='dynamic'))
     evaluation_text = db.Column(db.Text, nullable=False)
     metrics = db.Column(db.JSON, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     applied_to_model = db.Column(db.Boolean, default=False)
     
     def to_dict(self):
@@ -231,7 +635,7 @@ class OptimizationSuggestion(db.Model):
     """
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     based_on_evaluations = db.Column(db.Integer, nullable=False)  # Number of evaluations used
     implemented = db.Column(db.Boolean, default=False)
     implementation_date = db.Column(db.DateTime, nullable=True)
@@ -257,7 +661,7 @@ class ABTest(db.Model):
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
     variants = db.Column(db.JSON, nullable=False)  # Different prompt variants being tested
-    start_date = db.Column(db.DateTime, default=datetime.utcnow)
+    start_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     end_date = db.Column(db.DateTime, nullable=True)
     is_active = db.Column(db.Boolean, default=True)
     results = db.Column(db.JSON, nullable=True)  # Metrics for each variant
@@ -274,4 +678,221 @@ class ABTest(db.Model):
             'is_active': self.is_active,
             'results': self.results,
             'winner': self.winner
-        }
\ No newline at end of file
+        }
+
+class AnalyticsRollup(db.Model):
+    """
+    Running aggregates over customized_resume for the admin dashboard.
+    
+    One row per UTC day ('YYYY-MM-DD') plus an all-time row ('all'). The
+    counters are adjusted in the same transaction as every CustomizedResume
+    insert, score/feedback update and delete (see _update_analytics_rollups),
+    so reading the dashboard stats is a primary-key lookup. reconcile()
+    compares them with a full recomputation.
+    """
+    ALL_TIME = 'all'
+    
+    bucket = db.Column(db.String(10), primary_key=True)
+    customization_count = db.Column(db.Integer, nullable=False, default=0)
+    # Sum and count of (ats_score - original_ats_score) over rows with both scores
+    improvement_sum = db.Column(db.Float, nullable=False, default=0.0)
+    improvement_count = db.Column(db.Integer, nullable=False, default=0)
+    # Sum and count of user_rating over rated rows
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    feedback_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    COUNTERS = ('customization_count', 'improvement_sum', 'improvement_count', 'rating_sum', 'feedback_count')
+    
+    @staticmethod
+    def contribution(created_at, ats_score, original_ats_score, user_rating):
+        """Counter values a single resume adds to its buckets"""
+        has_improvement = ats_score is not None and original_ats_score is not None
+        return {
+            'customization_count': 1,
+            'improvement_sum': (ats_score - original_ats_score) if has_improvement else 0.0,
+            'improvement_count': 1 if has_improvement else 0,
+            'rating_sum': user_rating or 0,
+            'feedback_count': 1 if user_rating is not None else 0,
+        }
+    
+    @classmethod
+    def apply_deltas(cls, connection, deltas):
+        """
+        Add {bucket: {counter: delta}} to the rollup rows, creating missing rows
+        
+        Each bucket is a single upsert, so two transactions opening the same
+        day's row at once both add to it instead of one failing on the key.
+        """
+        table = cls.__table__
+        insert = postgresql_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+        now = datetime.utcnow()
+        for bucket, delta in deltas.items():
+            if not any(delta.values()):
+                continue
+            statement = insert(table).values(bucket=bucket, updated_at=now, **{
+                name: delta.get(name, 0) for name in cls.COUNTERS
+            })
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=['bucket'],
+                set_={
+                    'updated_at': statement.excluded.updated_at,
+                    **{name: table.c[name] + statement.excluded[name] for name in cls.COUNTERS}
+                }
+            ))
+    
+    @classmethod
+    def summary(cls):
+        """All-time dashboard stats read from the rollup row"""
+        row = db.session.get(cls, cls.ALL_TIME)
+        total = row.customization_count if row else 0
+        feedback_count = row.feedback_count if row else 0
+        return {
+            'total_customizations': total,
+            'avg_improvement': round(row.improvement_sum / row.improvement_count, 1) if row and row.improvement_count else 0,
+            'feedback_count': feedback_count,
+            'feedback_rate': round((feedback_count / total) * 100, 1) if total > 0 else 0,
+            'avg_rating': round(row.rating_sum / feedback_count, 1) if feedback_count else 0,
+        }
+    
+    @classmethod
+    def recent_customizations(cls, days=30):
+        """Customizations created in the last N days, summed from the daily rows"""
+        since = (datetime.utcnow() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        return db.session.query(func.coalesce(func.sum(cls.customization_count), 0)).filter(
+            cls.bucket != cls.ALL_TIME, cls.bucket >= since
+        ).scalar()
+    
+    @classmethod
+    def recompute(cls):
+        """Full recomputation of every bucket from customized_resume: {bucket: {counter: value}}"""
+        improvement = CustomizedResume.ats_score - CustomizedResume.original_ats_score
+        day = func.date(CustomizedResume.created_at)
+        rows = db.session.query(
+            day,
+            func.count(CustomizedResume.id),
+            func.coalesce(func.sum(improvement), 0.0),
+            func.count(improvement),
+            func.coalesce(func.sum(CustomizedResume.user_rating), 0),
+            func.count(CustomizedResume.user_rating),
+        ).group_by(day).all()
+        
+        expected = {}
+        all_time = dict.fromkeys(cls.COUNTERS, 0)
+        for bucket, *values in rows:
+            counters = dict(zip(cls.COUNTERS, values))
+            expected[str(bucket)] = counters
+            for name, value in counters.items():
+                all_time[name] += value
+        expected[cls.ALL_TIME] = all_time
+        return expected
+    
+    @classmethod
+    def reconcile(cls, fix=False, tolerance=1e-6):
+        """
+        Compare the rollups with a full recomputation
+        
+        Reads every row of customized_resume, so it runs as a manual or
+        scheduled job, never at boot.
+        
+        Args:
+            fix: Add the difference to each mismatched counter. The corrections
+                are increments like the flush-event deltas, so deltas other
+                workers commit meanwhile are kept rather than overwritten.
+            tolerance: Allowed float drift in improvement_sum
+            
+        Returns:
+            List of (bucket, counter, stored, expected) mismatches
+        """
+        expected = cls.recompute()
+        stored = {row.bucket: {name: getattr(row, name) for name in cls.COUNTERS} for row in cls.query.all()}
+        
+        mismatches = []
+        corrections = {}
+        for bucket in sorted(set(expected) | set(stored)):
+            zero = dict.fromkeys(cls.COUNTERS, 0)
+            want, have = expected.get(bucket, zero), stored.get(bucket, zero)
+            for name in cls.COUNTERS:
+                difference = (want[name] or 0) - (have[name] or 0)
+                if abs(difference) > tolerance:
+                    mismatches.append((bucket, name, have[name], want[name]))
+                    corrections.setdefault(bucket, {})[name] = difference
+        
+        if fix and corrections:
+            cls.apply_deltas(db.session.connection(), corrections)
+            db.session.commit()
+        return mismatches
+
+
+# CustomizedResume attributes that feed the rollups, in AnalyticsRollup.contribution order
+ROLLUP_FIELDS = ('created_at', 'ats_score', 'original_ats_score', 'user_rating')
+
+
+def _rollup_buckets(created_at):
+    return (AnalyticsRollup.ALL_TIME, (created_at or datetime.utcnow()).strftime('%Y-%m-%d'))
+
+
+def _rollup_changed(obj):
+    state = inspect(obj)
+    return any(state.attrs[key].history.has_changes() for key in ROLLUP_FIELDS)
+
+
+@event.listens_for(Session, 'before_flush')
+def _capture_rollup_removals(session, flush_context, instances):
+    """
+    Read the stored rollup fields of resumes about to be updated or deleted.
+    
+    Attribute history can't be trusted for this (an expired attribute that is
+    reassigned has no old value), so the pre-flush row is read from the database.
+    """
+    resume_ids = [
+        inspect(obj).identity[0] for obj in list(session.deleted) + list(session.dirty)
+        if isinstance(obj, CustomizedResume) and inspect(obj).identity
+        and (obj in session.deleted or _rollup_changed(obj))
+    ]
+    if not resume_ids:
+        return
+    
+    columns = [getattr(CustomizedResume, key) for key in ROLLUP_FIELDS]
+    rows = session.connection().execute(
+        select(CustomizedResume.id, *columns).where(CustomizedResume.id.in_(resume_ids))
+    )
+    previous = session.info.setdefault('rollup_previous', {})
+    for resume_id, *values in rows:
+        previous.setdefault(resume_id, values)
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_analytics_rollups(session, flush_context):
+    """
+    Keep AnalyticsRollup in step with customized_resume inside the flushing transaction.
+    
+    New and updated rows are counted after the flush so Python-side defaults
+    (created_at) are populated; the old values of updated and deleted rows
+    come from _capture_rollup_removals.
+    """
+    previous = session.info.pop('rollup_previous', {})
+    deltas = {}
+    
+    def add(values, sign):
+        for bucket in _rollup_buckets(values[0]):
+            bucket_delta = deltas.setdefault(bucket, dict.fromkeys(AnalyticsRollup.COUNTERS, 0))
+            for name, value in AnalyticsRollup.contribution(*values).items():
+                bucket_delta[name] += sign * value
+    
+    for values in previous.values():
+        add(values, -1)
+    
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, CustomizedResume) or obj in session.deleted:
+            continue
+        if obj in session.new or obj.id in previous:
+            add([getattr(obj, key) for key in ROLLUP_FIELDS], 1)
+    
+    if deltas:
+        AnalyticsRollup.apply_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rollup_removals(session):
+    session.info.pop('rollup_previous', None)
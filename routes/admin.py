@@ -1,9 +1,14 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+import os
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context, current_app, send_file, abort
 from flask_login import login_required, current_user
 from extensions import db
-from models import User, ABTest, OptimizationSuggestion, CustomizedResume, JobDescription
+from models import User, ABTest, OptimizationSuggestion, CustomizedResume, JobDescription, AnalyticsRollup
 from functools import wraps
 from services.feedback_loop import FeedbackLoop
+from services.analytics_export import ExportError, FORMATS, stream_export, parse_date
+from services.tracing import tracer, slowest, span_tree
+from services.profiler import ProfilerError, PROFILE_MODES, MAX_PROFILE_REQUESTS
+from services.memory import current_rss
 from sqlalchemy import func
 
 # Create admin blueprint
@@ -76,39 +81,10 @@ def feedback_dashboard():
     optimizations = feedback_loop.list_optimizations()
     tests = feedback_loop.list_ab_tests()
     
-    # Get database models for stats
-    from models import CustomizedResume, JobDescription
-    from sqlalchemy import func
-    
-    # Calculate statistics for the dashboard
-    total_customizations = CustomizedResume.query.count()
-    
-    # Calculate average improvement if there are customizations
-    avg_improvement = 0
-    if total_customizations > 0:
-        avg_improvement_result = db.session.query(
-            func.avg(CustomizedResume.ats_score - CustomizedResume.original_ats_score)
-        ).scalar()
-        avg_improvement = round(avg_improvement_result or 0, 1)
-    
-    # Calculate feedback stats
-    feedback_count = CustomizedResume.query.filter(CustomizedResume.user_rating.isnot(None)).count()
-    feedback_rate = round((feedback_count / total_customizations) * 100, 1) if total_customizations > 0 else 0
-    
-    # Calculate average rating
-    avg_rating_result = db.session.query(func.avg(CustomizedResume.user_rating)).filter(
-        CustomizedResume.user_rating.isnot(None)
-    ).scalar()
-    avg_rating = round(avg_rating_result or 0, 1)
-    
-    # Compile stats
-    stats = {
-        'total_customizations': total_customizations,
-        'avg_improvement': avg_improvement,
-        'feedback_count': feedback_count,
-        'feedback_rate': feedback_rate,
-        'avg_rating': avg_rating
-    }
+    # Stats come from the incrementally maintained rollups (a primary-key read),
+    # not from aggregating customized_resume on every page load
+    stats = AnalyticsRollup.summary()
+    stats['recent_customizations'] = AnalyticsRollup.recent_customizations(days=30)
     
     # Render template with data
     return render_template(
@@ -119,6 +95,136 @@ def feedback_dashboard():
         stats=stats
     )
 
+@admin_bp.route('/admin/export/<dataset>', methods=['GET'])
+@admin_required
+def export_analytics(dataset):
+    """
+    Stream customization analytics as JSONL or CSV.
+    
+    Query parameters: format (jsonl or csv), columns (comma-separated),
+    start and end (YYYY-MM-DD; end is exclusive).
+    """
+    export_format = request.args.get('format', 'jsonl')
+    columns = [name.strip() for name in request.args.get('columns', '').split(',') if name.strip()]
+    try:
+        chunks = stream_export(
+            dataset, export_format, columns=columns or None,
+            start=parse_date(request.args.get('start')), end=parse_date(request.args.get('end'))
+        )
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={dataset}.{export_format}'}
+    )
+
+@admin_bp.route('/admin/traces', methods=['GET'])
+@admin_required
+def list_traces():
+    """Display the slowest recent request traces."""
+    limit = request.args.get('limit', 50, type=int)
+    endpoint = request.args.get('endpoint', '')
+    traces = tracer.recent()
+    if endpoint:
+        traces = [trace for trace in traces if endpoint in trace['name']]
+    return render_template(
+        'admin/traces.html',
+        traces=slowest(traces, limit),
+        recent_count=len(traces),
+        endpoint=endpoint,
+        tracing_enabled=tracer.enabled
+    )
+
+@admin_bp.route('/admin/traces/<trace_id>', methods=['GET'])
+@admin_required
+def view_trace(trace_id):
+    """Display one trace as a tree of timed spans."""
+    trace = next((trace for trace in tracer.recent() if trace['trace_id'] == trace_id), None)
+    if trace is None:
+        flash('Trace not found; it may have been evicted from the buffer.', 'warning')
+        return redirect(url_for('admin.list_traces'))
+    return render_template('admin/trace_detail.html', trace=trace, spans=span_tree(trace))
+
+@admin_bp.route('/admin/profiler', methods=['GET'])
+@admin_required
+def profiler_dashboard():
+    """Display the profiler's arming state and saved profiles."""
+    profiler = current_app.extensions['profiler']
+    return render_template(
+        'admin/profiler.html',
+        armed=profiler.status(),
+        profiles=profiler.profiles(),
+        modes=PROFILE_MODES,
+        max_requests=MAX_PROFILE_REQUESTS
+    )
+
+@admin_bp.route('/admin/profiler/arm', methods=['POST'])
+@admin_required
+def arm_profiler():
+    """Profile the next requests matching a path pattern."""
+    try:
+        state = current_app.extensions['profiler'].arm(
+            request.form.get('pattern', '').strip() or '.*',
+            request.form.get('count', 1, type=int),
+            mode=request.form.get('mode', 'sampling'),
+            armed_by=current_user.username
+        )
+        flash(f"Profiler armed for the next {state['count']} request(s) matching {state['pattern']}.", 'success')
+    except ProfilerError as e:
+        flash(str(e), 'danger')
+    return redirect(url_for('admin.profiler_dashboard'))
+
+@admin_bp.route('/admin/profiler/disarm', methods=['POST'])
+@admin_required
+def disarm_profiler():
+    """Stop profiling before the remaining requests arrive."""
+    current_app.extensions['profiler'].disarm()
+    flash('Profiler disarmed.', 'success')
+    return redirect(url_for('admin.profiler_dashboard'))
+
+@admin_bp.route('/admin/profiler/<profile_id>', methods=['GET'])
+@admin_required
+def view_profile(profile_id):
+    """Display the summary of a saved profile."""
+    profile = current_app.extensions['profiler'].get(profile_id)
+    if profile is None:
+        flash('Profile not found.', 'warning')
+        return redirect(url_for('admin.profiler_dashboard'))
+    return render_template('admin/profile_detail.html', profile=profile)
+
+@admin_bp.route('/admin/profiler/<profile_id>/download', methods=['GET'])
+@admin_required
+def download_profile(profile_id):
+    """Download a profile as a pstats or collapsed-stack file."""
+    path = current_app.extensions['profiler'].data_path(profile_id)
+    if path is None:
+        abort(404)
+    return send_file(path, as_attachment=True, download_name=os.path.basename(path),
+                     mimetype='application/octet-stream')
+
+@admin_bp.route('/admin/profiler/<profile_id>/delete', methods=['POST'])
+@admin_required
+def delete_profile(profile_id):
+    """Delete a saved profile."""
+    current_app.extensions['profiler'].delete(profile_id)
+    flash('Profile deleted.', 'success')
+    return redirect(url_for('admin.profiler_dashboard'))
+
+@admin_bp.route('/admin/memory', methods=['GET'])
+@admin_required
+def memory_dashboard():
+    """Display this worker's memory use and the requests that peaked over the threshold."""
+    monitor = current_app.extensions['memory']
+    return render_template(
+        'admin/memory.html',
+        monitor=monitor,
+        rss=current_rss(),
+        pid=os.getpid(),
+        requests=monitor.log.recent(request.args.get('limit', 50, type=int))
+    )
+
 @admin_bp.route('/admin/users', methods=['GET'])
 @admin_required
 def manage_users():
@@ -1,8 +1,9 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
 from extensions import db
-from models import JobDescription, CustomizedResume, User
+from models import JobDescription, CustomizedResume, User, StoredBlob, ExportCache
 from sqlalchemy import func
+from services.dashboard_query import dashboard_page, dashboard_stats
 from functools import wraps
 
 # Create dashboard blueprint
@@ -27,70 +28,42 @@ def admin_required(f):
 @dashboard_bp.route('/dashboard', methods=['GET'])
 @login_required
 def user_dashboard():
-    """Display the user dashboard with all customized resumes."""
-    # Get search query if present
+    """Display the user dashboard, one page of customized resumes at a time."""
+    # Get search query and page cursor if present
     search_query = request.args.get('search', '')
+    cursor = request.args.get('after')
     
-    # Build query for customized resumes
-    query = db.session.query(
-        CustomizedResume,
-        JobDescription.title.label('job_title'),
-        JobDescription.url.label('job_url')
-    ).join(
-        JobDescription,
-        CustomizedResume.job_description_id == JobDescription.id
-    ).filter(
-        CustomizedResume.user_id == current_user.id
-    )
-    
-    # Apply search filter if provided
-    if search_query:
-        query = query.filter(
-            JobDescription.title.ilike(f'%{search_query}%') |
-            JobDescription.url.ilike(f'%{search_query}%') |
-            JobDescription.content.ilike(f'%{search_query}%')
-        )
-    
-    # Get all results
-    results = query.order_by(CustomizedResume.created_at.desc()).all()
+    # Only the listed columns are loaded; paging is keyset-based on (created_at, id)
+    rows, next_cursor = dashboard_page(current_user.id, search_query, cursor)
     
     # Process results into the format expected by the template
     dashboard_data = []
-    for resume_tuple in results:
-        resume = resume_tuple[0]  # The CustomizedResume object
-        job_title = resume_tuple.job_title  # Using the label from query
-        job_url = resume_tuple.job_url      # Using the label from query
-        
+    for resume, job_title, job_url in rows:
         # Calculate improvement if possible
         improvement = 0
         if resume.original_ats_score is not None and resume.ats_score is not None:
             improvement = round(resume.ats_score - resume.original_ats_score, 1)
         
-        # Create a job object for the template
-        job = {
-            'title': job_title,
-            'url': job_url
-        }
-        
         # Add to dashboard data
         dashboard_data.append({
             'resume': resume,
-            'job': job,
+            'job': {'title': job_title, 'url': job_url},
             'improvement': improvement,
             'date': resume.created_at.strftime('%Y-%m-%d %H:%M')
         })
     
-    # Calculate overall statistics
-    total_resumes = len(dashboard_data)
-    avg_improvement = sum(item['improvement'] for item in dashboard_data) / total_resumes if total_resumes > 0 else 0
+    # Overall statistics are aggregated in SQL across all pages
+    stats = dashboard_stats(current_user.id, search_query)
     
     # Return dashboard template with results
     return render_template(
         'user_dashboard.html',
         dashboard_data=dashboard_data,
-        total_resumes=total_resumes,
-        avg_improvement=round(avg_improvement, 1),
-        search_query=search_query
+        total_resumes=stats['total_resumes'],
+        avg_improvement=stats['avg_improvement'],
+        search_query=search_query,
+        next_cursor=next_cursor,
+        is_first_page=not cursor
     )
 
 @dashboard_bp.route('/dashboard/resume/<int:resume_id>/delete', methods=['GET'])
@@ -105,7 +78,12 @@ def delete_resume(resume_id):
         return redirect(url_for('dashboard.user_dashboard'))
     
     # Delete resume and redirect
+    if resume.blob_hash:
+        StoredBlob.release(resume.blob_hash)
+    content_hash = resume.customized_content_hash
     db.session.delete(resume)
-    db.session.commit()
+    db.session.flush()
+    # Drop its rendered exports unless another resume has the same content
+    ExportCache.purge_unreferenced(content_hash)
     flash('Resume deleted successfully!', 'success')
     return redirect(url_for('dashboard.user_dashboard')) 
\ No newline at end of file
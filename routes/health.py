@@ -0,0 +1,19 @@
+from flask import Blueprint, current_app, jsonify
+
+# Create health blueprint
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/healthz', methods=['GET'])
+def liveness():
+    """Liveness probe: the worker is serving requests. No I/O."""
+    response = jsonify({'status': 'ok'})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@health_bp.route('/readyz', methods=['GET'])
+def readiness():
+    """Readiness probe: database, NLTK data and services checked, cached for a few seconds."""
+    result = current_app.extensions['health'].status()
+    response = jsonify({'status': 'ready' if result['ready'] else 'unavailable', **result})
+    response.headers['Cache-Control'] = 'no-store'
+    return response, 200 if result['ready'] else 503
@@ -3,10 +3,12 @@ from flask_login import login_required, current_user
 from extensions import db
 from models import JobDescription, CustomizedResume
 from services.job_description_processor import JobDescriptionProcessor
-from services.ats_analyzer import EnhancedATSAnalyzer
+from services.ats_analyzer import EnhancedATSAnalyzer, ANALYZER_VERSION
 from services.ai_suggestions import AISuggestions
 from services.resume_customizer import ResumeCustomizer
 from services.file_parser import FileParser
+from services.search_index import search_jobs
+from services.rate_limit import llm_rate_limited
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +18,14 @@ ats_analyzer = EnhancedATSAnalyzer()
 ai_suggestions = AISuggestions()
 resume_customizer = ResumeCustomizer()
 file_parser = FileParser()
+# The shared services, by name; /readyz checks them
+SERVICES = {
+    'job_processor': job_processor,
+    'ats_analyzer': ats_analyzer,
+    'ai_suggestions': ai_suggestions,
+    'resume_customizer': resume_customizer,
+    'file_parser': file_parser,
+}
 
 def handle_job_url_submission(job_url, resume_content=None):
     """
@@ -57,6 +67,7 @@ def handle_job_url_submission(job_url, resume_content=None):
 
 @jobs_bp.route('/job/text', methods=['POST'])
 @login_required
+@llm_rate_limited
 def submit_job_text():
     try:
         data = request.get_json()
@@ -123,6 +134,7 @@ def submit_job_text():
 
 @jobs_bp.route('/job/url', methods=['POST'])
 @login_required
+@llm_rate_limited
 def submit_job_url():
     try:
         logger.debug("Processing job URL submission")
@@ -201,8 +213,25 @@ def get_jobs():
         logger.error(f"Error fetching jobs: {str(e)}")
         return jsonify({'error': 'Failed to fetch jobs'}), 500
 
+@jobs_bp.route('/jobs/search', methods=['GET'])
+@login_required
+def search_jobs_route():
+    """Ranked full-text search over the user's job descriptions, with highlighted snippets."""
+    search_query = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    try:
+        results = search_jobs(current_user.id, search_query, limit=limit)
+        for result in results:
+            if result['created_at'] is not None and not isinstance(result['created_at'], str):
+                result['created_at'] = result['created_at'].isoformat()
+        return jsonify({'query': search_query, 'results': results})
+    except Exception as e:
+        logger.error(f"Error searching jobs: {str(e)}")
+        return jsonify({'error': 'Failed to search jobs'}), 500
+
 @jobs_bp.route('/customize-resume-v2', methods=['POST'])
 @login_required
+@llm_rate_limited
 def customize_resume():
     try:
         data = request.get_json()
@@ -240,6 +269,7 @@ def customize_resume():
             job_description_id=job.id,
             user_id=current_user.id,
             ats_score=customization_result['ats_score'],
+            analyzer_version=ANALYZER_VERSION,
             matching_keywords=customization_result['matching_keywords'],
             missing_keywords=customization_result['missing_keywords']
         )
@@ -0,0 +1,26 @@
+import hmac
+from flask import Blueprint, Response, current_app, request, abort
+from services.metrics import render_all
+
+# Create metrics blueprint
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Prometheus scrape endpoint
+
+    When METRICS_PORT is set, metrics are only served to requests that came in
+    on that port (gunicorn listens on it as well as on the public port, but
+    only the public port is routed by Fly's proxy); elsewhere /metrics is a
+    404. When METRICS_TOKEN is set, a bearer token is required as well.
+    """
+    port = current_app.config.get('METRICS_PORT')
+    if port and request.environ.get('SERVER_PORT') != str(port):
+        abort(404)
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+            abort(401)
+    return Response(render_all(current_app), mimetype='text/plain; version=0.0.4')
@@ -1,30 +1,41 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, send_file
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, send_file, current_app
 from flask_login import login_required, current_user
 from datetime import datetime
 from io import BytesIO
+import os
 from extensions import db
 from models import JobDescription, CustomizedResume, User, OptimizationSuggestion
-from services.file_parser import FileParser
-from services.ats_analyzer import EnhancedATSAnalyzer
-from services.ai_suggestions import AISuggestions
-from services.resume_customizer import ResumeCustomizer
+from services.ats_analyzer import ANALYZER_VERSION
+from services.blob_store import BlobStore
+from services.export_service import ExportService, EXPORT_FORMATS
+from services.rescoring import RescoringService
+from services.rate_limit import llm_rate_limited
 import logging
-from routes.jobs import handle_job_url_submission, jobs_bp
+# Share the analysis services created by routes.jobs rather than building a second set
+from routes.jobs import handle_job_url_submission, jobs_bp, file_parser, ats_analyzer, ai_suggestions, resume_customizer
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
 # Initialize services
-file_parser = FileParser()
-ats_analyzer = EnhancedATSAnalyzer()
-ai_suggestions = AISuggestions()
-resume_customizer = ResumeCustomizer()
+blob_store = BlobStore()
+export_service = ExportService(blob_store=blob_store)
+rescoring_service = RescoringService()
+
+# MIME types for downloads
+DOWNLOAD_MIMETYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'md': 'text/markdown',
+    'txt': 'text/plain',
+}
 
 # Create resume blueprint
 resume_bp = Blueprint('resume', __name__)
 
 @resume_bp.route('/customize-resume', methods=['POST'])
 @login_required
+@llm_rate_limited
 def customize_resume():
     """Handle customization of resume based on job description."""
     logger.debug("Handling customize-resume request")
@@ -108,21 +119,30 @@ def customize_resume():
         file_format=file_format,
         original_ats_score=original_score,
         ats_score=new_score,
+        analyzer_version=ANALYZER_VERSION,
         matching_keywords=matching_keywords,
         missing_keywords=missing_keywords,
         added_keywords_count=added_keywords_count,
         changes_count=changes_count,
         created_at=datetime.utcnow(),
         original_id=original_resume.id,
-        comparison_data=comparison_data
+        comparison_data=comparison_data,
+        blob_hash=original_resume.blob_hash
     )
     
+    # The customization shares the original's upload rather than copying it
+    if original_resume.blob_hash:
+        blob_store.retain(original_resume.blob_hash)
+    
     # Add and commit to database
     db.session.add(customized_resume)
     db.session.commit()
     
     logger.debug(f"Created customized resume with ID: {customized_resume.id}")
     
+    # Render PDF/DOCX in the background so the first download is a cache read
+    export_service.prerender(customized_content)
+    
     # Check if this is an HTMX request
     if request.headers.get('HX-Request') == 'true':
         # For HTMX requests, use HX-Redirect for proper client-side navigation
@@ -135,6 +155,7 @@ def customize_resume():
 
 @resume_bp.route('/api/process_resume', methods=['POST'])
 @login_required
+@llm_rate_limited
 def process_resume():
     """Process a resume against a job description."""
     # Get resume and job from form
@@ -155,8 +176,9 @@ def process_resume():
     logger.debug(f"Processing resume, text length: {len(resume_text)}")
     logger.debug(f"Processing job description, text length: {len(job_description)}")
     
-    # Analyze resume against job description
-    ats_results = ats_analyzer.analyze(resume_text, job_description)
+    # Analyze resume against job description (admins can add ?debug=1 for per-stage timings)
+    debug = request.args.get('debug') == '1' and current_user.is_admin
+    ats_results = ats_analyzer.analyze(resume_text, job_description, debug=debug)
     
     # Generate AI suggestions for improvements
     suggestions = ai_suggestions.generate_suggestions(
@@ -180,6 +202,7 @@ def process_resume():
 
 @resume_bp.route('/api/analyze_resume', methods=['POST'])
 @login_required
+@llm_rate_limited
 def analyze_resume():
     """Analyze a resume against a job description."""
     # Debug log the incoming form data
@@ -192,19 +215,24 @@ def analyze_resume():
         file = request.files['resume_file']
         logger.debug(f"Resume file received: {file.filename}")
         
-        # Parse resume content from file
+        # Parse resume content from file (PDFs also yield their section map)
         try:
-            resume_content = file_parser.parse_to_markdown(file)
+            resume_content, resume_sections = file_parser.parse_with_sections(file)
             # Determine file format from filename
             file_format = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else 'txt'
             original_filename = file.filename
+            # Keep the uploaded file itself for downloads of the original
+            file.seek(0)
+            original_bytes = file.read()
         except Exception as e:
             return jsonify({'error': f'Error parsing resume file: {str(e)}'}), 400
     else:
         # Get resume from form data
         resume_content = request.form.get('resume')
+        resume_sections = None
         file_format = 'text'
         original_filename = 'resume.txt'
+        original_bytes = None
         
         if not resume_content:
             return jsonify({'error': 'No resume provided'}), 400
@@ -253,10 +281,10 @@ def analyze_resume():
             job_id = job.id
     
     # Save original resume to database
-    resume_id = save_resume(resume_content, original_filename, file_format, job_id)
+    resume_id = save_resume(resume_content, original_filename, file_format, job_id, original_bytes)
     
     # Analyze resume against job description
-    ats_results = ats_analyzer.analyze(resume_content, job_description)
+    ats_results = ats_analyzer.analyze(resume_content, job_description, resume_sections=resume_sections)
     
     # Generate AI suggestions for improvements
     suggestions = ai_suggestions.get_suggestions(
@@ -288,6 +316,10 @@ def view_customized_resume(resume_id):
         flash('You do not have permission to view this resume.', 'danger')
         return redirect(url_for('dashboard.user_dashboard'))
     
+    # Scores from an older analyzer are recomputed in the background if enabled
+    if current_app.config.get('RESCORE_ON_READ'):
+        rescoring_service.schedule(resume)
+    
     # Get job description
     job = JobDescription.query.get(resume.job_description_id)
     
@@ -315,6 +347,10 @@ def compare_resume(resume_id):
     if resume.original_id:
         original = CustomizedResume.query.get(resume.original_id)
     
+    # Scores from an older analyzer are recomputed in the background if enabled
+    if current_app.config.get('RESCORE_ON_READ'):
+        rescoring_service.schedule(resume)
+    
     # Get job description
     job = JobDescription.query.get(resume.job_description_id)
     
@@ -338,24 +374,41 @@ def download_resume(resume_id, format):
         flash('You do not have permission to download this resume.', 'danger')
         return redirect(url_for('dashboard.user_dashboard'))
     
-    # Generate PDF or appropriate format
-    if format == 'pdf':
-        # Convert to PDF
-        from services.pdf_extractor import generate_pdf
-        pdf_bytes = generate_pdf(resume.customized_content, resume.file_format)
-        
-        # Create file-like object
-        file_obj = BytesIO(pdf_bytes)
-        
-        # Generate filename
-        filename = f"resume_{resume_id}.pdf"
+    if format in EXPORT_FORMATS:
+        # Rendered exports are cached (and usually pre-rendered), so this is a cache read
+        try:
+            blob, blob_hash = export_service.open_export(resume.customized_content, format)
+        except Exception as e:
+            logger.error(f"Error exporting resume {resume_id} as {format}: {str(e)}")
+            flash(f'Error generating {format.upper()} file.', 'danger')
+            return redirect(url_for('resume.view_customized_resume', resume_id=resume_id))
         
-        # Send file
+        return send_blob(blob, blob_hash, f"resume_{resume_id}.{format}", DOWNLOAD_MIMETYPES[format])
+    elif format == 'md':
         return send_file(
-            file_obj,
+            BytesIO(resume.customized_content.encode('utf-8')),
             as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
+            download_name=f"resume_{resume_id}.md",
+            mimetype=DOWNLOAD_MIMETYPES['md']
+        )
+    elif format == 'original':
+        if not resume.blob_hash:
+            flash('No original upload stored for this resume.', 'warning')
+            return redirect(url_for('resume.view_customized_resume', resume_id=resume_id))
+        
+        # Stream the memory-mapped blob; the bytes never pass through the ORM
+        try:
+            blob = blob_store.open(resume.blob_hash)
+        except FileNotFoundError:
+            logger.error(f"Blob {resume.blob_hash} missing for resume {resume_id}")
+            flash('Original upload is no longer available.', 'danger')
+            return redirect(url_for('resume.view_customized_resume', resume_id=resume_id))
+        
+        return send_blob(
+            blob,
+            resume.blob_hash,
+            f"resume_{resume_id}_original.{resume.file_format}",
+            DOWNLOAD_MIMETYPES.get(resume.file_format, 'application/octet-stream')
         )
     else:
         # Handle other formats
@@ -384,8 +437,7 @@ def export_resume(resume_id, version=None):
         return redirect(url_for('resume.download_resume', resume_id=resume_id, format='pdf'))
     elif format_type == 'docx':
         # Generate DOCX
-        flash('DOCX export not implemented yet.', 'warning')
-        return redirect(url_for('resume.view_customized_resume', resume_id=resume_id))
+        return redirect(url_for('resume.download_resume', resume_id=resume_id, format='docx'))
     else:
         # Handle unsupported format
         flash(f'Unsupported format: {format_type}', 'danger')
@@ -422,9 +474,23 @@ def submit_feedback(resume_id):
     # Return success
     return jsonify({'success': True})
 
+# Helper function to stream a blob store file as a download
+def send_blob(blob, blob_hash, download_name, mimetype):
+    """Send a memory-mapped blob as an attachment, using its hash as the ETag."""
+    response = send_file(
+        blob,
+        as_attachment=True,
+        download_name=download_name,
+        mimetype=mimetype,
+        etag=blob_hash
+    )
+    # send_file can't size a file object that isn't a BytesIO
+    response.content_length = os.path.getsize(blob_store.path_for(blob_hash))
+    return response
+
 # Helper function to save a resume to the database
-def save_resume(content, filename, file_format, job_id):
-    """Save a resume to the database."""
+def save_resume(content, filename, file_format, job_id, original_bytes=None):
+    """Save a resume to the database, with the uploaded file (if any) in the blob store."""
     # Create resume record
     resume = CustomizedResume(
         user_id=current_user.id,
@@ -432,6 +498,7 @@ def save_resume(content, filename, file_format, job_id):
         original_content=content,
         customized_content=content,  # Initially, customized content is the same as original
         file_format=file_format,
+        blob_hash=blob_store.put(original_bytes) if original_bytes else None,
         created_at=datetime.utcnow()
     )
     
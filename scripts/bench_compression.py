@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark for compressed column storage
+
+Measures the compression ratio and the CPU cost added by CompressedText /
+CompressedBinary on a corpus of resume-like payloads: the text and PDF files
+in test_data, layout-aware PDF extraction output, and synthetic resumes of
+increasing length. Optionally samples real rows from an existing database.
+
+Usage:
+    python scripts/bench_compression.py [--levels 1,6,9] [--iterations 200] [--database URI] [--sample 100]
+"""
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+from sqlalchemy import create_engine, text
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db_types import compress_payload, decompress_payload, COMPRESSION_LEVEL
+
+# Set up logging
+logging.basicConfig(level=logging.WARNING, 
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TEST_DATA_DIR = Path(__file__).parent.parent / "test_data"
+
+def separator(title=None):
+    """Print a separator line with optional title"""
+    width = 70
+    if title:
+        print(f"\n{'=' * 5} {title} {'=' * (width - len(title) - 7)}\n")
+    else:
+        print("\n" + "=" * width + "\n")
+
+def build_corpus():
+    """Collect (label, bytes) payloads resembling what the compressed columns hold"""
+    corpus = []
+    
+    for path in sorted(TEST_DATA_DIR.glob("*")):
+        if path.stat().st_size > 100:
+            corpus.append((path.name, path.read_bytes()))
+    
+    try:
+        from services.pdf_extractor import PDFExtractor
+        extractor = PDFExtractor(use_cache=False)
+        for path in sorted(TEST_DATA_DIR.glob("*.pdf")):
+            if path.stat().st_size > 100:
+                markdown, _, _ = extractor._perform_layout_extraction(path.read_bytes())
+                corpus.append((f"{path.name} (markdown)", markdown.encode('utf-8')))
+    except Exception as e:
+        logger.warning(f"Skipping layout extraction samples: {e}")
+    
+    # Synthetic resumes: the sample resume with varied experience entries
+    base = (TEST_DATA_DIR / "sample.txt").read_text()
+    for repeats in (4, 16, 64):
+        entries = [
+            f"Engineer {i}, Company {i * 7 % 13}, {2000 + i % 24}-{2001 + i % 24}\n"
+            f"- Delivered project {i} using Python, SQL and cloud services for {i * 3} users\n"
+            for i in range(repeats)
+        ]
+        synthetic = base + "\n" + "".join(entries)
+        corpus.append((f"synthetic x{repeats}", synthetic.encode('utf-8')))
+    
+    return corpus
+
+def sample_database(database_uri, sample_size):
+    """Sample stored payloads from an existing database"""
+    samples = []
+    engine = create_engine(database_uri)
+    columns = [
+        ('resume_content', 'body'),
+        ('pdf_cache', 'extracted_text'),
+    ]
+    with engine.connect() as connection:
+        for table_name, column_name in columns:
+            rows = connection.execute(text(
+                f"SELECT {column_name} FROM {table_name} WHERE {column_name} IS NOT NULL LIMIT :n"
+            ), {'n': sample_size}).fetchall()
+            for (value,) in rows:
+                raw = value.encode('utf-8') if isinstance(value, str) else decompress_payload(value)
+                samples.append((f"{table_name}.{column_name}", raw))
+    return samples
+
+def time_per_call(func, iterations):
+    """Average seconds per call"""
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start_time) / iterations
+
+def benchmark(corpus, levels, iterations):
+    """Print ratio and timings for each payload at each compression level"""
+    totals = {level: [0, 0, 0.0, 0.0] for level in levels}
+    
+    for level in levels:
+        separator(f"zlib level {level}{' (default)' if level == COMPRESSION_LEVEL else ''}")
+        print(f"{'payload':<32}{'raw':>9}{'stored':>9}{'ratio':>8}{'comp us':>10}{'decomp us':>11}")
+        for label, raw in corpus:
+            stored = compress_payload(raw, level)
+            assert decompress_payload(stored) == raw
+            
+            compress_time = time_per_call(lambda: compress_payload(raw, level), iterations)
+            decompress_time = time_per_call(lambda: decompress_payload(stored), iterations)
+            
+            print(f"{label[:31]:<32}{len(raw):>9}{len(stored):>9}{len(raw) / len(stored):>8.2f}"
+                  f"{compress_time * 1e6:>10.1f}{decompress_time * 1e6:>11.1f}")
+            
+            total = totals[level]
+            total[0] += len(raw)
+            total[1] += len(stored)
+            total[2] += compress_time
+            total[3] += decompress_time
+    
+    separator("SUMMARY")
+    for level, (raw_bytes, stored_bytes, compress_time, decompress_time) in totals.items():
+        print(f"level {level}: {raw_bytes} -> {stored_bytes} bytes "
+              f"(ratio {raw_bytes / stored_bytes:.2f}, saves {100 - stored_bytes * 100 / raw_bytes:.1f}%), "
+              f"compress {compress_time * 1e3:.2f} ms, decompress {decompress_time * 1e3:.2f} ms for the corpus")
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description='Benchmark compressed column storage')
+    parser.add_argument('--levels', default=f"1,{COMPRESSION_LEVEL},9", help='Comma-separated zlib levels')
+    parser.add_argument('--iterations', type=int, default=200, help='Timing iterations per payload')
+    parser.add_argument('--database', help='Also sample payloads from this database URI')
+    parser.add_argument('--sample', type=int, default=100, help='Rows sampled per column from --database')
+    
+    args = parser.parse_args()
+    
+    corpus = build_corpus()
+    if args.database:
+        corpus.extend(sample_database(args.database, args.sample))
+    
+    levels = [int(level) for level in args.levels.split(',') if level.strip()]
+    benchmark(corpus, levels, args.iterations)
+
+if __name__ == "__main__":
+    main()
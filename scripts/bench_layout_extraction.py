@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Accuracy and timing check for layout-aware PDF extraction
+
+Compares the two ways of getting resume sections out of a PDF:
+1. Plain-text extraction followed by EnhancedATSAnalyzer._identify_sections
+2. Layout-aware extraction, which emits the section map in the same pass
+
+Accuracy is measured against the expected set of section names (the
+test_data resumes all contain summary, education, experience and skills).
+
+Usage:
+    python scripts/bench_layout_extraction.py [pdf_path ...] [--expected summary,skills] [--iterations 5]
+    
+If no pdf_path is provided, every readable PDF in test_data is used.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.pdf_extractor import PDFExtractor
+from services.ats_analyzer import EnhancedATSAnalyzer
+
+# Set up logging
+logging.basicConfig(level=logging.WARNING, 
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPECTED_SECTIONS = ['summary', 'education', 'experience', 'skills']
+
+def separator(title=None):
+    """Print a separator line with optional title"""
+    width = 70
+    if title:
+        print(f"\n{'=' * 5} {title} {'=' * (width - len(title) - 7)}\n")
+    else:
+        print("\n" + "=" * width + "\n")
+
+def score_sections(found, expected):
+    """Return (precision, recall) of detected section names against the expected set"""
+    found = set(found) - {'unknown'}
+    expected = set(expected)
+    if not found:
+        return 0.0, 0.0
+    hits = len(found & expected)
+    return hits / len(found), hits / len(expected)
+
+def time_call(func, iterations):
+    """Run func repeatedly and return (last_result, average_seconds)"""
+    result = None
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        result = func()
+    return result, (time.perf_counter() - start_time) / iterations
+
+def benchmark_pdf(pdf_path, analyzer, expected, iterations):
+    """Benchmark both section detection paths on a single PDF"""
+    separator(os.path.basename(pdf_path))
+    
+    with open(pdf_path, 'rb') as f:
+        pdf_bytes = f.read()
+    
+    # Caching disabled so both paths measure real extraction work
+    extractor = PDFExtractor(use_cache=False)
+    
+    def heuristic_path():
+        text, _ = extractor._perform_extraction(pdf_bytes)
+        return analyzer._identify_sections(text)
+    
+    def layout_path():
+        _, section_map, _ = extractor._perform_layout_extraction(pdf_bytes)
+        return section_map
+    
+    heuristic_sections, heuristic_time = time_call(heuristic_path, iterations)
+    layout_sections, layout_time = time_call(layout_path, iterations)
+    
+    results = {}
+    for label, sections, elapsed in (
+        ('text + heuristics', heuristic_sections, heuristic_time),
+        ('layout-aware', layout_sections, layout_time),
+    ):
+        precision, recall = score_sections(sections.keys(), expected)
+        results[label] = (precision, recall, elapsed)
+        print(f"{label:>18}: {elapsed * 1000:8.2f} ms  precision {precision:.2f}  recall {recall:.2f}")
+        print(f"{'':>18}  sections: {sorted(sections.keys())}")
+    
+    return results
+
+def find_sample_pdfs():
+    """Find readable PDFs in the test_data directory"""
+    test_dir = Path(__file__).parent.parent / "test_data"
+    return [str(path) for path in sorted(test_dir.glob("*.pdf")) if path.stat().st_size > 100]
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description='Check layout-aware PDF extraction accuracy and speed')
+    parser.add_argument('pdf_paths', nargs='*', help='PDF files to benchmark')
+    parser.add_argument('--expected', default=','.join(DEFAULT_EXPECTED_SECTIONS),
+                        help='Comma-separated section names every PDF should contain')
+    parser.add_argument('--iterations', type=int, default=5, help='Timing iterations per path')
+    
+    args = parser.parse_args()
+    
+    pdf_paths = args.pdf_paths or find_sample_pdfs()
+    if not pdf_paths:
+        print("No PDF files to benchmark")
+        return
+    
+    expected = [name.strip() for name in args.expected.split(',') if name.strip()]
+    analyzer = EnhancedATSAnalyzer()
+    
+    totals = {}
+    for pdf_path in pdf_paths:
+        if not os.path.exists(pdf_path):
+            print(f"Error: PDF file not found: {pdf_path}")
+            continue
+        for label, values in benchmark_pdf(pdf_path, analyzer, expected, args.iterations).items():
+            totals.setdefault(label, []).append(values)
+    
+    separator("SUMMARY")
+    for label, rows in totals.items():
+        count = len(rows)
+        print(f"{label:>18}: avg {sum(r[2] for r in rows) / count * 1000:8.2f} ms  "
+              f"precision {sum(r[0] for r in rows) / count:.2f}  "
+              f"recall {sum(r[1] for r in rows) / count:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark for session storage backends
+
+Stores a resume's text in the session, as process_resume does, then times
+follow-up requests that read it and reports the session cookie size and
+Set-Cookie header bytes for each backend: Flask's signed cookie session,
+and the database and filesystem server-side backends. Browsers ignore
+cookies over 4096 bytes, so a cookie session that outgrows that silently
+loses everything in it, including the login.
+
+Usage:
+    python scripts/bench_sessions.py [--requests 500] [--resume FILE] [--entries 0]
+
+--entries appends that many synthetic experience entries to the resume.
+"""
+
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from flask import Flask, session
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extensions import db
+from db_config import configure_database
+from services.session_store import (
+    DatabaseSessionBackend, FilesystemSessionBackend, ServerSideSessionInterface
+)
+
+# Set up logging
+logging.basicConfig(level=logging.WARNING, 
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TEST_DATA_DIR = Path(__file__).parent.parent / "test_data"
+
+BROWSER_COOKIE_LIMIT = 4096
+
+def separator(title=None):
+    """Print a separator line with optional title"""
+    width = 70
+    if title:
+        print(f"\n{'=' * 5} {title} {'=' * (width - len(title) - 7)}\n")
+    else:
+        print("\n" + "=" * width + "\n")
+
+def create_app(backend_name, work_dir, resume_text):
+    """Minimal app with the given session backend and two session routes"""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'bench'
+    configure_database(app, f"sqlite:///{work_dir}/sessions.db")
+    db.init_app(app)
+    if backend_name == 'database':
+        app.session_interface = ServerSideSessionInterface(DatabaseSessionBackend())
+    elif backend_name == 'filesystem':
+        app.session_interface = ServerSideSessionInterface(FilesystemSessionBackend(f"{work_dir}/sessions"))
+    
+    @app.route('/store', methods=['POST'])
+    def store():
+        session['original_resume_content'] = resume_text
+        return 'ok'
+    
+    @app.route('/read')
+    def read():
+        return str(len(session.get('original_resume_content', '')))
+    
+    with app.app_context():
+        db.create_all()
+    return app
+
+def run_backend(backend_name, resume_text, requests):
+    """Time /read requests against a session holding resume_text"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        app = create_app(backend_name, work_dir, resume_text)
+        client = app.test_client()
+        
+        response = client.post('/store')
+        cookie = client.get_cookie('session')
+        cookie_bytes = len(cookie.value) if cookie else 0
+        set_cookie_bytes = len(response.headers.get('Set-Cookie', ''))
+        
+        start_time = time.perf_counter()
+        for _ in range(requests):
+            response = client.get('/read')
+        elapsed = time.perf_counter() - start_time
+        intact = response.get_data(as_text=True) == str(len(resume_text))
+    
+    return {
+        'cookie_bytes': cookie_bytes,
+        'set_cookie_bytes': set_cookie_bytes,
+        'request_ms': elapsed * 1000 / requests,
+        'intact': intact,
+    }
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description='Benchmark session storage backends')
+    parser.add_argument('--requests', type=int, default=500, help='Timed requests per backend')
+    parser.add_argument('--resume', default=str(TEST_DATA_DIR / "sample.txt"), help='Resume text stored in the session')
+    parser.add_argument('--entries', type=int, default=0, help='Synthetic experience entries appended to the resume')
+    
+    args = parser.parse_args()
+    
+    resume_text = Path(args.resume).read_text() + "".join(
+        f"Engineer {i}, Company {i * 7 % 13}, {2000 + i % 24}-{2001 + i % 24}\n"
+        f"- Delivered project {i} using Python, SQL and cloud services for {i * 3} users\n"
+        for i in range(args.entries)
+    )
+    separator(f"{len(resume_text)} characters of resume text in the session")
+    print(f"{'backend':<12}{'cookie B':>10}{'Set-Cookie B':>14}{'ms/request':>12}{'fits browser':>14}")
+    for backend_name in ('cookie', 'database', 'filesystem'):
+        result = run_backend(backend_name, resume_text, args.requests)
+        fits = result['cookie_bytes'] <= BROWSER_COOKIE_LIMIT
+        print(f"{backend_name:<12}{result['cookie_bytes']:>10}{result['set_cookie_bytes']:>14}"
+              f"{result['request_ms']:>12.3f}{'yes' if fits else 'NO':>14}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark for app start-up (import time)
+
+Fly stops idle machines, so every quiet period ends in a cold start whose
+largest cost is importing the app in each gunicorn worker. This imports the
+app in fresh interpreters under `python -X importtime`, keeps the best of
+--runs for every module, and prints the slowest modules by cumulative time.
+
+With --check the results are compared with scripts/startup_budget.json and
+the script exits with status 1 when a budgeted module is over its budget
+or a module that should be deferred (PyMuPDF, python-docx, the Anthropic
+SDK, ReportLab; see services/lazy_imports.py) was imported at start-up.
+Run it in CI to catch cold-start regressions.
+
+Usage:
+    python scripts/bench_startup.py [--runs 3] [--top 25] [--check] [--budget FILE]
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Set up logging
+logging.basicConfig(level=logging.WARNING,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_BUDGET = Path(__file__).resolve().parent / 'startup_budget.json'
+
+def separator(title=None):
+    """Print a separator line with optional title"""
+    width = 70
+    if title:
+        print(f"\n{'=' * 5} {title} {'=' * (width - len(title) - 7)}\n")
+    else:
+        print("\n" + "=" * width + "\n")
+
+def load_budget(path=DEFAULT_BUDGET):
+    with open(path) as f:
+        return json.load(f)
+
+def parse_importtime(stderr):
+    """
+    Cumulative import time per module from `python -X importtime` output
+
+    Returns:
+        Dict of module name -> cumulative milliseconds
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.setdefault(name.strip(), int(cumulative) / 1000)
+    return modules
+
+def import_app(deferred=()):
+    """
+    Import the app once in a fresh interpreter
+
+    Returns:
+        (cumulative ms per module, deferred modules that were imported)
+    """
+    with tempfile.TemporaryDirectory(prefix='bench-startup-') as work_dir:
+        return _import_app(work_dir, deferred)
+
+def _import_app(work_dir, deferred):
+    env = dict(os.environ)
+    env.setdefault('JINA_API_KEY', 'bench')
+    env.setdefault('ANTHROPIC_API_KEY', 'bench')
+    env.update({
+        'DB_BOOTSTRAP': 'false',
+        'COLD_START_MODE': 'lazy',
+        'DATABASE_URL': f"sqlite:///{work_dir}/bench.db",
+        'METRICS_DIR': os.path.join(work_dir, 'metrics'),
+    })
+    code = ("import json, sys, app; "
+            f"print(json.dumps([name for name in {list(deferred)!r} if name in sys.modules]))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing the app failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr), json.loads(result.stdout.strip().splitlines()[-1])
+
+def benchmark(runs=3, deferred=()):
+    """Best-of-runs cumulative import time per module, plus any deferred modules imported"""
+    best = {}
+    imported = set()
+    for _ in range(runs):
+        modules, loaded = import_app(deferred)
+        imported.update(loaded)
+        for name, ms in modules.items():
+            best[name] = min(ms, best.get(name, ms))
+    return best, sorted(imported)
+
+def check_budget(modules, imported, budget):
+    """Budget violations as human-readable strings (empty when within budget)"""
+    failures = [f"{name} was imported at start-up but should be deferred" for name in imported]
+    for name, limit in budget.get('modules_ms', {}).items():
+        if name not in modules:
+            continue
+        if modules[name] > limit:
+            failures.append(f"{name} took {modules[name]:.0f} ms to import (budget {limit} ms)")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure how long importing the app takes, per module')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters to import the app in (best is kept)')
+    parser.add_argument('--top', type=int, default=25, help='Slowest modules to list')
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 if over the budget')
+    parser.add_argument('--budget', default=str(DEFAULT_BUDGET), help='Budget file (JSON)')
+    args = parser.parse_args()
+
+    budget = load_budget(args.budget)
+    modules, imported = benchmark(args.runs, budget.get('deferred', ()))
+
+    separator(f"Import time, best of {args.runs}")
+    print(f"{'Module':<50} {'Cumulative':>12} {'Budget':>10}")
+    budgets = budget.get('modules_ms', {})
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for name, ms in slowest:
+        limit = budgets.get(name)
+        print(f"{name:<50} {ms:>9.0f} ms {f'{limit} ms' if limit else '':>10}")
+    for name in imported:
+        print(f"\nDeferred module imported at start-up: {name}")
+
+    if args.check:
+        failures = check_budget(modules, imported, budget)
+        separator('Budget')
+        if failures:
+            for failure in failures:
+                print(f"FAIL  {failure}")
+            return 1
+        print("All modules within budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark suite for the analyzer, file parser, exporters and PDF cache
+
+Runs each benchmark on a synthetic corpus of resumes and job descriptions at
+several sizes (word count and number of skill keywords), so results are
+comparable from one commit to the next without depending on real uploads:
+
+    analyze/<size>                 EnhancedATSAnalyzer.analyze
+    analyze/<size>/<stage>         each stage of the analysis (from the
+                                   analyzer's own stage timer)
+    parse/<format>/<size>          FileParser.parse_to_markdown for md, docx
+                                   and pdf uploads (PDF cache off)
+    export/<format>/<size>         FileParser.markdown_to_pdf / markdown_to_docx
+    pdf_cache/<op>/<size>          PDFCache add, hit and miss on a scratch
+                                   SQLite database
+
+For every benchmark the median, p95 and minimum of --runs timed runs (after
+--warmup untimed ones) are reported in milliseconds. --output writes them as
+JSON together with the commit they were measured on; --compare checks a run
+against such a file and exits with status 1 when a benchmark's median got
+slower than allowed by scripts/bench_thresholds.json. Compare runs from the
+same machine: absolute times from different hardware aren't comparable.
+
+Usage:
+    python scripts/bench_suite.py [--filter 'analyze/*'] [--sizes small,medium] [--runs 20]
+                                  [--output results.json] [--compare baseline.json] [--thresholds FILE]
+"""
+
+import io
+import sys
+import json
+import time
+import random
+import fnmatch
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+import docx
+from pathlib import Path
+from datetime import datetime
+from flask import Flask
+from werkzeug.datastructures import FileStorage
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extensions import db
+from db_config import configure_database
+from models import PDFCache
+from services.ats_analyzer import EnhancedATSAnalyzer, SKILLS_TAXONOMY
+from services.file_parser import FileParser
+from services.pdf_extractor import PDFExtractor
+from scripts.create_sample_pdf import render_pdf
+
+# Set up logging
+logging.basicConfig(level=logging.WARNING,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_THRESHOLDS = Path(__file__).resolve().parent / 'bench_thresholds.json'
+
+# Corpus sizes: resume words and skills, job description words and skills
+SIZES = {
+    'small': {'resume_words': 250, 'resume_keywords': 10, 'job_words': 150, 'job_keywords': 8},
+    'medium': {'resume_words': 700, 'resume_keywords': 30, 'job_words': 400, 'job_keywords': 20},
+    'large': {'resume_words': 2000, 'resume_keywords': 80, 'job_words': 1000, 'job_keywords': 50},
+}
+
+SKILLS = sorted({skill for category, skills in SKILLS_TAXONOMY.items() for skill in [category, *skills]})
+
+FILLER = ('led', 'team', 'delivered', 'projects', 'across', 'customers', 'improved', 'reliability', 'with',
+          'stakeholders', 'designed', 'systems', 'for', 'growth', 'reduced', 'costs', 'by', 'built', 'new',
+          'features', 'and', 'owned', 'the', 'roadmap', 'mentored', 'engineers', 'in', 'production')
+
+def separator(title=None):
+    """Print a separator line with optional title"""
+    width = 70
+    if title:
+        print(f"\n{'=' * 5} {title} {'=' * (width - len(title) - 7)}\n")
+    else:
+        print("\n" + "=" * width + "\n")
+
+# Corpus generators
+
+def _sentences(rng, words, keywords):
+    """Filler sentences totalling `words` words with the keywords spread through them"""
+    tokens = [rng.choice(FILLER) for _ in range(max(words - len(keywords), 0))]
+    for keyword in keywords:
+        tokens.insert(rng.randrange(len(tokens) + 1), keyword)
+    sentences = []
+    while tokens:
+        length = rng.randint(8, 16)
+        sentence, tokens = tokens[:length], tokens[length:]
+        sentences.append(' '.join(sentence).capitalize() + '.')
+    return sentences
+
+def generate_resume(words=700, keywords=30, seed=0):
+    """
+    A synthetic resume with uppercase section headings, as real uploads have
+
+    Returns:
+        (text, skills it mentions)
+    """
+    rng = random.Random(seed)
+    skills = rng.sample(SKILLS, min(keywords, len(SKILLS)))
+    listed, spread = skills[:len(skills) // 3], skills[len(skills) // 3:]
+    sentences = _sentences(rng, max(words - len(listed) - 20, 0), spread)
+    summary, sentences = sentences[:2], sentences[2:]
+
+    lines = ['Jordan Example', 'jordan@example.com | 555-010-0000', '', 'SUMMARY', ' '.join(summary), '', 'EXPERIENCE']
+    roles = max(1, len(sentences) // 6)
+    for role in range(roles):
+        lines += ['', f"Senior Engineer, Company {role + 1}, {2020 - 2 * role}-{2022 - 2 * role}"]
+        lines += [f"- {sentence}" for sentence in sentences[role::roles]]
+    lines += ['', 'EDUCATION', 'BSc Computer Science, Example University, 2012', '',
+              'SKILLS', ', '.join(listed)]
+    return '\n'.join(lines), skills
+
+def generate_job_description(words=400, keywords=20, seed=0):
+    """
+    A synthetic job description with responsibilities and a requirements list
+
+    Returns:
+        (text, skills it asks for)
+    """
+    rng = random.Random(seed + 1)
+    skills = rng.sample(SKILLS, min(keywords, len(SKILLS)))
+    required, spread = skills[:len(skills) // 2], skills[len(skills) // 2:]
+    sentences = _sentences(rng, max(words - len(required) * 4, 0), spread)
+    lines = ['Senior Software Engineer', '', 'About the role', *sentences[:2], '', 'Responsibilities']
+    lines += [f"- {sentence}" for sentence in sentences[2:]]
+    lines += ['', 'Requirements']
+    lines += [f"- {rng.randint(2, 8)}+ years of experience with {skill}" for skill in required]
+    return '\n'.join(lines), skills
+
+def to_markdown(text):
+    """Resume text with its uppercase headings as markdown headings"""
+    return '\n'.join(f"## {line.title()}" if line.isupper() and len(line) > 3 else line
+                     for line in text.split('\n'))
+
+def to_pdf(text):
+    """Resume text rendered as a PDF, via scripts/create_sample_pdf.py"""
+    buffer = io.BytesIO()
+    render_pdf(text, buffer)
+    return buffer.getvalue()
+
+def to_docx(text):
+    """Resume text as a DOCX with Heading 2 section titles"""
+    document = docx.Document()
+    for line in text.split('\n'):
+        if line.isupper() and len(line) > 3:
+            document.add_heading(line.title(), level=2)
+        elif line:
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def build_corpus(sizes, seed=0):
+    """Resume and job description text plus upload bytes for each size"""
+    corpus = {}
+    for size in sizes:
+        spec = SIZES[size]
+        resume, _ = generate_resume(spec['resume_words'], spec['resume_keywords'], seed)
+        job, _ = generate_job_description(spec['job_words'], spec['job_keywords'], seed)
+        corpus[size] = {
+            'resume': resume,
+            'job': job,
+            'markdown': to_markdown(resume),
+            'uploads': {'md': to_markdown(resume).encode('utf-8'), 'docx': to_docx(resume), 'pdf': to_pdf(resume)},
+        }
+    return corpus
+
+# Timing
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def summarize(samples):
+    """Milliseconds statistics for a list of durations in seconds"""
+    return {
+        'runs': len(samples),
+        'median_ms': round(percentile(samples, 50) * 1000, 4),
+        'p95_ms': round(percentile(samples, 95) * 1000, 4),
+        'min_ms': round(min(samples) * 1000, 4),
+    }
+
+def measure(fn, runs, warmup=1, setup=None):
+    """Durations in seconds of `runs` calls to fn(), after `warmup` untimed ones; setup() runs untimed before each"""
+    samples = []
+    for i in range(warmup + runs):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            samples.append(elapsed)
+    return samples
+
+# Benchmarks
+
+def bench_analyzer(corpus, runs, warmup):
+    analyzer = EnhancedATSAnalyzer()
+    results = {}
+    for size, docs in corpus.items():
+        stages = {}
+
+        def analyze():
+            timings = analyzer.analyze(docs['resume'], docs['job'], debug=True).get('timings', {})
+            for stage, ms in timings.get('stages_ms', {}).items():
+                stages.setdefault(stage, []).append(ms / 1000)
+
+        samples = measure(analyze, runs, warmup)
+        results[f"analyze/{size}"] = summarize(samples)
+        for stage, stage_samples in stages.items():
+            results[f"analyze/{size}/{stage}"] = summarize(stage_samples[warmup:])
+    return results
+
+def bench_parser(corpus, runs, warmup):
+    parser = FileParser()
+    # Measure extraction itself; the cache has its own benchmarks
+    parser.pdf_extractor = PDFExtractor(use_cache=False)
+    results = {}
+    for size, docs in corpus.items():
+        for file_format, data in docs['uploads'].items():
+            def parse():
+                parser.parse_to_markdown(FileStorage(io.BytesIO(data), filename=f"resume.{file_format}"))
+            results[f"parse/{file_format}/{size}"] = summarize(measure(parse, runs, warmup))
+    return results
+
+def bench_exporters(corpus, runs, warmup):
+    results = {}
+    for size, docs in corpus.items():
+        markdown = docs['markdown']
+        results[f"export/pdf/{size}"] = summarize(measure(lambda: FileParser.markdown_to_pdf(markdown), runs, warmup))
+        results[f"export/docx/{size}"] = summarize(measure(lambda: FileParser.markdown_to_docx(markdown), runs, warmup))
+    return results
+
+def create_app(database_uri):
+    """Create a minimal Flask app bound to a scratch database"""
+    app = Flask(__name__)
+    configure_database(app, database_uri)
+    db.init_app(app)
+    return app
+
+def bench_pdf_cache(corpus, runs, warmup):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='bench-suite-') as work_dir:
+        app = create_app(f"sqlite:///{work_dir}/bench.db")
+        with app.app_context():
+            db.create_all()
+            for size, docs in corpus.items():
+                pdf_bytes = docs['uploads']['pdf']
+                text = docs['resume']
+                sections = {'summary': text[:200], 'skills': text[-200:]}
+
+                def clear():
+                    PDFCache.query.delete()
+                    db.session.commit()
+
+                def add():
+                    PDFCache.add_to_cache(pdf_bytes, text, 1, section_map=sections, extraction_mode='layout')
+
+                results[f"pdf_cache/add/{size}"] = summarize(measure(add, runs, warmup, setup=clear))
+                results[f"pdf_cache/hit/{size}"] = summarize(
+                    measure(lambda: PDFCache.get_extraction_from_cache(pdf_bytes, 'layout'), runs, warmup))
+                results[f"pdf_cache/miss/{size}"] = summarize(
+                    measure(lambda: PDFCache.get_extraction_from_cache(pdf_bytes + b' ', 'layout'), runs, warmup))
+                clear()
+    return results
+
+BENCHMARKS = {
+    'analyze': bench_analyzer,
+    'parse': bench_parser,
+    'export': bench_exporters,
+    'pdf_cache': bench_pdf_cache,
+}
+
+def run_suite(sizes=('small', 'medium', 'large'), runs=20, warmup=1, pattern='*', seed=0):
+    """
+    Run every benchmark group with a name matching `pattern` (fnmatch)
+
+    Returns:
+        Dict of benchmark name -> statistics, only for names matching pattern
+    """
+    corpus = build_corpus(sizes, seed)
+    results = {}
+    for group, bench in BENCHMARKS.items():
+        # Skip groups none of whose benchmarks can match
+        if not fnmatch.fnmatch(group, pattern.split('/')[0]):
+            continue
+        results.update({name: stats for name, stats in bench(corpus, runs, warmup).items()
+                        if fnmatch.fnmatch(name, pattern)})
+    return results
+
+# Storing and comparing results
+
+def current_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+def results_document(results, args=None):
+    return {
+        'commit': current_commit(),
+        'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'settings': {key: value for key, value in vars(args).items() if key in ('runs', 'warmup', 'sizes', 'seed')}
+        if args else {},
+        'benchmarks': results,
+    }
+
+def load_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+def threshold_for(name, thresholds):
+    """Allowed relative slowdown for a benchmark: the most specific matching pattern wins"""
+    matches = [(len(pattern), limit) for pattern, limit in thresholds.get('benchmarks', {}).items()
+               if fnmatch.fnmatch(name, pattern)]
+    return max(matches)[1] if matches else thresholds.get('default', 0.25)
+
+def compare(results, baseline, thresholds):
+    """
+    Compare medians against a baseline run
+
+    A benchmark regresses when its median is slower than the baseline's by
+    more than its threshold and by more than min_delta_ms (so sub-millisecond
+    noise doesn't fail a run).
+
+    Returns:
+        (rows of (name, baseline ms, current ms, relative change, regressed), regressions)
+    """
+    min_delta = thresholds.get('min_delta_ms', 0.05)
+    rows, regressions = [], []
+    for name, stats in sorted(results.items()):
+        before = baseline.get('benchmarks', {}).get(name)
+        if not before:
+            continue
+        old, new = before['median_ms'], stats['median_ms']
+        change = (new - old) / old if old else 0.0
+        regressed = change > threshold_for(name, thresholds) and new - old > min_delta
+        rows.append((name, old, new, change, regressed))
+        if regressed:
+            regressions.append(name)
+    return rows, regressions
+
+def print_results(results):
+    print(f"{'Benchmark':<48} {'Median':>10} {'p95':>10} {'Min':>10}")
+    for name, stats in results.items():
+        print(f"{name:<48} {stats['median_ms']:>7.3f} ms {stats['p95_ms']:>7.3f} ms {stats['min_ms']:>7.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for the analyzer, parser, exporters and PDF cache')
+    parser.add_argument('--filter', default='*', help="Benchmarks to run (fnmatch pattern, e.g. 'parse/pdf/*')")
+    parser.add_argument('--sizes', default='small,medium,large', help='Corpus sizes to run')
+    parser.add_argument('--runs', type=int, default=20, help='Timed runs per benchmark')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs before timing')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--compare', help='Results file to compare against')
+    parser.add_argument('--thresholds', default=str(DEFAULT_THRESHOLDS), help='Regression thresholds (JSON)')
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"Unknown sizes: {', '.join(unknown)} (choose from {', '.join(SIZES)})")
+
+    results = run_suite(sizes, args.runs, args.warmup, args.filter, args.seed)
+    separator(f"Benchmarks, {args.runs} runs each")
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results_document(results, args), f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        baseline = load_json(args.compare)
+        rows, regressions = compare(results, baseline, load_json(args.thresholds))
+        separator(f"Compared with {baseline.get('commit') or args.compare}")
+        print(f"{'Benchmark':<48} {'Before':>10} {'After':>10} {'Change':>8}")
+        for name, old, new, change, regressed in rows:
+            print(f"{name:<48} {old:>7.3f} ms {new:>7.3f} ms {change:>+7.0%}{'  REGRESSION' if regressed else ''}")
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than their threshold")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
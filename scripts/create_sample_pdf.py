@@ -7,15 +7,16 @@ from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 
-def create_sample_pdf(input_text_path, output_pdf_path):
-    """Create a PDF file from a text file"""
-    # Read the text file
-    with open(input_text_path, "r") as f:
-        content = f.read()
-    
+def render_pdf(content, output):
+    """
+    Render resume-style text to a PDF
+
+    Uppercase lines become section headings and blank lines become spacing.
+    `output` is a file path or a writable binary file object.
+    """
     # Create a PDF document
     doc = SimpleDocTemplate(
-        output_pdf_path,
+        output,
         pagesize=letter,
         rightMargin=72,
         leftMargin=72,
@@ -43,6 +44,14 @@ def create_sample_pdf(input_text_path, output_pdf_path):
     
     # Build the PDF
     doc.build(flowables)
+
+def create_sample_pdf(input_text_path, output_pdf_path):
+    """Create a PDF file from a text file"""
+    # Read the text file
+    with open(input_text_path, "r") as f:
+        content = f.read()
+    
+    render_pdf(content, output_pdf_path)
     print(f"Created PDF file: {output_pdf_path}")
 
 if __name__ == "__main__":
@@ -5,6 +5,12 @@ Database migration utility for ResumeRocket
 This script provides utilities for database migrations that are more complex than
 simply creating new tables. Use this when you need to add columns, modify data,
 or perform other database schema changes that SQLAlchemy's create_all() can't handle.
+
+Data changes (copy-column, and the data steps of migrations applied with
+`apply`) run through ChunkedMigration: rows are processed --batch-size at a
+time with a commit per batch, progress is checkpointed to --checkpoint so an
+interrupted run resumes, and --dry-run reports what would change without
+writing anything.
 """
 
 import os
@@ -12,14 +18,19 @@ import sys
 import logging
 import argparse
 import sqlite3
+import inspect
 import importlib.util
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 
 # Add the parent directory to path so we can import app
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app import app, db
+from chunked_migration import ChunkedMigration, DEFAULT_BATCH_SIZE
+
+DEFAULT_CHECKPOINT = os.path.join('instance', 'db_migration_checkpoint.json')
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -36,12 +47,17 @@ def get_db_path():
     # Strip sqlite:/// prefix to get the file path
     return db_uri.replace('sqlite:///', '')
 
-def execute_sql(sql_statements, params=None):
+def execute_sql(sql_statements, params=None, dry_run=False):
     """Execute raw SQL statements on the database"""
     db_path = get_db_path()
     if not db_path:
         return False
     
+    if dry_run:
+        for stmt in (sql_statements if isinstance(sql_statements, list) else [sql_statements]):
+            logger.info(f"Dry run, not executing: {stmt}")
+        return True
+    
     logger.info(f"Executing SQL on database: {db_path}")
     
     try:
@@ -73,7 +89,7 @@ def execute_sql(sql_statements, params=None):
         if 'conn' in locals():
             conn.close()
 
-def add_column(table_name, column_name, column_type):
+def add_column(table_name, column_name, column_type, dry_run=False):
     """Add a column to an existing table if it doesn't exist"""
     logger.info(f"Adding column {column_name} ({column_type}) to table {table_name}")
     
@@ -96,7 +112,7 @@ def add_column(table_name, column_name, column_type):
         
         # Add the column
         add_sql = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"
-        return execute_sql(add_sql)
+        return execute_sql(add_sql, dry_run=dry_run)
     except Exception as e:
         logger.error(f"Error checking or adding column: {str(e)}")
         return False
@@ -104,20 +120,40 @@ def add_column(table_name, column_name, column_type):
         if 'conn' in locals():
             conn.close()
 
-def copy_column_values(table_name, source_column, target_column):
-    """Copy values from one column to another where target is NULL"""
+def copy_column_values(table_name, source_column, target_column, batch_size=DEFAULT_BATCH_SIZE,
+                       checkpoint_path=None, dry_run=False):
+    """Copy values from one column to another where target is NULL, one batch of rows at a time"""
     logger.info(f"Copying values from {source_column} to {target_column} in table {table_name}")
     
-    update_sql = f"""
+    # Each batch is updated by primary key range, so values never pass through Python
+    update_range = f"""
     UPDATE {table_name}
     SET {target_column} = {source_column}
-    WHERE {target_column} IS NULL
+    WHERE id BETWEEN :first_id AND :last_id AND {target_column} IS NULL
     """
     
-    return execute_sql(update_sql)
+    def copy_batch(rows):
+        return [(update_range, {'first_id': rows[0][0], 'last_id': rows[-1][0]})]
+    
+    try:
+        with app.app_context(), db.engine.connect() as connection:
+            ChunkedMigration(
+                f"copy {table_name}.{source_column} to {target_column}", table_name, [],
+                where=f"{target_column} IS NULL", batch_size=batch_size, checkpoint_path=checkpoint_path,
+                dry_run=dry_run, commit_each_batch=True, logger=logger
+            ).run(connection, copy_batch)
+        return True
+    except Exception as e:
+        logger.error(f"Error copying column values: {str(e)}")
+        return False
 
-def apply_migration(migration_name=None):
-    """Apply a specific migration from the migrations/versions directory"""
+def apply_migration(migration_name=None, batch_size=DEFAULT_BATCH_SIZE, checkpoint_path=None, dry_run=False):
+    """
+    Apply a specific migration from the migrations/versions directory
+    
+    batch_size, checkpoint_path and dry_run apply to the migration's data
+    steps; with dry_run, SQL statements are logged instead of executed.
+    """
     if not migration_name:
         logger.error("No migration name specified")
         return False
@@ -146,18 +182,23 @@ def apply_migration(migration_name=None):
         # Apply migration using direct sqlite operations instead of alembic
         # This is necessary because we're not using alembic's context manager
         with app.app_context():
+            chunk_options = {'batch_size': batch_size, 'checkpoint_path': checkpoint_path, 'dry_run': dry_run}
             if hasattr(module, 'custom_upgrade'):
                 # Custom upgrade function that takes our utility functions
-                module.custom_upgrade(
-                    execute_sql=execute_sql,
-                    add_column=add_column,
-                    copy_column_values=copy_column_values
-                )
+                kwargs = {
+                    'execute_sql': partial(execute_sql, dry_run=dry_run),
+                    'add_column': partial(add_column, dry_run=dry_run),
+                    'copy_column_values': partial(copy_column_values, **chunk_options)
+                }
+                # Migrations with chunked data steps also take the chunking options
+                if 'chunk_options' in inspect.signature(module.custom_upgrade).parameters:
+                    kwargs['chunk_options'] = chunk_options
+                module.custom_upgrade(**kwargs)
             else:
                 # Execute SQL statements defined in the migration, if any
                 if hasattr(module, 'sql_statements'):
                     for stmt in module.sql_statements:
-                        execute_sql(stmt)
+                        execute_sql(stmt, dry_run=dry_run)
         
         logger.info(f"Migration {migration_name} applied successfully")
         return True
@@ -198,6 +239,13 @@ def parse_args():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Database migration utility for ResumeRocket')
     
+    # Options for chunked data changes
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per batch for data changes')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT,
+                        help='Progress file used to resume interrupted data changes')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Report what would change without writing (schema statements are only logged)')
+    
     # Add commands
     subparsers = parser.add_subparsers(dest='command', help='Command to execute')
     
@@ -207,6 +255,12 @@ def parse_args():
     add_column_parser.add_argument('column', help='Column name')
     add_column_parser.add_argument('type', help='Column type (e.g., TEXT, INTEGER, FLOAT)')
     
+    # copy-column command
+    copy_column_parser = subparsers.add_parser('copy-column', help='Copy a column into another where it is NULL')
+    copy_column_parser.add_argument('table', help='Table name')
+    copy_column_parser.add_argument('source', help='Column to copy from')
+    copy_column_parser.add_argument('target', help='Column to copy into')
+    
     # apply command
     apply_parser = subparsers.add_parser('apply', help='Apply a specific migration')
     apply_parser.add_argument('migration', help='Migration name (without .py extension)')
@@ -224,14 +278,18 @@ def main():
     """Main entry point"""
     args = parse_args()
     
+    chunk_options = {'batch_size': args.batch_size, 'checkpoint_path': args.checkpoint, 'dry_run': args.dry_run}
+    
     if args.command == 'add-column':
-        success = add_column(args.table, args.column, args.type)
+        success = add_column(args.table, args.column, args.type, dry_run=args.dry_run)
+    elif args.command == 'copy-column':
+        success = copy_column_values(args.table, args.source, args.target, **chunk_options)
     elif args.command == 'apply':
-        success = apply_migration(args.migration)
+        success = apply_migration(args.migration, **chunk_options)
     elif args.command == 'backup':
         success = create_backup()
     elif args.command == 'execute-sql':
-        success = execute_sql(args.sql)
+        success = execute_sql(args.sql, dry_run=args.dry_run)
     else:
         logger.error("No command specified. Use -h for help.")
         return 1
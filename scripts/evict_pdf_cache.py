@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Out-of-band eviction for the PDF extraction cache
+
+Keeps the pdf_cache table under a total-bytes budget by evicting the entries
+with the lowest LFU/LRU hybrid score (hit count decayed by days since last
+access), optionally dropping entries that haven't been used for a while first.
+Deletes run as set-based statements in chunks; no ORM objects are loaded.
+
+This replaces the hourly cleanup that used to run inside PDF extraction
+requests. scripts/maintenance.py runs it in the background after each boot;
+run it from cron or by hand as well if needed.
+
+Usage:
+    python scripts/evict_pdf_cache.py [--max-bytes N] [--max-age-days N] [--batch-size N] [--database URI]
+    
+The budget defaults to the PDF_CACHE_MAX_BYTES environment variable (64 MB if unset).
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+from flask import Flask
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extensions import db
+from db_config import configure_database
+from models import PDFCache
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, 
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+def create_app(database_uri):
+    """Create a minimal Flask app bound to the application database"""
+    app = Flask(__name__)
+    configure_database(app, database_uri)
+    db.init_app(app)
+    return app
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Evict PDF cache entries to stay within a byte budget')
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help='Total payload bytes the cache may hold')
+    parser.add_argument('--max-age-days', type=int, default=None,
+                        help='Also drop entries not accessed for this many days')
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help='Rows removed per DELETE statement')
+    parser.add_argument('--database', default=None,
+                        help='Database URI (defaults to DATABASE_URL, like the application)')
+    return parser.parse_args()
+
+def evict_pdf_cache(max_bytes=DEFAULT_MAX_BYTES, max_age_days=None, batch_size=500):
+    """
+    Trim the PDF cache to max_bytes (inside an app context)
+    
+    Returns:
+        Result of PDFCache.evict_to_budget
+    """
+    start_time = time.time()
+    before_bytes = PDFCache.total_bytes()
+    logger.info(f"PDF cache holds {before_bytes / 1024:.1f} KB (budget {max_bytes / 1024:.1f} KB)")
+    
+    if max_age_days is not None:
+        expired = PDFCache.clean_old_entries(max_age_days=max_age_days, keep_min=0, batch_size=batch_size)
+        logger.info(f"Removed {expired} entries not accessed in {max_age_days} days")
+    
+    result = PDFCache.evict_to_budget(max_bytes, batch_size=batch_size)
+    elapsed = time.time() - start_time
+    
+    logger.info(f"Evicted {result['deleted_count']} entries, reclaimed "
+                f"{(before_bytes - result['total_bytes']) / 1024:.1f} KB in {elapsed:.2f}s; "
+                f"cache now holds {result['total_bytes'] / 1024:.1f} KB")
+    return result
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+    app = create_app(args.database)
+    
+    with app.app_context():
+        evict_pdf_cache(args.max_bytes, max_age_days=args.max_age_days, batch_size=args.batch_size)
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Export customization analytics as JSONL or CSV
+
+Streams customized_resume outcomes, customization evaluations or A/B test
+results to a file (or stdout) with a server-side cursor, so memory use stays
+constant however many rows are exported.
+
+Usage:
+    python scripts/export_analytics.py customizations [--format jsonl|csv] [--columns a,b,c]
+        [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--output PATH] [--batch-size N] [--database URI]
+    python scripts/export_analytics.py customizations --list-columns
+
+Datasets: customizations, evaluations, ab_tests. --end is exclusive.
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+from flask import Flask
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extensions import db
+from db_config import configure_database
+from services.analytics_export import BATCH_SIZE, DATASETS, FORMATS, ExportError, stream_export, parse_date
+
+# Set up logging (stderr, so exports can go to stdout)
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def create_app(database_uri):
+    """Create a minimal Flask app bound to the application database"""
+    app = Flask(__name__)
+    configure_database(app, database_uri)
+    db.init_app(app)
+    return app
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Stream customization analytics as JSONL or CSV')
+    parser.add_argument('dataset', choices=sorted(DATASETS), help='Data to export')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='jsonl', help='Output format (default: jsonl)')
+    parser.add_argument('--columns', default=None, help='Comma-separated columns (default: the dataset\'s standard set)')
+    parser.add_argument('--list-columns', action='store_true', help='List the exportable columns and exit')
+    parser.add_argument('--start', default=None, help='Only rows on or after this date')
+    parser.add_argument('--end', default=None, help='Only rows before this date')
+    parser.add_argument('--output', default='-', help='Output file (default: stdout)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows fetched per round trip')
+    parser.add_argument('--database', default=None,
+                        help='Database URI (defaults to DATABASE_URL, like the application)')
+    return parser.parse_args()
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+
+    if args.list_columns:
+        print('\n'.join(DATASETS[args.dataset].columns))
+        return 0
+
+    columns = [name.strip() for name in args.columns.split(',') if name.strip()] if args.columns else None
+    app = create_app(args.database)
+
+    with app.app_context():
+        try:
+            chunks = stream_export(args.dataset, args.format, columns=columns,
+                                   start=parse_date(args.start), end=parse_date(args.end),
+                                   batch_size=args.batch_size)
+        except ExportError as e:
+            logger.error(str(e))
+            return 2
+
+        output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+        lines = 0
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+                lines += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+    logger.info(f"Exported {lines} lines of {args.dataset}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
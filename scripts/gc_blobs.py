@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Blob store garbage collection
+
+Deletes uploads and rendered exports nothing references any more, plus
+stray files on disk without a StoredBlob row. Export cache entries rendered
+with an older EXPORT_TEMPLATE_VERSION or for content no resume has any more
+are purged first, and the least recently downloaded exports are evicted
+until the cache fits in --export-max-bytes (EXPORT_CACHE_MAX_BYTES, 64 MB if
+unset). With --reconcile, reference counts are first
+recomputed from customized_resume.blob_hash in case they have drifted. Resume text in
+resume_content that no resume references any more is removed as well.
+Meant to run outside the request path; scripts/maintenance.py runs it in
+the background after each boot.
+
+Usage:
+    python scripts/gc_blobs.py [--reconcile] [--root DIR] [--export-max-bytes N]
+"""
+
+import os
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+logging.basicConfig(level=logging.INFO, 
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_MAX_BYTES = int(os.environ.get('EXPORT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+def collect_blobs(root=None, export_max_bytes=DEFAULT_EXPORT_MAX_BYTES, reconcile=False):
+    """Trim the export cache and delete unreferenced blobs and resume texts (inside an app context)"""
+    from models import ExportCache, ResumeContent
+    from services.blob_store import BlobStore
+    from services.export_service import EXPORT_TEMPLATE_VERSION
+    
+    store = BlobStore(root=root)
+    purged = ExportCache.purge_stale(EXPORT_TEMPLATE_VERSION)
+    logger.info(f"Purged {purged} stale export cache entries")
+    purged = ExportCache.purge_unreferenced()
+    logger.info(f"Purged {purged} export cache entries no resume uses")
+    result = ExportCache.evict_to_budget(export_max_bytes)
+    logger.info(f"Evicted {result['deleted_count']} export cache entries ({result['reclaimed_bytes']} bytes), "
+                f"{result['total_bytes']} bytes remain")
+    if reconcile:
+        changed = store.reconcile()
+        logger.info(f"Reconciled reference counts for {changed} blobs")
+    result = store.collect_garbage()
+    logger.info(f"Removed {result['deleted_count']} blobs, reclaimed {result['reclaimed_bytes']} bytes")
+    result = ResumeContent.collect_orphans()
+    logger.info(f"Removed {result['deleted_count']} unreferenced resume texts ({result['reclaimed_bytes']} bytes)")
+
+def main():
+    """Main garbage collection function"""
+    parser = argparse.ArgumentParser(description='Remove unreferenced blobs from the blob store')
+    parser.add_argument('--reconcile', action='store_true', help='Recompute reference counts first')
+    parser.add_argument('--root', help='Blob store directory (default: app BLOB_STORE_DIR / instance/blobs)')
+    parser.add_argument('--export-max-bytes', type=int, default=DEFAULT_EXPORT_MAX_BYTES,
+                        help=f'Byte budget for rendered exports (default: {DEFAULT_EXPORT_MAX_BYTES})')
+    
+    args = parser.parse_args()
+    
+    from app import app
+    
+    with app.app_context():
+        collect_blobs(root=args.root, export_max_bytes=args.export_max_bytes, reconcile=args.reconcile)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Load test: scripted user journeys against the app, with stubbed upstreams
+
+Each virtual user registers, logs in, then repeats the journey a real user
+takes through the product until the run ends:
+
+    analyze     upload test_data/sample_resume.pdf with a job URL
+                (POST /api/analyze_resume; fetches the job via the Reader and
+                calls the LLM for suggestions)
+    customize   POST /customize-resume as htmx does (LLM plan + resume)
+    compare     GET /compare/<id>
+    download    GET /download/<id>/pdf
+
+The Anthropic and Jina APIs are replaced by scripts/stub_servers.py, so the
+run measures the app (and how its workers cope with slow upstream calls)
+rather than the providers. Their latency and token distributions are set
+with the same options as the stub script.
+
+For every --config (worker class:workers[:threads or connections], e.g.
+sync:2, gthread:2:8, gevent:2:100) a gunicorn server is started on a fresh
+database, loaded for --duration seconds, and stopped. The report lists
+throughput, p50/p95/p99 latency and error rate per step, and ends with a
+table comparing the configurations. gunicorn (and gevent, for the gevent
+class) must be installed; use --target to load a server that is already
+running instead.
+
+Usage:
+    python scripts/load_test.py [--config sync:2 --config gthread:2:8 --config gevent:2:100]
+                                [--users 10] [--duration 60] [--think-time 1.0] [--json FILE]
+    python scripts/load_test.py --target http://127.0.0.1:5000 [--users 10]
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import socket
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from collections import defaultdict
+
+import requests
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.stub_servers import StubServers, add_stub_arguments, settings_from_args
+
+# Set up logging
+logging.basicConfig(level=logging.WARNING,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+SAMPLE_RESUME = PROJECT_ROOT / 'test_data' / 'sample_resume.pdf'
+
+JOURNEY_STEPS = ('register', 'login', 'analyze', 'customize', 'compare', 'download')
+
+CSRF_PATTERNS = (
+    re.compile(r'name="csrf-token" content="([^"]+)"'),
+    re.compile(r'name="csrf_token"[^>]*value="([^"]+)"'),
+)
+
+def separator(title=None):
+    """Print a separator line with optional title"""
+    width = 70
+    if title:
+        print(f"\n{'=' * 5} {title} {'=' * (width - len(title) - 7)}\n")
+    else:
+        print("\n" + "=" * width + "\n")
+
+def find_csrf_token(html):
+    for pattern in CSRF_PATTERNS:
+        match = pattern.search(html)
+        if match:
+            return match.group(1)
+    return None
+
+def find_hidden(html, name):
+    """Value of the hidden input `name` in an HTML fragment"""
+    match = re.search(rf'name="{name}"[^>]*value="([^"]*)"', html)
+    return match.group(1) if match else None
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class JourneyError(Exception):
+    """A journey step returned something other than what a user would see"""
+
+
+class Results:
+    """Latency samples and errors per journey step, shared by the virtual users"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_examples = {}
+        self.journeys = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, step, seconds, error=None):
+        with self._lock:
+            self.samples[step].append(seconds)
+            if error:
+                self.errors[step] += 1
+                self.error_examples.setdefault(step, error)
+
+    def journey_done(self):
+        with self._lock:
+            self.journeys += 1
+
+    def summary(self):
+        """Per-step statistics plus totals, as plain data"""
+        elapsed = self.elapsed or 1e-9
+        steps = {}
+        for step in JOURNEY_STEPS:
+            samples = self.samples.get(step)
+            if not samples:
+                continue
+            steps[step] = {
+                'count': len(samples),
+                'errors': self.errors[step],
+                'error_rate': self.errors[step] / len(samples),
+                'throughput': len(samples) / elapsed,
+                'p50_ms': percentile(samples, 50) * 1000,
+                'p95_ms': percentile(samples, 95) * 1000,
+                'p99_ms': percentile(samples, 99) * 1000,
+            }
+        requests_total = sum(len(samples) for samples in self.samples.values())
+        errors_total = sum(self.errors.values())
+        return {
+            'elapsed_s': self.elapsed,
+            'journeys': self.journeys,
+            'journeys_per_s': self.journeys / elapsed,
+            'requests': requests_total,
+            'requests_per_s': requests_total / elapsed,
+            'error_rate': errors_total / requests_total if requests_total else 0.0,
+            'steps': steps,
+            'error_examples': dict(self.error_examples),
+        }
+
+
+class VirtualUser:
+    """One user with their own session (cookies, CSRF token) walking the journey"""
+
+    def __init__(self, base_url, results, job_url, timeout=120):
+        self.base_url = base_url.rstrip('/')
+        self.results = results
+        self.job_url = job_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.csrf_token = None
+        suffix = uuid.uuid4().hex[:10]
+        self.username = f"load_{suffix}"
+        self.email = f"load_{suffix}@example.com"
+        self.password = 'load-test-password'
+
+    def _request(self, method, path, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, f"{self.base_url}{path}", **kwargs)
+
+    def _step(self, step, action):
+        """Run and time one step; returns the action's (truthy) result, or None if it failed"""
+        start = time.perf_counter()
+        try:
+            result = action()
+        except (JourneyError, requests.RequestException) as e:
+            self.results.record(step, time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+            return None
+        self.results.record(step, time.perf_counter() - start)
+        return result
+
+    def _form(self, path, data):
+        """GET a form page for its CSRF token, then POST the form"""
+        page = self._request('GET', path)
+        self.csrf_token = find_csrf_token(page.text) or self.csrf_token
+        response = self._request('POST', path, data={**data, 'csrf_token': self.csrf_token})
+        if response.status_code >= 400:
+            raise JourneyError(f"POST {path} returned {response.status_code}")
+        return response
+
+    def register(self):
+        response = self._form('/auth/register', {'username': self.username, 'email': self.email,
+                                                  'password': self.password})
+        if '/auth/login' not in response.url:
+            raise JourneyError('registration did not redirect to login')
+        return True
+
+    def login(self):
+        response = self._form('/auth/login', {'email': self.email, 'password': self.password})
+        if '/auth/login' in response.url:
+            raise JourneyError('login was rejected')
+        self.csrf_token = find_csrf_token(response.text) or self.csrf_token
+        return True
+
+    def analyze(self):
+        with open(SAMPLE_RESUME, 'rb') as f:
+            response = self._request('POST', '/api/analyze_resume',
+                                     data={'job_url': self.job_url},
+                                     files={'resume_file': (SAMPLE_RESUME.name, f, 'application/pdf')},
+                                     headers={'X-CSRFToken': self.csrf_token, 'HX-Request': 'true'})
+        if response.status_code != 200:
+            raise JourneyError(f"analyze returned {response.status_code}")
+        resume_id, job_id = find_hidden(response.text, 'resume_id'), find_hidden(response.text, 'job_id')
+        if not resume_id or not job_id:
+            raise JourneyError('analysis results had no resume or job id')
+        return resume_id, job_id
+
+    def customize(self, resume_id, job_id):
+        response = self._request('POST', '/customize-resume',
+                                 data={'resume_id': resume_id, 'job_id': job_id, 'csrf_token': self.csrf_token},
+                                 headers={'HX-Request': 'true'})
+        location = response.headers.get('HX-Redirect', '')
+        match = re.search(r'/compare/(\d+)', location)
+        if response.status_code != 200 or not match:
+            raise JourneyError(f"customize returned {response.status_code} without a compare redirect")
+        return match.group(1)
+
+    def compare(self, customized_id):
+        response = self._request('GET', f"/compare/{customized_id}", allow_redirects=False)
+        if response.status_code != 200:
+            raise JourneyError(f"compare returned {response.status_code}")
+        return True
+
+    def download(self, customized_id):
+        response = self._request('GET', f"/download/{customized_id}/pdf", allow_redirects=False)
+        if response.status_code != 200 or not response.content.startswith(b'%PDF'):
+            raise JourneyError(f"download returned {response.status_code} {response.headers.get('Content-Type')}")
+        return True
+
+    def sign_up(self):
+        """Register and log in; False if either failed"""
+        return self._step('register', self.register) is not None and self._step('login', self.login) is not None
+
+    def journey(self):
+        """One pass through analyze, customize, compare and download"""
+        ids = self._step('analyze', self.analyze)
+        if ids is None:
+            return False
+        customized_id = self._step('customize', lambda: self.customize(*ids))
+        if customized_id is None:
+            return False
+        self._step('compare', lambda: self.compare(customized_id))
+        self._step('download', lambda: self.download(customized_id))
+        self.results.journey_done()
+        return True
+
+
+def run_users(base_url, users, duration, think_time, job_url='https://jobs.example.com/senior-python-engineer',
+              ramp_up=1.0):
+    """
+    Run `users` virtual users against base_url for `duration` seconds
+
+    Each user is a closed loop: it starts its next journey after the last one
+    finishes plus an exponentially distributed think time (mean `think_time`).
+
+    Returns:
+        Results
+    """
+    results = Results()
+    deadline = time.monotonic() + duration
+
+    def user_loop(index):
+        time.sleep(ramp_up * index / max(users, 1))
+        user = VirtualUser(base_url, results, job_url)
+        if not user.sign_up():
+            return
+        rng = random.Random(index)
+        while time.monotonic() < deadline:
+            user.journey()
+            if think_time:
+                time.sleep(min(rng.expovariate(1 / think_time), max(deadline - time.monotonic(), 0)))
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=user_loop, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.elapsed = time.monotonic() - start
+    return results
+
+def parse_config(spec):
+    """
+    Parse 'class:workers[:threads]' into gunicorn arguments
+
+    The third field is --threads for gthread and --worker-connections for
+    gevent/eventlet; sync workers take none.
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    parts = spec.split(':')
+    if len(parts) not in (2, 3) or not parts[1].isdigit() or (len(parts) == 3 and not parts[2].isdigit()):
+        raise ValueError(f"Invalid worker config '{spec}' (expected class:workers[:threads])")
+    worker_class, workers = parts[0], int(parts[1])
+    args = ['--worker-class', worker_class, '--workers', str(workers)]
+    if len(parts) == 3:
+        if worker_class == 'gthread':
+            args += ['--threads', parts[2]]
+        elif worker_class in ('gevent', 'eventlet'):
+            args += ['--worker-connections', parts[2]]
+        else:
+            raise ValueError(f"Worker class '{worker_class}' takes no third field")
+    return args
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_until_ready(base_url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        try:
+            requests.get(f"{base_url}/healthz", timeout=2)
+            return
+        except requests.RequestException:
+            time.sleep(0.25)
+    raise RuntimeError(f"Server did not answer within {timeout}s")
+
+def run_config(spec, stubs, args):
+    """Start gunicorn with the given worker config on a fresh database, load it, stop it"""
+    with tempfile.TemporaryDirectory(prefix='load-test-') as work_dir:
+        port = free_port()
+        env = dict(os.environ)
+        env.update(stubs.environment())
+        env.update({
+            'JINA_API_KEY': env.get('JINA_API_KEY', 'load-test'),
+            'ANTHROPIC_API_KEY': env.get('ANTHROPIC_API_KEY', 'load-test'),
+            'SECRET_KEY': 'load-test',
+            'DATABASE_URL': f"sqlite:///{work_dir}/load.db",
+            'METRICS_DIR': os.path.join(work_dir, 'metrics'),
+            'PROFILE_DIR': os.path.join(work_dir, 'profiles'),
+            # Measure the workers, not the LLM rate limits; set RATE_LIMIT_ENABLED=true to load the limiter too
+            'RATE_LIMIT_ENABLED': env.get('RATE_LIMIT_ENABLED', 'false'),
+        })
+        # Create the schema once, as start.sh does, so workers don't race to create it
+        subprocess.run([sys.executable, 'migrate.py'], cwd=PROJECT_ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        env['DB_BOOTSTRAP'] = 'false'
+
+        command = [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', *parse_config(spec),
+                   '--bind', f"127.0.0.1:{port}", '--timeout', '120', 'main:app']
+        log_path = os.path.join(work_dir, 'gunicorn.log')
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+            base_url = f"http://127.0.0.1:{port}"
+            try:
+                wait_until_ready(base_url, process)
+                return run_users(base_url, args.users, args.duration, args.think_time)
+            except RuntimeError:
+                with open(log_path) as f:
+                    logger.error(f"gunicorn ({spec}) failed to start:\n{f.read()[-2000:]}")
+                raise
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+def print_report(name, summary):
+    separator(name)
+    print(f"{summary['journeys']} journeys in {summary['elapsed_s']:.1f}s "
+          f"({summary['journeys_per_s']:.2f}/s), {summary['requests']} requests "
+          f"({summary['requests_per_s']:.2f}/s), error rate {summary['error_rate']:.1%}\n")
+    print(f"{'Step':<12} {'Count':>7} {'Errors':>7} {'Req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for step, stats in summary['steps'].items():
+        print(f"{step:<12} {stats['count']:>7} {stats['errors']:>7} {stats['throughput']:>8.2f} "
+              f"{stats['p50_ms']:>9.0f} {stats['p95_ms']:>9.0f} {stats['p99_ms']:>9.0f}")
+    for step, example in summary['error_examples'].items():
+        print(f"\nFirst {step} error: {example}")
+
+def print_comparison(summaries):
+    separator('Worker configurations')
+    print(f"{'Config':<16} {'Journeys/s':>11} {'Req/s':>8} {'Errors':>8} {'analyze p95':>12} {'customize p95':>14}")
+    for name, summary in summaries.items():
+        steps = summary['steps']
+        analyze = steps.get('analyze', {}).get('p95_ms')
+        customize = steps.get('customize', {}).get('p95_ms')
+        print(f"{name:<16} {summary['journeys_per_s']:>11.2f} {summary['requests_per_s']:>8.2f} "
+              f"{summary['error_rate']:>8.1%} {f'{analyze:.0f} ms' if analyze else '-':>12} "
+              f"{f'{customize:.0f} ms' if customize else '-':>14}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the app with scripted journeys and stubbed upstream APIs')
+    parser.add_argument('--config', action='append', help='Worker config class:workers[:threads] (repeatable)')
+    parser.add_argument('--target', help='Load an already running server at this URL instead')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to run each configuration')
+    parser.add_argument('--think-time', type=float, default=1.0, help='Mean pause between journeys (s)')
+    parser.add_argument('--json', help='Write the results to this file')
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    summaries = {}
+    with StubServers(settings_from_args(args)) as stubs:
+        if args.target:
+            print("Point the target at the stubs with:")
+            for name, value in stubs.environment().items():
+                print(f"    {name}={value}")
+            summaries[args.target] = run_users(args.target, args.users, args.duration, args.think_time).summary()
+            print_report(args.target, summaries[args.target])
+        else:
+            for spec in args.config or ['sync:2', 'gthread:2:8']:
+                try:
+                    parse_config(spec)
+                except ValueError as e:
+                    parser.error(str(e))
+            for spec in args.config or ['sync:2', 'gthread:2:8']:
+                summaries[spec] = run_config(spec, stubs, args).summary()
+                print_report(spec, summaries[spec])
+            print_comparison(summaries)
+        upstream = dict(stubs.stats.counts)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'settings': vars(args), 'results': summaries, 'upstream': upstream}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return 1 if any(summary['requests'] == 0 for summary in summaries.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
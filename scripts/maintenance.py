@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Database and volume maintenance in a single process
+
+Runs the maintenance steps that used to be separate interpreters in the
+container start script, so SQLAlchemy, the models and the database
+connection are set up once:
+
+    --pdf-cache   Trim the PDF cache to PDF_CACHE_MAX_BYTES (scripts/evict_pdf_cache.py)
+    --blobs       Trim the export cache to EXPORT_CACHE_MAX_BYTES and delete
+                  unreferenced blobs and resume texts (scripts/gc_blobs.py)
+    --analytics   Report analytics rollup drift (scripts/reconcile_analytics.py);
+                  it scans all of customized_resume, so it is never run at boot
+
+With no step flags, --pdf-cache and --blobs run. None of this is needed
+before the app can serve requests, so start.sh runs it in the background
+after migrate.py instead of making the deploy wait for it. It can also be
+run by hand or from a scheduler:
+
+    fly ssh console -C "python scripts/maintenance.py --analytics"
+
+A failed step is logged and the remaining steps still run.
+
+Usage:
+    python scripts/maintenance.py [--pdf-cache] [--blobs] [--analytics] [--database URI]
+"""
+
+import os
+import sys
+import logging
+import argparse
+from pathlib import Path
+from flask import Flask
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extensions import db
+from db_config import configure_database
+from scripts.evict_pdf_cache import DEFAULT_MAX_BYTES, evict_pdf_cache
+from scripts.gc_blobs import DEFAULT_EXPORT_MAX_BYTES, collect_blobs
+from scripts.reconcile_analytics import reconcile_analytics
+
+# Set up logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+def create_app(database_uri=None):
+    """
+    Create a minimal Flask app bound to the application database
+
+    Its instance folder is the application's, so the blob store resolves
+    to the same directory as in the app.
+    """
+    app = Flask(__name__, instance_path=str(PROJECT_ROOT / 'instance'))
+    configure_database(app, database_uri)
+    app.config['BLOB_STORE_DIR'] = os.environ.get('BLOB_STORE_DIR')
+    db.init_app(app)
+    return app
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Run database and volume maintenance steps in one process')
+    parser.add_argument('--pdf-cache', action='store_true', help='Trim the PDF cache to its byte budget')
+    parser.add_argument('--blobs', action='store_true',
+                        help='Trim the export cache and delete unreferenced blobs and resume texts')
+    parser.add_argument('--analytics', action='store_true', help='Report analytics rollup drift')
+    parser.add_argument('--pdf-max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help=f'Byte budget for the PDF cache (default: {DEFAULT_MAX_BYTES})')
+    parser.add_argument('--export-max-bytes', type=int, default=DEFAULT_EXPORT_MAX_BYTES,
+                        help=f'Byte budget for rendered exports (default: {DEFAULT_EXPORT_MAX_BYTES})')
+    parser.add_argument('--database', default=None,
+                        help='Database URI (defaults to DATABASE_URL, like the application)')
+    args = parser.parse_args(argv)
+    if not (args.pdf_cache or args.blobs or args.analytics):
+        args.pdf_cache = args.blobs = True
+    return args
+
+def run(args, app):
+    """
+    Run the selected steps in order
+
+    Returns:
+        0 if every step succeeded (and the rollups match), else 1
+    """
+    steps = []
+    if args.pdf_cache:
+        steps.append(('PDF cache eviction', lambda: evict_pdf_cache(args.pdf_max_bytes)))
+    if args.blobs:
+        steps.append(('blob garbage collection', lambda: collect_blobs(export_max_bytes=args.export_max_bytes)))
+    if args.analytics:
+        steps.append(('analytics reconciliation', lambda: reconcile_analytics(fix=False)))
+
+    status = 0
+    with app.app_context():
+        for name, step in steps:
+            try:
+                if step() == 1:
+                    status = 1
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"{name.capitalize()} failed: {str(e)}")
+                status = 1
+    return status
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+    return run(args, create_app(args.database))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,8 +5,18 @@ Data Migration Script - Helps transfer data from old to new database
 This script backs up the old database and helps initialize a new database
 using Flask-Migrate. It copies data from the old database to the new one.
 
+Rows are copied table by table in primary key order, --batch-size rows at a
+time with a commit per batch, so memory use stays flat however large the old
+database is. Progress is recorded in --checkpoint; if a copy is interrupted,
+re-running the script resumes it from the renamed .old database. Resume text
+is stored through resume_content and original uploads through the blob store,
+as the current schema expects.
+
 Usage:
-    python scripts/migrate_data.py
+    python scripts/migrate_data.py [--batch-size N] [--checkpoint PATH] [--dry-run]
+
+With --dry-run the old database is only inspected: the script reports how
+many rows each table would copy and leaves both databases untouched.
     
 Make sure Flask-Migrate is installed before running:
     uv pip install flask-migrate
@@ -18,6 +28,9 @@ import os
 import sys
 import shutil
 import sqlite3
+import hashlib
+import logging
+import argparse
 import datetime
 from pathlib import Path
 
@@ -30,7 +43,11 @@ sys.path.insert(0, str(project_root))
 try:
     from app import app, db
     from flask_migrate import upgrade, stamp
-    from sqlalchemy import inspect
+    from sqlalchemy import create_engine, inspect
+    from chunked_migration import ChunkedMigration, DEFAULT_BATCH_SIZE
+    from db_types import compress_payload, decompress_payload
+    from models import AnalyticsRollup
+    from services.blob_store import BlobStore
 except ImportError as e:
     print(f"Error importing application: {e}")
     print("\nMake sure Flask-Migrate is installed:")
@@ -73,32 +90,140 @@ def backup_database():
             print(f"Error backing up database: {e}")
             return False
 
-def get_data_from_old_db(db_path):
-    """Extract data from the old database"""
+# Tables copied from the old database, parents first
+COPIED_TABLES = ['user', 'job_description', 'customized_resume']
+
+DEFAULT_CHECKPOINT = os.path.join('instance', 'migrate_data_checkpoint.json')
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger('migrate_data')
+
+def count_old_rows(db_path):
+    """Count the rows of each copied table in the old database"""
     try:
         conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        
-        # Get users
-        users = list(conn.execute("SELECT * FROM user").fetchall())
-        
-        # Get job descriptions
-        job_descriptions = list(conn.execute("SELECT * FROM job_description").fetchall())
-        
-        # Get customized resumes
-        customized_resumes = list(conn.execute("SELECT * FROM customized_resume").fetchall())
-        
-        conn.close()
-        
-        return {
-            'users': users,
-            'job_descriptions': job_descriptions,
-            'customized_resumes': customized_resumes
-        }
+        try:
+            existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+            return {
+                table: conn.execute(f'SELECT count(*) FROM "{table}"').fetchone()[0]
+                for table in COPIED_TABLES if table in existing
+            }
+        finally:
+            conn.close()
     except Exception as e:
         print(f"Error reading old database: {e}")
         return None
 
+def _columns(connection, table):
+    return [column['name'] for column in inspect(connection).get_columns(table)]
+
+def _resume_transform(old_columns, new_columns, store, dry_run):
+    """
+    Build the per-row transform for customized_resume
+
+    Older databases keep the resume text and upload inline; the current
+    schema keeps text in resume_content and uploads in the blob store.
+    Returns (old columns consumed, new columns produced, transform), where
+    transform(values, contents, blobs) rewrites one row's values in place and
+    collects the resume_content and stored_blob rows it needs.
+    """
+    text_columns = [name for name in ('original_content', 'customized_content')
+                    if name in old_columns and f"{name}_hash" in new_columns]
+    move_upload = 'original_bytes' in old_columns and 'blob_hash' in new_columns
+    
+    def transform(values, contents, blobs):
+        for name in text_columns:
+            stored = values.pop(name)
+            data = (stored if isinstance(stored, str) else decompress_payload(stored).decode('utf-8')).encode('utf-8')
+            content_hash = hashlib.sha256(data).hexdigest()
+            contents.setdefault(content_hash, {'hash': content_hash, 'body': compress_payload(data), 'size': len(data)})
+            values[f"{name}_hash"] = content_hash
+        if move_upload:
+            stored = values.pop('original_bytes')
+            values['blob_hash'] = None
+            if stored is not None:
+                data = decompress_payload(stored)
+                blob_hash = store.hash_bytes(data) if dry_run else store.write(data)
+                size, count = blobs.get(blob_hash, (len(data), 0))
+                blobs[blob_hash] = (size, count + 1)
+                values['blob_hash'] = blob_hash
+    
+    extra = [f"{name}_hash" for name in text_columns] + (['blob_hash'] if move_upload else [])
+    return text_columns + (['original_bytes'] if move_upload else []), extra, transform
+
+def copy_table(source, target, table, batch_size=DEFAULT_BATCH_SIZE, checkpoint_path=None, dry_run=False, store=None):
+    """
+    Copy one table from the old database into the new one, a batch at a time
+    
+    Only columns present in both schemas are copied; new columns keep their
+    defaults. Returns the ChunkedMigration stats.
+    """
+    old_columns = _columns(source, table)
+    new_columns = _columns(target, table)
+    columns = [name for name in old_columns if name in new_columns and name != 'id']
+    
+    transform = None
+    inserted = ['id'] + columns
+    if table == 'customized_resume':
+        moved, extra, transform = _resume_transform(old_columns, new_columns, store, dry_run)
+        columns += moved
+        inserted += extra
+    
+    # A crash between a batch's commit and its checkpoint means that batch is copied twice
+    insert_row = (f'INSERT INTO "{table}" ({", ".join(inserted)}) '
+                  f'VALUES ({", ".join(":" + name for name in inserted)}) ON CONFLICT (id) DO NOTHING')
+    insert_content = ("INSERT INTO resume_content (hash, body, size, created_at, last_used_at) "
+                      "VALUES (:hash, :body, :size, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP) "
+                      "ON CONFLICT (hash) DO NOTHING")
+    insert_blob = ("INSERT INTO stored_blob (hash, size, ref_count, created_at) "
+                   "VALUES (:hash, :size, :ref_count, CURRENT_TIMESTAMP) "
+                   "ON CONFLICT (hash) DO UPDATE SET ref_count = stored_blob.ref_count + excluded.ref_count")
+    
+    def copy_batch(rows):
+        contents, blobs, values = {}, {}, []
+        for row in rows:
+            row_values = dict(zip(['id'] + columns, row))
+            if transform:
+                transform(row_values, contents, blobs)
+            values.append(row_values)
+        return [
+            (insert_content, list(contents.values())),
+            (insert_blob, [{'hash': h, 'size': size, 'ref_count': count} for h, (size, count) in blobs.items()]),
+            (insert_row, values),
+        ]
+    
+    return ChunkedMigration(
+        f"copy {table}", f'"{table}"', columns, batch_size=batch_size, checkpoint_path=checkpoint_path,
+        dry_run=dry_run, commit_each_batch=True, logger=logger
+    ).run(source, copy_batch, target=target)
+
+def copy_old_data(old_path, batch_size=DEFAULT_BATCH_SIZE, checkpoint_path=None, dry_run=False):
+    """
+    Copy users, job descriptions and customized resumes from the old database
+    
+    Must run inside an app context, after the new schema has been created.
+    Rows already present in the new database are not copied again when a
+    checkpoint is resumed, since each table is walked from its last copied id.
+    """
+    source_engine = create_engine(f"sqlite:///{old_path}")
+    store = BlobStore()
+    try:
+        with source_engine.connect() as source, db.engine.connect() as target:
+            existing = set(inspect(source).get_table_names())
+            for table in COPIED_TABLES:
+                if table not in existing:
+                    print(f"Old database has no {table} table, skipping")
+                    continue
+                stats = copy_table(source, target, table, batch_size=batch_size,
+                                   checkpoint_path=checkpoint_path, dry_run=dry_run, store=store)
+                print(f"{'Would copy' if dry_run else 'Copied'} {stats['rows']} {table} rows")
+    finally:
+        source_engine.dispose()
+    
+    if not dry_run:
+        # Rows were inserted below the ORM, so rebuild the admin analytics from them
+        AnalyticsRollup.reconcile(fix=True)
+
 def check_tables_exist():
     """Check if expected tables already exist in the database"""
     with app.app_context():
@@ -117,10 +242,54 @@ def check_tables_exist():
             
         return exists
 
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Move an old ResumeRocket database onto Flask-Migrate')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows copied per batch')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT,
+                        help='Progress file used to resume an interrupted copy')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Report what would be copied without changing either database')
+    return parser.parse_args()
+
+def copy_and_report(old_path, args):
+    """Copy the old data into the new database, keeping the checkpoint if it fails"""
+    with app.app_context():
+        try:
+            print(f"Copying data from {old_path}...")
+            copy_old_data(old_path, batch_size=args.batch_size, checkpoint_path=args.checkpoint)
+            print("Data migration is complete!")
+            print("\nYou can now run the application with the new migration-based database.")
+            return True
+        except Exception as e:
+            print(f"Error copying data: {e}")
+            print("Progress has been saved; re-run this script to resume the copy.")
+            return False
+
 def main():
     """Main migration function"""
+    args = parse_args()
     print("Starting database migration...")
     
+    if args.dry_run:
+        with app.app_context():
+            db_path = app.config.get('SQLALCHEMY_DATABASE_URI', '').replace('sqlite:///', '')
+        counts = count_old_rows(db_path) if os.path.exists(db_path) else None
+        if not counts:
+            print("Dry run: no data to copy.")
+            return
+        for table, count in counts.items():
+            print(f"Dry run: would copy {count} {table} rows in batches of {args.batch_size}")
+        return
+    
+    # An interrupted copy left the old database renamed and a checkpoint behind
+    with app.app_context():
+        db_path = app.config.get('SQLALCHEMY_DATABASE_URI', '').replace('sqlite:///', '')
+    if os.path.exists(f"{db_path}.old") and os.path.exists(args.checkpoint):
+        print(f"Resuming interrupted copy from {db_path}.old")
+        copy_and_report(f"{db_path}.old", args)
+        return
+    
     # Backup old database
     db_path = backup_database()
     if not db_path:
@@ -179,9 +348,9 @@ def main():
     
     # If we reach here, the database has tables but not our expected ones
     # Try to extract data from the old db
-    print("Extracting data from old database...")
-    old_data = get_data_from_old_db(db_path)
-    if not old_data:
+    print("Counting data in old database...")
+    old_counts = count_old_rows(db_path)
+    if not old_counts:
         print("No data to migrate or tables are in unexpected format.")
         print("Creating fresh database with migrations...")
         
@@ -215,10 +384,6 @@ def main():
         try:
             print("Running database migrations...")
             upgrade()
-            
-            print("Data migration is complete!")
-            print("\nYou can now run the application with the new migration-based database.")
-            print(f"If you need to restore the old database, the backup is available at: {db_path}.backup_*")
         except Exception as e:
             print(f"Error during migration: {e}")
             print("\nRestoring backup from before migration...")
@@ -227,6 +392,10 @@ def main():
             shutil.copy2(latest_backup, db_path)
             print(f"Restored database from {latest_backup}")
             print("Please check the error message and try again after fixing the issue.")
+            return
+    
+    if copy_and_report(f"{db_path}.old", args):
+        print(f"If you need to restore the old database, the backup is available at: {db_path}.backup_*")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
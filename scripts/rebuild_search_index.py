@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Backfill or rebuild the job description full-text search index
+
+Creates the index objects if they are missing (FTS5 table and triggers on
+SQLite, generated tsvector column and GIN index on Postgres) and repopulates
+the index from every existing job_description row. Safe to re-run.
+
+Usage:
+    python scripts/rebuild_search_index.py [--database URI] [--query TEXT --user-id N]
+
+Pass --query/--user-id to print ranked results afterwards as a smoke test.
+"""
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+from flask import Flask
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extensions import db
+from db_config import configure_database
+from services.search_index import rebuild_search_index, search_jobs
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, 
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def create_app(database_uri):
+    """Create a minimal Flask app bound to the application database"""
+    app = Flask(__name__)
+    configure_database(app, database_uri)
+    db.init_app(app)
+    return app
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Rebuild the job description full-text search index')
+    parser.add_argument('--database', default=None,
+                        help='Database URI (defaults to DATABASE_URL, like the application)')
+    parser.add_argument('--query', help='Run a ranked search after rebuilding')
+    parser.add_argument('--user-id', type=int, help='User whose job descriptions --query searches')
+    return parser.parse_args()
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+    app = create_app(args.database)
+    
+    with app.app_context():
+        start_time = time.time()
+        with db.engine.begin() as connection:
+            count = rebuild_search_index(connection)
+        logger.info(f"Indexed {count} job descriptions in {time.time() - start_time:.2f}s")
+        
+        if args.query and args.user_id is not None:
+            for result in search_jobs(args.user_id, args.query):
+                print(f"{result['rank']:8.3f}  #{result['id']} {result['title']}\n          {result['snippet']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Check the admin analytics rollups against customized_resume
+
+The rollups are maintained by ORM flush events, so changes made with raw SQL
+or bulk updates bypass them. This recomputes every bucket from scratch and
+reports any counter that differs; --fix adds the difference to each one.
+The recomputation scans all of customized_resume, so this runs by hand or on
+a schedule, not from the container start script.
+
+Usage:
+    python scripts/reconcile_analytics.py [--fix] [--database URI]
+
+Exits with status 1 if mismatches were found and not fixed.
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+from flask import Flask
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extensions import db
+from db_config import configure_database
+from models import AnalyticsRollup
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, 
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def create_app(database_uri):
+    """Create a minimal Flask app bound to the application database"""
+    app = Flask(__name__)
+    configure_database(app, database_uri)
+    db.init_app(app)
+    return app
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Reconcile admin analytics rollups with customized_resume')
+    parser.add_argument('--fix', action='store_true', help='Rewrite the rollups when they differ')
+    parser.add_argument('--database', default=None,
+                        help='Database URI (defaults to DATABASE_URL, like the application)')
+    return parser.parse_args()
+
+def reconcile_analytics(fix=False):
+    """
+    Report (and with fix, repair) rollup drift (inside an app context)
+    
+    Returns:
+        0 if the rollups match or were fixed, else 1
+    """
+    mismatches = AnalyticsRollup.reconcile(fix=fix)
+    
+    for bucket, counter, stored, expected in mismatches:
+        logger.warning(f"{bucket} {counter}: stored {stored}, expected {expected}")
+    
+    if not mismatches:
+        logger.info("Analytics rollups match customized_resume")
+        return 0
+    if fix:
+        logger.info(f"Corrected analytics rollups ({len(mismatches)} mismatched counters)")
+        return 0
+    logger.error(f"{len(mismatches)} mismatched counters; re-run with --fix to repair")
+    return 1
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+    app = create_app(args.database)
+    
+    with app.app_context():
+        return reconcile_analytics(fix=args.fix)
+
+if __name__ == "__main__":
+    sys.exit(main())
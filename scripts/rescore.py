@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Recompute ATS scores produced by an older analyzer version
+
+Finds customized resumes whose analyzer_version differs from the current
+ANALYZER_VERSION (or was never recorded) and rescores them on a process pool,
+writing results back one batch per transaction. Progress is checkpointed
+after every batch, so re-running after an interruption resumes where it
+stopped.
+
+Usage:
+    python scripts/rescore.py [--workers N] [--batch-size 50] [--limit N]
+                              [--checkpoint FILE] [--dry-run] [--database URI]
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+from flask import Flask
+
+# Add parent directory to path to import from parent
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extensions import db
+from db_config import configure_database
+from models import CustomizedResume
+from services.ats_analyzer import ANALYZER_VERSION
+from services.rescoring import RescoringService, BATCH_SIZE, stale_clause
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, 
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def create_app(database_uri):
+    """Create a minimal Flask app bound to the application database"""
+    app = Flask(__name__)
+    configure_database(app, database_uri)
+    db.init_app(app)
+    return app
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Rescore resumes scored by an older ATS analyzer version')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Scoring processes (default: CPU count; 0 scores in this process)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per batch')
+    parser.add_argument('--limit', type=int, default=None, help='Stop after this many rows')
+    parser.add_argument('--checkpoint', default=os.path.join('instance', 'rescore_checkpoint.json'),
+                        help='Progress file used to resume an interrupted run')
+    parser.add_argument('--dry-run', action='store_true', help='Only count stale rows')
+    parser.add_argument('--database', default=None,
+                        help='Database URI (defaults to DATABASE_URL, like the application)')
+    return parser.parse_args()
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+    app = create_app(args.database)
+    
+    with app.app_context():
+        stale = CustomizedResume.query.filter(stale_clause()).count()
+        logger.info(f"{stale} resumes have scores from an analyzer version other than {ANALYZER_VERSION}")
+        if args.dry_run or not stale:
+            return
+        
+        start_time = time.time()
+        result = RescoringService().rescore_stale(
+            batch_size=args.batch_size,
+            workers=args.workers,
+            checkpoint_path=args.checkpoint,
+            limit=args.limit
+        )
+        elapsed = time.time() - start_time
+        rate = result['rescored'] / elapsed if elapsed else 0
+        logger.info(f"Rescored {result['rescored']} resumes in {elapsed:.1f}s ({rate:.1f} rows/s)")
+
+if __name__ == "__main__":
+    main()
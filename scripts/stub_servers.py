@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the Anthropic Messages API and the Jina Reader
+
+Load tests can't call the real services: they would be slow, cost money and
+hit rate limits long before the app does. These servers answer the same
+requests with canned content after a configurable delay, so the app spends
+its time waiting on "upstream" calls the way it does in production.
+
+    Anthropic  POST /v1/messages. Replies after a time-to-first-token plus a
+               per-output-token delay. The output length is drawn from a
+               lognormal distribution, capped at the request's max_tokens.
+               Prompts that ask for JSON get a JSON optimization plan, and
+               prompts that ask for the optimized resume get the original
+               resume back with a few additions. Anything else gets a list
+               of suggestions. With --anthropic-error-rate, a fraction of
+               requests fail with 529 overloaded_error, as the real API does
+               under load.
+    Jina       GET /<url>. Returns a job posting in the Reader's
+               "Title / URL Source / Markdown Content" format after a
+               lognormal delay.
+
+Point the app at them with:
+    ANTHROPIC_BASE_URL=http://127.0.0.1:<anthropic port>
+    JINA_READER_URL=http://127.0.0.1:<jina port>/
+
+Usage:
+    python scripts/stub_servers.py [--anthropic-port 9101] [--jina-port 9102] [--anthropic-ttft-ms 800]
+                                   [--ms-per-token 12] [--output-tokens 600] [--jina-latency-ms 1200]
+"""
+
+import re
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import logging
+import argparse
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Set up logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Rough characters per token, used to estimate input tokens and size output text
+CHARS_PER_TOKEN = 4
+
+JOB_POSTING = """Title: Senior Python Engineer
+URL Source: {url}
+Markdown Content:
+# Senior Python Engineer
+
+We are hiring a Senior Python Engineer to build and scale our hiring platform.
+
+## Requirements
+- 5+ years of Python experience, including Flask or Django
+- PostgreSQL and SQLAlchemy, schema design and query tuning
+- REST API design, Docker and AWS
+- Experience with CI/CD, automated testing and code review
+- Strong communication skills and experience mentoring engineers
+
+## Nice to have
+- Kubernetes, Terraform, Redis
+- Experience with NLP or LLM-backed products
+"""
+
+OPTIMIZATION_PLAN = {
+    "summary": "Good overall match; make cloud and container experience more visible.",
+    "job_analysis": "The role emphasises Python web services, SQL and cloud deployment.",
+    "recommendations": [
+        {"section": "Skills", "change": "Group cloud and container tools together", "reason": "Matches the job's requirements list"},
+        {"section": "Experience", "change": "Quantify the API work", "reason": "Shows scale and impact"},
+    ],
+    "keywords_to_add": ["Docker", "AWS", "CI/CD"],
+    "equivalent_terms": {"REST API design": "built REST APIs"},
+    "formatting_suggestions": ["Use consistent bullet style"],
+}
+
+
+@dataclass
+class StubSettings:
+    """Latency, size and error distributions for the stand-ins"""
+    anthropic_ttft_ms: float = 800.0
+    ms_per_token: float = 12.0
+    output_tokens: int = 600
+    output_tokens_sigma: float = 0.5
+    latency_sigma: float = 0.3
+    anthropic_error_rate: float = 0.0
+    jina_latency_ms: float = 1200.0
+    jina_error_rate: float = 0.0
+    seed: int = None
+
+
+def lognormal(median, sigma, rng):
+    """A draw from a lognormal distribution with the given median"""
+    return median * math.exp(rng.gauss(0, sigma)) if sigma else median
+
+
+class StubStats:
+    """Requests served per stand-in, for reporting"""
+
+    def __init__(self):
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, outcome):
+        with self._lock:
+            key = f"{name}:{outcome}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+
+def _filler(tokens, rng):
+    """Resume-like bullet lines totalling roughly `tokens` tokens"""
+    words = ['Delivered', 'Python', 'services', 'for', 'hiring', 'workflows', 'with', 'Flask', 'PostgreSQL',
+             'and', 'Docker', 'reducing', 'latency', 'by', '30%', 'across', 'AWS', 'deployments']
+    lines = []
+    remaining = tokens * CHARS_PER_TOKEN
+    while remaining > 0:
+        line = '- ' + ' '.join(rng.choice(words) for _ in range(14))
+        lines.append(line)
+        remaining -= len(line)
+    return '\n'.join(lines)
+
+
+def message_text(system, prompt, output_tokens, rng):
+    """Reply text matching what the calling service parses"""
+    asks = f"{system}\n{prompt}"
+    if 'JSON' in asks and ('simulation' in asks.lower() or 'ATS system' in asks):
+        simulations = {name: {"score": rng.randint(55, 90), "feedback": "Keywords parsed correctly"}
+                       for name in ('Workday', 'Greenhouse', 'Lever', 'Taleo')}
+        return f"```json\n{json.dumps(simulations, indent=2)}\n```"
+    if 'JSON' in asks:
+        return f"```json\n{json.dumps(OPTIMIZATION_PLAN, indent=2)}\n```"
+    match = re.search(r'ORIGINAL RESUME:\s*(.*?)\s*JOB DESCRIPTION:', prompt, re.DOTALL)
+    if match:
+        resume = '\n'.join(line.strip() for line in match.group(1).splitlines())
+        extra = max(output_tokens - len(resume) // CHARS_PER_TOKEN, 20)
+        return f"{resume}\n\n## Highlights\n{_filler(extra, rng)}"
+    suggestions = ["## Keyword Optimization", "- Add Docker and AWS to the skills section",
+                   "## Content Improvements", _filler(max(output_tokens - 40, 20), rng)]
+    return '\n'.join(suggestions)
+
+
+def make_anthropic_handler(settings, stats, rng):
+    class AnthropicHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                request = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._send_json(400, {'type': 'error', 'error': {'type': 'invalid_request_error', 'message': 'Invalid JSON'}})
+                return
+            if not self.path.startswith('/v1/messages'):
+                self._send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+                return
+
+            if rng.random() < settings.anthropic_error_rate:
+                time.sleep(lognormal(settings.anthropic_ttft_ms, settings.latency_sigma, rng) / 1000 / 4)
+                stats.record('anthropic', 'overloaded')
+                self._send_json(529, {'type': 'error', 'error': {'type': 'overloaded_error', 'message': 'Overloaded'}},
+                                headers={'x-should-retry': 'false'})
+                return
+
+            prompt = '\n'.join(str(message.get('content', '')) for message in request.get('messages', []))
+            system = str(request.get('system', ''))
+            max_tokens = int(request.get('max_tokens') or 1024)
+            output_tokens = min(max_tokens, max(1, int(lognormal(settings.output_tokens, settings.output_tokens_sigma, rng))))
+            input_tokens = max(1, (len(prompt) + len(system)) // CHARS_PER_TOKEN)
+
+            delay_ms = lognormal(settings.anthropic_ttft_ms, settings.latency_sigma, rng) + output_tokens * settings.ms_per_token
+            time.sleep(delay_ms / 1000)
+            stats.record('anthropic', 'ok')
+            self._send_json(200, {
+                'id': f"msg_stub_{uuid.uuid4().hex[:20]}",
+                'type': 'message',
+                'role': 'assistant',
+                'model': request.get('model', 'stub'),
+                'content': [{'type': 'text', 'text': message_text(system, prompt, output_tokens, rng)}],
+                'stop_reason': 'end_turn',
+                'stop_sequence': None,
+                'usage': {'input_tokens': input_tokens, 'output_tokens': output_tokens},
+            })
+
+    return AnthropicHandler
+
+
+def make_jina_handler(settings, stats, rng):
+    class JinaHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(lognormal(settings.jina_latency_ms, settings.latency_sigma, rng) / 1000)
+            if rng.random() < settings.jina_error_rate:
+                status, body = 503, b'Service Unavailable'
+                stats.record('jina', 'error')
+            else:
+                status, body = 200, JOB_POSTING.format(url=self.path.lstrip('/')).encode('utf-8')
+                stats.record('jina', 'ok')
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return JinaHandler
+
+
+class StubServers:
+    """Both stand-ins, each serving from its own thread"""
+
+    def __init__(self, settings=None, anthropic_port=0, jina_port=0, host='127.0.0.1'):
+        self.settings = settings or StubSettings()
+        self.stats = StubStats()
+        rng = random.Random(self.settings.seed)
+        self.anthropic = ThreadingHTTPServer((host, anthropic_port), make_anthropic_handler(self.settings, self.stats, rng))
+        self.jina = ThreadingHTTPServer((host, jina_port), make_jina_handler(self.settings, self.stats, rng))
+        self.anthropic.daemon_threads = self.jina.daemon_threads = True
+        self._threads = []
+
+    @property
+    def anthropic_url(self):
+        host, port = self.anthropic.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def jina_url(self):
+        host, port = self.jina.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def environment(self):
+        """Environment variables that point the app at the stand-ins"""
+        return {'ANTHROPIC_BASE_URL': self.anthropic_url, 'JINA_READER_URL': self.jina_url}
+
+    def start(self):
+        for server in (self.anthropic, self.jina):
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for server in (self.anthropic, self.jina):
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_stub_arguments(parser):
+    """Distribution options shared with scripts/load_test.py"""
+    defaults = StubSettings()
+    parser.add_argument('--anthropic-ttft-ms', type=float, default=defaults.anthropic_ttft_ms,
+                        help='Median time before the first token (ms)')
+    parser.add_argument('--ms-per-token', type=float, default=defaults.ms_per_token,
+                        help='Generation time per output token (ms)')
+    parser.add_argument('--output-tokens', type=int, default=defaults.output_tokens,
+                        help='Median output tokens per message')
+    parser.add_argument('--output-tokens-sigma', type=float, default=defaults.output_tokens_sigma,
+                        help='Lognormal sigma of output tokens')
+    parser.add_argument('--latency-sigma', type=float, default=defaults.latency_sigma,
+                        help='Lognormal sigma of the latencies')
+    parser.add_argument('--anthropic-error-rate', type=float, default=defaults.anthropic_error_rate,
+                        help='Fraction of messages answered with 529 overloaded')
+    parser.add_argument('--jina-latency-ms', type=float, default=defaults.jina_latency_ms,
+                        help='Median Jina Reader latency (ms)')
+    parser.add_argument('--jina-error-rate', type=float, default=defaults.jina_error_rate,
+                        help='Fraction of Jina requests answered with 503')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+
+
+def settings_from_args(args):
+    return StubSettings(
+        anthropic_ttft_ms=args.anthropic_ttft_ms,
+        ms_per_token=args.ms_per_token,
+        output_tokens=args.output_tokens,
+        output_tokens_sigma=args.output_tokens_sigma,
+        latency_sigma=args.latency_sigma,
+        anthropic_error_rate=args.anthropic_error_rate,
+        jina_latency_ms=args.jina_latency_ms,
+        jina_error_rate=args.jina_error_rate,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve local stand-ins for the Anthropic and Jina APIs')
+    parser.add_argument('--anthropic-port', type=int, default=9101)
+    parser.add_argument('--jina-port', type=int, default=9102)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    servers = StubServers(settings_from_args(args), args.anthropic_port, args.jina_port).start()
+    for name, value in servers.environment().items():
+        print(f"{name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servers.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,10 @@
 import os
-import anthropic
-from anthropic import Anthropic
+from services.metrics import MeteredAnthropic
+from services.lazy_imports import LazyObject, lazy_module
+from services.tracing import traced
+
+# Imported on first use (see services.lazy_imports)
+anthropic = lazy_module('anthropic')
 
 
 class AISuggestions:
@@ -12,10 +16,13 @@ class AISuggestions:
             raise ValueError(
                 'ANTHROPIC_API_KEY environment variable must be set')
 
-        self.client = Anthropic(api_key=self.anthropic_key)
+        self.client = MeteredAnthropic(
+            LazyObject(lambda: anthropic.Anthropic(api_key=self.anthropic_key)), 'ai_suggestions'
+        )
         # the newest Anthropic model is "claude-3-7-sonnet-20250219" which was released February 19, 2025
         self.model = "claude-3-7-sonnet-20250219"
 
+    @traced()
     def get_suggestions(self, resume_text, job_description):
         """
         Get AI-powered suggestions for resume improvement
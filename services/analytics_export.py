@@ -0,0 +1,201 @@
+"""
+Streaming export of customization analytics
+
+Exports CustomizedResume outcomes, CustomizationEvaluation records and ABTest
+results as JSONL or CSV for offline analysis. Rows are selected as plain
+columns (no ORM objects) and fetched with yield_per, so the database cursor
+is read a batch at a time and memory stays flat however large the table is.
+Used by scripts/export_analytics.py and the /admin/export endpoint.
+"""
+
+import io
+import csv
+import json
+import logging
+from datetime import date, datetime
+from sqlalchemy import select
+from extensions import db
+from models import CustomizedResume, CustomizationEvaluation, ABTest
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the cursor per round trip
+BATCH_SIZE = 500
+
+FORMATS = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+class ExportError(ValueError):
+    """Raised for an unknown dataset, column or format"""
+
+
+class Dataset:
+    """An exportable model: its date column for range filters and default columns"""
+
+    def __init__(self, model, date_column, default_columns):
+        self.model = model
+        self.date_column = date_column
+        self.default_columns = default_columns
+
+    @property
+    def columns(self):
+        """Every column that can be exported, in table order"""
+        return [column.key for column in self.model.__table__.columns]
+
+
+DATASETS = {
+    'customizations': Dataset(CustomizedResume, 'created_at', [
+        'id', 'user_id', 'job_description_id', 'created_at', 'analyzer_version',
+        'original_ats_score', 'ats_score', 'matching_keywords', 'missing_keywords',
+        'added_keywords_count', 'changes_count', 'comparison_data', 'user_rating',
+        'user_feedback', 'was_effective', 'interview_secured', 'job_secured', 'feedback_date',
+    ]),
+    'evaluations': Dataset(CustomizationEvaluation, 'created_at', [
+        'id', 'customized_resume_id', 'created_at', 'metrics', 'applied_to_model', 'evaluation_text',
+    ]),
+    'ab_tests': Dataset(ABTest, 'start_date', [
+        'id', 'name', 'start_date', 'end_date', 'is_active', 'variants', 'results', 'winner',
+    ]),
+}
+
+
+def _dataset(name):
+    if name not in DATASETS:
+        raise ExportError(f"Unknown dataset '{name}' (expected one of: {', '.join(DATASETS)})")
+    return DATASETS[name]
+
+
+def resolve_columns(dataset_name, columns=None):
+    """
+    Validate a column selection
+
+    Args:
+        dataset_name: Key of DATASETS
+        columns: Column names, or None for the dataset's defaults
+
+    Returns:
+        List of column names
+
+    Raises:
+        ExportError: If the dataset or a column is unknown
+    """
+    dataset = _dataset(dataset_name)
+    if not columns:
+        return list(dataset.default_columns)
+    unknown = [name for name in columns if name not in dataset.columns]
+    if unknown:
+        raise ExportError(f"Unknown columns for {dataset_name}: {', '.join(unknown)}")
+    return list(columns)
+
+
+def iter_rows(dataset_name, columns=None, start=None, end=None, batch_size=BATCH_SIZE):
+    """
+    Stream rows of a dataset as dicts, in primary key order
+
+    Args:
+        dataset_name: Key of DATASETS
+        columns: Column names to include (default: the dataset's defaults)
+        start: Only rows on or after this datetime (optional)
+        end: Only rows before this datetime (optional)
+        batch_size: Rows fetched per round trip
+
+    Yields:
+        Dict of column name to value for each row
+    """
+    dataset = _dataset(dataset_name)
+    columns = resolve_columns(dataset_name, columns)
+    table = dataset.model.__table__
+
+    statement = select(*[table.c[name] for name in columns]).order_by(table.c.id)
+    date_column = table.c[dataset.date_column]
+    if start is not None:
+        statement = statement.where(date_column >= start)
+    if end is not None:
+        statement = statement.where(date_column < end)
+
+    # Plain column rows with a streaming cursor: nothing accumulates in the session
+    result = db.session.execute(statement.execution_options(yield_per=batch_size, stream_results=True))
+    try:
+        for row in result:
+            yield dict(zip(columns, row))
+    finally:
+        result.close()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        # Nested JSON (keywords, comparison_data, metrics) stays JSON inside the cell
+        return json.dumps(value)
+    return value
+
+
+def to_jsonl(rows):
+    """Yield one JSON line per row"""
+    for row in rows:
+        yield json.dumps(row, default=_json_default) + '\n'
+
+
+def to_csv(rows, columns):
+    """Yield a CSV header followed by one line per row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(columns)
+    yield flush()
+    for row in rows:
+        writer.writerow([_csv_value(row[name]) for name in columns])
+        yield flush()
+
+
+def stream_export(dataset_name, export_format='jsonl', columns=None, start=None, end=None, batch_size=BATCH_SIZE):
+    """
+    Stream an export as text chunks
+
+    Validation happens before the first chunk is produced, so errors can
+    still be reported as a normal response.
+
+    Raises:
+        ExportError: If the dataset, a column or the format is unknown
+    """
+    if export_format not in FORMATS:
+        raise ExportError(f"Unknown format '{export_format}' (expected one of: {', '.join(FORMATS)})")
+    columns = resolve_columns(dataset_name, columns)
+    logger.info(f"Exporting {dataset_name} as {export_format} ({len(columns)} columns)")
+
+    rows = iter_rows(dataset_name, columns, start=start, end=end, batch_size=batch_size)
+    if export_format == 'csv':
+        return to_csv(rows, columns)
+    return to_jsonl(rows)
+
+
+def parse_date(value):
+    """
+    Parse a YYYY-MM-DD or ISO 8601 date filter
+
+    Raises:
+        ExportError: If the value isn't a date
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"Invalid date '{value}' (expected YYYY-MM-DD)")
@@ -8,7 +8,11 @@ import re
 import math
 import json
 import os
+import hashlib
+from functools import lru_cache
 from typing import Dict, List, Tuple, Set, Any, Optional
+from services.stage_timing import ANALYSIS_STATS, NULL_TIMER, start_timer
+from services.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -155,22 +159,79 @@ SKILLS_TAXONOMY = {
                   "marketing strategy", "analytics", "customer acquisition"]
 }
 
+# Score calibration and keyword position weights (copied onto each analyzer instance)
+CALIBRATION = {
+    "BASE_SCORE_ADJUSTMENT": 30,  # Lowered to make keyword matches more impactful
+    "SCALING_FACTOR": 0.8,  # Increased to make improvements more significant
+    "TITLE_WEIGHT": 2.5,
+    "HEADER_WEIGHT": 2.0,
+    "FIRST_PARAGRAPH_WEIGHT": 1.5,
+    "BULLET_WEIGHT": 1.2,
+    "max_ngram_size": 3,
+}
+
+# Bump when the scoring code changes in a way that moves scores. Edits to the
+# tables above change ANALYZER_VERSION on their own.
+ANALYZER_REVISION = 1
+
+def _analyzer_fingerprint():
+    tables = [RESUME_SECTIONS, SECTION_WEIGHTS, SKILLS_TAXONOMY, CALIBRATION]
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode('utf-8')).hexdigest()[:10]
+
+# Stored with every score (CustomizedResume.analyzer_version) so stale scores can be found and rescored
+ANALYZER_VERSION = f"{ANALYZER_REVISION}.{_analyzer_fingerprint()}"
+
+def match_section_header(text, exact=False):
+    """
+    Map a header line to its canonical RESUME_SECTIONS name.
+    With exact=True only whole-header matches count; otherwise a known
+    pattern anywhere in the header is enough. Returns None when nothing matches.
+    """
+    header = re.sub(r'^#+\s*', '', text.strip().lower()).strip(' :')
+    if not header:
+        return None
+    
+    for section_name, section_patterns in RESUME_SECTIONS.items():
+        if header in section_patterns:
+            return section_name
+    
+    if not exact:
+        for section_name, section_patterns in RESUME_SECTIONS.items():
+            if any(pattern in header for pattern in section_patterns):
+                return section_name
+    
+    return None
+
+# NLTK data the analyzer uses, as (resource path, download package)
+NLTK_RESOURCES = (
+    ('tokenizers/punkt', 'punkt'),
+    ('tokenizers/punkt_tab', 'punkt_tab'),  # word_tokenize on NLTK >= 3.8.2
+    ('corpora/stopwords', 'stopwords'),
+)
+
+@lru_cache(maxsize=1)
+def load_stop_words():
+    """
+    English stop words, downloading any missing NLTK data first
+
+    Runs once per process. nltk.download() fetches the remote package index
+    even when the data is installed, so only resources nltk.data.find()
+    can't locate are downloaded. The Docker image ships them under NLTK_DATA.
+    """
+    for path, package in NLTK_RESOURCES:
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(package, quiet=True)
+    return frozenset(stopwords.words('english'))
+
 class EnhancedATSAnalyzer:
     def __init__(self):
-        # Download required NLTK data
         try:
-            # Download only if not already present
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-            self.stop_words = set(stopwords.words('english'))
-            
-            # Add additional downloads for enhanced analysis
-            nltk.download('averaged_perceptron_tagger', quiet=True)
-            nltk.download('maxent_ne_chunker', quiet=True)
-            nltk.download('words', quiet=True)
+            self.stop_words = load_stop_words()
         except Exception as e:
             logger.error(f"Error initializing NLTK: {str(e)}")
-            self.stop_words = set()
+            self.stop_words = frozenset()
         
         # Default section weights
         self.section_weights = SECTION_WEIGHTS["default"]
@@ -179,23 +240,33 @@ class EnhancedATSAnalyzer:
         self.skills_taxonomy = SKILLS_TAXONOMY
         
         # Calibration constants
-        self.BASE_SCORE_ADJUSTMENT = 30  # Lowered to make keyword matches more impactful
-        self.SCALING_FACTOR = 0.8  # Increased to make improvements more significant
+        self.BASE_SCORE_ADJUSTMENT = CALIBRATION["BASE_SCORE_ADJUSTMENT"]
+        self.SCALING_FACTOR = CALIBRATION["SCALING_FACTOR"]
         
         # Position weights
-        self.TITLE_WEIGHT = 2.5
-        self.HEADER_WEIGHT = 2.0
-        self.FIRST_PARAGRAPH_WEIGHT = 1.5
-        self.BULLET_WEIGHT = 1.2
+        self.TITLE_WEIGHT = CALIBRATION["TITLE_WEIGHT"]
+        self.HEADER_WEIGHT = CALIBRATION["HEADER_WEIGHT"]
+        self.FIRST_PARAGRAPH_WEIGHT = CALIBRATION["FIRST_PARAGRAPH_WEIGHT"]
+        self.BULLET_WEIGHT = CALIBRATION["BULLET_WEIGHT"]
         
         # N-gram settings
-        self.max_ngram_size = 3
+        self.max_ngram_size = CALIBRATION["max_ngram_size"]
     
-    def analyze(self, resume_text, job_description):
+    @traced()
+    def analyze(self, resume_text, job_description, resume_sections=None, debug=False):
         """
         Enhanced analysis of resume against job description using weighted keyword matching
         Returns a detailed score from 0-100, matching and missing keywords, section scores, and more
+        
+        resume_sections may carry a precomputed section map (e.g. from layout-aware
+        PDF extraction); when empty, sections are detected from the text.
+        
+        Each stage's duration and the token, n-gram and keyword counts are
+        recorded in services.stage_timing.ANALYSIS_STATS; with debug=True they
+        are also returned under 'timings'.
         """
+        # Local to this call: routes share one analyzer across (possibly threaded) requests
+        timer = start_timer(force=debug)
         try:
             if not resume_text or not job_description:
                 return self._empty_result()
@@ -203,39 +274,61 @@ class EnhancedATSAnalyzer:
             # Detect job type and adjust section weights
             job_type = self._detect_job_type(job_description)
             self._adjust_section_weights(job_type)
+            timer.mark('detect_job_type')
             
-            # Identify sections in resume
-            resume_sections = self._identify_sections(resume_text)
+            # Identify sections in resume unless the extractor already mapped them
+            if not resume_sections:
+                resume_sections = self._identify_sections(resume_text)
+            timer.mark('identify_sections')
             
             # Process job description to extract key elements
             jd_elements = self._process_job_description(job_description)
+            timer.mark('process_job_description')
             
             # Extract ngrams from both texts
-            resume_ngrams = self._extract_ngrams(resume_text)
-            job_ngrams = self._extract_ngrams(job_description)
+            resume_ngrams = self._extract_ngrams(resume_text, timer)
+            job_ngrams = self._extract_ngrams(job_description, timer)
+            timer.mark('extract_ngrams')
             
             # Perform matching and scoring
             match_results = self._perform_matching(resume_text, resume_sections, resume_ngrams, 
                                                   job_description, jd_elements, job_ngrams)
+            timer.mark('perform_matching')
             
             # Calculate section-based scores
             section_scores = self._calculate_section_scores(resume_sections, jd_elements)
+            timer.mark('calculate_section_scores')
             
             # Calculate overall score with calibration
             overall_score = self._calculate_calibrated_score(match_results, section_scores)
+            confidence = self._calculate_confidence(match_results)
+            timer.mark('calculate_score')
+            
+            suggestions = self._generate_suggestions(match_results, section_scores, jd_elements)
+            timer.mark('generate_suggestions')
             
             # Prepare result with comprehensive details
-            return {
+            result = {
                 'score': round(overall_score, 2),
-                'confidence': self._calculate_confidence(match_results),
+                'confidence': confidence,
                 'matching_keywords': match_results['top_matching_keywords'],
                 'missing_keywords': match_results['top_missing_keywords'],
                 'section_scores': section_scores,
                 'job_type': job_type,
                 'keyword_density': match_results['keyword_density'],
-                'suggestions': self._generate_suggestions(match_results, section_scores, jd_elements)
+                'suggestions': suggestions
             }
             
+            if timer.enabled:
+                timer.count('resume_ngrams', len(resume_ngrams))
+                timer.count('job_ngrams', len(job_ngrams))
+                timer.count('job_keywords', len(jd_elements['keywords']))
+                timer.count('matched_keywords', match_results['matched_job_keywords'])
+                ANALYSIS_STATS.record(timer)
+                if debug:
+                    result['timings'] = timer.as_dict()
+            return result
+            
         except Exception as e:
             logger.error(f"Error in enhanced analysis: {str(e)}")
             return self._empty_result()
@@ -492,12 +585,13 @@ class EnhancedATSAnalyzer:
             all_skills.update(skills)
         return all_skills
     
-    def _extract_ngrams(self, text):
-        """Extract n-grams from text with their frequencies"""
+    def _extract_ngrams(self, text, timer=NULL_TIMER):
+        """Extract n-grams from text with their frequencies, counting tokens on the given timer"""
         result = defaultdict(int)
         
         # Convert to lowercase and tokenize
         tokens = self._process_text(text.lower())
+        timer.count('tokens', len(tokens))
         
         # Extract n-grams of different sizes
         for n in range(1, self.max_ngram_size + 1):
@@ -818,13 +912,13 @@ class EnhancedATSAnalyzer:
 class ATSAnalyzer(EnhancedATSAnalyzer):
     """Legacy class that maintains the original interface while using the enhanced implementation"""
     
-    def analyze(self, resume_text, job_description):
+    def analyze(self, resume_text, job_description, resume_sections=None, debug=False):
         """
         Analyze resume against job description using the enhanced analyzer
         but return results in the original format for backward compatibility
         """
         # Get the enhanced analysis
-        enhanced_result = super().analyze(resume_text, job_description)
+        enhanced_result = super().analyze(resume_text, job_description, resume_sections, debug=debug)
         
         # Convert to original format
         legacy_result = {
@@ -832,5 +926,7 @@ class ATSAnalyzer(EnhancedATSAnalyzer):
             'matching_keywords': enhanced_result['matching_keywords'][:10],  # Keep only top 10
             'missing_keywords': enhanced_result['missing_keywords'][:10]  # Keep only top 10
         }
+        if 'timings' in enhanced_result:
+            legacy_result['timings'] = enhanced_result['timings']
         
         return legacy_result
\ No newline at end of file
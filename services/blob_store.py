@@ -0,0 +1,179 @@
+import os
+import io
+import mmap
+import hashlib
+import logging
+import tempfile
+from collections import Counter
+from flask import current_app
+from extensions import db
+from models import StoredBlob, CustomizedResume, ExportCache
+
+logger = logging.getLogger(__name__)
+
+class BlobStore:
+    """
+    Content-addressed store for original resume uploads and rendered exports
+
+    Files are kept on the instance volume under <root>/<hash[:2]>/<hash>, keyed
+    by the SHA-256 of their contents, so identical uploads are written once.
+    StoredBlob rows count the resumes and export cache entries referencing each
+    file; callers commit those changes together with the rows they belong to.
+    """
+
+    def __init__(self, root=None):
+        """
+        Initialize the blob store
+
+        Args:
+            root: Directory holding the blobs (default: BLOB_STORE_DIR config,
+                falling back to <instance_path>/blobs)
+        """
+        self._root = root
+
+    @property
+    def root(self):
+        if self._root:
+            return self._root
+        return current_app.config.get('BLOB_STORE_DIR') or os.path.join(current_app.instance_path, 'blobs')
+
+    @staticmethod
+    def hash_bytes(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, blob_hash):
+        """Filesystem path of a blob"""
+        return os.path.join(self.root, blob_hash[:2], blob_hash)
+
+    def write(self, data):
+        """
+        Write bytes to disk if they aren't stored yet, without touching reference counts
+
+        Returns:
+            The blob's SHA-256 hash
+        """
+        blob_hash = self.hash_bytes(data)
+        path = self.path_for(blob_hash)
+        if os.path.exists(path):
+            return blob_hash
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        logger.debug(f"Stored blob {blob_hash} ({len(data)} bytes)")
+        return blob_hash
+
+    def put(self, data):
+        """Store bytes and add a reference to them. Returns the blob hash."""
+        blob_hash = self.write(data)
+        StoredBlob.retain(blob_hash, len(data))
+        return blob_hash
+
+    def retain(self, blob_hash):
+        """
+        Add a reference to an already stored blob (e.g. a customization sharing its original's upload)
+
+        Only the StoredBlob row is touched, so a file missing from disk (a
+        partial restore, say) doesn't fail the request that shares it.
+        """
+        if StoredBlob.retain(blob_hash):
+            return
+        # No row at all (the counts have drifted); recreate it so collect_garbage keeps the file
+        try:
+            size = os.path.getsize(self.path_for(blob_hash))
+        except OSError:
+            size = 0
+        logger.warning(f"Blob {blob_hash} had no StoredBlob row; recreating it")
+        StoredBlob.retain(blob_hash, size)
+
+    def release(self, blob_hash):
+        """Drop a reference to a blob"""
+        StoredBlob.release(blob_hash)
+
+    def open(self, blob_hash):
+        """
+        Open a blob for reading through a read-only memory map
+
+        The returned object supports read()/seek()/close() and len(), so it can be
+        passed straight to send_file without copying the file into Python memory.
+
+        Raises:
+            FileNotFoundError: If the blob isn't on disk
+        """
+        with open(self.path_for(blob_hash), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap can't map empty files
+                return io.BytesIO(b'')
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def reconcile(self):
+        """
+        Recompute reference counts from CustomizedResume and ExportCache rows
+
+        Returns:
+            Number of StoredBlob rows whose count changed
+        """
+        actual = Counter()
+        for model in (CustomizedResume, ExportCache):
+            actual.update(dict(
+                db.session.query(model.blob_hash, db.func.count(model.id))
+                .filter(model.blob_hash.isnot(None))
+                .group_by(model.blob_hash)
+                .all()
+            ))
+        changed = 0
+        for blob in StoredBlob.query.all():
+            ref_count = actual.get(blob.hash, 0)
+            if blob.ref_count != ref_count:
+                blob.ref_count = ref_count
+                changed += 1
+        db.session.commit()
+        return changed
+
+    def collect_garbage(self):
+        """
+        Delete unreferenced blobs and any files on disk without a StoredBlob row
+
+        Meant to run outside the request path (e.g. at startup), like PDF cache eviction.
+
+        Returns:
+            Dict with deleted_count and reclaimed_bytes
+        """
+        deleted_count = 0
+        reclaimed_bytes = 0
+
+        for blob_hash, size in db.session.query(StoredBlob.hash, StoredBlob.size).filter(StoredBlob.ref_count <= 0).all():
+            # Re-check the count in the DELETE so a concurrent retain wins
+            removed = db.session.execute(
+                db.delete(StoredBlob).where(StoredBlob.hash == blob_hash, StoredBlob.ref_count <= 0)
+            ).rowcount
+            db.session.commit()
+            if removed and os.path.exists(self.path_for(blob_hash)):
+                os.unlink(self.path_for(blob_hash))
+                deleted_count += 1
+                reclaimed_bytes += size
+
+        if os.path.isdir(self.root):
+            known = {blob_hash for (blob_hash,) in db.session.query(StoredBlob.hash).all()}
+            for directory, _, filenames in os.walk(self.root):
+                for filename in filenames:
+                    if filename.startswith('.tmp-') or filename not in known:
+                        path = os.path.join(directory, filename)
+                        reclaimed_bytes += os.path.getsize(path)
+                        os.unlink(path)
+                        deleted_count += 1
+
+        logger.info(f"Blob garbage collection removed {deleted_count} files ({reclaimed_bytes} bytes)")
+        return {'deleted_count': deleted_count, 'reclaimed_bytes': reclaimed_bytes}
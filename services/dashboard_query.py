@@ -0,0 +1,130 @@
+"""
+Lightweight queries behind the user dashboard
+
+The listing only shows a job title/URL, a date, two scores and the feedback
+flags, so these queries load just those columns (everything else on
+CustomizedResume is deferred and raises if touched) and page with a keyset
+cursor on (created_at, id) instead of loading every resume the user owns.
+Summary statistics are aggregated in SQL.
+"""
+
+import logging
+from datetime import datetime
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import load_only
+from extensions import db
+from models import CustomizedResume, JobDescription
+from services.search_index import job_search_clause
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_PAGE_SIZE = 25
+
+# CustomizedResume columns the dashboard listing renders
+LISTING_COLUMNS = (
+    CustomizedResume.id,
+    CustomizedResume.created_at,
+    CustomizedResume.ats_score,
+    CustomizedResume.original_ats_score,
+    CustomizedResume.user_rating,
+    CustomizedResume.was_effective,
+    CustomizedResume.interview_secured,
+    CustomizedResume.job_secured,
+)
+
+
+def encode_cursor(created_at, resume_id):
+    """Opaque-ish cursor for the row after which the next page starts."""
+    return f"{created_at.isoformat()}_{resume_id}"
+
+
+def decode_cursor(cursor):
+    """Parse a cursor from encode_cursor. Returns None for missing or malformed values."""
+    if not cursor:
+        return None
+    try:
+        created_at, resume_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(created_at), int(resume_id)
+    except ValueError:
+        logger.warning(f"Ignoring malformed dashboard cursor: {cursor}")
+        return None
+
+
+def _filtered(query, user_id, search_query):
+    query = query.join(
+        JobDescription,
+        CustomizedResume.job_description_id == JobDescription.id
+    ).filter(
+        CustomizedResume.user_id == user_id
+    )
+    # Full-text index lookup instead of substring scans over every posting
+    search_clause = job_search_clause(search_query)
+    if search_clause is not None:
+        query = query.filter(search_clause)
+    return query
+
+
+def dashboard_page(user_id, search_query='', cursor=None, page_size=DASHBOARD_PAGE_SIZE):
+    """
+    One page of the user's resumes, newest first
+
+    Args:
+        user_id: Owner of the resumes
+        search_query: Optional text matched against the job search index (title, URL, description)
+        cursor: Cursor from a previous page's next_cursor (None for the first page)
+        page_size: Rows per page
+
+    Returns:
+        Tuple of (rows, next_cursor). Each row has a CustomizedResume with only
+        LISTING_COLUMNS loaded plus job_title and job_url; next_cursor is None
+        on the last page.
+    """
+    query = _filtered(
+        db.session.query(
+            CustomizedResume,
+            JobDescription.title.label('job_title'),
+            JobDescription.url.label('job_url')
+        ).options(load_only(*LISTING_COLUMNS, raiseload=True)),
+        user_id,
+        search_query
+    )
+
+    position = decode_cursor(cursor)
+    if position:
+        query = query.filter(tuple_(CustomizedResume.created_at, CustomizedResume.id) < tuple_(*position))
+
+    # Fetch one extra row to know whether another page follows
+    rows = query.order_by(
+        CustomizedResume.created_at.desc(),
+        CustomizedResume.id.desc()
+    ).limit(page_size + 1).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, next_cursor
+
+
+def dashboard_stats(user_id, search_query=''):
+    """
+    Resume count and average ATS score improvement, aggregated in the database
+
+    Resumes missing either score count as zero improvement.
+
+    Returns:
+        Dict with total_resumes and avg_improvement (rounded to one decimal)
+    """
+    improvement = func.coalesce(CustomizedResume.ats_score - CustomizedResume.original_ats_score, 0)
+    total_resumes, avg_improvement = _filtered(
+        db.session.query(func.count(CustomizedResume.id), func.avg(improvement)),
+        user_id,
+        search_query
+    ).one()
+
+    return {
+        'total_resumes': total_resumes,
+        'avg_improvement': round(float(avg_improvement or 0), 1)
+    }
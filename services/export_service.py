@@ -0,0 +1,134 @@
+import hashlib
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import ExportCache
+from services.blob_store import BlobStore
+from services.metrics import CACHE_REQUESTS
+from services.file_parser import FileParser
+from services.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever markdown_to_pdf/markdown_to_docx output changes so cached renders are replaced
+EXPORT_TEMPLATE_VERSION = 1
+
+EXPORT_FORMATS = ('pdf', 'docx')
+
+class ExportService:
+    """
+    Renders customized resumes to PDF/DOCX and caches the result
+
+    Rendered bytes are stored in the blob store and indexed by ExportCache on
+    (SHA-256 of the Markdown, format, EXPORT_TEMPLATE_VERSION), so a download
+    of unchanged content is a cache read. prerender() fills the cache in a
+    background thread right after a customization is saved.
+    """
+
+    RENDERERS = {
+        'pdf': FileParser.markdown_to_pdf,
+        'docx': FileParser.markdown_to_docx,
+    }
+
+    def __init__(self, blob_store=None, max_workers=1):
+        """
+        Initialize the export service
+
+        Args:
+            blob_store: BlobStore holding rendered files (default: a new BlobStore)
+            max_workers: Background threads used for pre-rendering (default: 1)
+        """
+        self.blob_store = blob_store or BlobStore()
+        self.max_workers = max_workers
+        self._executor = None
+
+    @staticmethod
+    def content_hash(markdown_content):
+        return hashlib.sha256(markdown_content.encode('utf-8')).hexdigest()
+
+    @traced()
+    def get_or_render(self, markdown_content, export_format):
+        """
+        Return the blob hash of the rendered export, rendering it on a cache miss
+
+        Raises:
+            ValueError: If export_format isn't supported
+        """
+        if export_format not in self.RENDERERS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        content_hash = self.content_hash(markdown_content)
+        entry = ExportCache.lookup(content_hash, export_format, EXPORT_TEMPLATE_VERSION)
+        if entry:
+            entry.hit_count += 1
+            entry.last_accessed = datetime.utcnow()
+            db.session.commit()
+            CACHE_REQUESTS.inc(cache='export', result='hit')
+            logger.debug(f"Export cache hit: {export_format} {content_hash[:12]}")
+            return entry.blob_hash
+
+        CACHE_REQUESTS.inc(cache='export', result='miss')
+        logger.debug(f"Export cache miss: {export_format} {content_hash[:12]}")
+        rendered = self.RENDERERS[export_format](markdown_content)
+
+        try:
+            blob_hash = self.blob_store.put(rendered)
+            db.session.add(ExportCache(
+                content_hash=content_hash,
+                export_format=export_format,
+                template_version=EXPORT_TEMPLATE_VERSION,
+                blob_hash=blob_hash,
+                size=len(rendered)
+            ))
+            db.session.commit()
+        except IntegrityError:
+            # Another worker rendered the same content first
+            db.session.rollback()
+            entry = ExportCache.lookup(content_hash, export_format, EXPORT_TEMPLATE_VERSION)
+            if not entry:
+                raise
+            blob_hash = entry.blob_hash
+
+        return blob_hash
+
+    def open_export(self, markdown_content, export_format):
+        """
+        Open the rendered export for streaming
+
+        Returns:
+            Tuple of (memory-mapped file, blob hash)
+        """
+        blob_hash = self.get_or_render(markdown_content, export_format)
+        try:
+            return self.blob_store.open(blob_hash), blob_hash
+        except FileNotFoundError:
+            # The file was collected out from under the cache entry; render it again
+            logger.warning(f"Export blob {blob_hash} missing, re-rendering")
+            self.blob_store.release(blob_hash)
+            db.session.execute(db.delete(ExportCache).where(ExportCache.blob_hash == blob_hash))
+            db.session.commit()
+            blob_hash = self.get_or_render(markdown_content, export_format)
+            return self.blob_store.open(blob_hash), blob_hash
+
+    def prerender(self, markdown_content, formats=EXPORT_FORMATS):
+        """
+        Render the given formats into the cache in a background thread
+
+        Must be called inside an app context; returns the Future.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='export-prerender')
+        app = current_app._get_current_object()
+        return self._executor.submit(self._prerender, app, markdown_content, formats)
+
+    def _prerender(self, app, markdown_content, formats):
+        with app.app_context():
+            for export_format in formats:
+                try:
+                    self.get_or_render(markdown_content, export_format)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Error pre-rendering {export_format} export: {str(e)}")
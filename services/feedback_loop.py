@@ -2,14 +2,19 @@ import os
 import json
 import logging
 from datetime import datetime, timedelta
-from anthropic import Anthropic
+from services.metrics import MeteredAnthropic
+from services.lazy_imports import LazyObject, lazy_module
 from sqlalchemy import func
 from models import CustomizedResume, CustomizationEvaluation, OptimizationSuggestion, ABTest
 from services.ats_analyzer import EnhancedATSAnalyzer
 from extensions import db
+from services.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Imported on first use (see services.lazy_imports)
+anthropic = lazy_module('anthropic')
+
 class FeedbackLoop:
     """
     Implements the continuous feedback loop for resume customization improvement
@@ -21,9 +26,12 @@ class FeedbackLoop:
         if not self.anthropic_key:
             raise ValueError('ANTHROPIC_API_KEY environment variable must be set')
         
-        self.client = Anthropic(api_key=self.anthropic_key)
+        self.client = MeteredAnthropic(
+            LazyObject(lambda: anthropic.Anthropic(api_key=self.anthropic_key)), 'feedback_loop'
+        )
         self.model = "claude-3-7-sonnet-20250219"
     
+    @traced()
     def evaluate_customization(self, resume_id):
         """
         Evaluate a specific resume customization and generate insights
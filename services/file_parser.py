@@ -1,14 +1,61 @@
 import os
 import io
 import filetype  # Replace magic with filetype
-import docx
 import logging
+from functools import lru_cache
 from werkzeug.utils import secure_filename
-from docx.opc.exceptions import PackageNotFoundError
 from services.pdf_extractor import PDFExtractor  # Import the new PDFExtractor class
+from services.tracing import traced
+from services.lazy_imports import lazy_module
 
 logger = logging.getLogger(__name__)
 
+# python-docx, imported on first use (see services.lazy_imports)
+docx = lazy_module('docx')
+
+@lru_cache(maxsize=1)
+def get_pdf_styles():
+    """
+    ReportLab stylesheet used by FileParser.markdown_to_pdf
+
+    Built once per process; getSampleStyleSheet() and the custom styles
+    are the same for every document.
+    """
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    
+    styles = getSampleStyleSheet()
+
+    # Create custom styles for markdown elements
+    styles.add(ParagraphStyle(
+        name='CustomHeading1',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=12
+    ))
+    styles.add(ParagraphStyle(
+        name='CustomHeading2',
+        parent=styles['Heading2'],
+        fontSize=16,
+        spaceAfter=10
+    ))
+    styles.add(ParagraphStyle(
+        name='CustomHeading3',
+        parent=styles['Heading3'],
+        fontSize=14,
+        spaceAfter=8
+    ))
+    styles.add(ParagraphStyle(
+        name='CustomBulletPoint',
+        parent=styles['Normal'],
+        fontSize=12,
+        leftIndent=20,
+        firstLineIndent=0,
+        spaceBefore=2,
+        spaceAfter=2
+    ))
+    
+    return styles
+
 class FileParser:
     MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB in bytes
     ALLOWED_EXTENSIONS = {'md', 'docx', 'pdf'}
@@ -138,6 +185,36 @@ class FileParser:
             logger.error(f"Error parsing file: {str(e)}")
             raise Exception(f"Error parsing file: {str(e)}")
 
+    @traced()
+    def parse_with_sections(self, file):
+        """
+        Parse a file to markdown along with any section map produced during extraction
+        Returns a tuple of (markdown_content, section_map)
+        
+        Only PDFs get a precomputed section map (from layout-aware extraction);
+        other formats return None so the analyzer detects sections itself.
+        """
+        try:
+            filename = secure_filename(file.filename)
+            extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else None
+            
+            if extension != 'md':
+                file_content = file.read()
+                file.seek(0)
+                kind = filetype.guess(file_content)
+                
+                if kind and kind.mime == 'application/pdf':
+                    content, section_map = self.pdf_extractor.extract_with_sections(file_content)
+                    logger.debug(f"Parsed PDF content: {len(content)} chars, sections: {list(section_map.keys())}")
+                    return content, section_map
+        
+        except Exception as e:
+            logger.error(f"Error parsing file with sections: {str(e)}")
+            raise Exception(f"Error parsing file: {str(e)}")
+        
+        return self.parse_to_markdown(file), None
+
+    @traced()
     def parse_file_with_format(self, file):
         """
         Parse file to markdown for display but preserve original format for download
@@ -265,10 +342,8 @@ class FileParser:
         """
         try:
             from reportlab.lib.pagesizes import letter
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
             from reportlab.lib.units import inch
             from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-            from reportlab.lib.enums import TA_LEFT, TA_CENTER
             import io
             import re
             
@@ -285,37 +360,8 @@ class FileParser:
                 bottomMargin=72
             )
             
-            # Get the default styles
-            styles = getSampleStyleSheet()
-            
-            # Create custom styles for markdown elements
-            styles.add(ParagraphStyle(
-                name='CustomHeading1',
-                parent=styles['Heading1'],
-                fontSize=18,
-                spaceAfter=12
-            ))
-            styles.add(ParagraphStyle(
-                name='CustomHeading2',
-                parent=styles['Heading2'],
-                fontSize=16,
-                spaceAfter=10
-            ))
-            styles.add(ParagraphStyle(
-                name='CustomHeading3',
-                parent=styles['Heading3'],
-                fontSize=14,
-                spaceAfter=8
-            ))
-            styles.add(ParagraphStyle(
-                name='CustomBulletPoint',
-                parent=styles['Normal'],
-                fontSize=12,
-                leftIndent=20,
-                firstLineIndent=0,
-                spaceBefore=2,
-                spaceAfter=2
-            ))
+            # Stylesheet is built once per process
+            styles = get_pdf_styles()
             
             # Process markdown content and build flowables for the document
             flowables = []
@@ -0,0 +1,116 @@
+"""
+Liveness and readiness checks for the Fly proxy and autoscaler
+
+/healthz answers as soon as the worker can run a view and does no I/O.
+/readyz runs the checks below and answers 503 if any fails:
+
+    database    SELECT 1 on a pooled connection
+    nltk        The tokenizer and stop word data the ATS analyzer loads
+                (nltk.data.find only; nothing is downloaded)
+    services    The shared analysis services exist and have their API keys,
+                and the deferred libraries (see services/lazy_imports.py) are
+                installed. find_spec locates them without importing them, and
+                no external API is called.
+
+Each worker caches the readiness result for READINESS_CACHE_SECONDS, and
+probes arriving while the checks run wait for that result instead of running
+the checks again, so frequent probing costs one cached lookup per request.
+"""
+
+import time
+import logging
+import threading
+import importlib.util
+from sqlalchemy import text
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Probe paths, which don't get a session, a trace or a profile
+PROBE_PATHS = ('/healthz', '/readyz')
+
+# API key attributes a shared service must have set to be usable
+API_KEY_ATTRIBUTES = ('anthropic_key', 'jina_api_key')
+
+
+def check_database():
+    with db.engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    return db.engine.dialect.name
+
+
+def check_nltk():
+    import nltk
+    from services.ats_analyzer import NLTK_RESOURCES
+    for path, _ in NLTK_RESOURCES:
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            # NLTK's own message is a multi-line banner listing every search path
+            raise LookupError(f"{path} not found (set NLTK_DATA)") from None
+    return f"{len(NLTK_RESOURCES)} resources"
+
+
+def check_services(services):
+    """Every registered service exists with its API key, and every deferred library is installed"""
+    from services.lazy_imports import DEFERRED
+    for name, service in services.items():
+        if service is None:
+            raise RuntimeError(f"{name} is not initialized")
+        for attribute in API_KEY_ATTRIBUTES:
+            if hasattr(service, attribute) and not getattr(service, attribute):
+                raise RuntimeError(f"{name} has no {attribute}")
+    missing = [name for name in DEFERRED if importlib.util.find_spec(name) is None]
+    if missing:
+        raise RuntimeError(f"Not installed: {', '.join(sorted(missing))}")
+    return f"{len(services)} services"
+
+
+class ReadinessProbe:
+    """Runs the readiness checks at most once per `ttl` seconds and caches the result"""
+
+    def __init__(self, checks, ttl=5.0):
+        self.checks = checks
+        self.ttl = ttl
+        self._result = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _run(self):
+        results = {}
+        for name, check in self.checks.items():
+            start = time.perf_counter()
+            try:
+                detail = check()
+                results[name] = {'ok': True, 'detail': detail}
+            except Exception as e:
+                logger.warning(f"Readiness check {name} failed: {str(e)}")
+                results[name] = {'ok': False, 'detail': f"{type(e).__name__}: {str(e)}"}
+            results[name]['ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return {'ready': all(result['ok'] for result in results.values()), 'checks': results}
+
+    def status(self):
+        """The latest result, re-running the checks when it is older than ttl"""
+        with self._lock:
+            now = time.monotonic()
+            if self._result is None or now - self._checked_at >= self.ttl:
+                self._result = self._run()
+                self._checked_at = now
+            return dict(self._result, age=round(now - self._checked_at, 2))
+
+
+def init_health(app, services=None):
+    """
+    Set up the readiness probe for an app
+
+    Config:
+        READINESS_CACHE_SECONDS: How long a readiness result is reused
+    """
+    services = services or {}
+    probe = ReadinessProbe({
+        'database': check_database,
+        'nltk': check_nltk,
+        'services': lambda: check_services(services),
+    }, ttl=app.config.get('READINESS_CACHE_SECONDS', 5.0))
+    app.extensions['health'] = probe
+    return probe
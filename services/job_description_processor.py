@@ -2,6 +2,9 @@ import requests
 import logging
 import re
 import os
+import time
+from services.metrics import JINA_FETCH_SECONDS
+from services.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +17,10 @@ class JobDescriptionProcessor:
         self.headers = {
             'Authorization': f'Bearer {self.jina_api_key}'
         }
+        # Reader endpoint; the load tests point this at a local stand-in
+        self.reader_url = os.environ.get('JINA_READER_URL', 'https://r.jina.ai/')
 
+    @traced()
     def extract_from_url(self, url):
         """
         Extract job description from a given URL using Jina Reader API
@@ -24,11 +30,17 @@ class JobDescriptionProcessor:
 
             # Use Jina API to extract content
             logger.debug(f"Using Jina API to extract content from: {url}")
-            jina_url = f"https://r.jina.ai/{url}"
+            jina_url = f"{self.reader_url}{url}"
             logger.debug(f"Sending request to Jina API with URL: {jina_url}")
 
-            response = requests.get(jina_url, headers=self.headers, timeout=30)
-            response.raise_for_status()
+            start = time.perf_counter()
+            outcome = 'error'
+            try:
+                response = requests.get(jina_url, headers=self.headers, timeout=30)
+                response.raise_for_status()
+                outcome = 'ok'
+            finally:
+                JINA_FETCH_SECONDS.observe(time.perf_counter() - start, outcome=outcome)
 
             content = response.text
             logger.debug(f"Received response from Jina API: {content[:200]}...")
@@ -0,0 +1,106 @@
+"""
+Deferred imports for libraries that are slow to load
+
+PyMuPDF, python-docx and the Anthropic SDK together account for most of the
+time it takes to import the app, and every gunicorn worker paid it at boot,
+even though a page view needs none of them. Services bind them with
+lazy_module() instead of importing them, so the import happens on first
+attribute access (the first upload, export or LLM call) and a cold start
+only loads what serving a page needs.
+
+COLD_START_MODE selects when the deferred modules are loaded:
+    lazy        On first use (default)
+    background  In a daemon thread once the app has been created, so boot
+                doesn't wait for them and usually neither does the first upload
+    eager       While the app is created, as plain imports would
+"""
+
+import time
+import logging
+import importlib
+import threading
+
+logger = logging.getLogger(__name__)
+
+COLD_START_MODES = ('lazy', 'background', 'eager')
+
+# Every module bound with lazy_module(), by name
+DEFERRED = {}
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access"""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with self._lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    self.__dict__['_module'] = module
+                    logger.info(f"Imported {self._name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return module
+
+    @property
+    def loaded(self):
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'deferred'
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_module(name):
+    """A LazyModule for `name`, shared by every caller"""
+    module = DEFERRED.get(name)
+    if module is None:
+        module = DEFERRED.setdefault(name, LazyModule(name))
+    return module
+
+
+class LazyObject:
+    """Builds an object with factory() on first attribute access, e.g. an SDK client"""
+
+    def __init__(self, factory):
+        self.__dict__['_factory'] = factory
+        self.__dict__['_target'] = None
+
+    def __getattr__(self, name):
+        target = self.__dict__['_target']
+        if target is None:
+            target = self.__dict__['_target'] = self._factory()
+        return getattr(target, name)
+
+
+def load_deferred():
+    """Import every deferred module now; failures are logged and left to surface on use"""
+    for name, module in list(DEFERRED.items()):
+        try:
+            module._load()
+        except ImportError as e:
+            logger.warning(f"Could not import {name}: {str(e)}")
+
+
+def apply_cold_start_mode(mode):
+    """
+    Load the deferred modules according to COLD_START_MODE
+
+    Raises:
+        ValueError: If mode is not one of COLD_START_MODES
+    """
+    if mode not in COLD_START_MODES:
+        raise ValueError(f"Unknown COLD_START_MODE: {mode}")
+    if mode == 'eager':
+        load_deferred()
+    elif mode == 'background':
+        threading.Thread(target=load_deferred, name='load-deferred-modules', daemon=True).start()
@@ -0,0 +1,287 @@
+"""
+Per-request memory tracking and RSS-based worker recycling
+
+With MEMORY_TRACKING=true, tracemalloc runs in every worker. Each request's
+peak is the most memory traced while it ran, above what was already allocated
+when it started, and it is recorded in the
+resumerocket_request_peak_memory_bytes histogram. When a request peaks above
+MEMORY_REPORT_THRESHOLD_MB, the allocation sites that grew the most since
+tracking began are appended to a log shared by the workers and shown at
+/admin/memory. That log survives the worker being recycled. The sites come
+from a snapshot taken near the request's peak (see RequestMemoryTracker),
+so they show what was holding memory then: upload bytes, PyMuPDF documents,
+render buffers. tracemalloc's peak is process-wide, so the
+figures are per request only with sync workers (the default); threaded
+workers see the peaks of concurrent requests combined.
+
+tracemalloc slows allocation-heavy code noticeably, so tracking is off by
+default and meant to be switched on while investigating.
+
+WORKER_RSS_CEILING_MB is enforced separately, and always: gunicorn.conf.py
+checks the worker's resident set size after each response has been sent.
+Once it is over the ceiling, the worker finishes and gunicorn starts a fresh
+one, instead of the kernel's OOM killer taking it down mid-request.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import tracemalloc
+from datetime import datetime
+from flask import g, request
+from services.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Upper bounds in bytes for per-request peaks
+MEMORY_BUCKETS = tuple(size * MB for size in (1, 2, 5, 10, 25, 50, 100, 250, 500))
+
+# Allocation sites recorded for a heavy request
+TOP_SITES = 10
+
+# Heavy-request log size at which it is rotated to <log>.1
+MAX_LOG_BYTES = 1024 * 1024
+
+REQUEST_PEAK_MEMORY_BYTES = REGISTRY.histogram(
+    'resumerocket_request_peak_memory_bytes', 'Peak traced memory above the starting level, per request',
+    ['endpoint'], buckets=MEMORY_BUCKETS)
+
+
+def current_rss():
+    """Resident set size of this process in bytes (None where /proc isn't available)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def rss_over_ceiling(ceiling_mb):
+    """The current RSS in bytes if it is above ceiling_mb (a falsy ceiling disables the check), else None"""
+    if not ceiling_mb:
+        return None
+    rss = current_rss()
+    return rss if rss is not None and rss > ceiling_mb * MB else None
+
+
+def _worker_rss():
+    """Gauge of each worker's RSS; the pid label keeps workers apart when snapshots are merged"""
+    rss = current_rss()
+    return {'resumerocket_worker_rss_bytes': {
+        'type': 'gauge',
+        'help': 'Resident set size of the worker process',
+        'samples': [[{'pid': os.getpid()}, rss]] if rss is not None else [],
+    }}
+
+REGISTRY.collectors.append(_worker_rss)
+
+
+class MemoryLog:
+    """Append-only JSON lines log of heavy requests, shared by the workers"""
+
+    def __init__(self, path, max_bytes=MAX_LOG_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def append(self, entry):
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            try:
+                if os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, self.path + '.1')
+            except OSError:
+                pass
+            # One write per entry in append mode, so lines from several workers don't interleave
+            with open(self.path, 'a') as f:
+                f.write(line)
+
+    def recent(self, limit=100):
+        """Newest entries first"""
+        entries = []
+        for path in (self.path, self.path + '.1'):
+            try:
+                with open(path) as f:
+                    lines = f.readlines()
+            except OSError:
+                continue
+            for line in reversed(lines):
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+                if len(entries) >= limit:
+                    return entries
+        return entries
+
+
+class RequestMemory:
+    """Memory state of one request: where it started, and a snapshot taken near its peak"""
+
+    __slots__ = ('start', 'snapshot', 'snapshot_at')
+
+    def __init__(self, start):
+        self.start = start
+        self.snapshot = None
+        self.snapshot_at = 0
+
+
+class RequestMemoryTracker:
+    """
+    Measures each request's peak with tracemalloc and finds the sites behind heavy ones
+
+    Most of a request's memory is gone by the time it returns, so a watcher
+    thread checks the traced size every SAMPLE_INTERVAL seconds. Once a
+    request is over the threshold, it takes a snapshot, and another each time
+    the request grows by a further quarter, so the last snapshot is close to
+    the peak. Snapshots hold the GIL while they are taken and cost
+    milliseconds, so only heavy requests pay for them.
+    """
+
+    SAMPLE_INTERVAL = 0.05
+
+    def __init__(self, threshold_bytes, frames=1, top_sites=TOP_SITES):
+        self.threshold_bytes = threshold_bytes
+        self.frames = frames
+        self.top_sites = top_sites
+        self._baseline = None
+        self._active = set()
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def begin(self):
+        """Reset the peak and start watching a request"""
+        if self._baseline is None:
+            # Compare heavy requests with the worker as it was before serving anything
+            self._baseline = self._snapshot()
+        tracemalloc.reset_peak()
+        state = RequestMemory(tracemalloc.get_traced_memory()[0])
+        with self._lock:
+            self._active.add(state)
+            if self._watcher is None or not self._watcher.is_alive():
+                self._watcher = threading.Thread(target=self._watch, name='memory-watcher', daemon=True)
+                self._watcher.start()
+        return state
+
+    def end(self, state):
+        """Stop watching a request; returns the bytes its peak rose above where it started"""
+        with self._lock:
+            self._active.discard(state)
+        return max(tracemalloc.get_traced_memory()[1] - state.start, 0)
+
+    def _watch(self):
+        while tracemalloc.is_tracing():
+            time.sleep(self.SAMPLE_INTERVAL)
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                continue
+            current = tracemalloc.get_traced_memory()[0]
+            for state in active:
+                above = current - state.start
+                if above >= self.threshold_bytes and above > state.snapshot_at * 1.25:
+                    state.snapshot = self._snapshot()
+                    state.snapshot_at = above
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    def sites(self, state):
+        """Allocation sites that grew the most since the baseline, near the request's peak if it was caught"""
+        snapshot = state.snapshot or self._snapshot()
+        stats = snapshot.compare_to(self._baseline, 'traceback' if self.frames > 1 else 'lineno')
+        grown = sorted((stat for stat in stats if stat.size_diff > 0), key=lambda stat: stat.size_diff, reverse=True)
+        return [{
+            'site': ' <- '.join(f"{frame.filename}:{frame.lineno}" for frame in stat.traceback),
+            'size_diff': stat.size_diff,
+            'count_diff': stat.count_diff,
+        } for stat in grown[:self.top_sites]]
+
+
+class MemoryMonitor:
+    """Per-app memory state: the tracker (when enabled), the heavy-request log and the RSS ceiling"""
+
+    def __init__(self, log, tracker=None, threshold_bytes=50 * MB, rss_ceiling_mb=None):
+        self.log = log
+        self.tracker = tracker
+        self.threshold_bytes = threshold_bytes
+        self.rss_ceiling_mb = rss_ceiling_mb
+
+    @property
+    def tracking(self):
+        return self.tracker is not None
+
+    def record(self, state, status):
+        """Record one request's peak; heavy requests also get their allocation sites logged"""
+        peak = self.tracker.end(state)
+        endpoint = request.endpoint or 'unmatched'
+        REQUEST_PEAK_MEMORY_BYTES.observe(peak, endpoint=endpoint)
+        if peak < self.threshold_bytes:
+            return None
+        entry = {
+            'recorded_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'pid': os.getpid(),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': endpoint,
+            'status': status,
+            'peak_bytes': peak,
+            'rss_bytes': current_rss(),
+            'near_peak': state.snapshot is not None,
+            'sites': self.tracker.sites(state),
+        }
+        try:
+            self.log.append(entry)
+        except OSError as e:
+            logger.warning(f"Could not write memory log: {str(e)}")
+        logger.warning(f"{request.method} {request.path} peaked at {peak / MB:.1f} MB above its starting level")
+        return entry
+
+
+def init_memory_tracking(app):
+    """
+    Install the per-request memory hooks for an app
+
+    Config:
+        MEMORY_TRACKING: Trace allocations with tracemalloc (default: off)
+        MEMORY_TRACE_FRAMES: Stack frames kept per allocation (1 groups sites by line)
+        MEMORY_REPORT_THRESHOLD_MB: Peak above which a request's sites are logged
+        MEMORY_LOG: Heavy-request log (default: <instance_path>/memory/heavy_requests.jsonl)
+        WORKER_RSS_CEILING_MB: RSS at which gunicorn.conf.py recycles a worker (shown at /admin/memory)
+    """
+    log = MemoryLog(app.config.get('MEMORY_LOG') or os.path.join(app.instance_path, 'memory', 'heavy_requests.jsonl'))
+    threshold_bytes = (app.config.get('MEMORY_REPORT_THRESHOLD_MB') or 50) * MB
+    tracker = None
+    if app.config.get('MEMORY_TRACKING'):
+        tracker = RequestMemoryTracker(threshold_bytes, frames=app.config.get('MEMORY_TRACE_FRAMES') or 1)
+        tracker.start()
+    monitor = MemoryMonitor(log, tracker, threshold_bytes, rss_ceiling_mb=app.config.get('WORKER_RSS_CEILING_MB'))
+    app.extensions['memory'] = monitor
+    if tracker is None:
+        return monitor
+
+    @app.before_request
+    def start_memory_tracking():
+        g.request_memory = tracker.begin()
+
+    @app.after_request
+    def record_memory_peak(response):
+        if 'request_memory' in g:
+            monitor.record(g.pop('request_memory'), response.status_code)
+        return response
+
+    logger.info(f"Memory tracking enabled (reporting requests over {threshold_bytes / MB:.0f} MB)")
+    return monitor
@@ -0,0 +1,428 @@
+"""
+Application metrics in Prometheus text format
+
+A small built-in registry of counters and histograms. Request latency per
+endpoint and per-request SQLAlchemy query counts/durations come from Flask
+and engine event hooks installed by init_metrics(), so handlers need no
+changes. The service layer records Anthropic latency and token usage (via
+MeteredAnthropic), Jina fetch latency, PDF extraction time and cache
+hits/misses. ATS analysis stage timings (services.stage_timing) are included
+as well.
+
+gunicorn runs several workers, each with its own registry. Every worker
+writes a snapshot to METRICS_DIR at most every METRICS_FLUSH_INTERVAL
+seconds, and /metrics merges the snapshots of all live workers, so a scrape
+sees the whole machine whichever worker answers it.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from services.stage_timing import Histogram, ANALYSIS_STATS, DURATION_BUCKETS
+from services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds for external calls (LLM, Jina), which take far longer than local work
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Seconds between snapshot writes in each worker
+FLUSH_INTERVAL = 5.0
+
+def _label_key(labelnames, labels):
+    missing = set(labelnames) ^ set(labels)
+    if missing:
+        raise ValueError(f"Expected labels {labelnames}, got {sorted(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+class Metric:
+    """A counter or histogram family, with one child per label combination"""
+
+    def __init__(self, name, documentation, labelnames=(), kind='counter', buckets=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        self.buckets = buckets
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _child(self, labels):
+        key = _label_key(self.labelnames, labels)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, Histogram(self.buckets) if self.kind == 'histogram' else [0.0])
+        return child
+
+    def inc(self, amount=1, **labels):
+        """Add to a counter"""
+        child = self._child(labels)
+        with self._lock:
+            child[0] += amount
+
+    def observe(self, value, **labels):
+        """Record a histogram observation"""
+        self._child(labels).observe(value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        samples = []
+        for key, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, key))
+            samples.append([labels, child.snapshot() if self.kind == 'histogram' else child[0]])
+        return {'type': self.kind, 'help': self.documentation, 'samples': samples}
+
+
+class MetricsRegistry:
+    """Holds the metrics of one process and renders them"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Metric(name, documentation, labelnames, 'counter'))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        return self._register(Metric(name, documentation, labelnames, 'histogram', buckets))
+
+    def snapshot(self):
+        """JSON-serialisable state of every metric, including collectors"""
+        families = {name: metric.snapshot() for name, metric in self.metrics.items()}
+        for collector in self.collectors:
+            families.update(collector())
+        return families
+
+
+def merge_snapshots(snapshots):
+    """Sum snapshots from several processes: counters add, histogram buckets add"""
+    merged = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(name, {'type': family['type'], 'help': family['help'], 'samples': {}})
+            for labels, value in family['samples']:
+                key = tuple(sorted(labels.items()))
+                current = target['samples'].get(key)
+                if current is None:
+                    target['samples'][key] = value
+                elif family['type'] == 'histogram':
+                    target['samples'][key] = {
+                        'buckets': [[bound, a + b] for (bound, a), (_, b) in zip(current['buckets'], value['buckets'])],
+                        'count': current['count'] + value['count'],
+                        'sum': current['sum'] + value['sum'],
+                    }
+                else:
+                    target['samples'][key] = current + value
+    for family in merged.values():
+        family['samples'] = [[dict(key), value] for key, value in family['samples'].items()]
+    return merged
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def cache_hit_ratios(families):
+    """Gauge family of hits / (hits + misses) per cache, from the cache request counter"""
+    totals = {}
+    for labels, value in families.get(CACHE_REQUESTS.name, {}).get('samples', []):
+        hits, requests = totals.get(labels['cache'], (0, 0))
+        totals[labels['cache']] = (hits + (value if labels['result'] == 'hit' else 0), requests + value)
+    return {
+        'type': 'gauge',
+        'help': 'Fraction of cache lookups that were hits',
+        'samples': [[{'cache': cache}, hits / requests] for cache, (hits, requests) in sorted(totals.items()) if requests],
+    }
+
+
+def render(families):
+    """Prometheus text exposition format (version 0.0.4)"""
+    families = dict(families)
+    families['resumerocket_cache_hit_ratio'] = cache_hit_ratios(families)
+    lines = []
+    for name in sorted(families):
+        family = families[name]
+        if not family['samples']:
+            continue
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for labels, value in family['samples']:
+            if family['type'] == 'histogram':
+                for bound, count in value['buckets']:
+                    bucket_labels = dict(labels, le=_format_bound(bound))
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+class SnapshotDirectory:
+    """Per-worker snapshot files, merged when /metrics is scraped"""
+
+    def __init__(self, directory, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._next_flush = 0
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f"{pid}.json")
+
+    def write(self, registry, force=False):
+        """Write this worker's snapshot, at most every flush_interval seconds unless forced"""
+        now = time.monotonic()
+        if not force and now < self._next_flush:
+            return
+        self._next_flush = now + self.flush_interval
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(registry.snapshot(), f)
+        os.replace(tmp_path, self._path(os.getpid()))
+
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def read_all(self):
+        """Snapshots of live workers; files left by exited workers are removed"""
+        snapshots = []
+        if not os.path.isdir(self.directory):
+            return snapshots
+        for entry in os.scandir(self.directory):
+            name, ext = os.path.splitext(entry.name)
+            if ext != '.json' or not name.isdigit():
+                continue
+            if not self._alive(int(name)):
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+                continue
+            try:
+                with open(entry.path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                logger.warning(f"Skipping unreadable metrics snapshot {entry.name}")
+        return snapshots
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'resumerocket_http_request_duration_seconds', 'Time to produce a response, per endpoint',
+    ['endpoint', 'method', 'status'])
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    'resumerocket_db_query_duration_seconds', 'SQL statement execution time, per endpoint',
+    ['endpoint'])
+DB_QUERIES_PER_REQUEST = REGISTRY.histogram(
+    'resumerocket_db_queries_per_request', 'SQL statements executed per request',
+    ['endpoint'], buckets=QUERY_COUNT_BUCKETS)
+DB_SECONDS_PER_REQUEST = REGISTRY.histogram(
+    'resumerocket_db_time_per_request_seconds', 'Total SQL time per request',
+    ['endpoint'])
+ANTHROPIC_REQUEST_SECONDS = REGISTRY.histogram(
+    'resumerocket_anthropic_request_duration_seconds', 'Anthropic API call latency, per call site',
+    ['call_site', 'model', 'outcome'], buckets=SLOW_BUCKETS)
+ANTHROPIC_TOKENS = REGISTRY.counter(
+    'resumerocket_anthropic_tokens_total', 'Anthropic tokens used, per call site',
+    ['call_site', 'model', 'kind'])
+JINA_FETCH_SECONDS = REGISTRY.histogram(
+    'resumerocket_jina_fetch_duration_seconds', 'Jina Reader fetch latency',
+    ['outcome'], buckets=SLOW_BUCKETS)
+PDF_EXTRACTION_SECONDS = REGISTRY.histogram(
+    'resumerocket_pdf_extraction_duration_seconds', 'PyMuPDF extraction time on cache misses',
+    ['mode'])
+CACHE_REQUESTS = REGISTRY.counter(
+    'resumerocket_cache_requests_total', 'Cache lookups by result',
+    ['cache', 'result'])
+
+
+def _analysis_stats():
+    """Expose the ATS analyzer's stage histograms"""
+    families = {}
+    for name, histograms, label, documentation in (
+        ('resumerocket_ats_stage_duration_seconds', ANALYSIS_STATS.stages, 'stage', 'ATS analysis time per stage'),
+        ('resumerocket_ats_analysis_size', ANALYSIS_STATS.counters, 'counter', 'Tokens, n-grams and keywords per ATS analysis'),
+    ):
+        families[name] = {
+            'type': 'histogram',
+            'help': documentation,
+            'samples': [[{label: key}, histogram.snapshot()] for key, histogram in sorted(histograms.items())],
+        }
+    return families
+
+REGISTRY.collectors.append(_analysis_stats)
+
+
+class _MeteredMessages:
+    def __init__(self, messages, service):
+        self._messages = messages
+        self._service = service
+
+    def create(self, **kwargs):
+        # Call site = service plus the calling method, e.g. resume_customizer.customize_resume
+        call_site = f"{self._service}.{sys._getframe(1).f_code.co_name}"
+        model = kwargs.get('model', 'unknown')
+        outcome = 'error'
+        start = time.perf_counter()
+        try:
+            with tracer.span(f"anthropic {call_site}", model=model) as span:
+                response = self._messages.create(**kwargs)
+                outcome = 'ok'
+                usage = getattr(response, 'usage', None)
+                for kind in ('input', 'output'):
+                    tokens = getattr(usage, f"{kind}_tokens", None)
+                    if isinstance(tokens, int):
+                        ANTHROPIC_TOKENS.inc(tokens, call_site=call_site, model=model, kind=kind)
+                        # Counted against the user's daily budget (services/rate_limit.py)
+                        if has_request_context() and 'llm_tokens' in g:
+                            g.llm_tokens += tokens
+                        if span is not None:
+                            span.set(**{f"{kind}_tokens": tokens})
+            return response
+        finally:
+            ANTHROPIC_REQUEST_SECONDS.observe(time.perf_counter() - start, call_site=call_site, model=model, outcome=outcome)
+
+    def __getattr__(self, name):
+        return getattr(self._messages, name)
+
+
+class MeteredAnthropic:
+    """Wraps an Anthropic client so messages.create records latency and token usage"""
+
+    def __init__(self, client, service):
+        self._client = client
+        self._service = service
+        self._messages = None
+
+    @property
+    def messages(self):
+        # Resolved on first use so a lazily built client isn't created at startup
+        if self._messages is None:
+            self._messages = _MeteredMessages(self._client.messages, self._service)
+        return self._messages
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def _current_endpoint():
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return 'background'
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    DB_QUERY_SECONDS.observe(elapsed, endpoint=_current_endpoint())
+    if has_request_context() and 'metrics_start' in g:
+        g.metrics_db_queries += 1
+        g.metrics_db_seconds += elapsed
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    starts = connection.info.get('metrics_query_start') if connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def init_metrics(app):
+    """
+    Install the request hooks and snapshot directory for an app
+
+    Config:
+        METRICS_DIR: Directory for per-worker snapshots (default: a
+            resumerocket-metrics folder in the system temp directory)
+        METRICS_FLUSH_INTERVAL: Seconds between snapshot writes
+    """
+    directory = app.config.get('METRICS_DIR') or os.path.join(tempfile.gettempdir(), 'resumerocket-metrics')
+    app.extensions['metrics'] = SnapshotDirectory(
+        directory, flush_interval=app.config.get('METRICS_FLUSH_INTERVAL', FLUSH_INTERVAL)
+    )
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_db_queries = 0
+        g.metrics_db_seconds = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        if 'metrics_start' not in g:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - g.metrics_start,
+                                     endpoint=endpoint, method=request.method, status=response.status_code)
+        DB_QUERIES_PER_REQUEST.observe(g.metrics_db_queries, endpoint=endpoint)
+        DB_SECONDS_PER_REQUEST.observe(g.metrics_db_seconds, endpoint=endpoint)
+        try:
+            app.extensions['metrics'].write(REGISTRY)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {str(e)}")
+        return response
+
+    logger.info(f"Metrics enabled (snapshots in {directory})")
+
+
+def render_all(app):
+    """Metrics for every live worker, in Prometheus text format"""
+    snapshots = app.extensions.get('metrics')
+    if snapshots is None:
+        return render(REGISTRY.snapshot())
+    snapshots.write(REGISTRY, force=True)
+    return render(merge_snapshots(snapshots.read_all()))
@@ -2,29 +2,44 @@ import os
 import io
 import logging
 import time
-from typing import Optional, Tuple
-import fitz  # PyMuPDF
+from collections import Counter
+from typing import Dict, Optional, Tuple
 from models import PDFCache
+from services.ats_analyzer import match_section_header
+from services.metrics import CACHE_REQUESTS, PDF_EXTRACTION_SECONDS
+from services.tracing import traced
+from services.lazy_imports import lazy_module
 
 logger = logging.getLogger(__name__)
 
+# PyMuPDF, imported on first use (see services.lazy_imports)
+fitz = lazy_module('fitz')
+
+# A line is treated as a heading when its font is at least this much larger than body text
+HEADING_SIZE_RATIO = 1.15
+# Longer lines are never headings, whatever their font
+MAX_HEADING_LENGTH = 60
+# PyMuPDF span flag for bold text
+BOLD_FLAG = 16
+
 class PDFExtractor:
     """
     Enhanced PDF extraction service using PyMuPDF (fitz) with caching support
     """
     
-    def __init__(self, use_cache=True):
+    def __init__(self, use_cache=True, layout_aware=False):
         """
         Initialize the PDF extractor
         
         Args:
             use_cache: Whether to use cache for PDF extraction (default: True)
+            layout_aware: Whether extract_text should emit Markdown headings from
+                font size/weight instead of flat text (default: False)
         """
         self.use_cache = use_cache
-        logger.info(f"Initialized enhanced PDF extractor with PyMuPDF (cache: {'enabled' if use_cache else 'disabled'})")
-        
-        # Periodically clean old cache entries (less than once per hour per instance)
-        self._last_cache_cleanup = 0
+        self.layout_aware = layout_aware
+        logger.info(f"Initialized enhanced PDF extractor with PyMuPDF (cache: {'enabled' if use_cache else 'disabled'}, "
+                    f"mode: {'layout' if layout_aware else 'text'})")
     
     def extract_text(self, pdf_bytes: bytes) -> str:
         """
@@ -36,34 +51,68 @@ class PDFExtractor:
         Returns:
             Extracted text as string
         """
+        if self.layout_aware:
+            text, _ = self.extract_with_sections(pdf_bytes)
+            return text
+        
+        text, _ = self._extract_cached(pdf_bytes, 'text')
+        return text
+    
+    def extract_with_sections(self, pdf_bytes: bytes) -> Tuple[str, Dict[str, str]]:
+        """
+        Extract Markdown text and a section map in one layout-aware pass, with caching
+        
+        Args:
+            pdf_bytes: PDF file content as bytes
+            
+        Returns:
+            Tuple of (markdown_text, section_map) where section_map has the same
+            shape as EnhancedATSAnalyzer._identify_sections output
+        """
+        text, section_map = self._extract_cached(pdf_bytes, 'layout')
+        return text, section_map or {}
+    
+    @traced()
+    def _extract_cached(self, pdf_bytes: bytes, extraction_mode: str) -> Tuple[str, Optional[Dict[str, str]]]:
+        """
+        Run the requested extraction mode, going through the PDF cache when enabled
+        
+        Returns:
+            Tuple of (extracted_text, section_map); section_map is None in text mode
+        """
         start_time = time.time()
         
         try:
-            # Clean cache periodically (once per hour)
-            self._maybe_clean_cache()
-            
             # Try to get from cache first if caching is enabled
             if self.use_cache:
-                cached_text = PDFCache.get_from_cache(pdf_bytes)
-                if cached_text:
+                cached = PDFCache.get_extraction_from_cache(pdf_bytes, extraction_mode)
+                if cached and cached[0]:
+                    CACHE_REQUESTS.inc(cache='pdf', result='hit')
                     elapsed = time.time() - start_time
-                    logger.info(f"Cache HIT! Retrieved PDF text from cache in {elapsed:.2f}s")
-                    return cached_text
+                    logger.info(f"Cache HIT! Retrieved PDF text ({extraction_mode} mode) from cache in {elapsed:.2f}s")
+                    return cached
                     
-                logger.debug("Cache MISS - Extracting PDF text using PyMuPDF")
+                CACHE_REQUESTS.inc(cache='pdf', result='miss')
+                logger.debug(f"Cache MISS - Extracting PDF text using PyMuPDF ({extraction_mode} mode)")
             else:
-                logger.debug("Cache disabled - Extracting PDF text using PyMuPDF")
+                logger.debug(f"Cache disabled - Extracting PDF text using PyMuPDF ({extraction_mode} mode)")
             
             # Not in cache or cache disabled, extract text
-            text, page_count = self._perform_extraction(pdf_bytes)
+            with PDF_EXTRACTION_SECONDS.time(mode=extraction_mode):
+                if extraction_mode == 'layout':
+                    text, section_map, page_count = self._perform_layout_extraction(pdf_bytes)
+                else:
+                    text, page_count = self._perform_extraction(pdf_bytes)
+                    section_map = None
             
             # Store in cache if enabled
             if self.use_cache and text:
-                PDFCache.add_to_cache(pdf_bytes, text, page_count)
+                PDFCache.add_to_cache(pdf_bytes, text, page_count,
+                                      section_map=section_map, extraction_mode=extraction_mode)
                 
             elapsed = time.time() - start_time
-            logger.info(f"PDF text extraction completed in {elapsed:.2f}s")
-            return text
+            logger.info(f"PDF text extraction ({extraction_mode} mode) completed in {elapsed:.2f}s")
+            return text, section_map
                 
         except Exception as e:
             logger.error(f"Error extracting PDF text: {str(e)}")
@@ -99,23 +148,96 @@ class PDFExtractor:
             
             logger.info(f"Successfully extracted text from {page_count} PDF pages using PyMuPDF")
             return content, page_count
-        
-    def _maybe_clean_cache(self):
+    
+    def _perform_layout_extraction(self, pdf_bytes: bytes) -> Tuple[str, Dict[str, str], int]:
         """
-        Periodically clean old cache entries (once per hour)
+        Extract Markdown with headings and a section map using PyMuPDF span data
+        
+        Headings are lines set noticeably larger than the body font. Bold or
+        ALL-CAPS lines at body size only count when they exactly name a known
+        resume section. Headings that name a resume section start a new entry
+        in the section map; everything before the first one goes to "unknown".
+        
+        Args:
+            pdf_bytes: PDF file content as bytes
+            
+        Returns:
+            Tuple of (markdown_text, section_map, page_count)
         """
-        if not self.use_cache:
-            return
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            page_count = len(doc)
             
-        current_time = time.time()
-        # Only clean up once per hour to avoid overhead
-        if current_time - self._last_cache_cleanup > 3600:  # 3600 seconds = 1 hour
-            try:
-                deleted_count = PDFCache.clean_old_entries()
-                if deleted_count > 0:
-                    logger.info(f"Cache cleanup: removed {deleted_count} old cache entries")
-                self._last_cache_cleanup = current_time
-            except Exception as e:
-                logger.warning(f"Cache cleanup failed: {str(e)}")
-                # Don't retry too soon
-                self._last_cache_cleanup = current_time - 3000 
\ No newline at end of file
+            # Collect (text, font_size, is_bold) per visual line, page by page
+            pages = []
+            for page in doc:
+                page_lines = []
+                for block in page.get_text("dict")["blocks"]:
+                    # Skip image blocks
+                    if block.get("type") != 0:
+                        continue
+                    for line in block["lines"]:
+                        spans = [span for span in line["spans"] if span["text"].strip()]
+                        if not spans:
+                            continue
+                        text = "".join(span["text"] for span in spans).strip()
+                        size = round(max(span["size"] for span in spans), 1)
+                        is_bold = all(span["flags"] & BOLD_FLAG or "bold" in span["font"].lower() for span in spans)
+                        page_lines.append((text, size, is_bold))
+                if page_lines:
+                    pages.append(page_lines)
+        
+        # Body size is the font size carrying the most characters
+        size_weights = Counter()
+        for page_lines in pages:
+            for text, size, _ in page_lines:
+                size_weights[size] += len(text)
+        body_size = size_weights.most_common(1)[0][0] if size_weights else 0
+        
+        # Larger fonts map to higher heading levels (capped at ###)
+        heading_sizes = sorted(
+            (size for size in size_weights if size >= body_size * HEADING_SIZE_RATIO),
+            reverse=True
+        )
+        heading_levels = {size: min(rank + 1, 3) for rank, size in enumerate(heading_sizes)}
+        
+        markdown_pages = []
+        section_lines = {}
+        current_section = "unknown"
+        
+        for page_lines in pages:
+            markdown_lines = []
+            for text, size, is_bold in page_lines:
+                level = None
+                section_name = None
+                
+                if len(text) <= MAX_HEADING_LENGTH:
+                    if size in heading_levels:
+                        level = heading_levels[size]
+                        section_name = match_section_header(text)
+                    elif (is_bold or text.isupper()) and match_section_header(text, exact=True):
+                        level = 2
+                        section_name = match_section_header(text, exact=True)
+                    elif is_bold:
+                        # Job titles, employers, degrees and the like
+                        level = 3
+                
+                if level:
+                    markdown_lines.append(f"{'#' * level} {text}")
+                else:
+                    markdown_lines.append(text)
+                
+                if section_name:
+                    current_section = section_name
+                    section_lines.setdefault(current_section, [])
+                else:
+                    section_lines.setdefault(current_section, []).append(text)
+            
+            markdown_pages.append("\n".join(markdown_lines))
+        
+        content = "\n\n".join(markdown_pages)
+        section_map = {
+            name: "\n".join(lines) for name, lines in section_lines.items() if lines
+        }
+        
+        logger.info(f"Layout-aware extraction found {len(section_map)} sections in {page_count} PDF pages")
+        return content, section_map, page_count
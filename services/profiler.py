@@ -0,0 +1,412 @@
+"""
+On-demand request profiling
+
+An admin arms the profiler with a path pattern, a request count and a mode
+from /admin/profiler. The next matching requests (across all workers) are
+profiled and saved to PROFILE_DIR:
+
+    sampling       A background thread samples the request thread's stack
+                   every few milliseconds. Saved as collapsed stacks
+                   ("a;b;c 12" per line), the input format of flamegraph.pl,
+                   speedscope and similar viewers.
+    deterministic  cProfile records every function call. Saved as a pstats
+                   file for `python -m pstats` or snakeviz.
+
+The arming state lives in a file shared by the workers. Each of them checks
+that file's modification time at most once a second, so while the profiler
+is disarmed a request pays for one clock read and nothing else. Workers
+claim request slots by exclusively creating a claim file per slot, so
+exactly `count` requests get profiled however many workers are running.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import pstats
+import cProfile
+import logging
+import tempfile
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from flask import g, request
+from services.health import PROBE_PATHS
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('sampling', 'deterministic')
+
+# Most requests one arming may profile
+MAX_PROFILE_REQUESTS = 50
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+
+# Frames kept per sampled stack, innermost first
+MAX_STACK_DEPTH = 200
+
+# Seconds between checks of the arming file
+CHECK_INTERVAL = 1.0
+
+# Saved profiles kept; older ones are deleted
+KEEP_PROFILES = 100
+
+# Functions or stacks listed in a profile's summary
+SUMMARY_SIZE = 15
+
+# Requests that are never profiled (the profiler's own pages, static files and health probes)
+EXCLUDED_PREFIXES = ('/static/', '/admin/profiler', *PROBE_PATHS)
+
+_PROFILE_ID = re.compile(r'^[\w-]+$')
+
+
+class ProfilerError(ValueError):
+    """Invalid arming request"""
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples one thread's call stack from a background thread"""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+
+def collapse(stacks):
+    """Collapsed-stack text: one 'root;...;leaf count' line per distinct stack"""
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def summarize_stacks(stacks, limit=SUMMARY_SIZE):
+    """Functions that were on top of the stack most often"""
+    leaves = Counter()
+    for stack, count in stacks.items():
+        leaves[stack.rsplit(';', 1)[-1]] += count
+    total = sum(leaves.values()) or 1
+    return [{'function': leaf, 'samples': count, 'percent': round(count * 100 / total, 1)}
+            for leaf, count in leaves.most_common(limit)]
+
+
+def summarize_pstats(profile, limit=SUMMARY_SIZE):
+    """Functions with the most cumulative time"""
+    stats = pstats.Stats(profile)
+    rows = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': f"{name} ({os.path.basename(filename)}:{line})",
+            'calls': calls,
+            'own_ms': round(own * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3),
+        })
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return rows[:limit]
+
+
+class ActiveProfile:
+    """A profile running for one request"""
+
+    def __init__(self, mode, arm_id):
+        self.mode = mode
+        self.arm_id = arm_id
+        self.start = time.perf_counter()
+        if mode == 'sampling':
+            self.collector = StackSampler(threading.get_ident()).start()
+        else:
+            self.collector = cProfile.Profile()
+            self.collector.enable()
+
+    def stop(self):
+        self.duration = time.perf_counter() - self.start
+        if self.mode == 'sampling':
+            self.collector.stop()
+        else:
+            self.collector.disable()
+
+
+class Profiler:
+    """Arming state and saved profiles in one directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._armed = None
+        self._armed_mtime = None
+        self._next_check = 0.0
+        self._spent = set()
+        self._lock = threading.Lock()
+
+    @property
+    def _arm_path(self):
+        return os.path.join(self.directory, 'armed.json')
+
+    @property
+    def _claims_dir(self):
+        return os.path.join(self.directory, 'claims')
+
+    def arm(self, pattern, count, mode='sampling', ttl=3600, armed_by=None):
+        """
+        Profile the next `count` requests whose path matches `pattern`
+
+        Args:
+            pattern: Regular expression searched for in the request path
+            count: Number of requests to profile (1 to MAX_PROFILE_REQUESTS)
+            mode: 'sampling' or 'deterministic'
+            ttl: Seconds after which an unfinished arming expires
+
+        Returns:
+            The arming state
+
+        Raises:
+            ProfilerError: If the pattern, count or mode is invalid
+        """
+        if mode not in PROFILE_MODES:
+            raise ProfilerError(f"Unknown profiling mode: {mode}")
+        if not 1 <= count <= MAX_PROFILE_REQUESTS:
+            raise ProfilerError(f"Request count must be between 1 and {MAX_PROFILE_REQUESTS}")
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ProfilerError(f"Invalid path pattern: {e}")
+
+        now = datetime.utcnow()
+        state = {
+            'id': uuid.uuid4().hex[:12],
+            'pattern': pattern,
+            'count': count,
+            'mode': mode,
+            'armed_by': armed_by,
+            'armed_at': now.isoformat(),
+            'expires_at': (now + timedelta(seconds=ttl)).isoformat(),
+        }
+        os.makedirs(self._claims_dir, exist_ok=True)
+        for name in os.listdir(self._claims_dir):
+            os.unlink(os.path.join(self._claims_dir, name))
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._arm_path)
+        self._next_check = 0.0
+        logger.info(f"Profiler armed for {count} {mode} request(s) matching {pattern!r}")
+        return state
+
+    def disarm(self):
+        try:
+            os.unlink(self._arm_path)
+        except FileNotFoundError:
+            pass
+        self._next_check = 0.0
+
+    def status(self):
+        """The current arming state with the number of claimed slots, or None"""
+        try:
+            with open(self._arm_path) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if state['expires_at'] <= datetime.utcnow().isoformat():
+            return None
+        claimed = [name for name in os.listdir(self._claims_dir) if name.startswith(state['id'])] \
+            if os.path.isdir(self._claims_dir) else []
+        return dict(state, claimed=len(claimed))
+
+    def is_armed(self):
+        """Cheap check run on every request; rereads the arming file at most once per CHECK_INTERVAL"""
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + CHECK_INTERVAL
+            self._refresh()
+        return self._armed is not None
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self._arm_path).st_mtime_ns
+        except FileNotFoundError:
+            self._armed = self._armed_mtime = None
+            return
+        if mtime == self._armed_mtime:
+            if self._armed and self._armed['expires_at'] <= datetime.utcnow().isoformat():
+                self._armed = None
+            return
+        state = self.status()
+        self._armed_mtime = mtime
+        if state is None or state['id'] in self._spent:
+            self._armed = None
+        else:
+            state['regex'] = re.compile(state['pattern'])
+            self._armed = state
+
+    def claim(self, path):
+        """
+        Take a profiling slot for a request path
+
+        Returns:
+            The arming state if this request should be profiled, else None
+        """
+        state = self._armed
+        if state is None or path.startswith(EXCLUDED_PREFIXES) or not state['regex'].search(path):
+            return None
+        with self._lock:
+            for slot in range(state.get('next_slot', 0), state['count']):
+                state['next_slot'] = slot + 1
+                try:
+                    fd = os.open(os.path.join(self._claims_dir, f"{state['id']}-{slot}"),
+                                 os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                except FileExistsError:
+                    continue  # Claimed by another worker
+                except FileNotFoundError:
+                    break  # Disarmed or re-armed meanwhile
+                os.close(fd)
+                if slot == state['count'] - 1:
+                    self.disarm()
+                return state
+            self._spent.add(state['id'])
+            self._armed = None
+            return None
+
+    def save(self, active, details):
+        """Write a finished profile and its summary; returns the profile id"""
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = f"{datetime.utcnow():%Y%m%d-%H%M%S}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        if active.mode == 'sampling':
+            extension = 'collapsed'
+            with open(os.path.join(self.directory, f"{profile_id}.{extension}"), 'w') as f:
+                f.write(collapse(active.collector.stacks))
+            summary = summarize_stacks(active.collector.stacks)
+            details = dict(details, samples=active.collector.samples)
+        else:
+            extension = 'pstats'
+            active.collector.dump_stats(os.path.join(self.directory, f"{profile_id}.{extension}"))
+            summary = summarize_pstats(active.collector)
+        meta = dict(details, id=profile_id, mode=active.mode, arm_id=active.arm_id, file_extension=extension,
+                    duration_ms=round(active.duration * 1000, 3), created_at=datetime.utcnow().isoformat(),
+                    summary=summary)
+        with open(os.path.join(self.directory, f"{profile_id}.json"), 'w') as f:
+            json.dump(meta, f)
+        self._prune()
+        return profile_id
+
+    def _profile_ids(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory)
+                      if name.endswith('.json') and name != 'armed.json')
+
+    def _prune(self):
+        for profile_id in self._profile_ids()[:-KEEP_PROFILES]:
+            self.delete(profile_id)
+
+    def profiles(self):
+        """Saved profiles' metadata, newest first"""
+        profiles = []
+        for profile_id in reversed(self._profile_ids()):
+            meta = self.get(profile_id)
+            if meta is not None:
+                profiles.append(meta)
+        return profiles
+
+    def get(self, profile_id):
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(os.path.join(self.directory, f"{profile_id}.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def data_path(self, profile_id):
+        """Path of a profile's pstats or collapsed-stack file, or None"""
+        meta = self.get(profile_id)
+        if meta is None:
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.{meta['file_extension']}")
+        return path if os.path.exists(path) else None
+
+    def delete(self, profile_id):
+        if not _PROFILE_ID.match(profile_id):
+            return
+        for extension in ('json', 'collapsed', 'pstats'):
+            try:
+                os.unlink(os.path.join(self.directory, f"{profile_id}.{extension}"))
+            except FileNotFoundError:
+                pass
+
+
+def init_profiler(app):
+    """
+    Install the profiling hooks for an app
+
+    Config:
+        PROFILE_DIR: Arming state and saved profiles (default: <instance_path>/profiles)
+    """
+    directory = app.config.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+    profiler = Profiler(directory)
+    app.extensions['profiler'] = profiler
+
+    @app.before_request
+    def start_request_profile():
+        if not profiler.is_armed():
+            return
+        state = profiler.claim(request.path)
+        if state is None:
+            return
+        try:
+            g.request_profile = ActiveProfile(state['mode'], state['id'])
+        except ValueError as e:
+            # cProfile refuses to start while another profiler is running in this process
+            logger.warning(f"Could not profile {request.path}: {str(e)}")
+
+    @app.after_request
+    def record_profile_status(response):
+        if 'request_profile' in g:
+            g.request_profile_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_request_profile(exception=None):
+        active = g.pop('request_profile', None)
+        if active is None:
+            return
+        active.stop()
+        try:
+            profile_id = profiler.save(active, {
+                'method': request.method,
+                'path': request.path,
+                'endpoint': request.endpoint,
+                'status': g.pop('request_profile_status', None),
+            })
+            logger.info(f"Saved {active.mode} profile {profile_id} for {request.path}")
+        except OSError as e:
+            logger.warning(f"Could not save profile for {request.path}: {str(e)}")
+
+    return profiler
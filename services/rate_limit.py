@@ -0,0 +1,264 @@
+"""
+Rate limits and daily token budgets for the LLM-backed endpoints
+
+A single user repeatedly customizing or analyzing resumes can keep both
+workers busy and use up the Anthropic quota for everyone. Views decorated
+with @llm_rate_limited take one token from two token buckets before they run:
+
+    user:<id>   RATE_LIMIT_USER_CAPACITY requests in a burst, refilled at
+                RATE_LIMIT_USER_PER_MINUTE
+    global      RATE_LIMIT_GLOBAL_CAPACITY requests in a burst, refilled at
+                RATE_LIMIT_GLOBAL_PER_MINUTE, shared by every user
+
+The buckets are RateLimitBucket rows, so all workers (and all machines on a
+shared database) draw from the same buckets. A take is a single conditional
+UPDATE that refills the bucket for the time since it was last touched and
+spends a token only if one is there, so concurrent requests can't overspend.
+Both buckets are taken in one transaction: a request the global bucket
+refuses doesn't cost its user a token.
+
+Each user also has a daily budget of LLM tokens (LLM_DAILY_TOKEN_BUDGET,
+input plus output; 0 means no budget). MeteredAnthropic adds each call's
+usage to the request, and the decorator adds the request's total to the
+user's LLMUsage row for the UTC day. Once the day's total reaches the budget
+further requests are refused; the request that crosses it still finishes.
+
+Refused requests get a 429 straight away instead of waiting for a worker.
+Retry-After says when the bucket will have a token again or, for the budget,
+when the UTC day ends.
+"""
+
+import math
+import time
+import logging
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from flask_login import current_user
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from extensions import db
+from models import LLMUsage, RateLimitBucket
+from services.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Message returned with the 429 for each limit
+REFUSAL_MESSAGES = {
+    'user': 'Too many requests. Please wait a moment and try again.',
+    'global': 'The service is busy right now. Please try again shortly.',
+    'budget': "You've reached today's AI usage limit. It resets at midnight UTC.",
+}
+
+# Retry-After for a bucket that never refills (its per-minute rate is 0)
+NEVER_REFILLS_RETRY_AFTER = 24 * 3600
+
+RATE_LIMITED_REQUESTS = REGISTRY.counter(
+    'resumerocket_rate_limited_requests_total', 'LLM-backed requests refused with 429, by the limit they hit',
+    ['endpoint', 'limit'])
+
+
+def _insert(connection):
+    return postgresql_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+
+
+def _least(connection):
+    # SQLite's two-argument min()/max() are Postgres's LEAST()/GREATEST()
+    return func.least if connection.dialect.name == 'postgresql' else func.min
+
+
+def _greatest(connection):
+    return func.greatest if connection.dialect.name == 'postgresql' else func.max
+
+
+def utc_day(now=None):
+    return datetime.utcfromtimestamp(time.time() if now is None else now).strftime('%Y-%m-%d')
+
+
+def seconds_until_next_day(now=None):
+    moment = datetime.utcfromtimestamp(time.time() if now is None else now)
+    midnight = datetime(moment.year, moment.month, moment.day) + timedelta(days=1)
+    return (midnight - moment).total_seconds()
+
+
+class TokenBucket:
+    """
+    A bucket of `capacity` tokens refilled at `per_minute`, stored in the RateLimitBucket row `key`
+
+    A per_minute of 0 makes a bucket that never refills.
+    """
+
+    def __init__(self, key, capacity, per_minute):
+        self.key = key
+        self.capacity = float(capacity)
+        self.rate = max(per_minute, 0) / 60.0
+
+    def take(self, connection, now, cost=1):
+        """
+        Spend `cost` tokens
+
+        Returns:
+            None if they were spent, else the seconds until they will be available
+        """
+        table = RateLimitBucket.__table__
+        connection.execute(_insert(connection)(RateLimitBucket).values(
+            key=self.key, tokens=self.capacity, updated_at=now
+        ).on_conflict_do_nothing(index_elements=['key']))
+
+        # A clock a little behind another worker's must not drain the bucket
+        elapsed = _greatest(connection)(now - table.c.updated_at, 0.0)
+        refilled = _least(connection)(self.capacity, table.c.tokens + elapsed * self.rate)
+        taken = connection.execute(table.update().where(table.c.key == self.key, refilled >= cost).values(
+            tokens=refilled - cost,
+            updated_at=_greatest(connection)(table.c.updated_at, now),
+        )).rowcount
+        if taken:
+            return None
+        if not self.rate:
+            return NEVER_REFILLS_RETRY_AFTER
+
+        tokens, updated_at = connection.execute(
+            select(table.c.tokens, table.c.updated_at).where(table.c.key == self.key)
+        ).one()
+        available = min(self.capacity, tokens + max(now - updated_at, 0.0) * self.rate)
+        return (cost - available) / self.rate
+
+
+class RateLimiter:
+    """Per-user and global token buckets plus the per-user daily token budget"""
+
+    def __init__(self, user_capacity=5, user_per_minute=2, global_capacity=20, global_per_minute=30,
+                 daily_token_budget=0, enabled=True):
+        self.user_capacity = user_capacity
+        self.user_per_minute = user_per_minute
+        self.global_bucket = TokenBucket('global', global_capacity, global_per_minute)
+        self.daily_token_budget = daily_token_budget
+        self.enabled = enabled
+
+    def buckets(self, user_id):
+        """(limit, bucket) pairs a request by `user_id` takes from, in order"""
+        return [
+            ('user', TokenBucket(f"user:{user_id}", self.user_capacity, self.user_per_minute)),
+            ('global', self.global_bucket),
+        ]
+
+    def acquire(self, user_id, now=None):
+        """
+        Take a token from the user's bucket and the global bucket
+
+        Returns:
+            None if both were taken, else (limit, retry_after) for the bucket that refused
+        """
+        now = time.time() if now is None else now
+        # Its own connection, so the request's ORM session is left alone
+        with db.engine.connect() as connection:
+            with connection.begin() as transaction:
+                for limit, bucket in self.buckets(user_id):
+                    wait = bucket.take(connection, now)
+                    if wait is not None:
+                        # Give back the tokens already taken
+                        transaction.rollback()
+                        return limit, wait
+        return None
+
+    def tokens_used(self, user_id, now=None):
+        """LLM tokens the user has used today"""
+        with db.engine.connect() as connection:
+            return connection.execute(select(LLMUsage.tokens).where(
+                LLMUsage.user_id == user_id, LLMUsage.day == utc_day(now)
+            )).scalar() or 0
+
+    def record_usage(self, user_id, tokens, now=None):
+        """Add `tokens` to the user's total for today"""
+        with db.engine.begin() as connection:
+            statement = _insert(connection)(LLMUsage).values(user_id=user_id, day=utc_day(now), tokens=tokens)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=['user_id', 'day'],
+                set_={'tokens': LLMUsage.__table__.c.tokens + statement.excluded.tokens}
+            ))
+
+    def check(self, user_id, now=None):
+        """
+        Decide whether a request by `user_id` may call the LLM
+
+        The budget is checked first, so requests refused for it don't spend
+        bucket tokens.
+
+        Returns:
+            None if allowed, else (limit, retry_after) where limit is 'budget', 'user' or 'global'
+        """
+        now = time.time() if now is None else now
+        if self.daily_token_budget and self.tokens_used(user_id, now) >= self.daily_token_budget:
+            return 'budget', seconds_until_next_day(now)
+        return self.acquire(user_id, now)
+
+
+def too_many_requests(limit, retry_after):
+    """The 429 response for a refused request"""
+    retry_after = max(1, math.ceil(retry_after))
+    endpoint = request.endpoint or 'unmatched'
+    RATE_LIMITED_REQUESTS.inc(endpoint=endpoint, limit=limit)
+    logger.info(f"Refused {request.method} {request.path} for user {current_user.get_id()}: "
+                f"{limit} limit, retry after {retry_after}s")
+    response = jsonify({'error': REFUSAL_MESSAGES[limit], 'limit': limit, 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def llm_rate_limited(view):
+    """
+    Apply the app's rate limiter to an LLM-backed view
+
+    Goes below @login_required. The view runs only if the user is under the
+    daily budget and both buckets had a token, and the LLM tokens it used are
+    added to the user's daily total.
+    """
+    @wraps(view)
+    def limited_view(*args, **kwargs):
+        limiter = current_app.extensions.get('rate_limiter')
+        if limiter is None or not limiter.enabled or not current_user.is_authenticated:
+            return view(*args, **kwargs)
+        user_id = current_user.id
+        refused = limiter.check(user_id)
+        if refused is not None:
+            return too_many_requests(*refused)
+
+        # MeteredAnthropic adds each call's tokens here
+        g.llm_tokens = 0
+        try:
+            return view(*args, **kwargs)
+        finally:
+            tokens = g.pop('llm_tokens', 0)
+            if tokens:
+                try:
+                    limiter.record_usage(user_id, tokens)
+                except Exception as e:
+                    logger.error(f"Could not record LLM usage for user {user_id}: {str(e)}")
+    return limited_view
+
+
+def init_rate_limits(app):
+    """
+    Set up the LLM rate limiter for an app
+
+    Config:
+        RATE_LIMIT_ENABLED: Enforce the limits below (default: on)
+        RATE_LIMIT_USER_CAPACITY: Requests a user can make in a burst
+        RATE_LIMIT_USER_PER_MINUTE: Rate at which a user's bucket refills
+        RATE_LIMIT_GLOBAL_CAPACITY: Requests all users together can make in a burst
+        RATE_LIMIT_GLOBAL_PER_MINUTE: Rate at which the global bucket refills
+            (0 for either rate: the bucket never refills)
+        LLM_DAILY_TOKEN_BUDGET: LLM tokens a user may use per UTC day (default 200000; 0: no budget)
+    """
+    limiter = RateLimiter(
+        user_capacity=app.config.get('RATE_LIMIT_USER_CAPACITY', 5),
+        user_per_minute=app.config.get('RATE_LIMIT_USER_PER_MINUTE', 2),
+        global_capacity=app.config.get('RATE_LIMIT_GLOBAL_CAPACITY', 20),
+        global_per_minute=app.config.get('RATE_LIMIT_GLOBAL_PER_MINUTE', 30),
+        daily_token_budget=app.config.get('LLM_DAILY_TOKEN_BUDGET', 200000),
+        enabled=app.config.get('RATE_LIMIT_ENABLED', True),
+    )
+    app.extensions['rate_limiter'] = limiter
+    return limiter
@@ -0,0 +1,273 @@
+"""
+Rescoring of stored ATS scores
+
+CustomizedResume.analyzer_version records the ANALYZER_VERSION that produced
+a row's ats_score/original_ats_score. When the analyzer's tables or scoring
+code change, older scores are no longer comparable with new ones;
+rescore_stale() recomputes every stale row on a process pool, and schedule()
+rescores a single row in the background when a stale one is viewed
+(enabled by the RESCORE_ON_READ config flag).
+
+Rows that were never scored (e.g. an upload that hasn't been customized yet)
+aren't stale and are left alone.
+"""
+
+import os
+import json
+import logging
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import aliased, load_only
+from extensions import db
+from models import CustomizedResume, JobDescription, ResumeContent
+from services.ats_analyzer import EnhancedATSAnalyzer, ANALYZER_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched, scored and written back per batch
+BATCH_SIZE = 50
+
+# Columns rescoring overwrites (plus the rollup fields, which the flush listeners read)
+RESCORED_COLUMNS = (
+    CustomizedResume.id,
+    CustomizedResume.ats_score,
+    CustomizedResume.original_ats_score,
+    CustomizedResume.matching_keywords,
+    CustomizedResume.missing_keywords,
+    CustomizedResume.analyzer_version,
+    CustomizedResume.created_at,
+    CustomizedResume.user_rating,
+)
+
+
+def stale_clause(version=ANALYZER_VERSION):
+    """WHERE clause for scored rows produced by another analyzer version"""
+    return and_(
+        or_(CustomizedResume.analyzer_version.is_(None), CustomizedResume.analyzer_version != version),
+        or_(CustomizedResume.ats_score.isnot(None), CustomizedResume.original_ats_score.isnot(None))
+    )
+
+
+def is_stale(resume):
+    """Whether a loaded resume's scores came from another analyzer version"""
+    has_scores = resume.ats_score is not None or resume.original_ats_score is not None
+    return has_scores and resume.analyzer_version != ANALYZER_VERSION
+
+
+def _stale_rows_query(after_id=0, limit=BATCH_SIZE):
+    original = aliased(ResumeContent)
+    customized = aliased(ResumeContent)
+    return select(
+        CustomizedResume.id,
+        original.body,
+        customized.body,
+        JobDescription.content,
+        CustomizedResume.original_ats_score.isnot(None),
+        CustomizedResume.ats_score.isnot(None),
+    ).join(
+        original, CustomizedResume.original_content_hash == original.hash
+    ).join(
+        customized, CustomizedResume.customized_content_hash == customized.hash
+    ).join(
+        JobDescription, CustomizedResume.job_description_id == JobDescription.id
+    ).where(
+        stale_clause(), CustomizedResume.id > after_id
+    ).order_by(CustomizedResume.id).limit(limit)
+
+
+# One analyzer per pool process, created by _init_worker
+_worker_analyzer = None
+
+def _init_worker():
+    global _worker_analyzer
+    _worker_analyzer = EnhancedATSAnalyzer()
+
+
+def score_row(row, analyzer=None):
+    """
+    Recompute the scores of one stale row
+
+    Args:
+        row: (id, original text, customized text, job description, has original score, has new score)
+        analyzer: EnhancedATSAnalyzer to use (default: this process's worker analyzer)
+
+    Returns:
+        Dict of the CustomizedResume columns to update, including id
+    """
+    resume_id, original_text, customized_text, job_text, has_original, has_new = row
+    analyzer = analyzer or _worker_analyzer or EnhancedATSAnalyzer()
+
+    result = {'id': resume_id}
+    new_analysis = None
+    if has_new:
+        new_analysis = analyzer.analyze(customized_text, job_text)
+        result.update({
+            'ats_score': new_analysis['score'],
+            'matching_keywords': new_analysis['matching_keywords'],
+            'missing_keywords': new_analysis['missing_keywords'],
+        })
+    if has_original:
+        # Uncustomized uploads score the same text twice
+        same_text = new_analysis is not None and original_text == customized_text
+        result['original_ats_score'] = (new_analysis if same_text else analyzer.analyze(original_text, job_text))['score']
+    return result
+
+
+def apply_scores(results, version=ANALYZER_VERSION):
+    """
+    Write rescored values back and commit
+
+    Goes through the ORM so the analytics rollups follow the score changes.
+    """
+    resumes = {
+        resume.id: resume for resume in CustomizedResume.query.options(load_only(*RESCORED_COLUMNS))
+        .filter(CustomizedResume.id.in_([result['id'] for result in results]))
+    }
+    for result in results:
+        resume = resumes.get(result['id'])
+        if resume is None:
+            continue  # Deleted since it was read
+        for key, value in result.items():
+            if key != 'id':
+                setattr(resume, key, value)
+        resume.analyzer_version = version
+    db.session.commit()
+
+
+def _load_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('analyzer_version') != ANALYZER_VERSION:
+        logger.info(f"Ignoring checkpoint for analyzer version {checkpoint.get('analyzer_version')}")
+        return None
+    return checkpoint
+
+
+def _save_checkpoint(path, checkpoint):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+class RescoringService:
+    """
+    Brings stored ATS scores up to the current ANALYZER_VERSION
+
+    rescore_stale() is the bulk backfill (see scripts/rescore.py); schedule()
+    is the lazy path used when a stale resume is viewed.
+    """
+
+    def __init__(self, max_workers=1):
+        """
+        Initialize the rescoring service
+
+        Args:
+            max_workers: Background threads used by schedule() (default: 1)
+        """
+        self.max_workers = max_workers
+        self._executor = None
+        # One analyzer per background thread; analyze() keeps per-call state on the instance
+        self._local = threading.local()
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def rescore_stale(self, batch_size=BATCH_SIZE, workers=None, checkpoint_path=None, limit=None):
+        """
+        Recompute every stale row, batch by batch
+
+        Rows are streamed in primary key order, scored on a process pool and
+        written back one batch per transaction. After each batch the last id
+        is saved to checkpoint_path, so an interrupted run picks up where it
+        stopped (rows that are no longer stale are skipped anyway).
+
+        Args:
+            batch_size: Rows per batch
+            workers: Scoring processes (default: CPU count; 0 scores in this process)
+            checkpoint_path: JSON file recording progress (optional)
+            limit: Stop after this many rows (optional)
+
+        Returns:
+            Dict with rescored and last_id
+        """
+        checkpoint = _load_checkpoint(checkpoint_path) or {'analyzer_version': ANALYZER_VERSION, 'last_id': 0, 'rescored': 0}
+        if checkpoint['last_id']:
+            logger.info(f"Resuming rescoring after id {checkpoint['last_id']} ({checkpoint['rescored']} rows done)")
+        rescored = 0
+
+        workers = os.cpu_count() if workers is None else workers
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers else None
+        analyzer = None if pool else EnhancedATSAnalyzer()
+        try:
+            while limit is None or rescored < limit:
+                size = batch_size if limit is None else min(batch_size, limit - rescored)
+                rows = [tuple(row) for row in db.session.execute(_stale_rows_query(checkpoint['last_id'], size))]
+                # Release the read transaction while the batch is scored
+                db.session.commit()
+                if not rows:
+                    break
+
+                if pool:
+                    chunksize = max(1, len(rows) // (workers * 4))
+                    results = list(pool.map(score_row, rows, chunksize=chunksize))
+                else:
+                    results = [score_row(row, analyzer) for row in rows]
+                apply_scores(results)
+
+                rescored += len(rows)
+                checkpoint['last_id'] = rows[-1][0]
+                checkpoint['rescored'] += len(rows)
+                if checkpoint_path:
+                    _save_checkpoint(checkpoint_path, checkpoint)
+                logger.info(f"Rescored {checkpoint['rescored']} rows (up to id {checkpoint['last_id']})")
+        finally:
+            if pool:
+                pool.shutdown()
+
+        if checkpoint_path and os.path.exists(checkpoint_path) and (limit is None or rescored < limit):
+            # Finished: a later run should start from the beginning
+            os.unlink(checkpoint_path)
+        return {'rescored': rescored, 'last_id': checkpoint['last_id']}
+
+    def schedule(self, resume):
+        """
+        Rescore a stale resume on a background thread
+
+        Must be called inside an app context. Returns the Future, or None if
+        the resume isn't stale or is already queued.
+        """
+        if not is_stale(resume):
+            return None
+        with self._lock:
+            if resume.id in self._pending:
+                return None
+            self._pending.add(resume.id)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='rescore')
+        app = current_app._get_current_object()
+        return self._executor.submit(self._rescore_one, app, resume.id)
+
+    def _rescore_one(self, app, resume_id):
+        with app.app_context():
+            try:
+                row = db.session.execute(
+                    _stale_rows_query(limit=1).where(CustomizedResume.id == resume_id)
+                ).first()
+                if row:
+                    if not hasattr(self._local, 'analyzer'):
+                        self._local.analyzer = EnhancedATSAnalyzer()
+                    apply_scores([score_row(tuple(row), self._local.analyzer)])
+                    logger.debug(f"Rescored stale resume {resume_id}")
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error rescoring resume {resume_id}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._pending.discard(resume_id)
@@ -2,18 +2,25 @@ import os
 import logging
 import json
 import re
-from anthropic import Anthropic
+from services.metrics import MeteredAnthropic
+from services.lazy_imports import LazyObject, lazy_module
 from .ats_analyzer import EnhancedATSAnalyzer
+from services.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Imported on first use (see services.lazy_imports)
+anthropic = lazy_module('anthropic')
+
 class ResumeCustomizer:
     def __init__(self):
         self.anthropic_key = os.environ.get('ANTHROPIC_API_KEY')
         if not self.anthropic_key:
             raise ValueError('ANTHROPIC_API_KEY environment variable must be set')
         
-        self.client = Anthropic(api_key=self.anthropic_key)
+        self.client = MeteredAnthropic(
+            LazyObject(lambda: anthropic.Anthropic(api_key=self.anthropic_key)), 'resume_customizer'
+        )
         # the newest Anthropic model is "claude-3-7-sonnet-20250219" which was released February 19, 2025
         self.model = "claude-3-7-sonnet-20250219"
         self.ats_analyzer = EnhancedATSAnalyzer()
@@ -26,6 +33,7 @@ class ResumeCustomizer:
         }
         self.default_level = "balanced"
 
+    @traced()
     def customize_resume(self, resume_content, job_description, customization_level=None):
         """
         Two-stage resume customization process:
@@ -83,6 +91,7 @@ class ResumeCustomizer:
             logger.error(f"Error in resume customization: {str(e)}")
             raise Exception(f"Failed to customize resume: {str(e)}")
     
+    @traced()
     def _analyze_and_plan(self, resume_content, job_description, ats_analysis, level):
         """
         Stage 1: Analyze resume against job description and create optimization plan
@@ -202,6 +211,7 @@ class ResumeCustomizer:
             logger.error(f"Error in resume analysis stage: {str(e)}")
             raise Exception(f"Failed to analyze resume: {str(e)}")
     
+    @traced()
     def _implement_improvements(self, resume_content, job_description, optimization_plan, ats_analysis, level):
         """
         Stage 2: Implement the optimization plan to create an improved resume
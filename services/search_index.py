@@ -0,0 +1,179 @@
+"""
+Full-text search over job descriptions
+
+SQLite: an external-content FTS5 table (job_description_fts) mirrors the
+title, url and content columns of job_description and is kept in sync by
+insert/update/delete triggers. Postgres: a stored generated tsvector column
+(job_description.search_vector) with a GIN index plays the same role.
+
+The DDL is attached to the job_description table's after_create event, so
+db.create_all() sets everything up on a fresh database. Existing databases
+get it from the add_job_description_search migration, and
+scripts/rebuild_search_index.py backfills or rebuilds the index.
+"""
+
+import re
+import html
+import logging
+from sqlalchemy import DDL, event, text
+from extensions import db
+from models import JobDescription
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'job_description_fts'
+
+# Column weights for ranking: a hit in the title counts most, then the URL, then the body
+TITLE_WEIGHT = 10.0
+URL_WEIGHT = 5.0
+CONTENT_WEIGHT = 1.0
+
+# The database marks matches with these private-use characters. The snippet is
+# HTML-escaped afterwards and only then are they turned into <mark> tags, so
+# markup in a fetched job posting comes out as text
+SNIPPET_START = '\ue000'
+SNIPPET_END = '\ue001'
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, url, content, content='job_description', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS job_description_fts_insert AFTER INSERT ON job_description BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, url, content) VALUES (new.id, new.title, new.url, new.content); END",
+    f"CREATE TRIGGER IF NOT EXISTS job_description_fts_delete AFTER DELETE ON job_description BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, url, content) "
+    "VALUES ('delete', old.id, old.title, old.url, old.content); END",
+    f"CREATE TRIGGER IF NOT EXISTS job_description_fts_update AFTER UPDATE ON job_description BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, url, content) "
+    "VALUES ('delete', old.id, old.title, old.url, old.content); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, url, content) VALUES (new.id, new.title, new.url, new.content); END",
+]
+
+POSTGRES_DDL = [
+    "ALTER TABLE job_description ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(url, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_job_description_search_vector ON job_description USING GIN (search_vector)",
+]
+
+for statement in SQLITE_DDL:
+    event.listen(JobDescription.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in POSTGRES_DDL:
+    event.listen(JobDescription.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+event.listen(JobDescription.__table__, 'before_drop',
+             DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect='sqlite'))
+
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+def to_fts_query(search_query):
+    """
+    Turn free text typed by a user into a safe FTS5 MATCH expression
+
+    Each word becomes a quoted prefix term, so FTS5 operators and punctuation
+    in the input can't cause syntax errors and partial words still match.
+    Returns None if the input contains no searchable words.
+    """
+    terms = re.findall(r'\w+', search_query or '')
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def job_search_clause(search_query):
+    """
+    WHERE clause restricting JobDescription rows to full-text matches
+
+    Returns None when there's nothing to search for.
+    """
+    if _dialect() == 'postgresql':
+        if not (search_query or '').strip():
+            return None
+        return text("job_description.search_vector @@ websearch_to_tsquery('english', :search_query)").bindparams(
+            search_query=search_query
+        )
+
+    fts_query = to_fts_query(search_query)
+    if not fts_query:
+        return None
+    return JobDescription.id.in_(
+        text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query").bindparams(fts_query=fts_query)
+    )
+
+
+def highlight_snippet(snippet):
+    """HTML-escape a snippet and wrap its marked matches in <mark> tags"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>')
+
+
+def search_jobs(user_id, search_query, limit=20):
+    """
+    Rank a user's job descriptions against a search query
+
+    Returns:
+        List of dicts with id, title, url, created_at, rank (higher is better)
+        and snippet (escaped HTML with matched terms wrapped in <mark> tags),
+        best match first
+    """
+    if _dialect() == 'postgresql':
+        if not (search_query or '').strip():
+            return []
+        sql = text(
+            "SELECT id, title, url, created_at, "
+            "ts_rank(search_vector, query) AS rank, "
+            "ts_headline('english', content, query, "
+            f"'StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, MaxWords=24, MinWords=8') AS snippet "
+            "FROM job_description, websearch_to_tsquery('english', :search_query) AS query "
+            "WHERE user_id = :user_id AND search_vector @@ query "
+            "ORDER BY rank DESC, id DESC LIMIT :limit"
+        )
+        params = {'search_query': search_query, 'user_id': user_id, 'limit': limit}
+    else:
+        fts_query = to_fts_query(search_query)
+        if not fts_query:
+            return []
+        # bm25() is lower-is-better, so negate it to match ts_rank's ordering
+        sql = text(
+            "SELECT jd.id, jd.title, jd.url, jd.created_at, "
+            f"-bm25({FTS_TABLE}, {TITLE_WEIGHT}, {URL_WEIGHT}, {CONTENT_WEIGHT}) AS rank, "
+            f"snippet({FTS_TABLE}, 2, '{SNIPPET_START}', '{SNIPPET_END}', '…', 16) AS snippet "
+            f"FROM {FTS_TABLE} JOIN job_description jd ON jd.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :fts_query AND jd.user_id = :user_id "
+            "ORDER BY rank DESC, jd.id DESC LIMIT :limit"
+        )
+        params = {'fts_query': fts_query, 'user_id': user_id, 'limit': limit}
+
+    results = []
+    for row in db.session.execute(sql, params):
+        result = dict(row._mapping)
+        result['snippet'] = highlight_snippet(result['snippet'])
+        results.append(result)
+    return results
+
+
+def create_search_index(connection):
+    """Create the index objects for the connection's dialect if they don't exist"""
+    statements = POSTGRES_DDL if connection.dialect.name == 'postgresql' else SQLITE_DDL
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def rebuild_search_index(connection):
+    """
+    Create the index if needed and repopulate it from job_description
+
+    On SQLite this runs the FTS5 'rebuild' command; on Postgres the generated
+    column is already computed for every row, so only the GIN index is rebuilt.
+    """
+    create_search_index(connection)
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text("REINDEX INDEX ix_job_description_search_vector"))
+    else:
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    count = connection.execute(text("SELECT count(*) FROM job_description")).scalar()
+    logger.info(f"Rebuilt job description search index over {count} rows")
+    return count
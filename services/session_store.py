@@ -0,0 +1,326 @@
+"""
+Server-side Flask sessions
+
+Flask's default session serializes the whole session dict into a signed
+cookie, so anything large stored in it (e.g. the resume text kept by
+process_resume) travels with every request. ServerSideSessionInterface keeps
+the data in a pluggable backend and sends only a signed random session id.
+
+Backends:
+    database    ServerSession rows (default; shared by all workers)
+    filesystem  One file per session under SESSION_FILE_DIR
+                (default <instance_path>/sessions)
+
+Set SESSION_BACKEND=cookie to fall back to Flask's cookie sessions. Permanent
+sessions expire after PERMANENT_SESSION_LIFETIME. Other sessions get a cookie
+that lasts until the browser closes, which the server never hears about, so
+their entries expire after SESSION_IDLE_LIFETIME without use instead. Expired
+entries are ignored on load and deleted by a cleanup pass that runs at most
+every SESSION_CLEANUP_INTERVAL seconds per worker.
+"""
+
+import os
+import time
+import struct
+import hashlib
+import logging
+import secrets
+import tempfile
+from datetime import datetime, timedelta
+from flask import current_app
+from flask.sessions import SessionInterface, SessionMixin
+from flask.json.tag import TaggedJSONSerializer
+from flask_login import user_logged_in
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from db_types import compress_payload, decompress_payload
+from extensions import db
+from models import ServerSession
+from services.health import PROBE_PATHS
+
+logger = logging.getLogger(__name__)
+
+# Seconds between expired-session sweeps in each worker
+CLEANUP_INTERVAL = 15 * 60
+
+# Seconds a non-permanent session is kept without being used
+IDLE_LIFETIME = 24 * 3600
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its id and whether it changed"""
+
+    def __init__(self, initial=None, sid=None, new=False, expires_at=None):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid or secrets.token_urlsafe(32)
+        self.new = new
+        self.expires_at = expires_at
+        self.previous_sid = None
+        self.modified = False
+
+    def regenerate(self):
+        """Move the data to a fresh session id (e.g. on login) and drop the old one"""
+        if not self.new:
+            self.previous_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.modified = True
+
+
+class DatabaseSessionBackend:
+    """Stores sessions as ServerSession rows"""
+
+    def load(self, key):
+        """Return (payload, expires_at) for an unexpired session, or None"""
+        with db.engine.connect() as connection:
+            return connection.execute(
+                select(ServerSession.data, ServerSession.expires_at)
+                .where(ServerSession.id == key, ServerSession.expires_at > datetime.utcnow())
+            ).first()
+
+    def save(self, key, payload, expires_at):
+        # Runs on its own connection so it never commits the request's ORM session
+        with db.engine.begin() as connection:
+            insert = postgresql_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+            statement = insert(ServerSession).values(id=key, data=payload, expires_at=expires_at)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=['id'],
+                set_={'data': statement.excluded.data, 'expires_at': statement.excluded.expires_at}
+            ))
+
+    def delete(self, key):
+        with db.engine.begin() as connection:
+            connection.execute(delete(ServerSession).where(ServerSession.id == key))
+
+    def cleanup(self):
+        """Delete expired sessions. Returns the number removed."""
+        with db.engine.begin() as connection:
+            return connection.execute(
+                delete(ServerSession).where(ServerSession.expires_at <= datetime.utcnow())
+            ).rowcount
+
+
+class FilesystemSessionBackend:
+    """
+    Stores each session in its own file: an 8-byte expiry timestamp followed
+    by the compressed payload. Only suitable when all workers share a disk.
+    """
+
+    EXPIRY = struct.Struct('>d')
+
+    def __init__(self, directory=None):
+        self._directory = directory
+
+    @property
+    def directory(self):
+        if self._directory:
+            return self._directory
+        return current_app.config.get('SESSION_FILE_DIR') or os.path.join(current_app.instance_path, 'sessions')
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _read_expiry(self, f):
+        header = f.read(self.EXPIRY.size)
+        if len(header) < self.EXPIRY.size:
+            return None
+        return self.EXPIRY.unpack(header)[0]
+
+    def load(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                expires = self._read_expiry(f)
+                if expires is None or expires <= time.time():
+                    return None
+                return decompress_payload(f.read()), datetime.utcfromtimestamp(expires)
+        except FileNotFoundError:
+            return None
+
+    def save(self, key, payload, expires_at):
+        os.makedirs(self.directory, exist_ok=True)
+        expires = (expires_at - datetime(1970, 1, 1)).total_seconds()
+        # Write to a temp file and rename so concurrent readers never see a partial session
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.EXPIRY.pack(expires) + compress_payload(payload))
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def cleanup(self):
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.startswith('.tmp-'):
+                    # Leave in-flight writes alone; only clear out ones abandoned by a crash
+                    if entry.stat().st_mtime < now - 3600:
+                        os.unlink(entry.path)
+                        removed += 1
+                    continue
+                with open(entry.path, 'rb') as f:
+                    expires = self._read_expiry(f)
+                if expires is None or expires <= now:
+                    os.unlink(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface that keeps session data in a backend"""
+
+    serializer = TaggedJSONSerializer()
+    salt = 'server-side-session'
+
+    def __init__(self, backend, cleanup_interval=CLEANUP_INTERVAL, idle_lifetime=IDLE_LIFETIME):
+        """
+        Initialize the session interface
+
+        Args:
+            backend: DatabaseSessionBackend, FilesystemSessionBackend or compatible
+            cleanup_interval: Minimum seconds between expired-session sweeps
+            idle_lifetime: Seconds (or timedelta) a non-permanent session is kept without being used
+        """
+        self.backend = backend
+        self.cleanup_interval = cleanup_interval
+        if not isinstance(idle_lifetime, timedelta):
+            idle_lifetime = timedelta(seconds=idle_lifetime)
+        self.idle_lifetime = idle_lifetime
+        self._next_cleanup = 0
+
+    @staticmethod
+    def storage_key(sid):
+        """Backends store sessions under a hash of the id, never the id itself"""
+        return hashlib.sha256(sid.encode('utf-8')).hexdigest()
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt)
+
+    def open_session(self, app, request):
+        # Health probes get Flask's null session, so they never load or save one
+        if not app.secret_key or request.path in PROBE_PATHS:
+            return None
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode('utf-8')
+            except BadSignature:
+                sid = None
+            if sid:
+                record = self.backend.load(self.storage_key(sid))
+                if record:
+                    payload, expires_at = record
+                    try:
+                        data = self.serializer.loads(payload.decode('utf-8'))
+                        return ServerSideSession(data, sid=sid, expires_at=expires_at)
+                    except ValueError:
+                        logger.warning("Discarding unreadable server-side session")
+        return ServerSideSession(new=True)
+
+    def save_session(self, app, session, response):
+        self._maybe_cleanup(app)
+
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.previous_sid:
+            self.backend.delete(self.storage_key(session.previous_sid))
+
+        if not session:
+            if session.modified and not session.new:
+                self.backend.delete(self.storage_key(session.sid))
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+
+        response.vary.add('Cookie')
+
+        # Unchanged sessions are only re-saved once half their lifetime has passed
+        now = datetime.utcnow()
+        lifetime = app.permanent_session_lifetime if session.permanent else self.idle_lifetime
+        stale = session.expires_at is None or session.expires_at - now < lifetime / 2
+        if not (session.modified or stale):
+            return
+
+        expires_at = now + lifetime
+        payload = self.serializer.dumps(dict(session)).encode('utf-8')
+        self.backend.save(self.storage_key(session.sid), payload, expires_at)
+        session.expires_at = expires_at
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode('utf-8'),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+            partitioned=self.get_cookie_partitioned(app),
+        )
+
+    def _maybe_cleanup(self, app):
+        if time.monotonic() < self._next_cleanup:
+            return
+        self._next_cleanup = time.monotonic() + self.cleanup_interval
+        try:
+            removed = self.backend.cleanup()
+            if removed:
+                logger.info(f"Removed {removed} expired sessions")
+        except Exception as e:
+            logger.error(f"Error cleaning up expired sessions: {str(e)}")
+
+
+SESSION_BACKENDS = {
+    'database': DatabaseSessionBackend,
+    'filesystem': FilesystemSessionBackend,
+}
+
+def rotate_session_id(sender, user, **extra):
+    """Issue a new session id on login so a pre-login id can't be fixated"""
+    from flask import session
+    if isinstance(session, ServerSideSession):
+        session.regenerate()
+
+def configure_sessions(app):
+    """
+    Install the server-side session interface selected by SESSION_BACKEND
+
+    Raises:
+        ValueError: If SESSION_BACKEND names an unknown backend
+    """
+    backend_name = app.config.get('SESSION_BACKEND', 'database')
+    if backend_name == 'cookie':
+        logger.info("Using Flask cookie sessions")
+        return
+
+    if backend_name not in SESSION_BACKENDS:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend_name}")
+
+    app.session_interface = ServerSideSessionInterface(
+        SESSION_BACKENDS[backend_name](),
+        cleanup_interval=app.config.get('SESSION_CLEANUP_INTERVAL', CLEANUP_INTERVAL),
+        idle_lifetime=app.config.get('SESSION_IDLE_LIFETIME', IDLE_LIFETIME)
+    )
+    user_logged_in.connect(rotate_session_id, app)
+    logger.info(f"Using server-side sessions ({backend_name} backend)")
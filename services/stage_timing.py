@@ -0,0 +1,176 @@
+"""
+Per-stage timing for ATS analysis
+
+EnhancedATSAnalyzer.analyze marks the end of each stage on a StageTimer and
+adds counters (tokens, n-grams, keywords) as it goes. When the analysis
+finishes, the timer is folded into ANALYSIS_STATS, a set of process-wide
+histograms, and with debug=True it is also returned in the result under
+'timings'.
+
+Timing is on unless ANALYZER_TIMING=false. When it is off, analyses get
+NULL_TIMER, whose methods do nothing, so the hook costs one no-op call per
+stage. A debug analysis is always timed.
+"""
+
+import os
+import time
+import bisect
+import threading
+
+# Upper bounds in seconds for stage durations
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Upper bounds for counters (tokens, n-grams, keywords)
+COUNT_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000)
+
+ENABLED = os.environ.get('ANALYZER_TIMING', 'true').lower() == 'true'
+
+class Histogram:
+    """Fixed-bucket histogram, safe to update from several threads"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (None when empty)"""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def snapshot(self):
+        """Cumulative bucket counts (Prometheus style), count and sum"""
+        with self._lock:
+            counts, total, value_sum = list(self.counts), self.count, self.sum
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            running += count
+            cumulative.append((bound, running))
+        return {'buckets': cumulative, 'count': total, 'sum': value_sum}
+
+
+class StageTimer:
+    """Durations and counters for one analysis"""
+
+    __slots__ = ('stages', 'counters', '_start', '_last')
+    enabled = True
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, stage):
+        """Attribute the time since the previous mark to a stage"""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def count(self, name, value):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    @property
+    def total(self):
+        return self._last - self._start
+
+    def as_dict(self):
+        """Milliseconds per stage plus counters, as included in debug results"""
+        return {
+            'total_ms': round(self.total * 1000, 3),
+            'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()},
+            'counters': dict(self.counters),
+        }
+
+
+class _NullTimer:
+    """Stand-in used when timing is disabled"""
+
+    __slots__ = ()
+    enabled = False
+
+    def mark(self, stage):
+        pass
+
+    def count(self, name, value):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class StageStats:
+    """Process-wide histograms of stage durations and counters"""
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, histograms, name, buckets):
+        histogram = histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = histograms.setdefault(name, Histogram(buckets))
+        return histogram
+
+    def record(self, timer):
+        """Fold a finished timer into the histograms"""
+        if not timer.enabled:
+            return
+        for stage, seconds in timer.stages.items():
+            self._histogram(self.stages, stage, DURATION_BUCKETS).observe(seconds)
+        self._histogram(self.stages, 'total', DURATION_BUCKETS).observe(timer.total)
+        for name, value in timer.counters.items():
+            self._histogram(self.counters, name, COUNT_BUCKETS).observe(value)
+
+    def summary(self):
+        """Count, mean and approximate p50/p95 per stage (seconds) and counter"""
+        def describe(histogram):
+            return {
+                'count': histogram.count,
+                'mean': histogram.sum / histogram.count if histogram.count else None,
+                'p50': histogram.quantile(0.5),
+                'p95': histogram.quantile(0.95),
+            }
+        return {
+            'stages': {name: describe(h) for name, h in sorted(self.stages.items())},
+            'counters': {name: describe(h) for name, h in sorted(self.counters.items())},
+        }
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+
+
+ANALYSIS_STATS = StageStats()
+
+
+def start_timer(force=False):
+    """A StageTimer when timing is enabled (or forced), else NULL_TIMER"""
+    return StageTimer() if ENABLED or force else NULL_TIMER
+
+
+def set_enabled(enabled):
+    """Turn process-wide timing on or off"""
+    global ENABLED
+    ENABLED = enabled
@@ -0,0 +1,384 @@
+"""
+Lightweight request tracing
+
+Every request opens a root span. Spans started while it runs (service
+calls decorated with @traced, Anthropic calls, SQL statements, session
+commits) become its children through a context variable, so a request
+produces a tree with the timing of each step:
+
+    POST resume.customize_resume_endpoint          8123.4 ms
+      ResumeCustomizer.customize_resume            8090.2 ms
+        EnhancedATSAnalyzer.analyze                  41.7 ms
+        anthropic resume_customizer._analyze_and_plan  3510.0 ms
+        ...
+      db.commit                                       3.1 ms
+
+Finished traces go to an exporter selected by TRACE_EXPORTER:
+    memory  Ring buffer of the last TRACE_BUFFER_SIZE traces in each worker (default)
+    jsonl   Appended to TRACE_FILE, one trace per line, shared by all workers;
+            rotated to TRACE_FILE.1 past TRACE_FILE_MAX_BYTES
+    off     Tracing disabled
+
+/admin/traces lists the slowest recent traces. Context variables don't
+follow work onto other threads, so background jobs (e.g. rescoring) are not
+part of the request that scheduled them.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import functools
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from services.health import PROBE_PATHS
+
+logger = logging.getLogger(__name__)
+
+# Spans kept per trace; later ones are counted but dropped
+MAX_SPANS = 500
+
+# Characters of SQL kept on a query span
+MAX_STATEMENT_LENGTH = 200
+
+# Trace file size at which it is rotated to <file>.1
+MAX_TRACE_FILE_BYTES = 5 * 1024 * 1024
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'attributes', 'start', 'end', 'error')
+
+    def __init__(self, trace, name, parent_id=None, attributes=None):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes or {}
+        self.start = time.perf_counter()
+        self.end = None
+        self.error = None
+
+    @property
+    def duration_ms(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'offset_ms': round((self.start - self.trace.start) * 1000, 3),
+            'duration_ms': round(self.duration_ms, 3),
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class Trace:
+    """Spans recorded for one request"""
+
+    def __init__(self, name):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.spans = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS:
+                self.dropped += 1
+                return False
+            self.spans.append(span)
+            return True
+
+    def to_dict(self):
+        root = self.spans[0] if self.spans else None
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': round(root.duration_ms, 3) if root else 0.0,
+            'span_count': len(self.spans),
+            'dropped_spans': self.dropped,
+            'attributes': root.attributes if root else {},
+            'spans': [span.to_dict() for span in self.spans],
+        }
+
+
+class MemoryExporter:
+    """Keeps the most recent traces of this worker in a ring buffer"""
+
+    def __init__(self, capacity=200):
+        self.traces = deque(maxlen=capacity)
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+    def recent(self):
+        return list(self.traces)
+
+
+class JsonlExporter:
+    """
+    Appends each trace as a JSON line; readable by every worker
+
+    Past max_bytes the file is renamed to <path>.1 (replacing the previous
+    one), so at most about twice max_bytes is kept on disk.
+    """
+
+    def __init__(self, path, capacity=200, max_bytes=MAX_TRACE_FILE_BYTES):
+        self.path = path
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def export(self, trace):
+        line = json.dumps(trace) + '\n'
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            try:
+                if os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, self.path + '.1')
+            except OSError:
+                pass
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def recent(self):
+        """The last `capacity` traces, oldest first"""
+        lines = deque(maxlen=self.capacity)
+        for path in (self.path + '.1', self.path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    lines.extend(f)
+            except OSError:
+                continue
+        traces = []
+        for line in lines:
+            try:
+                traces.append(json.loads(line))
+            except ValueError:
+                continue  # A line cut short by a concurrent writer
+        return traces
+
+
+class Tracer:
+    """Creates spans and hands finished traces to the exporter"""
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def start_trace(self, name, **attributes):
+        """Open a root span; returns a token for finish_trace"""
+        trace = Trace(name)
+        span = Span(trace, name, attributes=attributes)
+        trace.add(span)
+        return span, _current_span.set(span)
+
+    def finish_trace(self, root, token, **attributes):
+        root.set(**attributes)
+        root.end = time.perf_counter()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            _current_span.set(None)  # Finished from another context (e.g. a streamed response)
+        try:
+            self.exporter.export(root.trace.to_dict())
+        except Exception as e:
+            logger.warning(f"Could not export trace {root.trace.trace_id}: {str(e)}")
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time a block as a child of the current span (no-op outside a trace)"""
+        parent = _current_span.get()
+        if parent is None or not self.enabled:
+            yield None
+            return
+        span = Span(parent.trace, name, parent_id=parent.span_id, attributes=attributes)
+        if not parent.trace.add(span):
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current_span.reset(token)
+
+    def recent(self):
+        """Recent finished traces as dicts (empty when tracing is off)"""
+        return self.exporter.recent() if self.enabled else []
+
+
+tracer = Tracer()
+
+
+def current_span():
+    return _current_span.get()
+
+
+def traced(name=None):
+    """
+    Decorator recording each call as a span
+
+    The default span name is the function's qualified name, e.g.
+    EnhancedATSAnalyzer.analyze.
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def slowest(traces, limit=50):
+    """The slowest of the given traces, slowest first"""
+    return sorted(traces, key=lambda trace: trace['duration_ms'], reverse=True)[:limit]
+
+
+def span_tree(trace):
+    """
+    A trace's spans in depth-first order
+
+    Returns:
+        List of (depth, span dict) with children following their parent in start order
+    """
+    children = {}
+    for span in trace['spans']:
+        children.setdefault(span['parent_id'], []).append(span)
+    ordered = []
+    stack = [(0, span) for span in reversed(sorted(children.get(None, []), key=lambda s: s['offset_ms']))]
+    while stack:
+        depth, span = stack.pop()
+        ordered.append((depth, span))
+        for child in reversed(sorted(children.get(span['span_id'], []), key=lambda s: s['offset_ms'])):
+            stack.append((depth + 1, child))
+    return ordered
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_span.get() is None:
+        return
+    manager = tracer.span('db.query', statement=statement[:MAX_STATEMENT_LENGTH])
+    manager.__enter__()
+    conn.info.setdefault('trace_spans', []).append(manager)
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    managers = conn.info.get('trace_spans')
+    if managers:
+        managers.pop().__exit__(None, None, None)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    managers = connection.info.get('trace_spans') if connection is not None else None
+    if managers:
+        span = _current_span.get()
+        if span is not None:
+            span.error = str(exception_context.original_exception)
+        managers.pop().__exit__(None, None, None)
+
+
+@event.listens_for(Session, 'before_commit')
+def _before_commit(session):
+    if _current_span.get() is None:
+        return
+    manager = tracer.span('db.commit')
+    manager.__enter__()
+    session.info.setdefault('trace_commits', []).append(manager)
+
+
+def _end_commit(session):
+    managers = session.info.get('trace_commits')
+    if managers:
+        managers.pop().__exit__(None, None, None)
+
+event.listen(Session, 'after_commit', _end_commit)
+event.listen(Session, 'after_soft_rollback', lambda session, previous_transaction: _end_commit(session))
+
+
+def init_tracing(app):
+    """
+    Trace every request of an app
+
+    Config:
+        TRACE_EXPORTER: 'memory' (default), 'jsonl' or 'off'
+        TRACE_FILE: JSONL path (default: <instance_path>/traces.jsonl)
+        TRACE_FILE_MAX_BYTES: Size at which TRACE_FILE is rotated to TRACE_FILE.1 (default: 5 MB)
+        TRACE_BUFFER_SIZE: Traces kept for the admin page (default: 200)
+
+    Raises:
+        ValueError: If TRACE_EXPORTER names an unknown exporter
+    """
+    exporter_name = app.config.get('TRACE_EXPORTER') or 'memory'
+    capacity = int(app.config.get('TRACE_BUFFER_SIZE') or 200)
+    if exporter_name == 'off':
+        logger.info("Request tracing disabled")
+        return
+    if exporter_name == 'memory':
+        tracer.exporter = MemoryExporter(capacity)
+    elif exporter_name == 'jsonl':
+        path = app.config.get('TRACE_FILE') or os.path.join(app.instance_path, 'traces.jsonl')
+        tracer.exporter = JsonlExporter(path, capacity,
+                                        max_bytes=int(app.config.get('TRACE_FILE_MAX_BYTES') or MAX_TRACE_FILE_BYTES))
+    else:
+        raise ValueError(f"Unknown TRACE_EXPORTER: {exporter_name}")
+
+    @app.before_request
+    def start_request_trace():
+        if request.endpoint == 'static' or request.path in PROBE_PATHS:
+            return
+        g.trace_root, g.trace_token = tracer.start_trace(
+            f"{request.method} {request.endpoint or 'unmatched'}", path=request.path
+        )
+
+    @app.teardown_request
+    def finish_request_trace(exception=None):
+        root = g.pop('trace_root', None)
+        if root is None:
+            return
+        if exception is not None:
+            root.error = f"{type(exception).__name__}: {exception}"
+        tracer.finish_trace(root, g.pop('trace_token'), status=g.pop('trace_status', None))
+
+    @app.after_request
+    def record_trace_status(response):
+        g.trace_status = response.status_code
+        return response
+
+    logger.info(f"Request tracing enabled ({exporter_name} exporter)")
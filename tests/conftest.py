@@ -0,0 +1,53 @@
+"""
+Shared database fixtures
+
+Database-backed tests run against in-memory SQLite by default. Set
+TEST_DATABASE_URL to run the same tests against another database, e.g. a
+local Postgres:
+
+    TEST_DATABASE_URL=postgresql://localhost/resumerocket_test python -m pytest tests
+
+Tests marked sqlite_only (FTS5, EXPLAIN QUERY PLAN, legacy TEXT rows) are
+skipped when the target isn't SQLite.
+"""
+import os
+import sys
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from extensions import db
+from db_config import configure_database
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'sqlite_only: test depends on SQLite-specific behaviour')
+
+
+def pytest_collection_modifyitems(config, items):
+    if not TEST_DATABASE_URL or TEST_DATABASE_URL.startswith('sqlite'):
+        return
+    skip = pytest.mark.skip(reason=f'SQLite-specific; TEST_DATABASE_URL is not SQLite')
+    for item in items:
+        if 'sqlite_only' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def make_db_app():
+    """
+    Factory for a Flask app bound to the test database
+
+    Pass the SQLite URI the test would use on its own; TEST_DATABASE_URL
+    overrides it. Extra keyword arguments are set as app config.
+    """
+    def factory(default_uri='sqlite:///:memory:', **config):
+        app = Flask(__name__)
+        configure_database(app, TEST_DATABASE_URL or default_uri)
+        app.config.update(config)
+        db.init_app(app)
+        return app
+    return factory
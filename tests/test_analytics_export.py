@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+import pytest
+from datetime import datetime
+
+from extensions import db
+from models import User, JobDescription, CustomizedResume, ABTest
+from services.analytics_export import ExportError, iter_rows, stream_export, parse_date
+
+
+@pytest.fixture
+def export_app(make_db_app):
+    app = make_db_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username='jane', email='jane@example.com')
+        db.session.add(user)
+        db.session.flush()
+        job = JobDescription(title='Engineer', content='Python', user_id=user.id)
+        db.session.add(job)
+        db.session.flush()
+        for day in range(1, 6):
+            db.session.add(CustomizedResume(
+                user_id=user.id, job_description_id=job.id, original_content='a', customized_content='b',
+                original_ats_score=40.0 + day, ats_score=60.0 + day, created_at=datetime(2025, 3, day),
+                matching_keywords=['python', 'flask'], comparison_data={'sections': {'skills': day}}
+            ))
+        db.session.add(ABTest(name='prompt v2', variants={'a': 'x', 'b': 'y'}, start_date=datetime(2025, 3, 1)))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_iter_rows_selects_columns_and_date_range(export_app):
+    rows = list(iter_rows('customizations', ['id', 'ats_score', 'created_at'],
+                          start=datetime(2025, 3, 2), end=datetime(2025, 3, 4), batch_size=1))
+    assert [row['ats_score'] for row in rows] == [62.0, 63.0]
+    assert set(rows[0]) == {'id', 'ats_score', 'created_at'}
+
+
+def test_rows_are_not_loaded_into_the_session(export_app):
+    db.session.expunge_all()
+    for _ in iter_rows('customizations', batch_size=2):
+        pass
+    assert len(db.session.identity_map) == 0
+
+
+def test_jsonl_export_keeps_nested_json(export_app):
+    lines = list(stream_export('customizations', 'jsonl', columns=['id', 'matching_keywords', 'comparison_data', 'created_at']))
+    assert len(lines) == 5
+    first = json.loads(lines[0])
+    assert first['matching_keywords'] == ['python', 'flask']
+    assert first['comparison_data'] == {'sections': {'skills': 1}}
+    assert first['created_at'] == '2025-03-01T00:00:00'
+
+
+def test_csv_export_has_header_and_json_cells(export_app):
+    body = ''.join(stream_export('customizations', 'csv', columns=['id', 'ats_score', 'user_rating', 'matching_keywords']))
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert len(rows) == 5
+    assert rows[0]['ats_score'] == '61.0'
+    assert rows[0]['user_rating'] == ''
+    assert json.loads(rows[0]['matching_keywords']) == ['python', 'flask']
+
+
+def test_default_columns_per_dataset(export_app):
+    row = json.loads(next(iter(stream_export('ab_tests'))))
+    assert row['name'] == 'prompt v2'
+    assert row['variants'] == {'a': 'x', 'b': 'y'}
+
+
+def test_invalid_requests_raise_before_streaming(export_app):
+    with pytest.raises(ExportError):
+        stream_export('users')
+    with pytest.raises(ExportError):
+        stream_export('customizations', 'xml')
+    with pytest.raises(ExportError):
+        stream_export('customizations', columns=['password_hash'])
+    with pytest.raises(ExportError):
+        parse_date('last tuesday')
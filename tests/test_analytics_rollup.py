@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+from datetime import datetime
+
+from extensions import db
+from models import User, JobDescription, CustomizedResume, AnalyticsRollup
+
+
+@pytest.fixture
+def rollup_app(make_db_app):
+    app = make_db_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username='jane', email='jane@example.com')
+        db.session.add(user)
+        db.session.flush()
+        job = JobDescription(title='Engineer', content='Python', user_id=user.id)
+        db.session.add(job)
+        db.session.commit()
+        yield user.id, job.id
+        db.session.remove()
+        db.drop_all()
+
+
+def add_resume(user_id, job_id, original, new, created_at=None, rating=None):
+    resume = CustomizedResume(user_id=user_id, job_description_id=job_id, original_content='a',
+                              customized_content='b', original_ats_score=original, ats_score=new,
+                              user_rating=rating, created_at=created_at)
+    db.session.add(resume)
+    db.session.commit()
+    return resume
+
+
+def test_rollups_follow_inserts_updates_and_deletes(rollup_app):
+    user_id, job_id = rollup_app
+    add_resume(user_id, job_id, 40.0, 60.0, created_at=datetime(2025, 3, 1))
+    second = add_resume(user_id, job_id, 50.0, 55.0)
+    add_resume(user_id, job_id, None, 70.0)
+
+    stats = AnalyticsRollup.summary()
+    assert stats['total_customizations'] == 3
+    assert stats['avg_improvement'] == 12.5
+    assert stats['feedback_count'] == 0
+
+    # Feedback on an expired instance: the old value isn't in attribute history
+    db.session.expire_all()
+    second.user_rating = 4
+    db.session.commit()
+    stats = AnalyticsRollup.summary()
+    assert stats['feedback_count'] == 1
+    assert stats['avg_rating'] == 4.0
+
+    db.session.delete(second)
+    db.session.commit()
+    stats = AnalyticsRollup.summary()
+    assert stats['total_customizations'] == 2
+    assert stats['avg_improvement'] == 20.0
+    assert stats['feedback_count'] == 0
+
+    assert db.session.get(AnalyticsRollup, '2025-03-01').customization_count == 1
+    assert AnalyticsRollup.reconcile() == []
+
+
+def test_reconcile_detects_and_fixes_drift(rollup_app):
+    user_id, job_id = rollup_app
+    add_resume(user_id, job_id, 40.0, 60.0, rating=5)
+    # Bulk SQL bypasses the ORM events
+    db.session.execute(db.update(CustomizedResume).values(user_rating=None))
+    db.session.commit()
+
+    mismatches = AnalyticsRollup.reconcile(fix=True)
+    assert {(bucket, name) for bucket, name, _, _ in mismatches} >= {('all', 'feedback_count'), ('all', 'rating_sum')}
+    assert AnalyticsRollup.reconcile() == []
+    assert AnalyticsRollup.summary()['feedback_count'] == 0
+
+
+def test_concurrent_writers_share_a_new_bucket(make_db_app, tmp_path):
+    # Separate connections, as two workers opening the same day's row would use
+    app = make_db_app(f"sqlite:///{tmp_path / 'rollup.db'}")
+    with app.app_context():
+        db.create_all()
+        engine = db.engine
+        errors = []
+
+        def write():
+            try:
+                with engine.begin() as connection:
+                    AnalyticsRollup.apply_deltas(connection, {'2025-03-01': {'customization_count': 1}})
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert db.session.get(AnalyticsRollup, '2025-03-01').customization_count == 8
+        db.drop_all()
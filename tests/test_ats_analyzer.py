@@ -471,7 +471,8 @@ class TestResumeCustomizer(unittest.TestCase):
             self.customizer.analyze_resume(SAMPLE_RESUME, SAMPLE_JOB)
         self.assertIn("Failed to analyze resume", str(context.exception))
         
-        # Test error handling in customize_resume
+        # Test error handling in customize_resume (it builds its own analyzers, so fail the API call)
+        self.anthropic_mock.messages.create.side_effect = Exception("API error")
         with self.assertRaises(Exception) as context:
             self.customizer.customize_resume(SAMPLE_RESUME, SAMPLE_JOB)
         self.assertIn("Failed to customize resume", str(context.exception))
@@ -184,6 +184,16 @@ class TestEnhancedATSAnalyzer:
         assert 'Python' in sections['skills']
         assert 'Computer Science' in sections['education']
         
+    def test_precomputed_sections_skip_detection(self, analyzer):
+        """Test that a precomputed section map bypasses section detection."""
+        sections = {'skills': 'Python, Django, SQL', 'experience': 'Built APIs with Django'}
+        
+        with patch.object(analyzer, '_identify_sections') as identify_mock:
+            result = analyzer.analyze(SAMPLE_RESUME, SAMPLE_JOB, resume_sections=sections)
+        
+        identify_mock.assert_not_called()
+        assert set(result['section_scores'].keys()) <= set(sections.keys())
+
     def test_ngram_extraction(self, analyzer):
         """Test n-gram extraction capability."""
         ngrams = analyzer._extract_ngrams("Python programming with Django and Flask")
@@ -0,0 +1,36 @@
+from scripts.bench_suite import (
+    compare, generate_job_description, generate_resume, run_suite, threshold_for, to_markdown
+)
+
+
+def test_corpus_is_deterministic_and_sized():
+    resume, skills = generate_resume(words=500, keywords=20, seed=3)
+    assert generate_resume(words=500, keywords=20, seed=3) == (resume, skills)
+    assert len(skills) == 20 and all(skill in resume.lower() for skill in skills)
+    assert abs(len(resume.split()) - 500) < 100
+    assert '## Experience' in to_markdown(resume)
+
+    job, wanted = generate_job_description(words=300, keywords=12, seed=3)
+    assert 'Requirements' in job and all(skill in job.lower() for skill in wanted)
+
+
+def test_suite_runs_selected_benchmarks():
+    results = run_suite(sizes=('small',), runs=2, warmup=0, pattern='parse/*')
+    assert set(results) == {'parse/md/small', 'parse/docx/small', 'parse/pdf/small'}
+    assert all(stats['runs'] == 2 and stats['min_ms'] <= stats['median_ms'] for stats in results.values())
+
+
+def test_regressions_respect_thresholds():
+    thresholds = {'default': 0.25, 'min_delta_ms': 0.5, 'benchmarks': {'analyze/*': 0.1, 'analyze/*/*': 0.5}}
+    assert threshold_for('analyze/small', thresholds) == 0.1
+    assert threshold_for('analyze/small/extract_ngrams', thresholds) == 0.5
+    assert threshold_for('export/pdf/small', thresholds) == 0.25
+
+    baseline = {'benchmarks': {'analyze/small': {'median_ms': 10.0}, 'export/pdf/small': {'median_ms': 1.0},
+                               'parse/md/small': {'median_ms': 0.01}}}
+    current = {'analyze/small': {'median_ms': 11.5}, 'export/pdf/small': {'median_ms': 1.2},
+               'parse/md/small': {'median_ms': 0.05}, 'pdf_cache/add/small': {'median_ms': 2.0}}
+    rows, regressions = compare(current, baseline, thresholds)
+    # parse/md is 5x slower but within min_delta_ms; pdf_cache has no baseline
+    assert regressions == ['analyze/small']
+    assert [row[0] for row in rows] == ['analyze/small', 'export/pdf/small', 'parse/md/small']
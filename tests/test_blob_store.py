@@ -0,0 +1,74 @@
+import os
+import pytest
+from flask import send_file
+
+from extensions import db
+from models import StoredBlob
+from services.blob_store import BlobStore
+
+
+PDF_BYTES = b"%PDF-1.4\n" + b"resume body " * 100
+
+
+@pytest.fixture
+def blob_app(tmp_path, make_db_app):
+    app = make_db_app(BLOB_STORE_DIR=str(tmp_path / 'blobs'))
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_identical_uploads_stored_once(blob_app):
+    store = BlobStore()
+    first = store.put(PDF_BYTES)
+    second = store.put(PDF_BYTES)
+    db.session.commit()
+
+    assert first == second
+    assert os.path.exists(store.path_for(first))
+    assert db.session.get(StoredBlob, first).ref_count == 2
+
+
+def test_open_returns_memory_mapped_contents(blob_app):
+    store = BlobStore()
+    blob_hash = store.put(PDF_BYTES)
+    db.session.commit()
+
+    blob = store.open(blob_hash)
+    assert len(blob) == len(PDF_BYTES)
+    with blob_app.test_request_context():
+        response = send_file(blob, mimetype='application/pdf', etag=blob_hash)
+        response.direct_passthrough = False
+        assert response.get_data() == PDF_BYTES
+        assert response.get_etag()[0] == blob_hash
+
+
+def test_garbage_collection_removes_unreferenced_blobs(blob_app):
+    store = BlobStore()
+    kept = store.put(b"kept " * 100)
+    dropped = store.put(PDF_BYTES)
+    db.session.commit()
+
+    store.release(dropped)
+    db.session.commit()
+    result = store.collect_garbage()
+
+    assert result['deleted_count'] == 1
+    assert not os.path.exists(store.path_for(dropped))
+    assert os.path.exists(store.path_for(kept))
+    assert db.session.get(StoredBlob, dropped) is None
+
+
+def test_retain_survives_missing_file(blob_app):
+    store = BlobStore()
+    blob_hash = store.put(PDF_BYTES)
+    db.session.commit()
+    os.remove(store.path_for(blob_hash))
+
+    store.retain(blob_hash)
+    db.session.commit()
+
+    blob = db.session.get(StoredBlob, blob_hash)
+    assert blob.ref_count == 2 and blob.size == len(PDF_BYTES)
@@ -0,0 +1,128 @@
+import logging
+import pytest
+from sqlalchemy import create_engine, text
+
+from chunked_migration import ChunkedMigration, Checkpoint, Progress
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY, value INTEGER, doubled INTEGER)"))
+        connection.execute(text("INSERT INTO item (id, value) VALUES (:id, :value)"),
+                           [{'id': i, 'value': i} for i in range(1, 11)])
+    yield engine
+    engine.dispose()
+
+
+def double_batch(rows):
+    return [("UPDATE item SET doubled = :doubled WHERE id = :id",
+             [{'id': row_id, 'doubled': value * 2} for row_id, value in rows])]
+
+
+def doubled(engine):
+    with engine.connect() as connection:
+        return dict(connection.execute(text("SELECT id, doubled FROM item")).fetchall())
+
+
+def test_run_processes_every_row_in_batches(engine):
+    seen = []
+
+    def process(rows):
+        seen.append([row[0] for row in rows])
+        return double_batch(rows)
+
+    with engine.connect() as connection:
+        stats = ChunkedMigration('double', 'item', ['value'], batch_size=4, commit_each_batch=True).run(connection, process)
+
+    assert seen == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+    assert stats['rows'] == 10 and stats['batches'] == 3 and stats['writes'] == 10 and stats['last_id'] == 10
+    assert doubled(engine) == {i: i * 2 for i in range(1, 11)}
+
+
+def test_where_clause_limits_rows(engine):
+    with engine.connect() as connection:
+        migration = ChunkedMigration('double', 'item', ['value'], where='value > 7', commit_each_batch=True)
+        assert migration.count_remaining(connection) == 3
+        assert migration.run(connection, double_batch)['rows'] == 3
+
+
+def test_dry_run_writes_nothing(engine, tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint.json'
+    with engine.connect() as connection:
+        stats = ChunkedMigration('double', 'item', ['value'], batch_size=3, dry_run=True, commit_each_batch=True,
+                                 checkpoint_path=str(checkpoint_path)).run(connection, double_batch)
+
+    assert stats['rows'] == 10 and stats['writes'] == 10
+    assert set(doubled(engine).values()) == {None}
+    assert not checkpoint_path.exists()
+
+
+def test_interrupted_run_resumes_from_checkpoint(engine, tmp_path):
+    checkpoint_path = str(tmp_path / 'checkpoint.json')
+
+    def failing(rows):
+        if rows[0][0] > 4:
+            raise RuntimeError("connection lost")
+        return double_batch(rows)
+
+    with engine.connect() as connection:
+        migration = ChunkedMigration('double', 'item', ['value'], batch_size=2, commit_each_batch=True,
+                                     checkpoint_path=checkpoint_path)
+        with pytest.raises(RuntimeError):
+            migration.run(connection, failing)
+    assert Checkpoint(checkpoint_path).load('double') == (4, 4)
+
+    seen = []
+
+    def process(rows):
+        seen.extend(row[0] for row in rows)
+        return double_batch(rows)
+
+    with engine.connect() as connection:
+        stats = migration.run(connection, process)
+
+    assert seen == [5, 6, 7, 8, 9, 10]
+    assert stats['rows'] == 6
+    assert doubled(engine) == {i: i * 2 for i in range(1, 11)}
+    # Finished runs clear their checkpoint so the next run starts over
+    assert Checkpoint(checkpoint_path).load('double') == (None, 0)
+
+
+def test_checkpoint_keeps_other_migrations(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'))
+    checkpoint.save('first', 10, 10)
+    checkpoint.save('second', 3, 2)
+    checkpoint.clear('first')
+    assert checkpoint.load('first') == (None, 0)
+    assert checkpoint.load('second') == (3, 2)
+
+
+def test_writes_go_to_target_connection(engine, tmp_path):
+    target_engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    with target_engine.begin() as connection:
+        connection.execute(text("CREATE TABLE copy (id INTEGER PRIMARY KEY, value INTEGER)"))
+
+    def copy_batch(rows):
+        return [("INSERT INTO copy (id, value) VALUES (:id, :value)",
+                 [{'id': row_id, 'value': value} for row_id, value in rows])]
+
+    with engine.connect() as source, target_engine.connect() as target:
+        ChunkedMigration('copy', 'item', ['value'], batch_size=4, commit_each_batch=True).run(
+            source, copy_batch, target=target)
+
+    with target_engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*), sum(value) FROM copy")).one() == (10, 55)
+    target_engine.dispose()
+
+
+def test_progress_reports_rate_and_eta(caplog):
+    progress = Progress('copy', total=100, logger=logging.getLogger('test_progress'), interval=0)
+    with caplog.at_level(logging.INFO, logger='test_progress'):
+        progress.advance(25, 25)
+
+    assert progress.rate > 0
+    assert progress.eta > 0
+    assert "copy: 25/100 rows (25.0%) up to id 25" in caplog.text
+    assert "ETA" in caplog.text
@@ -0,0 +1,67 @@
+import sys
+import pytest
+
+from extensions import db
+from db_bootstrap import ensure_schema, schema_fingerprint
+from services import lazy_imports
+from services.lazy_imports import LazyModule, LazyObject, lazy_module, apply_cold_start_mode
+from scripts.bench_startup import import_app, load_budget, parse_importtime, check_budget
+
+
+def test_lazy_module_imports_on_first_use(monkeypatch):
+    monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+    module = LazyModule('colorsys')
+    assert not module.loaded and 'colorsys' not in sys.modules
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert module.loaded
+
+
+def test_lazy_module_is_shared_and_object_built_once(monkeypatch):
+    monkeypatch.setattr(lazy_imports, 'DEFERRED', {})
+    assert lazy_module('json') is lazy_module('json')
+
+    built = []
+    client = LazyObject(lambda: built.append(1) or {'key': 'value'})
+    assert built == []
+    assert client.get('key') == 'value' and client.copy() == {'key': 'value'}
+    assert built == [1]
+
+
+def test_unknown_cold_start_mode_rejected():
+    with pytest.raises(ValueError):
+        apply_cold_start_mode('instant')
+
+
+def test_schema_creation_skipped_when_current(make_db_app):
+    app = make_db_app()
+    with app.app_context():
+        assert ensure_schema() is True
+        assert ensure_schema() is False
+        assert ensure_schema(force=True) is True
+        db.drop_all()
+
+
+def test_fingerprint_tracks_columns():
+    from sqlalchemy import Column, Integer, MetaData, String, Table
+    metadata = MetaData()
+    table = Table('probe', metadata, Column('id', Integer, primary_key=True))
+    before = schema_fingerprint(metadata)
+    table.append_column(Column('name', String(50)))
+    assert schema_fingerprint(metadata) != before
+
+
+def test_parse_importtime_and_budget():
+    stderr = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        120 |   json.decoder\n"
+              "import time:       300 |       2500 | app\n")
+    modules = parse_importtime(stderr)
+    assert modules == {'json.decoder': 0.12, 'app': 2.5}
+    assert check_budget(modules, [], {'modules_ms': {'app': 1}}) == ['app took 2 ms to import (budget 1 ms)']
+    assert check_budget(modules, ['fitz'], {'modules_ms': {'app': 10}})[0].startswith('fitz was imported')
+
+
+def test_app_import_defers_heavy_modules():
+    deferred = load_budget()['deferred']
+    modules, imported = import_app(deferred)
+    assert imported == []
+    assert 'app' in modules and 'services.pdf_extractor' in modules
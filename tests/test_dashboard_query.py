@@ -0,0 +1,79 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.exc import InvalidRequestError
+
+from extensions import db
+from models import User, JobDescription, CustomizedResume
+from services.dashboard_query import dashboard_page, dashboard_stats
+
+
+@pytest.fixture
+def dashboard_app(make_db_app):
+    app = make_db_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user_with_resumes(dashboard_app):
+    user = User(username='jane', email='jane@example.com')
+    other = User(username='joe', email='joe@example.com')
+    db.session.add_all([user, other])
+    db.session.flush()
+    job = JobDescription(title='Backend Engineer', content='Python Flask SQL', user_id=user.id)
+    db.session.add(job)
+    db.session.flush()
+
+    base = datetime(2025, 3, 1)
+    for i in range(7):
+        db.session.add(CustomizedResume(
+            user_id=user.id,
+            job_description_id=job.id,
+            original_content='original ' * 100,
+            customized_content='customized ' * 100,
+            # Pairs share a timestamp so the id tie-breaker matters
+            created_at=base + timedelta(hours=i // 2),
+            original_ats_score=50.0,
+            ats_score=50.0 + i
+        ))
+    db.session.add(CustomizedResume(
+        user_id=other.id, job_description_id=job.id, original_content='x', customized_content='x',
+        original_ats_score=0.0, ats_score=100.0
+    ))
+    db.session.commit()
+    return user
+
+
+def test_keyset_pages_cover_every_row_once(user_with_resumes):
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = dashboard_page(user_with_resumes.id, cursor=cursor, page_size=3)
+        seen.extend(resume.id for resume, _, _ in rows)
+        if not cursor:
+            break
+
+    expected = [r.id for r in CustomizedResume.query.filter_by(user_id=user_with_resumes.id)
+                .order_by(CustomizedResume.created_at.desc(), CustomizedResume.id.desc())]
+    assert seen == expected
+
+
+def test_heavy_columns_are_not_loaded(user_with_resumes):
+    rows, _ = dashboard_page(user_with_resumes.id)
+    resume, job_title, _ = rows[0]
+
+    assert job_title == 'Backend Engineer'
+    assert resume.ats_score is not None
+    with pytest.raises(InvalidRequestError):
+        resume.customized_content
+
+
+def test_stats_aggregated_in_sql(user_with_resumes):
+    stats = dashboard_stats(user_with_resumes.id)
+
+    assert stats['total_resumes'] == 7
+    assert stats['avg_improvement'] == 3.0
+    assert dashboard_stats(user_with_resumes.id, search_query='nothing matches')['total_resumes'] == 0
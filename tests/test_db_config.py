@@ -0,0 +1,41 @@
+import os
+from flask import Flask
+from sqlalchemy import text
+
+from extensions import db
+from db_config import resolve_database_uri, engine_options, configure_database, SQLITE_BUSY_TIMEOUT_MS
+
+
+def test_resolve_database_uri(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+
+    assert resolve_database_uri() == f"sqlite:///{tmp_path / 'resumerocket.db'}"
+    assert resolve_database_uri('sqlite:///instance/resumerocket.db') == f"sqlite:///{tmp_path / 'instance' / 'resumerocket.db'}"
+    assert resolve_database_uri('sqlite:////data/app.db') == 'sqlite:////data/app.db'
+    assert resolve_database_uri('postgres://u:p@db:5432/rr') == 'postgresql://u:p@db:5432/rr'
+
+    monkeypatch.setenv('DATABASE_URL', 'sqlite:///from-env.db')
+    assert resolve_database_uri() == f"sqlite:///{tmp_path / 'from-env.db'}"
+
+
+def test_postgres_engine_options():
+    options = engine_options('postgresql://localhost/rr')
+    assert options['pool_pre_ping'] is True
+    assert options['pool_recycle'] > 0
+    assert options['pool_size'] > 0
+    assert engine_options('sqlite:///x.db') == {}
+
+
+def test_sqlite_pragmas_applied(tmp_path):
+    app = Flask(__name__)
+    configure_database(app, f"sqlite:///{tmp_path / 'nested' / 'app.db'}")
+    db.init_app(app)
+
+    with app.app_context():
+        assert os.path.isdir(tmp_path / 'nested')
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert db.session.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+        assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == SQLITE_BUSY_TIMEOUT_MS
+        assert db.session.execute(text('PRAGMA mmap_size')).scalar() > 0
+        db.session.remove()
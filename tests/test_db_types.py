@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import text
+
+from extensions import db
+from db_types import (
+    compress_payload, decompress_payload, compress_existing_rows,
+    HEADER_RAW, HEADER_ZLIB_V1, MIN_COMPRESS_SIZE
+)
+from models import PDFCache
+
+
+RESUME_TEXT = "Experienced Python developer with Flask and SQLAlchemy. " * 40
+
+
+@pytest.fixture
+def db_app(make_db_app):
+    app = make_db_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_payload_round_trip():
+    data = RESUME_TEXT.encode('utf-8')
+    stored = compress_payload(data)
+    assert stored[0] == HEADER_ZLIB_V1
+    assert len(stored) < len(data)
+    assert decompress_payload(stored) == data
+
+
+def test_small_payload_stored_raw():
+    data = b"x" * (MIN_COMPRESS_SIZE - 1)
+    stored = compress_payload(data)
+    assert stored[0] == HEADER_RAW
+    assert decompress_payload(stored) == data
+
+
+def test_legacy_binary_returned_unchanged():
+    legacy = b"%PDF-1.4 legacy upload"
+    assert decompress_payload(legacy) == legacy
+
+
+def test_compressed_text_column_round_trip(db_app):
+    db.session.add(PDFCache(content_hash="a" * 64, extracted_text=RESUME_TEXT, file_size=100, page_count=1))
+    db.session.commit()
+    db.session.expire_all()
+
+    stored = db.session.execute(text("SELECT extracted_text FROM pdf_cache")).scalar()
+    assert stored[0] == HEADER_ZLIB_V1
+    assert PDFCache.query.first().extracted_text == RESUME_TEXT
+
+
+@pytest.mark.sqlite_only
+def test_compress_existing_rows_converts_legacy_text(db_app):
+    db.session.execute(
+        text("INSERT INTO pdf_cache (content_hash, extracted_text, file_size, page_count, hit_count) VALUES (:h, :t, 100, 1, 0)"),
+        [{'h': f"{i:064d}", 't': RESUME_TEXT} for i in range(5)]
+    )
+    db.session.commit()
+    assert PDFCache.query.first().extracted_text == RESUME_TEXT
+
+    connection = db.session.connection()
+    stats = compress_existing_rows(connection, 'pdf_cache', 'extracted_text', batch_size=2)
+    assert stats['rows_compressed'] == 5
+    assert stats['bytes_after'] < stats['bytes_before']
+
+    # Re-running is a no-op once every row carries a header
+    assert compress_existing_rows(connection, 'pdf_cache', 'extracted_text')['rows_compressed'] == 0
+    db.session.commit()
+    db.session.expire_all()
+    assert all(entry.extracted_text == RESUME_TEXT for entry in PDFCache.query.all())
@@ -0,0 +1,101 @@
+import pytest
+
+from extensions import db
+from models import CustomizedResume, ExportCache, JobDescription, StoredBlob, User
+from services.export_service import ExportService, EXPORT_TEMPLATE_VERSION
+from services.file_parser import get_pdf_styles
+
+
+RESUME_MARKDOWN = "# Jane Doe\n\n## Experience\n\n- Built Flask services\n- Tuned SQL queries\n"
+
+
+@pytest.fixture
+def export_app(tmp_path, make_db_app):
+    # File-backed so the background pre-render thread sees the same database
+    app = make_db_app(f"sqlite:///{tmp_path / 'export.db'}", BLOB_STORE_DIR=str(tmp_path / 'blobs'))
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_pdf_styles_built_once():
+    assert get_pdf_styles() is get_pdf_styles()
+
+
+def test_second_download_is_cache_read(export_app, monkeypatch):
+    service = ExportService()
+    calls = []
+    render = ExportService.RENDERERS['docx']
+    monkeypatch.setitem(ExportService.RENDERERS, 'docx', lambda content: calls.append(content) or render(content))
+
+    first = service.get_or_render(RESUME_MARKDOWN, 'docx')
+    second = service.get_or_render(RESUME_MARKDOWN, 'docx')
+
+    assert first == second
+    assert len(calls) == 1
+    entry = ExportCache.query.one()
+    assert entry.template_version == EXPORT_TEMPLATE_VERSION
+    assert entry.hit_count == 1
+
+    blob, blob_hash = service.open_export(RESUME_MARKDOWN, 'docx')
+    assert blob_hash == first
+    assert blob[:2] == b'PK'  # DOCX is a zip archive
+
+
+def test_prerender_fills_cache_for_both_formats(export_app):
+    service = ExportService()
+    service.prerender(RESUME_MARKDOWN).result(timeout=30)
+
+    formats = {entry.export_format for entry in ExportCache.query.all()}
+    assert formats == {'pdf', 'docx'}
+
+
+def test_purge_stale_releases_blobs(export_app):
+    service = ExportService()
+    blob_hash = service.get_or_render(RESUME_MARKDOWN, 'pdf')
+
+    assert ExportCache.purge_stale(EXPORT_TEMPLATE_VERSION + 1) == 1
+    assert ExportCache.query.count() == 0
+    assert db.session.get(StoredBlob, blob_hash).ref_count == 0
+
+
+def test_evict_to_budget_drops_least_recently_downloaded(export_app):
+    service = ExportService()
+    for i in range(3):
+        service.get_or_render(f"{RESUME_MARKDOWN}\n{i}\n", 'docx')
+    # Download the oldest again so the second becomes least recent
+    service.get_or_render(f"{RESUME_MARKDOWN}\n0\n", 'docx')
+    sizes = {entry.content_hash: entry.size for entry in ExportCache.query.all()}
+    evicted = ExportService.content_hash(f"{RESUME_MARKDOWN}\n1\n")
+
+    result = ExportCache.evict_to_budget(sum(sizes.values()) - 1)
+
+    assert result['deleted_count'] == 1 and result['reclaimed_bytes'] == sizes[evicted]
+    assert {entry.content_hash for entry in ExportCache.query.all()} == set(sizes) - {evicted}
+
+
+def test_unreferenced_exports_purged(export_app):
+    user = User(username='jane', email='jane@example.com')
+    db.session.add(user)
+    db.session.flush()
+    job = JobDescription(title='Engineer', content='Python', user_id=user.id)
+    db.session.add(job)
+    db.session.flush()
+    resume = CustomizedResume(user_id=user.id, job_description_id=job.id,
+                              original_content='original', customized_content=RESUME_MARKDOWN)
+    db.session.add(resume)
+    db.session.commit()
+    service = ExportService()
+    blob_hash = service.get_or_render(RESUME_MARKDOWN, 'pdf')
+    service.get_or_render('# Nobody uses this\n', 'pdf')
+
+    assert ExportCache.purge_unreferenced() == 1
+    assert ExportCache.query.one().blob_hash == blob_hash
+
+    db.session.delete(resume)
+    db.session.flush()
+    assert ExportCache.purge_unreferenced(ExportService.content_hash(RESUME_MARKDOWN)) == 1
+    assert ExportCache.query.count() == 0
+    assert db.session.get(StoredBlob, blob_hash).ref_count == 0
@@ -0,0 +1,54 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from routes.health import health_bp
+from services.health import ReadinessProbe, check_database, check_services, init_health
+
+
+@pytest.fixture
+def app(make_db_app):
+    app = make_db_app()
+    app.register_blueprint(health_bp)
+    return app
+
+
+def test_liveness_does_no_work(app):
+    response = app.test_client().get('/healthz')
+    assert response.status_code == 200 and response.json == {'status': 'ok'}
+    assert 'Set-Cookie' not in response.headers
+
+
+def test_readiness_reports_failed_checks(app):
+    init_health(app, {'ai_suggestions': SimpleNamespace(anthropic_key=None)})
+    response = app.test_client().get('/readyz')
+    assert response.status_code == 503
+    checks = response.json['checks']
+    assert checks['database']['ok'] and checks['database']['detail'] == 'sqlite'
+    assert not checks['services']['ok'] and 'anthropic_key' in checks['services']['detail']
+
+
+def test_readiness_ok_and_cached(app):
+    calls = []
+    app.extensions['health'] = ReadinessProbe({
+        'database': check_database,
+        'services': lambda: calls.append(1) or check_services({'file_parser': object()}),
+    }, ttl=60)
+    client = app.test_client()
+    first, second = client.get('/readyz'), client.get('/readyz')
+    assert first.status_code == second.status_code == 200
+    assert first.json['status'] == 'ready'
+    assert calls == [1]
+
+
+def test_service_check_does_not_import_deferred_modules(monkeypatch):
+    from services import lazy_imports
+    monkeypatch.setattr(lazy_imports, 'DEFERRED', {'colorsys': None})
+    monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+    assert check_services({}) == '0 services'
+    assert 'colorsys' not in sys.modules
+
+    monkeypatch.setattr(lazy_imports, 'DEFERRED', {'no_such_module_xyz': None})
+    with pytest.raises(RuntimeError, match='no_such_module_xyz'):
+        check_services({})
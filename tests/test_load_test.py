@@ -0,0 +1,71 @@
+import anthropic
+import pytest
+
+from services.job_description_processor import JobDescriptionProcessor
+from scripts.stub_servers import StubServers, StubSettings
+from scripts.load_test import Results, find_csrf_token, find_hidden, parse_config, percentile
+
+
+@pytest.fixture
+def stubs():
+    settings = StubSettings(anthropic_ttft_ms=1, ms_per_token=0, jina_latency_ms=1, output_tokens=50, seed=7)
+    with StubServers(settings) as servers:
+        yield servers
+
+
+def test_anthropic_stub_speaks_messages_api(stubs):
+    client = anthropic.Anthropic(api_key='test', base_url=stubs.anthropic_url)
+    message = client.messages.create(
+        model='claude-3-5-sonnet-20241022', max_tokens=30,
+        messages=[{'role': 'user', 'content': 'ORIGINAL RESUME:\nJane Doe\nPython developer\n\nJOB DESCRIPTION:\nEngineer'}]
+    )
+    assert message.content[0].text.startswith('Jane Doe\nPython developer')
+    assert message.usage.output_tokens <= 30
+
+    plan = client.messages.create(model='stub', max_tokens=500, system='Return valid JSON only',
+                                  messages=[{'role': 'user', 'content': 'Plan the changes'}])
+    assert '"keywords_to_add"' in plan.content[0].text
+    assert stubs.stats.counts['anthropic:ok'] == 2
+
+
+def test_anthropic_stub_overloaded_errors(stubs):
+    stubs.settings.anthropic_error_rate = 1.0
+    client = anthropic.Anthropic(api_key='test', base_url=stubs.anthropic_url, max_retries=0)
+    with pytest.raises(anthropic.APIStatusError) as excinfo:
+        client.messages.create(model='stub', max_tokens=10, messages=[{'role': 'user', 'content': 'hi'}])
+    assert excinfo.value.status_code == 529
+
+
+def test_job_processor_reads_from_jina_stub(stubs, monkeypatch):
+    monkeypatch.setenv('JINA_API_KEY', 'test')
+    monkeypatch.setenv('JINA_READER_URL', stubs.jina_url)
+    job = JobDescriptionProcessor().extract_from_url('https://jobs.example.com/42')
+    assert job['title'] == 'Senior Python Engineer'
+    assert 'PostgreSQL and SQLAlchemy' in job['content']
+    assert 'URL Source' not in job['content']
+
+
+def test_report_helpers():
+    assert percentile([], 50) is None
+    samples = [i / 100 for i in range(1, 101)]
+    assert percentile(samples, 50) == 0.5 and percentile(samples, 99) == 0.99 and percentile(samples, 100) == 1.0
+
+    results = Results()
+    results.record('analyze', 0.2)
+    results.record('analyze', 0.4, error='JourneyError: analyze returned 500')
+    results.elapsed = 2.0
+    summary = results.summary()
+    assert summary['steps']['analyze']['error_rate'] == 0.5
+    assert summary['requests_per_s'] == 1.0
+    assert summary['error_examples'] == {'analyze': 'JourneyError: analyze returned 500'}
+
+    html = '<meta name="csrf-token" content="abc"><input type="hidden" name="resume_id" value="12">'
+    assert find_csrf_token(html) == 'abc' and find_hidden(html, 'resume_id') == '12'
+
+
+def test_parse_worker_config():
+    assert parse_config('gthread:2:8') == ['--worker-class', 'gthread', '--workers', '2', '--threads', '8']
+    assert parse_config('gevent:2:100')[-2:] == ['--worker-connections', '100']
+    for spec in ('sync', 'sync:two', 'sync:2:4'):
+        with pytest.raises(ValueError):
+            parse_config(spec)
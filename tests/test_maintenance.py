@@ -0,0 +1,22 @@
+import scripts.maintenance as maintenance
+from scripts.maintenance import parse_args, run
+
+
+def test_default_steps_skip_analytics():
+    args = parse_args([])
+    assert args.pdf_cache and args.blobs and not args.analytics
+    args = parse_args(['--analytics'])
+    assert args.analytics and not (args.pdf_cache or args.blobs)
+
+
+def test_failed_step_does_not_stop_the_rest(make_db_app, monkeypatch):
+    calls = []
+
+    def failing_eviction(max_bytes):
+        raise RuntimeError('disk I/O error')
+
+    monkeypatch.setattr(maintenance, 'evict_pdf_cache', failing_eviction)
+    monkeypatch.setattr(maintenance, 'collect_blobs', lambda **kwargs: calls.append(kwargs))
+
+    assert run(parse_args([]), make_db_app()) == 1
+    assert calls == [{'export_max_bytes': maintenance.DEFAULT_EXPORT_MAX_BYTES}]
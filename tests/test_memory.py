@@ -0,0 +1,92 @@
+import time
+import runpy
+import logging
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from services.memory import MB, REQUEST_PEAK_MEMORY_BYTES, MemoryLog, init_memory_tracking, rss_over_ceiling
+
+GUNICORN_CONF = Path(__file__).resolve().parent.parent / 'gunicorn.conf.py'
+
+
+@pytest.fixture
+def app(make_db_app, tmp_path):
+    app = make_db_app(MEMORY_TRACKING=True, MEMORY_REPORT_THRESHOLD_MB=4,
+                      MEMORY_LOG=str(tmp_path / 'memory' / 'heavy.jsonl'))
+    init_memory_tracking(app)
+
+    @app.route('/upload')
+    def upload():
+        # Held while the request works, like upload bytes during parsing
+        data = bytearray(8 * MB)
+        time.sleep(0.3)
+        return str(len(data))
+
+    @app.route('/burst')
+    def burst():
+        return str(len(bytearray(8 * MB)))
+
+    @app.route('/small')
+    def small():
+        return 'ok'
+
+    yield app
+    tracemalloc.stop()
+
+
+def test_heavy_requests_logged_with_sites(app):
+    client = app.test_client()
+    assert client.get('/small').status_code == 200
+    assert client.get('/upload').status_code == 200
+
+    entries = app.extensions['memory'].log.recent()
+    assert [entry['path'] for entry in entries] == ['/upload']
+    entry = entries[0]
+    assert entry['peak_bytes'] >= 8 * MB and entry['status'] == 200
+    assert entry['near_peak']
+    assert any('test_memory.py' in site['site'] and site['size_diff'] >= 8 * MB for site in entry['sites'])
+
+    # Too brief for the watcher to see, but the peak is still measured
+    assert client.get('/burst').status_code == 200
+    burst = app.extensions['memory'].log.recent()[0]
+    assert burst['path'] == '/burst' and burst['peak_bytes'] >= 8 * MB and not burst['near_peak']
+
+    samples = dict((labels['endpoint'], value['count']) for labels, value in REQUEST_PEAK_MEMORY_BYTES.snapshot()['samples'])
+    assert samples['small'] >= 1 and samples['upload'] >= 1
+
+
+def test_tracking_off_by_default(make_db_app):
+    app = make_db_app()
+    monitor = init_memory_tracking(app)
+    assert not monitor.tracking and not tracemalloc.is_tracing()
+
+
+def test_memory_log_rotates(tmp_path):
+    log = MemoryLog(str(tmp_path / 'heavy.jsonl'), max_bytes=100)
+    for i in range(5):
+        log.append({'i': i, 'padding': 'x' * 40})
+    assert (tmp_path / 'heavy.jsonl.1').exists()
+    assert [entry['i'] for entry in log.recent(3)] == [4, 3, 2]
+
+
+def test_worker_recycled_over_rss_ceiling(monkeypatch):
+    assert rss_over_ceiling(0) is None
+    assert rss_over_ceiling(1024 * 1024) is None
+    assert rss_over_ceiling(1) > MB
+
+    def worker():
+        return SimpleNamespace(alive=True, pid=1, log=logging.getLogger('gunicorn.test'))
+    request = SimpleNamespace(method='POST', path='/api/analyze_resume')
+
+    monkeypatch.setenv('WORKER_RSS_CEILING_MB', '1')
+    recycled = worker()
+    runpy.run_path(str(GUNICORN_CONF))['post_request'](recycled, request, {}, None)
+    assert recycled.alive is False
+
+    monkeypatch.setenv('WORKER_RSS_CEILING_MB', '0')
+    kept = worker()
+    runpy.run_path(str(GUNICORN_CONF))['post_request'](kept, request, {}, None)
+    assert kept.alive is True
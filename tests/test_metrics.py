@@ -0,0 +1,116 @@
+import os
+import json
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import text
+
+from extensions import db
+from routes.metrics import metrics_bp
+from services.metrics import (
+    MetricsRegistry, MeteredAnthropic, SnapshotDirectory, REGISTRY, ANTHROPIC_TOKENS,
+    init_metrics, merge_snapshots, render, render_all
+)
+
+
+def samples(families, name):
+    return {tuple(sorted(labels.items())): value for labels, value in families[name]['samples']}
+
+
+def test_render_counters_and_histograms():
+    registry = MetricsRegistry()
+    requests = registry.counter('app_requests_total', 'Requests', ['route'])
+    latency = registry.histogram('app_latency_seconds', 'Latency', ['route'], buckets=(0.1, 1.0))
+    requests.inc(route='home')
+    requests.inc(2, route='home')
+    latency.observe(0.05, route='home')
+    latency.observe(0.5, route='home')
+
+    output = render(registry.snapshot())
+    assert '# TYPE app_requests_total counter' in output
+    assert 'app_requests_total{route="home"} 3' in output
+    assert 'app_latency_seconds_bucket{route="home",le="0.1"} 1' in output
+    assert 'app_latency_seconds_bucket{route="home",le="+Inf"} 2' in output
+    assert 'app_latency_seconds_count{route="home"} 2' in output
+
+    with pytest.raises(ValueError):
+        requests.inc(path='/')
+
+
+def test_merge_adds_worker_snapshots():
+    registry = MetricsRegistry()
+    hits = registry.counter('hits_total', 'Hits', ['cache'])
+    latency = registry.histogram('latency_seconds', 'Latency', buckets=(1.0,))
+    hits.inc(cache='pdf')
+    latency.observe(0.5)
+    # Round-trip through JSON, as the snapshot files do
+    snapshot = json.loads(json.dumps(registry.snapshot()))
+
+    merged = merge_snapshots([snapshot, snapshot])
+    assert samples(merged, 'hits_total') == {(('cache', 'pdf'),): 2}
+    histogram = samples(merged, 'latency_seconds')[()]
+    assert histogram['count'] == 2
+    assert histogram['buckets'] == [[1.0, 2], [float('inf'), 2]]
+
+
+def test_snapshot_directory_drops_exited_workers(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter('hits_total', 'Hits').inc()
+    directory = SnapshotDirectory(str(tmp_path))
+    directory.write(registry, force=True)
+    # Highest possible pid: no such process
+    stale = tmp_path / f"{2 ** 22 + 1}.json"
+    stale.write_text(json.dumps(registry.snapshot()))
+
+    snapshots = directory.read_all()
+    assert len(snapshots) == 1
+    assert not stale.exists()
+
+
+def test_request_and_query_metrics(make_db_app, tmp_path):
+    app = make_db_app(METRICS_DIR=str(tmp_path))
+    init_metrics(app)
+
+    @app.route('/metrics-probe')
+    def metrics_probe():
+        db.session.execute(text('SELECT 1'))
+        db.session.execute(text('SELECT 2'))
+        return 'ok'
+
+    with app.app_context():
+        client = app.test_client()
+        assert client.get('/metrics-probe').status_code == 200
+        output = render_all(app)
+
+    assert 'resumerocket_http_request_duration_seconds_count{endpoint="metrics_probe",method="GET",status="200"} 1' in output
+    assert 'resumerocket_db_queries_per_request_sum{endpoint="metrics_probe"} 2' in output
+    assert os.path.exists(tmp_path / f"{os.getpid()}.json")
+
+
+def test_metrics_only_served_on_internal_port(make_db_app, tmp_path):
+    app = make_db_app(METRICS_DIR=str(tmp_path), METRICS_PORT='9091', METRICS_TOKEN='secret')
+    init_metrics(app)
+    app.register_blueprint(metrics_bp)
+    client = app.test_client()
+
+    assert client.get('/metrics', base_url='http://app.example.com:8080').status_code == 404
+    # A Host header naming the internal port doesn't help; the listening port decides
+    assert client.get('/metrics', base_url='http://app.example.com:8080',
+                      headers={'Host': 'app.example.com:9091'}).status_code == 404
+    assert client.get('/metrics', base_url='http://10.0.0.2:9091').status_code == 401
+    response = client.get('/metrics', base_url='http://10.0.0.2:9091', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200 and '# TYPE' in response.get_data(as_text=True)
+
+
+def test_metered_anthropic_records_call_site_and_tokens():
+    response = SimpleNamespace(usage=SimpleNamespace(input_tokens=120, output_tokens=30))
+    client = SimpleNamespace(messages=SimpleNamespace(create=lambda **kwargs: response), api_key='x')
+    metered = MeteredAnthropic(client, 'probe_service')
+
+    def suggest():
+        return metered.messages.create(model='claude-test', messages=[])
+
+    assert suggest() is response
+    assert metered.api_key == 'x'
+    tokens = samples(REGISTRY.snapshot(), ANTHROPIC_TOKENS.name)
+    assert tokens[(('call_site', 'probe_service.suggest'), ('kind', 'input'), ('model', 'claude-test'))] == 120
+    assert tokens[(('call_site', 'probe_service.suggest'), ('kind', 'output'), ('model', 'claude-test'))] == 30
@@ -0,0 +1,160 @@
+"""
+Tests for layout-aware PDF extraction and the PDF cache using pytest.
+
+Extraction tests run with caching disabled and use the sample PDFs in
+test_data; cache tests run against an in-memory SQLite database.
+"""
+
+import os
+import sys
+import pytest
+from datetime import datetime, timedelta
+
+# Add parent directory to path to import from services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from extensions import db
+from models import PDFCache
+from services.pdf_extractor import PDFExtractor
+from services.ats_analyzer import match_section_header
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_data')
+EXPECTED_SECTIONS = {'summary', 'education', 'experience', 'skills'}
+
+
+def read_pdf(name):
+    """Read a PDF from the test_data directory."""
+    with open(os.path.join(TEST_DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def cache_app(make_db_app):
+    """Fixture for a Flask app backed by the test database (in-memory SQLite by default)."""
+    app = make_db_app()
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def add_cache_entries(count, entry_size=1000):
+    """Add entries whose hit count and recency both grow with their index."""
+    now = datetime.utcnow()
+    for i in range(count):
+        db.session.add(PDFCache(
+            content_hash=f"hash_{i}",
+            extracted_text='x' * entry_size,
+            file_size=entry_size,
+            page_count=1,
+            hit_count=i + 1,
+            last_accessed=now - timedelta(days=count - i),
+            entry_size=entry_size
+        ))
+    db.session.commit()
+
+
+@pytest.fixture
+def extractor():
+    """Fixture for a PDFExtractor that doesn't touch the cache."""
+    return PDFExtractor(use_cache=False)
+
+
+class TestLayoutExtraction:
+    """Tests for PDFExtractor.extract_with_sections."""
+
+    def test_font_size_headings(self, extractor):
+        """Larger bold fonts become markdown headings and section boundaries."""
+        text, sections = extractor.extract_with_sections(read_pdf('test_resume.pdf'))
+        
+        assert '## Experience' in text
+        assert '### Senior Software Engineer' in text
+        assert EXPECTED_SECTIONS <= set(sections.keys())
+        assert 'Tech Company Inc.' in sections['experience']
+        assert 'Sample Resume' in sections['unknown']
+
+    def test_all_caps_headings_at_body_size(self, extractor):
+        """ALL-CAPS section names are detected even without a larger font."""
+        text, sections = extractor.extract_with_sections(read_pdf('sample_resume.pdf'))
+        
+        assert '## SKILLS' in text
+        assert EXPECTED_SECTIONS <= set(sections.keys())
+        # Body lines that merely mention a section word must not split sections
+        assert 'Experienced software engineer' in sections['summary']
+
+    def test_section_content_excludes_headers(self, extractor):
+        """Section content has the same shape as the analyzer's own detection."""
+        _, sections = extractor.extract_with_sections(read_pdf('test_resume.pdf'))
+        
+        for content in sections.values():
+            assert not content.startswith('#')
+
+    def test_extract_text_modes(self):
+        """extract_text keeps plain output unless layout_aware is set."""
+        pdf_bytes = read_pdf('test_resume.pdf')
+        
+        plain = PDFExtractor(use_cache=False).extract_text(pdf_bytes)
+        layout = PDFExtractor(use_cache=False, layout_aware=True).extract_text(pdf_bytes)
+        
+        assert '#' not in plain
+        assert layout.startswith('# ')
+
+
+class TestPDFCacheEviction:
+    """Tests for the byte-budgeted PDFCache eviction."""
+
+    def test_evicts_lowest_scores_down_to_budget(self, cache_app):
+        """Least used, least recent entries go first, and only as many as needed."""
+        add_cache_entries(10)
+        
+        result = PDFCache.evict_to_budget(6500, batch_size=2)
+        
+        assert result['deleted_count'] == 4
+        assert result['reclaimed_bytes'] == 4000
+        assert result['total_bytes'] == 6000
+        remaining = {h for (h,) in db.session.query(PDFCache.content_hash)}
+        assert remaining == {f"hash_{i}" for i in range(4, 10)}
+
+    def test_under_budget_is_noop(self, cache_app):
+        """Nothing is deleted when the cache already fits."""
+        add_cache_entries(3)
+        
+        result = PDFCache.evict_to_budget(10000)
+        
+        assert result == {'deleted_count': 0, 'reclaimed_bytes': 0, 'total_bytes': 3000}
+
+    def test_entry_size_recorded_on_add(self, cache_app):
+        """add_to_cache stores the payload size used by eviction."""
+        PDFCache.add_to_cache(b'%PDF-fake', 'héllo', 1, section_map={'skills': 'Python'})
+        
+        entry = PDFCache.query.one()
+        assert entry.entry_size == PDFCache.calculate_entry_size('héllo', {'skills': 'Python'})
+        assert entry.entry_size > len('héllo')
+
+    def test_extraction_modes_cached_side_by_side(self, cache_app):
+        """Text and layout extractions of one PDF don't evict each other."""
+        PDFCache.add_to_cache(b'%PDF-fake', 'plain', 1)
+        PDFCache.add_to_cache(b'%PDF-fake', '# Layout', 1, section_map={'skills': 'Python'}, extraction_mode='layout')
+
+        assert PDFCache.get_extraction_from_cache(b'%PDF-fake', 'text') == ('plain', None)
+        assert PDFCache.get_extraction_from_cache(b'%PDF-fake', 'layout') == ('# Layout', {'skills': 'Python'})
+        assert PDFCache.query.count() == 2
+
+    def test_clean_old_entries_keeps_minimum(self, cache_app):
+        """Age-based cleanup never drops below keep_min entries."""
+        add_cache_entries(6)
+        
+        deleted = PDFCache.clean_old_entries(max_age_days=0, keep_min=2, batch_size=1)
+        
+        assert deleted == 4
+        assert PDFCache.query.count() == 2
+
+
+def test_match_section_header():
+    """Header lines map onto canonical RESUME_SECTIONS names."""
+    assert match_section_header('## Work Experience') == 'experience'
+    assert match_section_header('SKILLS:') == 'skills'
+    assert match_section_header('Relevant Experience Highlights') == 'experience'
+    assert match_section_header('Relevant Experience Highlights', exact=True) is None
+    assert match_section_header('Senior Software Engineer') is None
@@ -0,0 +1,93 @@
+import time
+import pstats
+import pytest
+
+from services import profiler as profiler_module
+from services.profiler import Profiler, ProfilerError, init_profiler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.fixture
+def app(make_db_app, tmp_path):
+    app = make_db_app(PROFILE_DIR=str(tmp_path / 'profiles'))
+    init_profiler(app)
+
+    @app.route('/api/slow')
+    def slow():
+        busy(0.05)
+        return 'ok'
+
+    @app.route('/fast')
+    def fast():
+        return 'ok'
+
+    return app
+
+
+def test_disarmed_profiler_records_nothing(app, tmp_path):
+    client = app.test_client()
+    assert client.get('/api/slow').status_code == 200
+    profiler = app.extensions['profiler']
+    assert not profiler.is_armed()
+    assert profiler.profiles() == []
+
+
+def test_profiles_next_matching_requests(app):
+    profiler = app.extensions['profiler']
+    profiler.arm('^/api/', 2, mode='sampling', armed_by='admin')
+    client = app.test_client()
+    for path in ('/fast', '/api/slow', '/api/slow', '/api/slow'):
+        client.get(path)
+
+    profiles = profiler.profiles()
+    assert len(profiles) == 2
+    assert {profile['path'] for profile in profiles} == {'/api/slow'}
+    assert profiler.status() is None  # Disarmed once both slots were taken
+
+    profile = profiles[0]
+    assert profile['status'] == 200 and profile['samples'] > 0
+    with open(profiler.data_path(profile['id'])) as f:
+        lines = f.read().splitlines()
+    stack, count = lines[0].rsplit(' ', 1)
+    assert int(count) > 0
+    assert any('busy (test_profiler.py' in line for line in lines)
+
+
+def test_deterministic_profile_is_pstats(app):
+    profiler = app.extensions['profiler']
+    profiler.arm('slow', 1, mode='deterministic')
+    app.test_client().get('/api/slow')
+
+    [profile] = profiler.profiles()
+    assert profile['file_extension'] == 'pstats'
+    stats = pstats.Stats(profiler.data_path(profile['id']))
+    assert any(name == 'busy' for _, _, name in stats.stats)
+    assert any(row['function'].startswith('busy ') for row in profile['summary'])
+
+
+def test_workers_share_request_slots(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler_module, 'CHECK_INTERVAL', 0)
+    first, second = Profiler(str(tmp_path)), Profiler(str(tmp_path))
+    first.arm('.*', 3)
+    assert first.is_armed() and second.is_armed()
+
+    claims = [worker.claim('/api/x') for worker in (first, second, second, first, second)]
+    assert sum(claim is not None for claim in claims) == 3
+    assert not first.is_armed() and not second.is_armed()
+
+
+def test_invalid_arming_rejected(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    with pytest.raises(ProfilerError):
+        profiler.arm('(', 1)
+    with pytest.raises(ProfilerError):
+        profiler.arm('.*', 0)
+    with pytest.raises(ProfilerError):
+        profiler.arm('.*', 1, mode='tracing')
+    assert profiler.get('../armed') is None
+
@@ -0,0 +1,137 @@
+"""
+Query-plan regression tests for the hot queries in routes/ and services/
+
+Each query is run against an in-memory SQLite database built by create_all
+(so it carries the same indexes as the models declare), the SQL it emits is
+captured, and EXPLAIN QUERY PLAN must not contain a bare full-table scan or
+a temp B-tree sort for any of it.
+"""
+import re
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+from extensions import db
+from models import (
+    User, JobDescription, CustomizedResume, CustomizationEvaluation,
+    OptimizationSuggestion, ABTest, PDFCache, ExportCache, AnalyticsRollup
+)
+from services.dashboard_query import dashboard_page, dashboard_stats, encode_cursor
+from services.search_index import search_jobs
+
+
+# "SCAN customized_resume" with no index behind it; covering-index and FTS virtual table scans are fine
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+@pytest.fixture
+def plan_app(monkeypatch, make_db_app):
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test-key')
+    app = make_db_app()
+    with app.app_context():
+        db.create_all()
+        seed()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def seed():
+    users = [User(username=f'user{i}', email=f'user{i}@example.com') for i in range(3)]
+    db.session.add_all(users)
+    db.session.flush()
+    base = datetime(2025, 3, 1)
+    for user in users:
+        previous = None
+        for j in range(5):
+            job = JobDescription(title=f'Job {j}', content='Python SQL Flask', user_id=user.id,
+                                 created_at=base + timedelta(days=j))
+            db.session.add(job)
+            db.session.flush()
+            resume = CustomizedResume(user_id=user.id, job_description_id=job.id, original_content='a',
+                                      customized_content='b', created_at=base + timedelta(days=j),
+                                      original_ats_score=40.0, ats_score=60.0, user_rating=j % 5 or None,
+                                      original_id=previous.id if previous else None)
+            db.session.add(resume)
+            db.session.flush()
+            previous = resume
+            db.session.add(CustomizationEvaluation(customized_resume_id=resume.id, evaluation_text='ok', metrics={}))
+    db.session.add(OptimizationSuggestion(content='x', based_on_evaluations=1))
+    db.session.add(ABTest(name='t', variants={}))
+    db.session.commit()
+    # Give the planner real statistics, as a long-lived database would have
+    db.session.execute(db.text('ANALYZE'))
+
+
+def captured_selects(run):
+    """Run a callable and return the SELECT statements (with parameters) it executed."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        run()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    assert statements, 'query emitted no SELECT'
+    return statements
+
+
+def plan_problems(statement, parameters, ranked=False):
+    cursor = db.session.connection().connection.cursor()
+    details = [row[3] for row in cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()]
+    return [d for d in details if FULL_SCAN.match(d) or (d == TEMP_SORT and not ranked)], details
+
+
+# Relevance-ranked queries sort on a computed score, so a temp B-tree is expected
+RANKED = True
+
+
+def hot_queries():
+    """(name, callable[, ranked]) entries mirroring the queries the routes and services issue."""
+    from services.feedback_loop import FeedbackLoop
+    feedback_loop = FeedbackLoop()
+    user_id = 1
+    cursor = encode_cursor(datetime(2025, 3, 4), 10)
+    return [
+        # routes/dashboard.user_dashboard
+        ('dashboard page', lambda: dashboard_page(user_id)),
+        ('dashboard next page', lambda: dashboard_page(user_id, cursor=cursor)),
+        ('dashboard search', lambda: dashboard_page(user_id, search_query='python')),
+        ('dashboard stats', lambda: dashboard_stats(user_id)),
+        # routes/jobs.get_jobs and /jobs/search
+        ('user jobs', lambda: JobDescription.query.filter_by(user_id=user_id)
+            .order_by(JobDescription.created_at.desc()).all()),
+        ('job search', lambda: search_jobs(user_id, 'python'), RANKED),
+        # routes/resume.compare_resume and customizations derived from a resume
+        ('customizations of original', lambda: CustomizedResume.query.filter_by(original_id=1).all()),
+        ('resumes for job', lambda: CustomizedResume.query.filter_by(job_description_id=1).all()),
+        # routes/admin.feedback_dashboard reads the rollups
+        ('admin rollup summary', AnalyticsRollup.summary),
+        ('admin recent customizations', lambda: AnalyticsRollup.recent_customizations(days=30)),
+        # services/feedback_loop.py
+        ('evaluations', feedback_loop.list_evaluations),
+        ('recent evaluations', lambda: CustomizationEvaluation.query.order_by(
+            CustomizationEvaluation.created_at.desc()).limit(100).all()),
+        ('evaluations for resume', lambda: CustomizationEvaluation.query.filter_by(customized_resume_id=1).all()),
+        ('optimizations', feedback_loop.list_optimizations),
+        ('ab tests', feedback_loop.list_ab_tests),
+        # cache lookups on the download and extraction paths
+        ('pdf cache lookup', lambda: PDFCache.query.filter_by(content_hash='0' * 64).first()),
+        ('export cache lookup', lambda: ExportCache.lookup('0' * 64, 'pdf', 1)),
+    ]
+
+
+@pytest.mark.sqlite_only
+def test_hot_queries_use_indexes(plan_app):
+    failures = []
+    for name, run, *ranked in hot_queries():
+        for statement, parameters in captured_selects(run):
+            problems, details = plan_problems(statement, parameters, ranked=bool(ranked))
+            if problems:
+                failures.append(f"{name}: {problems}\n  plan: {details}\n  sql: {' '.join(statement.split())}")
+    assert not failures, '\n'.join(failures)
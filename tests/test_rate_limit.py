@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pytest
+from flask_login import LoginManager, login_required
+
+from extensions import db
+from models import RateLimitBucket, User
+from services.metrics import MeteredAnthropic
+from services.rate_limit import NEVER_REFILLS_RETRY_AFTER, RateLimiter, TokenBucket, init_rate_limits, llm_rate_limited
+
+
+@pytest.fixture
+def app(make_db_app):
+    app = make_db_app(SECRET_KEY='test', LLM_DAILY_TOKEN_BUDGET=150,
+                      RATE_LIMIT_USER_CAPACITY=3, RATE_LIMIT_USER_PER_MINUTE=1)
+    login_manager = LoginManager(app)
+    login_manager.user_loader(lambda user_id: db.session.get(User, int(user_id)))
+    init_rate_limits(app)
+
+    usage = SimpleNamespace(input_tokens=70, output_tokens=30)
+    client = MeteredAnthropic(SimpleNamespace(messages=SimpleNamespace(
+        create=lambda **kwargs: SimpleNamespace(usage=usage))), 'test')
+
+    @app.route('/customize', methods=['POST'])
+    @login_required
+    @llm_rate_limited
+    def customize():
+        client.messages.create(model='test-model', messages=[])
+        return 'ok'
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, username='alice', email='alice@example.com'))
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def limiter(make_db_app):
+    app = make_db_app()
+    with app.app_context():
+        db.create_all()
+        yield RateLimiter(user_capacity=2, user_per_minute=60, global_capacity=3, global_per_minute=6)
+        db.drop_all()
+
+
+def test_user_bucket_refills(limiter):
+    assert limiter.acquire(1, now=1000.0) is None
+    assert limiter.acquire(1, now=1000.0) is None
+    assert limiter.acquire(1, now=1000.0) == ('user', pytest.approx(1.0))
+    assert limiter.acquire(1, now=1001.0) is None
+
+
+def test_global_refusal_keeps_user_token(limiter):
+    for user_id in (1, 2, 3):
+        assert limiter.acquire(user_id, now=1000.0) is None
+    limit, retry_after = limiter.acquire(4, now=1000.0)
+    assert limit == 'global' and retry_after == pytest.approx(10.0)
+    # The token taken from user 4's bucket was given back
+    assert db.session.get(RateLimitBucket, 'user:4') is None
+
+
+def test_bucket_that_never_refills(limiter):
+    limiter.global_bucket = TokenBucket('global', 1, 0)
+    assert limiter.acquire(1, now=1000.0) is None
+    assert limiter.acquire(2, now=5000.0) == ('global', NEVER_REFILLS_RETRY_AFTER)
+
+
+def test_budget_refuses_with_retry_after(app):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = '1'
+        session['_fresh'] = True
+
+    # 100 tokens each; the request that crosses the 150 budget still runs
+    assert client.post('/customize').status_code == 200
+    assert client.post('/customize').status_code == 200
+    assert app.extensions['rate_limiter'].tokens_used(1) == 200
+
+    response = client.post('/customize')
+    assert response.status_code == 429 and response.json['limit'] == 'budget'
+    assert 0 < int(response.headers['Retry-After']) <= 86400
+
+
+def test_user_limit_returns_429(app):
+    app.extensions['rate_limiter'].daily_token_budget = 0
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = '1'
+        session['_fresh'] = True
+
+    statuses = [client.post('/customize').status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+    response = client.post('/customize')
+    assert response.json['limit'] == 'user'
+    assert int(response.headers['Retry-After']) in (59, 60)
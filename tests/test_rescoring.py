@@ -0,0 +1,72 @@
+import pytest
+
+from extensions import db
+from models import User, JobDescription, CustomizedResume, AnalyticsRollup
+from services import rescoring
+from services.ats_analyzer import ANALYZER_VERSION, EnhancedATSAnalyzer
+
+
+class LengthAnalyzer:
+    """Deterministic stand-in for EnhancedATSAnalyzer (NLTK data isn't needed)"""
+
+    def analyze(self, resume_text, job_description):
+        return {'score': float(len(resume_text)), 'matching_keywords': ['python'], 'missing_keywords': []}
+
+
+@pytest.fixture
+def rescore_app(make_db_app, monkeypatch):
+    monkeypatch.setattr(rescoring, 'EnhancedATSAnalyzer', LengthAnalyzer)
+    app = make_db_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username='jane', email='jane@example.com')
+        db.session.add(user)
+        db.session.flush()
+        job = JobDescription(title='Engineer', content='Python', user_id=user.id)
+        db.session.add(job)
+        db.session.flush()
+        for i in range(7):
+            db.session.add(CustomizedResume(
+                user_id=user.id, job_description_id=job.id,
+                original_content='o' * 10, customized_content='c' * (20 + i),
+                original_ats_score=1.0, ats_score=2.0, analyzer_version='0.old'
+            ))
+        # Never scored: not stale
+        db.session.add(CustomizedResume(user_id=user.id, job_description_id=job.id,
+                                        original_content='x', customized_content='x'))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_rescore_stale_resumes_from_checkpoint(rescore_app, tmp_path):
+    checkpoint = tmp_path / 'checkpoint.json'
+    service = rescoring.RescoringService()
+
+    first = service.rescore_stale(batch_size=2, workers=0, checkpoint_path=str(checkpoint), limit=3)
+    assert first['rescored'] == 3
+    assert checkpoint.exists()
+
+    second = service.rescore_stale(batch_size=2, workers=0, checkpoint_path=str(checkpoint))
+    assert second['rescored'] == 4
+    assert not checkpoint.exists()
+
+    resumes = CustomizedResume.query.order_by(CustomizedResume.id).all()
+    assert [r.analyzer_version for r in resumes] == [ANALYZER_VERSION] * 7 + [None]
+    assert [r.ats_score for r in resumes[:7]] == [float(20 + i) for i in range(7)]
+    assert all(r.original_ats_score == 10.0 for r in resumes[:7])
+    assert resumes[7].ats_score is None
+    # Score changes flow into the analytics rollups
+    assert AnalyticsRollup.reconcile() == []
+
+
+def test_schedule_rescores_a_stale_resume(rescore_app):
+    service = rescoring.RescoringService()
+    resume = CustomizedResume.query.first()
+    assert rescoring.is_stale(resume)
+
+    service.schedule(resume).result()
+    db.session.expire_all()
+    assert resume.analyzer_version == ANALYZER_VERSION
+    assert service.schedule(resume) is None
@@ -0,0 +1,57 @@
+import pytest
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import User, JobDescription, CustomizedResume, ResumeContent
+
+
+@pytest.fixture
+def content_app(make_db_app):
+    app = make_db_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username='jane', email='jane@example.com')
+        db.session.add(user)
+        db.session.flush()
+        job = JobDescription(title='Engineer', content='Python', user_id=user.id)
+        db.session.add(job)
+        db.session.commit()
+        yield user.id, job.id
+        db.session.remove()
+        db.drop_all()
+
+
+def test_identical_text_is_stored_once(content_app):
+    user_id, job_id = content_app
+    original = 'Jane Doe\n\nPython developer ' * 40
+    for i in range(3):
+        db.session.add(CustomizedResume(user_id=user_id, job_description_id=job_id,
+                                        original_content=original, customized_content=original))
+        db.session.add(CustomizedResume(user_id=user_id, job_description_id=job_id,
+                                        original_content=original, customized_content=f'{original} tailored {i}'))
+    db.session.commit()
+    db.session.expunge_all()
+
+    assert ResumeContent.query.count() == 4
+    resumes = CustomizedResume.query.order_by(CustomizedResume.id).all()
+    assert resumes[0].original_content == resumes[0].customized_content == original
+    assert resumes[1].customized_content == f'{original} tailored 0'
+    assert resumes[1].to_dict()['original_content'] == original
+
+
+def test_collect_orphans_respects_grace_period(content_app):
+    user_id, job_id = content_app
+    resume = CustomizedResume(user_id=user_id, job_description_id=job_id,
+                              original_content='kept', customized_content='replaced')
+    db.session.add(resume)
+    db.session.commit()
+    resume.customized_content = 'edited'
+    db.session.commit()
+
+    assert ResumeContent.collect_orphans()['deleted_count'] == 0
+
+    db.session.execute(db.update(ResumeContent).values(last_used_at=datetime.utcnow() - timedelta(days=2)))
+    db.session.commit()
+    result = ResumeContent.collect_orphans()
+    assert result == {'deleted_count': 1, 'reclaimed_bytes': len('replaced')}
+    assert {c.body for c in ResumeContent.query.all()} == {'kept', 'edited'}
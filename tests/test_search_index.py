@@ -0,0 +1,108 @@
+import pytest
+
+from extensions import db
+from models import User, JobDescription
+from services.search_index import search_jobs, job_search_clause, to_fts_query, rebuild_search_index
+
+# FTS5 query syntax, prefix matching and the 'delete-all' command are SQLite-specific
+pytestmark = pytest.mark.sqlite_only
+
+
+@pytest.fixture
+def search_app(make_db_app):
+    app = make_db_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username='jane', email='jane@example.com')
+        db.session.add(user)
+        db.session.commit()
+        yield app, user.id
+        db.session.remove()
+        db.drop_all()
+
+
+def add_job(user_id, title, content, url=None):
+    job = JobDescription(title=title, content=content, url=url, user_id=user_id)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def test_to_fts_query_neutralises_operators():
+    assert to_fts_query('python OR "sql') == '"python"* "OR"* "sql"*'
+    assert to_fts_query('  -- ') is None
+
+
+def test_ranked_search_with_snippets(search_app):
+    _, user_id = search_app
+    add_job(user_id, 'Data Analyst', 'Excel dashboards and some Python scripting.')
+    title_hit = add_job(user_id, 'Python Developer', 'Build Flask services in Python with PostgreSQL.')
+    add_job(user_id, 'Accountant', 'Ledgers and reconciliations.')
+
+    results = search_jobs(user_id, 'pyth')
+
+    assert [r['id'] for r in results][0] == title_hit.id
+    assert len(results) == 2
+    assert '<mark>Python</mark>' in results[0]['snippet']
+
+
+def test_snippets_escape_job_markup(search_app):
+    _, user_id = search_app
+    add_job(user_id, 'Scraped', 'Python <script>alert(1)</script> <b onmouseover="x">role</b>')
+
+    snippet = search_jobs(user_id, 'python')[0]['snippet']
+
+    assert '<script>' not in snippet and '<b ' not in snippet
+    assert '<mark>Python</mark> &lt;script&gt;' in snippet
+
+
+def test_triggers_keep_index_in_sync(search_app):
+    _, user_id = search_app
+    job = add_job(user_id, 'Engineer', 'Kubernetes operators')
+    assert [r['id'] for r in search_jobs(user_id, 'kubernetes')] == [job.id]
+
+    job.content = 'Terraform modules'
+    db.session.commit()
+    assert search_jobs(user_id, 'kubernetes') == []
+    assert [r['id'] for r in search_jobs(user_id, 'terraform')] == [job.id]
+
+    db.session.delete(job)
+    db.session.commit()
+    assert search_jobs(user_id, 'terraform') == []
+
+
+def test_rebuild_backfills_and_filters(search_app):
+    _, user_id = search_app
+    job = add_job(user_id, 'SRE', 'On-call rotations and incident reviews', url='https://jobs.example.com/sre')
+    db.session.execute(db.text("INSERT INTO job_description_fts(job_description_fts) VALUES ('delete-all')"))
+    db.session.commit()
+    assert search_jobs(user_id, 'incident') == []
+
+    rebuild_search_index(db.session.connection())
+    db.session.commit()
+
+    matches = JobDescription.query.filter(job_search_clause('example incident')).all()
+    assert matches == [job]
+
+
+@pytest.mark.parametrize('limit', ['-1', '0'])
+def test_search_route_clamps_limit(search_app, monkeypatch, limit):
+    app, user_id = search_app
+    monkeypatch.setenv('JINA_API_KEY', 'test')
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test')
+    from flask_login import LoginManager
+    from routes.jobs import jobs_bp
+    app.config['SECRET_KEY'] = 'test'
+    LoginManager(app).user_loader(lambda uid: db.session.get(User, int(uid)))
+    app.register_blueprint(jobs_bp)
+    for i in range(3):
+        add_job(user_id, f'Python role {i}', 'Python services')
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    response = client.get(f'/jobs/search?q=python&limit={limit}')
+
+    assert response.status_code == 200
+    assert len(response.json['results']) == 1
@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime, timedelta
+from flask import session
+
+from extensions import db
+from services.session_store import (
+    DatabaseSessionBackend, FilesystemSessionBackend, ServerSideSessionInterface
+)
+
+RESUME_TEXT = 'Jane Doe\nSenior Python developer with ten years of experience. ' * 200
+
+
+@pytest.fixture(params=['database', 'filesystem'])
+def session_app(request, make_db_app, tmp_path):
+    app = make_db_app(SECRET_KEY='test', SESSION_FILE_DIR=str(tmp_path / 'sessions'))
+    backend = DatabaseSessionBackend() if request.param == 'database' else FilesystemSessionBackend()
+    app.session_interface = ServerSideSessionInterface(backend)
+
+    @app.route('/store', methods=['POST'])
+    def store():
+        session['original_resume_content'] = RESUME_TEXT
+        return 'ok'
+
+    @app.route('/remember', methods=['POST'])
+    def remember():
+        session.permanent = True
+        session['original_resume_content'] = RESUME_TEXT
+        return 'ok'
+
+    @app.route('/read')
+    def read():
+        return session.get('original_resume_content', '')
+
+    @app.route('/clear', methods=['POST'])
+    def clear():
+        session.clear()
+        return 'ok'
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_cookie_carries_only_the_session_id(session_app):
+    client = session_app.test_client()
+    response = client.post('/store')
+    cookie = response.headers['Set-Cookie']
+    assert len(cookie) < 200
+
+    assert client.get('/read').get_data(as_text=True) == RESUME_TEXT
+    # An unchanged session isn't rewritten
+    assert 'Set-Cookie' not in client.get('/read').headers
+
+
+def test_clear_and_tampered_cookies(session_app):
+    client = session_app.test_client()
+    client.post('/store')
+    sid_cookie = client.get_cookie('session').value
+
+    other = session_app.test_client()
+    other.set_cookie('session', sid_cookie[:-2] + 'xx')
+    assert other.get('/read').get_data(as_text=True) == ''
+
+    client.post('/clear')
+    replay = session_app.test_client()
+    replay.set_cookie('session', sid_cookie)
+    assert replay.get('/read').get_data(as_text=True) == ''
+
+
+def test_expired_sessions_are_ignored_and_cleaned_up(session_app):
+    session_app.session_interface.idle_lifetime = timedelta(seconds=-1)
+    client = session_app.test_client()
+    client.post('/store')
+    assert client.get('/read').get_data(as_text=True) == ''
+    assert session_app.session_interface.backend.cleanup() >= 1
+
+
+def test_browser_sessions_use_the_idle_lifetime(session_app):
+    interface = session_app.session_interface
+    interface.idle_lifetime = timedelta(minutes=5)
+
+    def stored_expiry(client):
+        sid = interface._signer(session_app).unsign(client.get_cookie('session').value).decode('utf-8')
+        return interface.backend.load(interface.storage_key(sid))[1]
+
+    browser = session_app.test_client()
+    browser.post('/store')
+    assert stored_expiry(browser) - datetime.utcnow() <= timedelta(minutes=5)
+
+    remembered = session_app.test_client()
+    remembered.post('/remember')
+    assert stored_expiry(remembered) - datetime.utcnow() > timedelta(days=30)
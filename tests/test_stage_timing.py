@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from services import ats_analyzer, stage_timing
+from services.stage_timing import Histogram, StageStats, StageTimer, NULL_TIMER, ANALYSIS_STATS
+
+
+RESUME = """# Jane Doe
+## Skills
+- Python, Flask, SQL, Docker
+## Experience
+- Built Python web services with Flask and PostgreSQL
+"""
+
+JOB = """Senior Python Engineer
+Requirements:
+- 5 years of Python and Flask experience
+- Docker and AWS
+"""
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    # Tokenize on whitespace so the analysis runs without NLTK's punkt data
+    monkeypatch.setattr(ats_analyzer, 'word_tokenize', str.split)
+    ANALYSIS_STATS.reset()
+    yield ats_analyzer.EnhancedATSAnalyzer()
+    ANALYSIS_STATS.reset()
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram((1, 5, 10))
+    for value in (0.5, 1, 3, 7, 20):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot['buckets'] == [(1, 2), (5, 3), (10, 4), (float('inf'), 5)]
+    assert snapshot['count'] == 5 and snapshot['sum'] == 31.5
+    assert histogram.quantile(0.5) == 5
+    assert Histogram((1,)).quantile(0.5) is None
+
+
+def test_stage_stats_aggregate_timers():
+    stats = StageStats()
+    for _ in range(3):
+        timer = StageTimer()
+        timer.mark('parse')
+        timer.count('tokens', 120)
+        stats.record(timer)
+    stats.record(NULL_TIMER)
+
+    summary = stats.summary()
+    assert summary['stages']['parse']['count'] == 3
+    assert summary['stages']['total']['count'] == 3
+    assert summary['counters']['tokens']['mean'] == 120
+
+
+def test_analyze_records_stages(analyzer):
+    result = analyzer.analyze(RESUME, JOB)
+    assert result['score'] > 0
+    assert 'timings' not in result
+
+    stages = ANALYSIS_STATS.summary()['stages']
+    for stage in ('identify_sections', 'process_job_description', 'extract_ngrams', 'perform_matching',
+                  'calculate_section_scores', 'generate_suggestions', 'total'):
+        assert stages[stage]['count'] == 1
+    assert ANALYSIS_STATS.summary()['counters']['tokens']['count'] == 1
+
+
+def test_debug_flag_returns_timings(analyzer):
+    timings = analyzer.analyze(RESUME, JOB, debug=True)['timings']
+    assert set(timings['stages_ms']) >= {'extract_ngrams', 'perform_matching', 'generate_suggestions'}
+    assert timings['total_ms'] >= sum(timings['stages_ms'].values()) - 0.01
+    assert timings['counters']['tokens'] > 0
+    assert timings['counters']['job_keywords'] > 0
+
+
+def test_disabled_timing_records_nothing(analyzer, monkeypatch):
+    monkeypatch.setattr(stage_timing, 'ENABLED', False)
+    assert stage_timing.start_timer() is NULL_TIMER
+
+    analyzer.analyze(RESUME, JOB)
+    assert ANALYSIS_STATS.summary()['stages'] == {}
+    # Debug analyses are timed regardless
+    assert 'timings' in analyzer.analyze(RESUME, JOB, debug=True)
+
+
+def test_concurrent_analyses_keep_their_own_timers(analyzer):
+    # Routes share one analyzer, so threaded workers run analyses on it concurrently
+    long_resume = RESUME + "- Ran Docker deployments on AWS\n" * 50
+    expected = {text: analyzer.analyze(text, JOB, debug=True)['timings']['counters']['tokens']
+                for text in (RESUME, long_resume)}
+    results = []
+
+    def run(text):
+        for _ in range(5):
+            results.append((text, analyzer.analyze(text, JOB, debug=True)['timings']['counters']['tokens']))
+
+    threads = [threading.Thread(target=run, args=(text,)) for text in (RESUME, long_resume) * 3]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 30
+    assert all(tokens == expected[text] for text, tokens in results)
@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy import text
+
+from extensions import db
+from services import tracing
+from services.tracing import (
+    JsonlExporter, MemoryExporter, Tracer, tracer, traced, init_tracing, slowest, span_tree
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_tracer():
+    exporter = tracer.exporter
+    yield
+    tracer.exporter = exporter
+
+
+@traced()
+def lookup():
+    db.session.execute(text('SELECT 1'))
+
+
+def test_request_produces_span_tree(make_db_app):
+    app = make_db_app(TRACE_EXPORTER='memory')
+    init_tracing(app)
+
+    @app.route('/trace-probe')
+    def trace_probe():
+        lookup()
+        db.session.commit()
+        return 'ok'
+
+    with app.app_context():
+        assert app.test_client().get('/trace-probe').status_code == 200
+
+    [trace] = tracer.recent()
+    assert trace['name'] == 'GET trace_probe'
+    assert trace['attributes'] == {'path': '/trace-probe', 'status': 200}
+
+    tree = [(depth, span['name']) for depth, span in span_tree(trace)]
+    assert tree[0] == (0, 'GET trace_probe')
+    assert (1, 'lookup') in tree
+    assert (2, 'db.query') in tree
+    assert (1, 'db.commit') in tree
+    root = trace['spans'][0]
+    assert all(span['duration_ms'] <= root['duration_ms'] for span in trace['spans'])
+
+
+def test_spans_outside_a_trace_are_ignored():
+    tracer.exporter = MemoryExporter()
+    with tracer.span('orphan') as span:
+        assert span is None
+    assert tracer.recent() == []
+
+
+def test_error_is_recorded_on_span():
+    local = Tracer(MemoryExporter())
+    root, token = local.start_trace('job')
+    with pytest.raises(KeyError):
+        with local.span('step'):
+            raise KeyError('missing')
+    local.finish_trace(root, token)
+
+    [trace] = local.recent()
+    assert trace['spans'][1]['error'] == "KeyError: 'missing'"
+
+
+def test_span_limit_counts_dropped(monkeypatch):
+    monkeypatch.setattr(tracing, 'MAX_SPANS', 3)
+    local = Tracer(MemoryExporter())
+    root, token = local.start_trace('job')
+    for _ in range(5):
+        with local.span('step'):
+            pass
+    local.finish_trace(root, token)
+
+    [trace] = local.recent()
+    assert trace['span_count'] == 3
+    assert trace['dropped_spans'] == 3
+
+
+def test_jsonl_exporter_round_trip(tmp_path):
+    path = tmp_path / 'traces' / 'traces.jsonl'
+    exporter = JsonlExporter(str(path), capacity=2)
+    for duration in (5.0, 50.0, 20.0):
+        exporter.export({'trace_id': str(duration), 'duration_ms': duration, 'spans': []})
+    with open(path, 'a') as f:
+        f.write('{"truncated')
+
+    recent = exporter.recent()
+    assert [trace['duration_ms'] for trace in recent] == [20.0]
+    assert slowest(exporter.recent() + [{'duration_ms': 90.0}], limit=1) == [{'duration_ms': 90.0}]
+
+
+def test_jsonl_exporter_rotates(tmp_path):
+    path = tmp_path / 'traces.jsonl'
+    exporter = JsonlExporter(str(path), capacity=10, max_bytes=100)
+    for i in range(6):
+        exporter.export({'trace_id': str(i), 'duration_ms': float(i), 'padding': 'x' * 40})
+
+    assert path.stat().st_size <= 200 and (tmp_path / 'traces.jsonl.1').exists()
+    assert not (tmp_path / 'traces.jsonl.2').exists()
+    # Reads the rotated file too, oldest first
+    assert [trace['trace_id'] for trace in exporter.recent()] == ['2', '3', '4', '5']
+
+
+def test_unknown_exporter_rejected(make_db_app):
+    with pytest.raises(ValueError):
+        init_tracing(make_db_app(TRACE_EXPORTER='zipkin'))